@@ -10,11 +10,18 @@ from scipy.spatial.distance import pdist, squareform
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
 from scipy.spatial.distance import cdist
+from clustpy.utils._utils import _get_n_jobs
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from threadpoolctl import threadpool_limits
+
+# Shared memory block and BLAS thread limit of the worker processes of _NrkmeansExecutor (see _attach_shared_data)
+_SHARED_DATA = None
 
 
 def _autonr(X: np.ndarray, nrkmeans_repetitions: int, outliers: bool, max_subspaces: int, max_n_clusters: int,
             mdl_for_noisespace: bool, max_distance: float, precision: float, similarity_threshold: float,
-            random_state: np.random.RandomState, debug: bool) -> (NrKmeans, float, list):
+            random_state: np.random.RandomState, debug: bool, n_jobs: int = None) -> (NrKmeans, float, list):
     """
     Start the actual AutoNR clustering procedure on the input data set.
 
@@ -42,6 +49,8 @@ def _autonr(X: np.ndarray, nrkmeans_repetitions: int, outliers: bool, max_subspa
         use a fixed random state to get a repeatable solution
     debug : bool
         If true, additional information will be printed to the console
+    n_jobs : int
+        number of processes used to execute the NrKmeans repetitions. None means 1 and -1 means using all processors (default: None)
 
     Returns
     -------
@@ -56,6 +65,58 @@ def _autonr(X: np.ndarray, nrkmeans_repetitions: int, outliers: bool, max_subspa
                                                                                      max_n_clusters,
                                                                                      max_distance,
                                                                                      precision)
+    # The worker processes and the shared memory block are created once and used by all NrKmeans executions
+    n_jobs = min(_get_n_jobs(n_jobs), nrkmeans_repetitions)
+    executor = _NrkmeansExecutor(X, n_jobs) if n_jobs > 1 else None
+    try:
+        return _autonr_search(X, nrkmeans_repetitions, outliers, max_subspaces, max_n_clusters, mdl_for_noisespace,
+                              max_distance, precision, similarity_threshold, random_state, debug, executor)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def _autonr_search(X: np.ndarray, nrkmeans_repetitions: int, outliers: bool, max_subspaces: int,
+                   max_n_clusters: int, mdl_for_noisespace: bool, max_distance: float, precision: float,
+                   similarity_threshold: float, random_state: np.random.RandomState, debug: bool,
+                   executor: '_NrkmeansExecutor') -> (NrKmeans, float, list):
+    """
+    Search for the best NrKmeans result by splitting and merging subspaces (see _autonr).
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    nrkmeans_repetitions : int
+        number of NrKmeans repetitions for each execution step to find the best local minimum
+    outliers : bool
+        defines if outliers should be identified through MDL
+    max_subspaces : int
+        maximum number of subspaces
+    max_n_clusters : int
+        maximum number of clusters for each subspace
+    mdl_for_noisespace : bool
+        defines if MDL should be used to identify noise space dimensions instead of only considering negative eigenvalues when running NrKmeans
+    max_distance : float
+        distance used to encode cluster centers and outliers
+    precision : float
+        precision used to convert probability densities to actual probabilities
+    similarity_threshold : float
+        threshold that defines if the noise space has not changed for two subsequent iterations by checking the subspace costs
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution
+    debug : bool
+        If true, additional information will be printed to the console
+    executor : _NrkmeansExecutor
+        the process pool used to execute the NrKmeans repetitions. If None, the repetitions are executed sequentially
+
+    Returns
+    -------
+    tuple : (NrKmeans, float, list)
+        The best NrKmeans object found,
+        The final MDL costs,
+        A list of type _Nrkmeans_Mdl_Costs containing all intermediate MDL costs
+    """
     all_mdl_costs = []
     # Default number of clusters
     n_clusters = [1]
@@ -110,12 +171,13 @@ def _autonr(X: np.ndarray, nrkmeans_repetitions: int, outliers: bool, max_subspa
                 nrkmeans_split, mdl_total_split, mdl_threshold_split, subspace_costs_split = _split_noise_space(
                     X_subspace, subspace_nr, best_nrkmeans, best_mdl_overall, best_subspace_costs, all_mdl_costs,
                     nrkmeans_repetitions, outliers, max_n_clusters, mdl_for_noisespace, max_distance, precision,
-                    similarity_threshold, random_state, debug)
+                    similarity_threshold, random_state, debug, executor)
             # Split existing cluster space
             else:
                 nrkmeans_split, mdl_total_split, mdl_threshold_split, subspace_costs_split = _split_cluster_space(
                     X_subspace, subspace_nr, best_nrkmeans, best_mdl_overall, best_subspace_costs, all_mdl_costs,
-                    nrkmeans_repetitions, outliers, mdl_for_noisespace, max_distance, precision, random_state, debug)
+                    nrkmeans_repetitions, outliers, mdl_for_noisespace, max_distance, precision, random_state, debug,
+                    executor)
             # ============================= FULL SPACE =====================================
             # Execute new found n_clusters for full space (except number of subspaces was 1)
             if len(best_nrkmeans.n_clusters) > 1 and mdl_threshold_split < best_subspace_costs[subspace_nr]:
@@ -251,8 +313,8 @@ def _check_input_parameters(X: np.ndarray, nrkmeans_repetitions: int, max_subspa
 def _execute_nrkmeans(X: np.ndarray, n_clusters: list, nrkmeans_repetitions: int,
                       random_state: np.random.RandomState, centers: list = None, V: np.ndarray = None,
                       P: list = None, outliers: bool = False, mdl_for_noisespace: bool = True,
-                      max_distance: float = None, precision: float = None, debug: float = False) -> (
-        NrKmeans, float, list):
+                      max_distance: float = None, precision: float = None, debug: float = False,
+                      executor: '_NrkmeansExecutor' = None) -> (NrKmeans, float, list):
     """
     Execute NrKmeans multiple times and return the best result found.
     In addition the method will return the total MDL costs of the best found result and its MDL costs per subspace.
@@ -283,6 +345,9 @@ def _execute_nrkmeans(X: np.ndarray, n_clusters: list, nrkmeans_repetitions: int
         precision used to convert probability densities to actual probabilities (default: None)
     debug : bool
         If true, additional information will be printed to the console (default: False)
+    executor : _NrkmeansExecutor
+        the process pool used to execute the NrKmeans repetitions. The seeds of the repetitions are always created in the main process, so the result does not depend on the executor.
+        If None, the repetitions are executed sequentially (default: None)
 
     Returns
     -------
@@ -304,6 +369,8 @@ def _execute_nrkmeans(X: np.ndarray, n_clusters: list, nrkmeans_repetitions: int
     add_random_executions = False
     if nrkmeans_repetitions > 1 and centers is not None and V is not None and P is not None:
         add_random_executions = True
+    # Parameters of the single NrKmeans executions
+    all_nrkmeans_params = []
     for i in range(nrkmeans_repetitions):
         if centers is not None and not (i > 0 and add_random_executions):
             input_centers = centers.copy()
@@ -317,18 +384,17 @@ def _execute_nrkmeans(X: np.ndarray, n_clusters: list, nrkmeans_repetitions: int
             input_P = P.copy()
         else:
             input_P = None
-        # Execute NrKmeans
-        nrkmeans = NrKmeans(n_clusters.copy(), random_state=randoms[i], cluster_centers=input_centers, V=input_V,
-                            P=input_P,
-                            outliers=outliers, mdl_for_noisespace=mdl_for_noisespace,
-                            max_distance=max_distance, precision=precision)
-        try:
-            nrkmeans.fit(X)
-        except (Exception, ValueError) as err:
-            print("Error occurred during NrKmeans execution: " + str(err))
-            raise err
-        # Get MDL Costs
-        total_costs, _, all_subspace_costs = nrkmeans.calculate_mdl_costs(X)
+        all_nrkmeans_params.append({"n_clusters": n_clusters.copy(), "random_state": randoms[i],
+                                    "cluster_centers": input_centers, "V": input_V, "P": input_P,
+                                    "outliers": outliers, "mdl_for_noisespace": mdl_for_noisespace,
+                                    "max_distance": max_distance, "precision": precision})
+    if executor is not None and nrkmeans_repetitions > 1:
+        results = executor.map(X, all_nrkmeans_params)
+    else:
+        # Generator, so that only the best NrKmeans result is kept in memory
+        results = (_fit_nrkmeans(X, nrkmeans_params) for nrkmeans_params in all_nrkmeans_params)
+    # Results are evaluated in the order of the repetitions, so the outcome equals the serial execution
+    for nrkmeans, total_costs, all_subspace_costs in results:
         if total_costs < best_total_mdl_costs:
             best_total_mdl_costs = total_costs
             best_subspace_costs = all_subspace_costs
@@ -339,11 +405,144 @@ def _execute_nrkmeans(X: np.ndarray, n_clusters: list, nrkmeans_repetitions: int
     return best_nrkmeans, best_total_mdl_costs, best_subspace_costs
 
 
+def _fit_nrkmeans(X: np.ndarray, nrkmeans_params: dict) -> (NrKmeans, float, list):
+    """
+    Execute a single NrKmeans run and calculate its MDL costs.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    nrkmeans_params : dict
+        the parameters of NrKmeans
+
+    Returns
+    -------
+    tuple : (NrKmeans, float, list)
+        The fitted NrKmeans object,
+        The total MDL costs,
+        A list containing the MDL costs of each subspace
+    """
+    nrkmeans = NrKmeans(**nrkmeans_params)
+    try:
+        nrkmeans.fit(X)
+    except (Exception, ValueError) as err:
+        print("Error occurred during NrKmeans execution: " + str(err))
+        raise err
+    # Get MDL Costs
+    total_costs, _, all_subspace_costs = nrkmeans.calculate_mdl_costs(X)
+    return nrkmeans, total_costs, all_subspace_costs
+
+
+class _NrkmeansExecutor():
+    """
+    Process pool used to execute the NrKmeans repetitions of AutoNR in parallel.
+    The worker processes and a shared memory block are created once and reused by all NrKmeans executions of an AutoNR run.
+    Before each execution, the (possibly transformed) data set is copied into the shared memory block, so it does not have to be sent to each worker process.
+    The number of BLAS threads of each worker process is limited to 1, so that the workers do not oversubscribe the CPU.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    n_jobs : int
+        number of worker processes
+
+    Attributes
+    ----------
+    shm : shared_memory.SharedMemory
+        The shared memory block. Its size suffices for all transformed data sets, since they have at most as many features as X
+    executor : ProcessPoolExecutor
+        The process pool
+    """
+
+    def __init__(self, X: np.ndarray, n_jobs: int):
+        # Transformed data sets have the dtype of X or float64
+        self.shm = shared_memory.SharedMemory(create=True,
+                                              size=max(X.shape[0] * X.shape[1] * max(X.dtype.itemsize, 8), 1))
+        self.executor = ProcessPoolExecutor(max_workers=n_jobs, initializer=_attach_shared_data,
+                                            initargs=(self.shm.name,))
+
+    def map(self, X: np.ndarray, all_nrkmeans_params: list) -> list:
+        """
+        Execute NrKmeans on X once for each entry in all_nrkmeans_params.
+
+        Parameters
+        ----------
+        X : np.ndarray
+            the given data set
+        all_nrkmeans_params : list
+            list containing the parameters of NrKmeans for each execution
+
+        Returns
+        -------
+        results : list
+            list containing the results of _fit_nrkmeans in the order of all_nrkmeans_params
+        """
+        X = np.ascontiguousarray(X)
+        assert X.nbytes <= self.shm.size, "The data set does not fit into the shared memory block"
+        X_shared = np.ndarray(X.shape, dtype=X.dtype, buffer=self.shm.buf)
+        X_shared[:] = X
+        # The view on the buffer must be released before the shared memory block can be closed
+        del X_shared
+        n_executions = len(all_nrkmeans_params)
+        results = list(self.executor.map(_fit_nrkmeans_on_shared_data, all_nrkmeans_params,
+                                         [X.shape] * n_executions, [X.dtype] * n_executions))
+        return results
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker processes and release the shared memory block.
+        """
+        self.executor.shutdown()
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach_shared_data(shm_name: str) -> None:
+    """
+    Initializer of the worker processes of _NrkmeansExecutor.
+    Attaches the shared memory block to the global variable _SHARED_DATA and limits the number of BLAS threads to 1.
+
+    Parameters
+    ----------
+    shm_name : str
+        the name of the shared memory block
+    """
+    global _SHARED_DATA
+    # Keep references to the shared memory block and the thread limit, so both stay active as long as the worker is alive
+    _SHARED_DATA = (shared_memory.SharedMemory(name=shm_name), threadpool_limits(limits=1))
+
+
+def _fit_nrkmeans_on_shared_data(nrkmeans_params: dict, shape: tuple, dtype: np.dtype) -> (NrKmeans, float, list):
+    """
+    Execute a single NrKmeans run on the data set stored in shared memory (see _NrkmeansExecutor).
+
+    Parameters
+    ----------
+    nrkmeans_params : dict
+        the parameters of NrKmeans
+    shape : tuple
+        the shape of the data set
+    dtype : np.dtype
+        the dtype of the data set
+
+    Returns
+    -------
+    tuple : (NrKmeans, float, list)
+        The fitted NrKmeans object,
+        The total MDL costs,
+        A list containing the MDL costs of each subspace
+    """
+    X = np.ndarray(shape, dtype=dtype, buffer=_SHARED_DATA[0].buf)
+    return _fit_nrkmeans(X, nrkmeans_params)
+
+
 def _split_noise_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans: NrKmeans, best_mdl_overall: float,
                        best_subspace_costs: list, all_mdl_costs: list, nrkmeans_repetitions: int, outliers: bool,
                        max_n_clusters: int, mdl_for_noisespace: bool, max_distance: float, precision: float,
-                       similarity_threshold: float, random_state: np.random.RandomState, debug: bool) -> (
-        NrKmeans, float, float, list):
+                       similarity_threshold: float, random_state: np.random.RandomState, debug: bool,
+                       executor: '_NrkmeansExecutor' = None) -> (NrKmeans, float, float, list):
     """
     Perform a noise space split. This operation tries to split an existing noise space into a new noise space and a cluster space.
     In the beginning a NrKmeans run with n_clusters = [2, 1] will be executed.
@@ -382,6 +581,8 @@ def _split_noise_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans:
         use a fixed random state to get a repeatable solution
     debug : bool
         If true, additional information will be printed to the console
+    executor : _NrkmeansExecutor
+        the process pool used to execute the NrKmeans repetitions. If None, the repetitions are executed sequentially (default: None)
 
     Returns
     -------
@@ -414,7 +615,8 @@ def _split_noise_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans:
                                                                P=None if centers is None else nrkmeans.P,
                                                                outliers=outliers, debug=debug,
                                                                mdl_for_noisespace=mdl_for_noisespace,
-                                                               max_distance=max_distance, precision=precision)
+                                                               max_distance=max_distance, precision=precision,
+                                                               executor=executor)
         sum_subspace_costs = np.sum(subspace_costs)
         all_mdl_costs.append(_Nrkmeans_Mdl_Costs(len(best_nrkmeans.n_clusters) == 1,
                                                  best_mdl_overall - best_subspace_costs[
@@ -468,7 +670,8 @@ def _split_noise_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans:
 def _split_cluster_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans: NrKmeans, best_mdl_overall: float,
                          best_subspace_costs: list, all_mdl_costs: list, nrkmeans_repetitions: int, outliers: bool,
                          mdl_for_noisespace: bool, max_distance: float, precision: float,
-                         random_state: np.random.RandomState, debug: bool) -> (NrKmeans, float, float, list):
+                         random_state: np.random.RandomState, debug: bool,
+                         executor: '_NrkmeansExecutor' = None) -> (NrKmeans, float, float, list):
     """
     Perform a cluster space split. This operation tries to split an existing cluster space into two new cluster spaces.
     In the beginning a both subspaces contain the original number of clusters.
@@ -505,6 +708,8 @@ def _split_cluster_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans
         use a fixed random state to get a repeatable solution
     debug : bool
         If true, additional information will be printed to the console
+    executor : _NrkmeansExecutor
+        the process pool used to execute the NrKmeans repetitions. If None, the repetitions are executed sequentially (default: None)
 
     Returns
     -------
@@ -607,7 +812,8 @@ def _split_cluster_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans
                                                                    P_split,
                                                                    outliers=outliers, debug=debug,
                                                                    mdl_for_noisespace=mdl_for_noisespace,
-                                                                   max_distance=max_distance, precision=precision)
+                                                                   max_distance=max_distance, precision=precision,
+                                                                   executor=executor)
             sum_subspace_costs = np.sum(subspace_costs)
             all_mdl_costs.append(_Nrkmeans_Mdl_Costs(len(best_nrkmeans.n_clusters) == 1,
                                                      best_mdl_overall - best_subspace_costs[
@@ -1144,6 +1350,9 @@ class AutoNR(BaseEstimator, ClusterMixin):
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
     debug : bool
         If true, additional information will be printed to the console (default: False)
+    n_jobs : int
+        number of processes used to execute the NrKmeans repetitions of each step. The result does not depend on n_jobs.
+        None means 1 and -1 means using all processors (default: None)
 
     Attributes
     ----------
@@ -1167,7 +1376,7 @@ class AutoNR(BaseEstimator, ClusterMixin):
     def __init__(self, nrkmeans_repetitions: int = 15, outliers: bool = True, max_subspaces: int = None,
                  max_n_clusters: int = None, mdl_for_noisespace: bool = True, max_distance: float = None,
                  precision: float = None, similarity_threshold: float = 1e-5,
-                 random_state: np.random.RandomState | int = None, debug: bool = False):
+                 random_state: np.random.RandomState | int = None, debug: bool = False, n_jobs: int = None):
         # Fixed attributes
         self.nrkmeans_repetitions = nrkmeans_repetitions
         self.outliers = outliers
@@ -1179,6 +1388,7 @@ class AutoNR(BaseEstimator, ClusterMixin):
         self.similarity_threshold = similarity_threshold
         self.random_state = check_random_state(random_state)
         self.debug = debug
+        self.n_jobs = n_jobs
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'AutoNR':
         """
@@ -1201,7 +1411,7 @@ class AutoNR(BaseEstimator, ClusterMixin):
                                                      self.max_subspaces,
                                                      self.max_n_clusters, self.mdl_for_noisespace,
                                                      self.max_distance, self.precision, self.similarity_threshold,
-                                                     self.random_state, self.debug)
+                                                     self.random_state, self.debug, self.n_jobs)
         # Output
         self.n_clusters_ = nrkmeans.n_clusters
         self.nrkmeans_ = nrkmeans
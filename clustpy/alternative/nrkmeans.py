@@ -5,6 +5,7 @@ Collin Leiber
 
 import numpy as np
 from scipy.stats import ortho_group
+from scipy.sparse import csr_matrix
 from sklearn.utils import check_random_state
 from scipy.spatial.distance import pdist
 from sklearn.utils.extmath import row_norms
@@ -129,12 +130,15 @@ def _nrkmeans(X: np.ndarray, n_clusters: list, V: np.ndarray, m: list, P: list,
     n_outliers = np.zeros(subspaces, dtype=int)
     # Repeat actions until convergence or max_iter
     for iteration in range(max_iter):
+        # labels, center and scatter matrix stay the same for the noise space if not outliers are present
+        update_subspace = [n_clusters[i] != 1 or iteration == 0 or n_outliers[i] > 0 for i in range(subspaces)]
+        # V does not change until the rotation update -> project X onto all relevant subspaces at once
+        cropped_X = _project_onto_subspaces(X, V, P, [i for i in range(subspaces) if update_subspace[i] or outliers])
         # Execute basic kmeans steps
         for i in range(subspaces):
-            # labels, center and scatter matrix stay the same for the noise space if not outliers are present
-            if n_clusters[i] != 1 or iteration == 0 or n_outliers[i] > 0:
+            if update_subspace[i]:
                 # Assign each point to closest cluster center
-                labels[:, i] = _assign_labels(X, V, centers[i], P[i])
+                labels[:, i] = _assign_labels(X, V, centers[i], P[i], cropped_X[i])
                 # Update centers and scatter matrices depending on cluster assignments
                 centers[i], scatter_matrices[i] = _update_centers_and_scatter_matrix(X, n_clusters[i], labels[:, i])
                 # Remove empty clusters
@@ -144,7 +148,7 @@ def _nrkmeans(X: np.ndarray, n_clusters: list, V: np.ndarray, m: list, P: list,
             if outliers:
                 labels[:, i], n_outliers[i] = _check_for_outliers(X, V, centers[i], labels[:, i],
                                                                   scatter_matrices[i], m[i], P[i],
-                                                                  X.shape[0], max_distance)
+                                                                  X.shape[0], max_distance, cropped_X[i])
                 # Again update centers and scatter matrices so rotations includes new strucure
                 centers[i], scatter_matrices[i] = _update_centers_and_scatter_matrix(X, n_clusters[i], labels[:, i])
         # Check if labels have not changed
@@ -321,7 +325,39 @@ def _initialize_nrkmeans_parameters(X: np.ndarray, n_clusters: list, V: np.ndarr
     return V, m, P, centers, subspaces, labels, scatter_matrices
 
 
-def _assign_labels(X: np.ndarray, V: np.ndarray, centers_subspace: np.ndarray, P_subspace: np.ndarray) -> np.ndarray:
+def _project_onto_subspaces(X: np.ndarray, V: np.ndarray, P: list, subspace_ids: list) -> dict:
+    """
+    Project the data set onto multiple subspaces using a single matrix multiplication.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    V : np.ndarray
+        the orthonormal rotation matrix
+    P : list
+        list containing projections (ids of corresponding dimensions) for each subspace
+    subspace_ids : list
+        the ids of the subspaces onto which the data should be projected
+
+    Returns
+    -------
+    cropped_X : dict
+        dictionary containing the projected data set (X @ V[:, P[i]]) for each subspace id i in subspace_ids
+    """
+    if len(subspace_ids) == 0:
+        return {}
+    X_projected = np.matmul(X, V[:, np.concatenate([P[i] for i in subspace_ids])])
+    cropped_X = {}
+    start = 0
+    for i in subspace_ids:
+        cropped_X[i] = X_projected[:, start:start + len(P[i])]
+        start += len(P[i])
+    return cropped_X
+
+
+def _assign_labels(X: np.ndarray, V: np.ndarray, centers_subspace: np.ndarray, P_subspace: np.ndarray,
+                   cropped_X: np.ndarray = None) -> np.ndarray:
     """
     Assign each point in each subspace to its nearest cluster center.
 
@@ -335,6 +371,8 @@ def _assign_labels(X: np.ndarray, V: np.ndarray, centers_subspace: np.ndarray, P
         the cluster centers in this subspace
     P_subspace : np.ndarray
         the relevant dimensions (projections) in this subspace
+    cropped_X : np.ndarray
+        the data set projected onto this subspace, i.e., X @ V[:, P_subspace]. If None, it will be calculated (default: None)
 
     Returns
     -------
@@ -342,7 +380,8 @@ def _assign_labels(X: np.ndarray, V: np.ndarray, centers_subspace: np.ndarray, P
         The updated cluster labels in this subspace
     """
     cropped_V = V[:, P_subspace]
-    cropped_X = np.matmul(X, cropped_V)
+    if cropped_X is None:
+        cropped_X = np.matmul(X, cropped_V)
     cropped_centers = np.matmul(centers_subspace, cropped_V)
     # Find nearest center
     labels, _ = pairwise_distances_argmin_min(X=cropped_X, Y=cropped_centers, metric='euclidean',
@@ -373,10 +412,19 @@ def _update_centers_and_scatter_matrix(X: np.ndarray, n_clusters_subspace: int,
         The updated cluster centers,
         The updated scatter matrix
     """
-    # Get new centers
-    centers = np.array([np.mean(X[labels_subspace == cluster_id], axis=0) for cluster_id in range(n_clusters_subspace)])
-    # Get new scatter matrix
-    centered_points = X[labels_subspace >= 0] - centers[labels_subspace[labels_subspace >= 0]]
+    is_assigned = labels_subspace >= 0
+    X_assigned = X if np.all(is_assigned) else X[is_assigned]
+    labels_assigned = labels_subspace[is_assigned]
+    # Get new centers by summing up the points of each cluster using a sparse one-hot matrix (single pass over X)
+    one_hot = csr_matrix((np.ones(labels_assigned.shape[0]), (labels_assigned, np.arange(labels_assigned.shape[0]))),
+                         shape=(n_clusters_subspace, labels_assigned.shape[0]))
+    cluster_sizes = np.bincount(labels_assigned, minlength=n_clusters_subspace)
+    with np.errstate(invalid="ignore"):
+        # Empty clusters receive nan centers and are handled by _remove_empty_cluster
+        centers = (one_hot @ X_assigned) / cluster_sizes[:, None]
+    # Get new scatter matrix (subtract the centers in place to avoid an additional copy of X)
+    centered_points = np.take(centers, labels_assigned, axis=0)
+    np.subtract(X_assigned, centered_points, out=centered_points)
     scatter_matrix = np.matmul(centered_points.T, centered_points)
     return centers, scatter_matrix
 
@@ -1249,7 +1297,7 @@ def _mdl_m_dependant_subspace_costs(X: np.ndarray, V: np.ndarray, cluster_index:
 
 def _check_for_outliers(X: np.ndarray, V: np.ndarray, centers_subspace: np.ndarray, labels_subspace: np.ndarray,
                         scatter_matrix_subspace: np.ndarray, m_subspace: int, P_subspace: np.ndarray,
-                        n_points: int, max_distance: float) -> (np.ndarray, int):
+                        n_points: int, max_distance: float, cropped_X: np.ndarray = None) -> (np.ndarray, int):
     """
     Check for each point if it should be interpreted as an outlier in this subspace. Outliers are defined by the cost
     difference when this point is removed from its cluster. If it is cheaper to encode the point separately it is an outlier.
@@ -1277,6 +1325,8 @@ def _check_for_outliers(X: np.ndarray, V: np.ndarray, centers_subspace: np.ndarr
         the number of objects. Used for the calculation of the MDL costs (since the method should also work for predictions, it can not be obtained from X)
     max_distance : float
         distance used to encode the outliers
+    cropped_X : np.ndarray
+        the data set projected onto this subspace, i.e., X @ V[:, P_subspace]. If None, it will be calculated (default: None)
 
     Returns
     -------
@@ -1289,7 +1339,8 @@ def _check_for_outliers(X: np.ndarray, V: np.ndarray, centers_subspace: np.ndarr
     # Copy labels to update theses based on new outliers
     labels_subspace_copy = labels_subspace.copy()
     # Calculate points distances to respective centers
-    cropped_X = np.matmul(X, cropped_V)
+    if cropped_X is None:
+        cropped_X = np.matmul(X, cropped_V)
     cropped_centers = np.matmul(centers_subspace, cropped_V)
     cropped_scatter_matrix = np.matmul(np.matmul(cropped_V.transpose(), scatter_matrix_subspace), cropped_V)
     differences_per_dim = np.power(cropped_X - cropped_centers[labels_subspace], 2)
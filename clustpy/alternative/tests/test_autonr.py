@@ -1,6 +1,7 @@
 import numpy as np
 from clustpy.alternative import AutoNR
-from clustpy.alternative.autonr import _find_two_closest_centers, _merge_nearest_centers, _split_largest_cluster
+from clustpy.alternative.autonr import _find_two_closest_centers, _merge_nearest_centers, _split_largest_cluster, \
+    _NrkmeansExecutor, _fit_nrkmeans
 from clustpy.data import create_nr_data
 from unittest.mock import patch
 
@@ -126,3 +127,34 @@ def test_dissolve_noise_space():
             assert len(autonr.nrkmeans_.P[i]) == autonr.nrkmeans_.m[i]
             check_P += autonr.nrkmeans_.P[i].tolist()
         assert np.array_equal(np.sort(check_P), np.arange(X.shape[1]))
+
+
+def test_autonr_with_n_jobs():
+    X, labels = create_nr_data(200, random_state=1)
+    autonr = AutoNR(nrkmeans_repetitions=4, max_subspaces=3, max_n_clusters=4, random_state=1)
+    autonr.fit(X)
+    # Parallel execution of the NrKmeans repetitions should not change the result
+    autonr_2 = AutoNR(nrkmeans_repetitions=4, max_subspaces=3, max_n_clusters=4, random_state=1, n_jobs=2)
+    autonr_2.fit(X)
+    assert np.array_equal(autonr_2.n_clusters_, autonr.n_clusters_)
+    assert np.array_equal(autonr_2.labels_, autonr.labels_)
+    assert np.array_equal(autonr_2.nrkmeans_.V, autonr.nrkmeans_.V)
+    assert autonr_2.mdl_costs_ == autonr.mdl_costs_
+    assert [c.costs for c in autonr_2.all_mdl_costs_] == [c.costs for c in autonr.all_mdl_costs_]
+
+
+def test_NrkmeansExecutor():
+    X, _ = create_nr_data(100, random_state=1)
+    executor = _NrkmeansExecutor(X, 2)
+    try:
+        # The same executor can be used for data sets with different shapes
+        for X_input in [X, X[:, :3].astype(np.float32)]:
+            all_nrkmeans_params = [{"n_clusters": [2, 1], "random_state": seed} for seed in range(3)]
+            results = executor.map(X_input, all_nrkmeans_params)
+            assert len(results) == 3
+            for (nrkmeans, total_costs, subspace_costs), nrkmeans_params in zip(results, all_nrkmeans_params):
+                _, total_costs_serial, subspace_costs_serial = _fit_nrkmeans(X_input, nrkmeans_params)
+                assert total_costs == total_costs_serial
+                assert subspace_costs == subspace_costs_serial
+    finally:
+        executor.shutdown()
@@ -2,7 +2,8 @@ import numpy as np
 from clustpy.alternative import NrKmeans
 from clustpy.alternative.nrkmeans import _assign_labels, _are_labels_equal, _is_matrix_orthogonal, _is_matrix_symmetric, \
     _create_full_rotation_matrix, _update_projections, _update_centers_and_scatter_matrix, _remove_empty_cluster, \
-    _get_cost_function_of_subspace, _get_total_cost_function, _remove_empty_subspace, _get_precision
+    _get_cost_function_of_subspace, _get_total_cost_function, _remove_empty_subspace, _get_precision, \
+    _project_onto_subspaces, _check_for_outliers
 from clustpy.data import create_nr_data
 from unittest.mock import patch
 
@@ -19,6 +20,33 @@ def test_update_centers_and_scatter_matrices():
     assert np.array_equal(expected_centers, calculated_centers, equal_nan=True)
     assert np.array_equal(expected_scatter_matrix, calculated_scatter_matrices)
 
+    # With outliers
+    labels_subspace = np.array([0, 0, 0, 1, 1, 1, -1, 3, 3, 3])
+    expected_centers = np.array([[3, 2, 1], [1, 3, 2], [np.nan, np.nan, np.nan], [20 / 3, 20 / 3, 20 / 3]])
+    centered_points = X[labels_subspace >= 0] - expected_centers[labels_subspace[labels_subspace >= 0]]
+    calculated_centers, calculated_scatter_matrices = _update_centers_and_scatter_matrix(X, n_clusters_subspace,
+                                                                                         labels_subspace)
+    assert np.allclose(expected_centers, calculated_centers, equal_nan=True)
+    assert np.allclose(np.matmul(centered_points.T, centered_points), calculated_scatter_matrices)
+
+
+def test_project_onto_subspaces():
+    X = np.random.RandomState(1).rand(20, 5)
+    V = np.linalg.qr(np.random.RandomState(2).rand(5, 5))[0]
+    P = [np.array([3, 0]), np.array([1]), np.array([2, 4])]
+    cropped_X = _project_onto_subspaces(X, V, P, [0, 2])
+    assert list(cropped_X.keys()) == [0, 2]
+    assert np.allclose(cropped_X[0], np.matmul(X, V[:, P[0]]))
+    assert np.allclose(cropped_X[2], np.matmul(X, V[:, P[2]]))
+    # Projected data can be passed to _assign_labels and _check_for_outliers
+    centers = X[:3]
+    labels = _assign_labels(X, V, centers, P[0])
+    assert np.array_equal(labels, _assign_labels(X, V, centers, P[0], cropped_X[0]))
+    scatter_matrix = np.matmul((X - centers[labels]).T, X - centers[labels])
+    outlier_labels, n_outliers = _check_for_outliers(X, V, centers, labels, scatter_matrix, 2, P[0], 20, 1.)
+    outlier_labels_2, n_outliers_2 = _check_for_outliers(X, V, centers, labels, scatter_matrix, 2, P[0], 20, 1.,
+                                                         cropped_X[0])
+    assert np.array_equal(outlier_labels, outlier_labels_2) and n_outliers == n_outliers_2
 
 def test_assign_labels():
     X = np.array([[1, 1, 1], [1, 2, 2], [2, 3, 1], [4, 5, 4], [5, 5, 5], [4, 5, 6], [10, 11, 11], [12, 10, 11]])
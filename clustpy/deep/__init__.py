@@ -10,6 +10,8 @@ from .aec import AEC
 from .deepect import DeepECT
 from ._data_utils import get_dataloader, get_default_augmented_dataloaders
 from ._train_utils import get_trained_network
+from ._training_options import TrainingOptions
+from ._pretraining_cache import PretrainingCache
 from ._utils import encode_batchwise, decode_batchwise, encode_decode_batchwise, predict_batchwise, detect_device, \
     get_device_from_module, set_torch_seed
 
@@ -29,6 +31,8 @@ __all__ = ['DEC',
            'get_dataloader',
            'get_default_augmented_dataloaders',
            'get_trained_network',
+           'TrainingOptions',
+           'PretrainingCache',
            'encode_batchwise',
            'decode_batchwise',
            'encode_decode_batchwise',
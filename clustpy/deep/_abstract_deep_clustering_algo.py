@@ -4,6 +4,7 @@ from sklearn.utils import check_random_state
 import numpy as np
 import torch
 from clustpy.deep._data_utils import augmentation_invariance_check
+from clustpy.deep._training_options import TrainingOptions
 
 
 class _AbstractDeepClusteringAlgo(BaseEstimator, ClusterMixin):
@@ -25,16 +26,20 @@ class _AbstractDeepClusteringAlgo(BaseEstimator, ClusterMixin):
         The device on which to perform the computations
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training of the neural network (default: None)
     """
 
     def __init__(self, batch_size: int, neural_network: torch.nn.Module | tuple, neural_network_weights: str,
-                 embedding_size: int, device: torch.device, random_state: np.random.RandomState | int):
+                 embedding_size: int, device: torch.device, random_state: np.random.RandomState | int,
+                 training_options: TrainingOptions = None):
         self.batch_size = batch_size
         self.neural_network = neural_network
         self.neural_network_weights = neural_network_weights
         self.embedding_size = embedding_size
         self.device = device
         self.random_state = check_random_state(random_state)
+        self.training_options = training_options
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> '_AbstractDeepClusteringAlgo':
         """
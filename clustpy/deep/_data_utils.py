@@ -1,6 +1,9 @@
 import torch
 import torchvision
 import numpy as np
+import random
+import os
+import multiprocessing
 from typing import Callable, List
 
 
@@ -24,6 +27,9 @@ class _ClustpyDataset(torch.utils.data.Dataset):
         and the third tensor will be transformed with transform1.
     orig_transforms_list : List of torchvision.transforms
         List of torchvision.transforms for each original tensor in tensors, e.g., for preprocessing. If a tensor in the list should not be transformed add None to the list.
+    batch_transforms : bool
+        If True, the transforms are applied to whole batches of shape (batch_size, ...) instead of single samples (see __getitems__).
+        Requires transforms that operate on batches, e.g., _BatchRandomAffine, torchvision.transforms.Normalize or torch.nn.Flatten (default: False)
     
     Attributes
     ----------
@@ -31,10 +37,14 @@ class _ClustpyDataset(torch.utils.data.Dataset):
         tensors that have the same size of the first dimension. Usually contains the data.
     aug_transforms_list : List of torchvision.transforms
     orig_transforms_list : List of torchvision.transforms
+    batch_transforms : bool
+    batch_fetching : bool
+        If True, __getitems__ directly returns a whole batch [indices, data1, data2, ...] by slicing the tensors instead of a list of single samples.
+        Requires a DataLoader with collate_fn=_collate_batch. Is set by get_dataloader if no transforms or batch_transforms are used
     """
 
     def __init__(self, *tensors: torch.Tensor, aug_transforms_list: List[Callable] = None,
-                 orig_transforms_list: List[Callable] = None):
+                 orig_transforms_list: List[Callable] = None, batch_transforms: bool = False):
         assert all(tensors[0].size(0) == tensor.size(0) for tensor in tensors), "Size mismatch between tensors"
         self.tensors = tensors
         assert orig_transforms_list is None or len(orig_transforms_list) == len(
@@ -43,6 +53,8 @@ class _ClustpyDataset(torch.utils.data.Dataset):
         assert aug_transforms_list is None or len(aug_transforms_list) == len(
             tensors), "Size mismatch between tensors and aug_transforms_list"
         self.aug_transforms_list = aug_transforms_list
+        self.batch_transforms = batch_transforms
+        self.batch_fetching = False
 
     def __getitem__(self, index: int) -> tuple:
         """
@@ -61,29 +73,81 @@ class _ClustpyDataset(torch.utils.data.Dataset):
 
         if self.orig_transforms_list is None and self.aug_transforms_list is None:
             final_tuple = tuple([index] + [tensor[index] for tensor in self.tensors])
+        elif self.batch_transforms:
+            # Transforms expect a batch -> use a batch containing only a single sample
+            final_tuple = tuple([index] + [sample[0] for sample in
+                                           self._transform([tensor[index:index + 1] for tensor in self.tensors])])
         else:
-            aug_list = []
-            for i, tensor in enumerate(self.tensors):
-                if self.aug_transforms_list is not None:
-                    # apply augmentation
-                    aug_transforms_i = self.aug_transforms_list[i]
-                    if aug_transforms_i is not None:
-                        aug_list.append(aug_transforms_i(tensor[index]))
-
-                if self.orig_transforms_list is not None:
-                    # apply preprocessing
-                    orig_transforms_i = self.orig_transforms_list[i]
-                    if orig_transforms_i is None:
-                        orig_i = tensor[index]
-                    else:
-                        orig_i = orig_transforms_i(tensor[index])
+            final_tuple = tuple([index] + self._transform([tensor[index] for tensor in self.tensors]))
+        return final_tuple
+
+    def _transform(self, samples: list) -> list:
+        """
+        Apply the augmentation and preprocessing transforms to the given samples.
+        The samples can either be single samples or whole batches (in case of batch_transforms).
+
+        Parameters
+        ----------
+        samples : list
+            list containing the samples (or batches) of each tensor
+
+        Returns
+        -------
+        aug_list : list
+            list containing the transformed samples. If an augmentation transform is given for a tensor, the augmented sample is followed by the original sample
+        """
+        aug_list = []
+        for i, sample in enumerate(samples):
+            if self.aug_transforms_list is not None:
+                # apply augmentation
+                aug_transforms_i = self.aug_transforms_list[i]
+                if aug_transforms_i is not None:
+                    aug_list.append(aug_transforms_i(sample))
+
+            if self.orig_transforms_list is not None:
+                # apply preprocessing
+                orig_transforms_i = self.orig_transforms_list[i]
+                if orig_transforms_i is None:
+                    orig_i = sample
                 else:
-                    orig_i = tensor[index]
+                    orig_i = orig_transforms_i(sample)
+            else:
+                orig_i = sample
 
-                aug_list.append(orig_i)
+            aug_list.append(orig_i)
+        return aug_list
 
-            final_tuple = tuple([index] + aug_list)
-        return final_tuple
+    def __getitems__(self, indices: list) -> list:
+        """
+        Get multiple samples at once. Is used by torch.utils.data.DataLoader to fetch a batch.
+        If batch_fetching is True, the tensors will be sliced using all indices at once (contiguous indices result in a single slice).
+        In case of batch_transforms, the transforms will afterward be applied to the whole batch.
+        Else, a list of single samples (see __getitem__) will be returned, which can be combined by the default collate function.
+
+        Parameters
+        ----------
+        indices : list
+            indices of the desired samples
+
+        Returns
+        -------
+        batch : list
+            If batch_fetching is True, list containing the batch. Consists of [indices, data1, data2, ...], depending on the input tensors.
+            Else, list containing the single samples
+        """
+        if not self.batch_fetching:
+            batch = [self[index] for index in indices]
+        else:
+            indices = torch.as_tensor(indices, dtype=torch.int64)
+            if indices.shape[0] > 0 and indices[-1] - indices[0] + 1 == indices.shape[0] and (
+                    indices.shape[0] == 1 or torch.all(indices[1:] - indices[:-1] == 1)):
+                # Contiguous indices (e.g. no shuffling) -> copy a single slice
+                batch = [indices] + [tensor[indices[0]:indices[-1] + 1].clone() for tensor in self.tensors]
+            else:
+                batch = [indices] + [tensor[indices] for tensor in self.tensors]
+            if self.orig_transforms_list is not None or self.aug_transforms_list is not None:
+                batch = [indices] + self._transform(batch[1:])
+        return batch
 
     def __len__(self) -> int:
         """
@@ -98,10 +162,128 @@ class _ClustpyDataset(torch.utils.data.Dataset):
         return dataset_size
 
 
+def _collate_batch(batch: list) -> list:
+    """
+    Collate function for batches that have already been created by _ClustpyDataset.__getitems__ (using batch_fetching=True).
+    Therefore, the batch will be returned as it is.
+
+    Parameters
+    ----------
+    batch : list
+        The batch, i.e., [indices, data1, data2, ...]
+
+    Returns
+    -------
+    batch : list
+        The unchanged batch
+    """
+    return batch
+
+
+def _get_default_num_workers() -> int:
+    """
+    Get the default number of worker processes for dataloaders that transform the samples.
+    Workers are only used by default if the fork start method is used, since otherwise the transforms (e.g., lambda functions) have to be picklable.
+
+    Returns
+    -------
+    num_workers : int
+        min(4, number of cpus) in case of the fork start method, else 0
+    """
+    start_method = multiprocessing.get_start_method(allow_none=True) or multiprocessing.get_all_start_methods()[0]
+    num_workers = min(4, os.cpu_count() or 1) if start_method == "fork" else 0
+    return num_workers
+
+
+def _seed_worker(worker_id: int) -> None:
+    """
+    Seed numpy and random within a worker process of a torch.utils.data.DataLoader.
+    Torch already seeds each worker with base_seed + worker_id, where base_seed is drawn from the torch random generator of the main process.
+    Therefore, the augmentations are reproducible if set_torch_seed is used (for a fixed number of workers).
+
+    Parameters
+    ----------
+    worker_id : int
+        the id of the worker
+    """
+    seed = torch.initial_seed() % 2 ** 32
+    np.random.seed(seed)
+    random.seed(seed)
+
+
+class _BatchRandomAffine(torch.nn.Module):
+    """
+    Random affine transformation of a batch of images of shape (batch_size, channels, height, width).
+    In contrast to torchvision.transforms.RandomAffine, each image of the batch receives its own random rotation, translation and shear.
+    The transformation is executed using torch.nn.functional.affine_grid and torch.nn.functional.grid_sample.
+    Therefore, it works on the device of the input batch (cpu or cuda) and does not require a conversion to PIL images.
+
+    Parameters
+    ----------
+    degrees : tuple
+        range of the rotation angle in degrees (default: (-16, 16))
+    translate : tuple
+        maximum absolute fraction of the horizontal and vertical translation (default: (0.1, 0.1))
+    shear : tuple
+        range of the shear angle (parallel to the x-axis) in degrees (default: (-8, 8))
+    fill : float
+        value of the pixels outside the transformed images (default: 0)
+    interpolation : str
+        interpolation mode of grid_sample. Can be 'nearest' or 'bilinear' (default: 'nearest')
+    """
+
+    def __init__(self, degrees: tuple = (-16, 16), translate: tuple = (0.1, 0.1), shear: tuple = (-8, 8),
+                 fill: float = 0, interpolation: str = "nearest"):
+        super().__init__()
+        self.degrees = degrees
+        self.translate = translate
+        self.shear = shear
+        self.fill = fill
+        self.interpolation = interpolation
+
+    def forward(self, batch: torch.Tensor) -> torch.Tensor:
+        """
+        Transform the batch using random affine transformations.
+
+        Parameters
+        ----------
+        batch : torch.Tensor
+            the batch of images of shape (batch_size, channels, height, width)
+
+        Returns
+        -------
+        transformed : torch.Tensor
+            the transformed batch
+        """
+        n, _, height, width = batch.shape
+        rand = torch.rand((4, n), device=batch.device)
+        angle = torch.deg2rad(self.degrees[0] + rand[0] * (self.degrees[1] - self.degrees[0]))
+        shear = torch.deg2rad(self.shear[0] + rand[1] * (self.shear[1] - self.shear[0]))
+        # Translation in normalized coordinates ([-1, 1] corresponds to the whole image)
+        translation_x = (rand[2] * 2 - 1) * self.translate[0] * 2
+        translation_y = (rand[3] * 2 - 1) * self.translate[1] * 2
+        # Forward transformation (rotation after shear) in pixel coordinates
+        forward = torch.zeros((n, 2, 2), device=batch.device)
+        forward[:, 0, 0] = torch.cos(angle)
+        forward[:, 0, 1] = torch.cos(angle) * torch.tan(shear) - torch.sin(angle)
+        forward[:, 1, 0] = torch.sin(angle)
+        forward[:, 1, 1] = torch.sin(angle) * torch.tan(shear) + torch.cos(angle)
+        # grid_sample needs the inverse transformation in normalized coordinates
+        scale = torch.tensor([2 / width, 2 / height], device=batch.device)
+        inverse = scale[None, :, None] * torch.linalg.inv(forward) / scale[None, None, :]
+        translation = torch.stack([translation_x, translation_y], dim=1)
+        theta = torch.cat([inverse, -torch.bmm(inverse, translation[:, :, None])], dim=2)
+        grid = torch.nn.functional.affine_grid(theta.to(batch.dtype), batch.shape, align_corners=False)
+        # Shift values so that the zero padding of grid_sample corresponds to fill
+        transformed = torch.nn.functional.grid_sample(batch - self.fill, grid, mode=self.interpolation,
+                                                      padding_mode="zeros", align_corners=False) + self.fill
+        return transformed
+
+
 def get_dataloader(X: np.ndarray | torch.Tensor, batch_size: int, shuffle: bool = True, drop_last: bool = False,
                    additional_inputs: list | np.ndarray | torch.Tensor = None,
                    dataset_class: torch.utils.data.Dataset = _ClustpyDataset, ds_kwargs: dict = None,
-                   dl_kwargs: dict = None) -> torch.utils.data.DataLoader:
+                   dl_kwargs: dict = None, num_workers: int = 0) -> torch.utils.data.DataLoader:
     """
     Create a dataloader for Deep Clustering algorithms.
     First entry always contains the indices of the data samples.
@@ -136,7 +318,18 @@ def get_dataloader(X: np.ndarray | torch.Tensor, batch_size: int, shuffle: bool
                    An example for MNIST is shown below.
 
     dl_kwargs : dict
-        other arguments for torch.utils.data.DataLoader
+        other arguments for torch.utils.data.DataLoader. Values specified here have priority over the defaults described below
+    num_workers : int
+        number of worker processes used to load the batches. If None, min(4, number of cpus) workers are used if the dataset transforms the samples
+        (i.e., if aug_transforms_list or orig_transforms_list is specified) and the fork start method is used (see _get_default_num_workers).
+        Else, 0 workers are used, since slicing the tensors in the main process is faster than transferring the batches between processes (default: 0)
+
+    Notes
+    ----------
+    If the default _ClustpyDataset is used without any transforms (or with batch_transforms=True) and no custom collate_fn is given, the batches are created by slicing the tensors with all indices of a batch at once
+    (see _ClustpyDataset.__getitems__). This avoids creating and stacking single samples and results in the same batches as the per-sample approach.
+    If workers are used, persistent_workers is True, pin_memory is True if cuda is available and numpy and random are seeded in each worker (see _seed_worker).
+    As torch seeds the workers based on its random generator, set_torch_seed still results in reproducible augmentations (for a fixed number of workers).
 
     Examples
     ----------
@@ -193,7 +386,7 @@ def get_dataloader(X: np.ndarray | torch.Tensor, batch_size: int, shuffle: bool
     assert additional_inputs is None or type(additional_inputs) in [np.ndarray, torch.Tensor,
                                                                     list], "additional_input must be None or of type np.ndarray, torch.Tensor or list."
     ds_kwargs = {} if ds_kwargs is None else ds_kwargs
-    dl_kwargs = {} if dl_kwargs is None else dl_kwargs
+    dl_kwargs = {} if dl_kwargs is None else dl_kwargs.copy()
     if type(X) is np.ndarray:
         # Convert np.ndarray to torch.Tensor
         X = torch.from_numpy(X).float()
@@ -214,6 +407,22 @@ def get_dataloader(X: np.ndarray | torch.Tensor, batch_size: int, shuffle: bool
                             type(input)))
                 dataset_input.append(input)
     dataset = dataset_class(*dataset_input, **ds_kwargs)
+    uses_transforms = getattr(dataset, "aug_transforms_list", None) is not None or getattr(
+        dataset, "orig_transforms_list", None) is not None
+    # Fast path: fetch whole batches at once if the samples do not have to be transformed individually
+    if isinstance(dataset, _ClustpyDataset) and type(dataset).__getitem__ is _ClustpyDataset.__getitem__ \
+            and type(dataset).__getitems__ is _ClustpyDataset.__getitems__ \
+            and (not uses_transforms or dataset.batch_transforms) and "collate_fn" not in dl_kwargs:
+        dataset.batch_fetching = True
+        dl_kwargs["collate_fn"] = _collate_batch
+    # Use worker processes if the samples have to be transformed
+    if num_workers is None:
+        num_workers = _get_default_num_workers() if uses_transforms else 0
+    dl_kwargs.setdefault("num_workers", num_workers)
+    if dl_kwargs["num_workers"] > 0:
+        dl_kwargs.setdefault("persistent_workers", True)
+        dl_kwargs.setdefault("pin_memory", torch.cuda.is_available())
+        dl_kwargs.setdefault("worker_init_fn", _seed_worker)
     # Create dataloader using the dataset
     dataloader = torch.utils.data.DataLoader(
         dataset,
@@ -295,7 +504,8 @@ def get_train_and_test_dataloader(X: np.ndarray | torch.Tensor, batch_size: int
 
 
 def get_default_augmented_dataloaders(X: np.ndarray | torch.Tensor, batch_size: int = 256, conv_used: bool = False,
-                                      flatten: bool = True) -> (
+                                      flatten: bool = True, batch_augmentation: bool = False,
+                                      num_workers: int = 0) -> (
         torch.utils.data.DataLoader, torch.utils.data.DataLoader):
     """
     Receive a train- and a test dataloader using default augmentations.
@@ -303,6 +513,7 @@ def get_default_augmented_dataloaders(X: np.ndarray | torch.Tensor, batch_size:
     torchvision.transforms.RandomAffine(degrees=(-16, +16), translate=(0.1, 0.1), shear=(-8, 8), fill=0) and
     a channel-wise z-transformation.
     Optionally, the images can be flatten afterward.
+    If batch_augmentation is True, the augmentations are applied to whole batches using _BatchRandomAffine instead, where each image receives its own random transformation.
 
 
     Parameters
@@ -317,6 +528,11 @@ def get_default_augmented_dataloaders(X: np.ndarray | torch.Tensor, batch_size:
     flatten : bool
         defines whether the augmented images should be flatten afterward.
         Must be False if conv_used is True (default: True)
+    batch_augmentation : bool
+        defines whether the transforms should be applied to whole batches using _BatchRandomAffine (see _ClustpyDataset).
+        If False, each image will be transformed individually using torchvision.transforms.RandomAffine on PIL images (default: False)
+    num_workers : int
+        number of worker processes used to load the batches. If None, the number of workers will be chosen automatically (see get_dataloader) (default: 0)
 
     Returns
     -------
@@ -340,15 +556,22 @@ def get_default_augmented_dataloaders(X: np.ndarray | torch.Tensor, batch_size:
     channel_stds = X.std([0, 2, 3])
     normalize_fn = torchvision.transforms.Normalize(channel_means, channel_stds)
     # augmentation transforms
-    transform_list = [
-        torchvision.transforms.ToPILImage(),
-        torchvision.transforms.RandomAffine(degrees=(-16, +16), translate=(0.1, 0.1), shear=(-8, 8), fill=0),
-        torchvision.transforms.ToTensor(),
-        normalize_fn
-    ]
+    if batch_augmentation:
+        transform_list = [
+            _BatchRandomAffine(degrees=(-16, +16), translate=(0.1, 0.1), shear=(-8, 8), fill=0),
+            normalize_fn
+        ]
+    else:
+        transform_list = [
+            torchvision.transforms.ToPILImage(),
+            torchvision.transforms.RandomAffine(degrees=(-16, +16), translate=(0.1, 0.1), shear=(-8, 8), fill=0),
+            torchvision.transforms.ToTensor(),
+            normalize_fn
+        ]
     orig_transform_list = [normalize_fn]
     if flatten:
-        flatten_fn = torchvision.transforms.Lambda(torch.flatten)
+        # Batches must keep their first dimension
+        flatten_fn = torch.nn.Flatten() if batch_augmentation else torchvision.transforms.Lambda(torch.flatten)
         transform_list.append(flatten_fn)
         orig_transform_list.append(flatten_fn)
     aug_transforms = torchvision.transforms.Compose(transform_list)
@@ -356,9 +579,11 @@ def get_default_augmented_dataloaders(X: np.ndarray | torch.Tensor, batch_size:
     # pass transforms to dataloader
     aug_dataloader = get_dataloader(X, batch_size=batch_size, shuffle=True,
                                     ds_kwargs={"aug_transforms_list": [aug_transforms],
-                                               "orig_transforms_list": [orig_transforms]})
+                                               "orig_transforms_list": [orig_transforms],
+                                               "batch_transforms": batch_augmentation}, num_workers=num_workers)
     orig_dataloader = get_dataloader(X, batch_size=batch_size, shuffle=False,
-                                     ds_kwargs={"orig_transforms_list": [orig_transforms]})
+                                     ds_kwargs={"orig_transforms_list": [orig_transforms],
+                                                "batch_transforms": batch_augmentation}, num_workers=num_workers)
     return aug_dataloader, orig_dataloader
 
 
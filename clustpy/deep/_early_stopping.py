@@ -1,4 +1,5 @@
 import torch
+import copy
 
 
 class EarlyStopping():
@@ -14,6 +15,9 @@ class EarlyStopping():
         minimum difference between new loss and old loss for new loss to be considered as an improvement (default=1e-4)
     verbose : bool
         if True will print INFO statements (default=False)
+    restore_best_weights : bool
+        if True, a copy of the state_dicts of the modules passed to the call will be kept in memory whenever best_loss improves.
+        These states can be restored using restore_best_state (default=False)
     
     Attributes
     ----------
@@ -23,18 +27,26 @@ class EarlyStopping():
         best loss achieved before stopping
     early_stop : boolean
         indicating whether to stop training or not
+    improved : boolean
+        indicating whether the last validation loss has been considered as an improvement (i.e., best_loss has been updated)
+    best_state : list
+        copies of the state_dicts of the modules at the time best_loss was reached. Is None if restore_best_weights is False
     """
 
-    def __init__(self, patience: int = 10, min_delta: float = 1e-4, verbose: bool = False):
+    def __init__(self, patience: int = 10, min_delta: float = 1e-4, verbose: bool = False,
+                 restore_best_weights: bool = False):
         self.patience = patience
         self.min_delta = min_delta
         self.verbose = verbose
+        self.restore_best_weights = restore_best_weights
 
         self.counter = 0
         self.best_loss = None
         self.early_stop = False
+        self.improved = False
+        self.best_state = None
 
-    def __call__(self, val_loss: torch.Tensor) -> None:
+    def __call__(self, val_loss: torch.Tensor, *modules: torch.nn.Module) -> None:
         """
         Call the EarlyStopping class with an input validation loss.
         If the validation loss does not improve for self.patience iterations, set self.early_stopping to True.
@@ -43,16 +55,54 @@ class EarlyStopping():
         ----------
         val_loss : torch.Tensor
             the input validation loss. Will be compared to self.best_loss
+        modules : torch.nn.Module
+            the modules whose state_dicts should be kept in memory if the validation loss improves. Only used if restore_best_weights is True
         """
         if self.best_loss == None:
             self.best_loss = val_loss
+            self.improved = True
+            self._save_state(modules)
         elif self.best_loss - val_loss >= self.min_delta:
             self.best_loss = val_loss
+            self.improved = True
+            self._save_state(modules)
             # reset counter if validation loss improves (gets smaller)
             self.counter = 0
-        elif self.best_loss - val_loss < self.min_delta:
+        else:
+            # Also covers non-finite losses
+            self.improved = False
             self.counter += 1
             if self.verbose:
                 print(f"INFO: Early stopping counter {self.counter} of {self.patience}")
             if self.counter >= self.patience:
                 self.early_stop = True
+
+    def _save_state(self, modules: tuple) -> None:
+        """
+        Keep a copy of the state_dicts of the given modules in memory (only if restore_best_weights is True).
+
+        Parameters
+        ----------
+        modules : tuple
+            tuple of torch.nn.Modules
+        """
+        if self.restore_best_weights:
+            self.best_state = [copy.deepcopy(module.state_dict()) for module in modules]
+
+    def restore_best_state(self, *modules: torch.nn.Module) -> None:
+        """
+        Load the state_dicts that have been saved when best_loss was reached into the given modules.
+        The modules must be given in the same order as in the calls of the EarlyStopping object.
+        Nothing happens if no state has been saved.
+
+        Parameters
+        ----------
+        modules : torch.nn.Module
+            the modules whose state should be restored
+        """
+        if self.best_state is not None:
+            assert len(modules) == len(
+                self.best_state), "Number of modules ({0}) does not match the number of saved states ({1})".format(
+                len(modules), len(self.best_state))
+            for module, state in zip(modules, self.best_state):
+                module.load_state_dict(state)
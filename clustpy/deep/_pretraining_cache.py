@@ -0,0 +1,308 @@
+import torch
+import numpy as np
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+_INDEX_FILE_NAME = "index.json"
+_LOCK_FILE_NAME = "index.lock"
+
+
+class PretrainingCache():
+    """
+    A persistent cache for pretrained neural networks.
+    If it is passed to get_trained_network (e.g., via TrainingOptions), the state_dict of the pretrained neural network will be stored in cache_dir.
+    Subsequent calls using the same data, architecture, initial parameters, optimizer parameters, number of epochs and random state will load the stored parameters instead of pretraining the neural network again.
+    Therefore, different deep clustering algorithms (e.g., DEC, IDEC and DCN) can share the same pretrained neural network.
+    The entries are tracked in an index file and the least recently used entries will be removed if the size of the cache exceeds max_size.
+    Updates of the index file are guarded by a file lock, so that multiple processes can share a cache.
+
+    Note that loading a neural network from the cache does not consume random numbers like the pretraining would.
+    Therefore, get_trained_network reseeds the random generators after the pretraining or loading step if a cache is used.
+    This way, the subsequent clustering result does not depend on whether the entry was already in the cache.
+    However, it can differ from the result obtained without a cache.
+
+    Parameters
+    ----------
+    cache_dir : str
+        the directory in which the neural networks are stored. Will be created if it does not exist
+    max_size : float
+        maximum size of the cache in megabytes. If None, the size of the cache is not bounded (default: 1024)
+
+    Examples
+    ----------
+    >>> from clustpy.data import create_subspace_data
+    >>> from clustpy.deep import DEC, DCN, TrainingOptions, PretrainingCache
+    >>> data, labels = create_subspace_data(1500, subspace_features=(3, 50), random_state=1)
+    >>> training_options = TrainingOptions(pretraining_cache=PretrainingCache("pretrained_networks"))
+    >>> dec = DEC(n_clusters=3, pretrain_epochs=3, clustering_epochs=3, random_state=1, training_options=training_options)
+    >>> dec.fit(data)
+    >>> # The pretrained neural network will be loaded from the cache
+    >>> dcn = DCN(n_clusters=3, pretrain_epochs=3, clustering_epochs=3, random_state=1, training_options=training_options)
+    >>> dcn.fit(data)
+    """
+
+    def __init__(self, cache_dir: str, max_size: float = 1024):
+        assert max_size is None or max_size > 0, "max_size must be None or larger than 0. Your input: {0}".format(
+            max_size)
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    def get_key(self, trainloader: torch.utils.data.DataLoader, neural_network: torch.nn.Module, n_epochs: int,
+                optimizer_class: torch.optim.Optimizer, optimizer_params: dict,
+                ssl_loss_fn: torch.nn.modules.loss._Loss, random_state: np.random.RandomState | int,
+                precision: str) -> str:
+        """
+        Get the key identifying a pretrained neural network.
+        The key is a hash of the data fingerprint, the architecture, the initial parameters of the neural network, the optimizer, the number of epochs, the loss function, the random state and the precision.
+        If the data can not be fingerprinted, i.e., the dataset of the trainloader does not contain the attribute tensors or uses transforms, or the random state is None, None will be returned.
+
+        Parameters
+        ----------
+        trainloader : torch.utils.data.DataLoader
+            dataloader used to train the neural network
+        neural_network : torch.nn.Module
+            the (not yet fitted) neural network
+        n_epochs : int
+            number of training epochs
+        optimizer_class : torch.optim.Optimizer
+            optimizer for training
+        optimizer_params : dict
+            parameters of the optimizer
+        ssl_loss_fn : torch.nn.modules.loss._Loss
+            self-supervised learning (ssl) loss function
+        random_state : np.random.RandomState | int
+            the random state before the neural network has been created
+        precision : str
+            the precision used for the training (see TrainingOptions)
+
+        Returns
+        -------
+        key : str
+            the key of the neural network or None if no key can be created
+        """
+        data_fingerprint = _get_data_fingerprint(trainloader)
+        if data_fingerprint is None or random_state is None:
+            return None
+        if type(random_state) is np.random.RandomState:
+            # Hash the current state of the random generator
+            _, keys, pos, has_gauss, cached_gaussian = random_state.get_state()
+            random_state = hashlib.sha256(keys.tobytes()).hexdigest() + "_{0}_{1}_{2}".format(pos, has_gauss,
+                                                                                               cached_gaussian)
+        components = {"data": data_fingerprint, "batch_size": trainloader.batch_size,
+                      "drop_last": trainloader.drop_last,
+                      "network": "{0}.{1}".format(type(neural_network).__module__, type(neural_network).__qualname__),
+                      "architecture": repr(neural_network),
+                      "initial_state_dict": _get_state_dict_fingerprint(neural_network), "n_epochs": n_epochs,
+                      "optimizer": "{0}.{1}".format(optimizer_class.__module__, optimizer_class.__qualname__),
+                      "optimizer_params": repr(sorted(optimizer_params.items())), "ssl_loss_fn": repr(ssl_loss_fn),
+                      "random_state": str(random_state), "precision": precision}
+        key = hashlib.sha256(json.dumps(components, sort_keys=True).encode()).hexdigest()
+        return key
+
+    def load(self, key: str, neural_network: torch.nn.Module) -> bool:
+        """
+        Load the parameters of a pretrained neural network from the cache (in place).
+        If the entry exists, the neural network will be marked as fitted and the access time of the entry will be updated.
+
+        Parameters
+        ----------
+        key : str
+            the key of the neural network (see get_key)
+        neural_network : torch.nn.Module
+            the neural network into which the parameters should be loaded
+
+        Returns
+        -------
+        found : bool
+            True if the entry has been found in the cache
+        """
+        if not os.path.isdir(self.cache_dir):
+            return False
+        with self._lock_index():
+            index = self._read_index()
+            if key not in index or not os.path.isfile(os.path.join(self.cache_dir, index[key]["file"])):
+                return False
+            device = next(neural_network.parameters()).device
+            state_dict = torch.load(os.path.join(self.cache_dir, index[key]["file"]), map_location=device)
+            neural_network.load_state_dict(state_dict)
+            neural_network.fitted = True
+            index[key]["last_access"] = time.time()
+            self._write_index(index)
+        return True
+
+    def save(self, key: str, neural_network: torch.nn.Module) -> None:
+        """
+        Store the parameters of a pretrained neural network in the cache.
+        Afterward, the least recently used entries will be removed until the size of the cache is below max_size.
+        The new entry itself is never removed. Therefore, the cache can exceed max_size if the new entry alone is larger than max_size.
+
+        Parameters
+        ----------
+        key : str
+            the key of the neural network (see get_key)
+        neural_network : torch.nn.Module
+            the pretrained neural network
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        file_name = key + ".pt"
+        file_path = os.path.join(self.cache_dir, file_name)
+        # Write to a temporary file first so that parallel runs never read incomplete files
+        torch.save(neural_network.state_dict(), file_path + ".tmp")
+        os.replace(file_path + ".tmp", file_path)
+        with self._lock_index():
+            index = self._read_index()
+            index[key] = {"file": file_name, "size": os.path.getsize(file_path), "last_access": time.time()}
+            if self.max_size is not None:
+                # Evict least recently used entries
+                total_size = sum(entry["size"] for entry in index.values())
+                for evict_key in sorted(index.keys(), key=lambda k: index[k]["last_access"]):
+                    if total_size <= self.max_size * 1024 ** 2:
+                        break
+                    if evict_key == key:
+                        # Never remove the entry that has just been stored
+                        continue
+                    total_size -= index[evict_key]["size"]
+                    evict_path = os.path.join(self.cache_dir, index.pop(evict_key)["file"])
+                    if os.path.isfile(evict_path):
+                        os.remove(evict_path)
+            self._write_index(index)
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the cache.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+        with self._lock_index():
+            index = self._read_index()
+            for entry in index.values():
+                file_path = os.path.join(self.cache_dir, entry["file"])
+                if os.path.isfile(file_path):
+                    os.remove(file_path)
+            self._write_index({})
+
+    @contextmanager
+    def _lock_index(self):
+        """
+        Acquire an exclusive lock for reading and updating the index file.
+        Blocks until the lock is released by other processes.
+        """
+        with open(os.path.join(self.cache_dir, _LOCK_FILE_NAME), "a+") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _read_index(self) -> dict:
+        """
+        Read the index file of the cache.
+
+        Returns
+        -------
+        index : dict
+            dictionary mapping the keys to the file name, the file size and the last access time of the entries
+        """
+        index_path = os.path.join(self.cache_dir, _INDEX_FILE_NAME)
+        if not os.path.isfile(index_path):
+            return {}
+        with open(index_path, "r") as f:
+            index = json.load(f)
+        return index
+
+    def _write_index(self, index: dict) -> None:
+        """
+        Write the index file of the cache.
+
+        Parameters
+        ----------
+        index : dict
+            dictionary mapping the keys to the file name, the file size and the last access time of the entries
+        """
+        index_path = os.path.join(self.cache_dir, _INDEX_FILE_NAME)
+        with open(index_path + ".tmp", "w") as f:
+            json.dump(index, f)
+        os.replace(index_path + ".tmp", index_path)
+
+
+def _get_data_fingerprint(trainloader: torch.utils.data.DataLoader) -> str:
+    """
+    Get a fingerprint of the data contained in the dataloader.
+    Only datasets that store their data in the attribute tensors and do not use transforms (e.g., datasets created by get_dataloader without transforms) are supported.
+
+    Parameters
+    ----------
+    trainloader : torch.utils.data.DataLoader
+        the dataloader
+
+    Returns
+    -------
+    fingerprint : str
+        the hash of the data or None if the data can not be fingerprinted
+    """
+    dataset = trainloader.dataset
+    if not hasattr(dataset, "tensors") or getattr(dataset, "aug_transforms_list", None) is not None or getattr(
+            dataset, "orig_transforms_list", None) is not None:
+        return None
+    data_hash = hashlib.sha256()
+    for tensor in dataset.tensors:
+        _update_hash_with_tensor(data_hash, tensor)
+    fingerprint = data_hash.hexdigest()
+    return fingerprint
+
+
+def _get_state_dict_fingerprint(neural_network: torch.nn.Module) -> str:
+    """
+    Get a fingerprint of the parameters and buffers contained in the state_dict of the neural network.
+    Two neural networks with the same architecture but different initial parameters (e.g., loaded weights) therefore get different fingerprints.
+
+    Parameters
+    ----------
+    neural_network : torch.nn.Module
+        the neural network
+
+    Returns
+    -------
+    fingerprint : str
+        the hash of the state_dict
+    """
+    state_dict_hash = hashlib.sha256()
+    for name, tensor in neural_network.state_dict().items():
+        state_dict_hash.update(name.encode())
+        _update_hash_with_tensor(state_dict_hash, tensor)
+    fingerprint = state_dict_hash.hexdigest()
+    return fingerprint
+
+
+def _update_hash_with_tensor(tensor_hash: 'hashlib._Hash', tensor: torch.Tensor) -> None:
+    """
+    Update a hash with the shape, the dtype and the raw bytes of a tensor (in place).
+
+    Parameters
+    ----------
+    tensor_hash : hashlib._Hash
+        the hash object that should be updated
+    tensor : torch.Tensor
+        the tensor
+    """
+    tensor = tensor.detach().cpu().contiguous()
+    tensor_hash.update("{0}_{1}".format(tuple(tensor.shape), tensor.dtype).encode())
+    tensor_hash.update(tensor.flatten().view(torch.uint8).numpy().tobytes())
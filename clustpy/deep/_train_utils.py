@@ -4,7 +4,8 @@ import copy
 import numpy as np
 from sklearn.base import ClusterMixin
 from clustpy.deep._data_utils import get_dataloader, get_train_and_test_dataloader, get_data_dim_from_dataloader
-from clustpy.deep._utils import run_initial_clustering, detect_device, encode_batchwise
+from clustpy.deep._utils import run_initial_clustering, detect_device, encode_batchwise, set_torch_seed
+from clustpy.deep._training_options import TrainingOptions
 
 
 def _get_default_layers(input_dim: int, embedding_size: int) -> list:
@@ -93,7 +94,8 @@ def get_trained_network(trainloader: torch.utils.data.DataLoader = None, data: n
                         neural_network: torch.nn.Module | tuple = None,
                         neural_network_class: torch.nn.Module = FeedforwardAutoencoder,
                         neural_network_params: dict = None, neural_network_weights: str = None,
-                        random_state: np.random.RandomState | int = None) -> torch.nn.Module:
+                        random_state: np.random.RandomState | int = None,
+                        training_options: TrainingOptions = None) -> torch.nn.Module:
     """This function returns a trained neural network. The following cases are considered
        - If the neural network is initialized and trained (neural_network.fitted==True), then return input neural network without training it again.
        - If the neural network is initialized and not trained (neural_network.fitted==False), it will be fitted (neural_network.fitted will be set to True) using default parameters.
@@ -132,6 +134,11 @@ def get_trained_network(trainloader: torch.utils.data.DataLoader = None, data: n
         Path to a file containing the state_dict of the neural_network (default: None)
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the pretraining.
+        If training_options.pretraining_cache is specified, the pretrained neural network will be loaded from or stored in the cache.
+        In this case, the random generators are reseeded afterward, so that subsequent results do not depend on whether the cache already contained the neural network.
+        If None, the default options of the fit function of the neural network will be used (default: None)
     
     Returns
     -------
@@ -150,17 +157,38 @@ def get_trained_network(trainloader: torch.utils.data.DataLoader = None, data: n
         neural_network_class = neural_network[0]
         neural_network_params = neural_network[1]
         neural_network = None
+    pretraining_cache = None if training_options is None else training_options.pretraining_cache
+    # Keep the random state before it is used to create the neural network, so that it can be part of the cache key
+    cache_random_state = None if pretraining_cache is None else copy.deepcopy(random_state)
     neural_network = _get_neural_network(input_dim, embedding_size, neural_network, neural_network_class,
                                          neural_network_params, neural_network_weights, random_state)
     # Move neural network to device
     device = detect_device(device)
     neural_network.to(device)
     if not neural_network.fitted:
-        print("Neural network is not fitted yet, will be pretrained.")
-        # Pretrain neural network
         optimizer_params = {"lr": 1e-3} if optimizer_params is None else optimizer_params
-        neural_network.fit(n_epochs=n_epochs, optimizer_params=optimizer_params, dataloader=trainloader,
-                           optimizer_class=optimizer_class, ssl_loss_fn=ssl_loss_fn)
+        cache_key = None if pretraining_cache is None else pretraining_cache.get_key(
+            trainloader, neural_network, n_epochs, optimizer_class, optimizer_params, ssl_loss_fn, cache_random_state,
+            training_options.precision)
+        # The pretraining can consume numbers of the random state (e.g., if it is shared with the neural network)
+        random_state_before_pretraining = random_state.get_state() if cache_key is not None and type(
+            random_state) is np.random.RandomState else None
+        if cache_key is not None and pretraining_cache.load(cache_key, neural_network):
+            print("Neural network has been loaded from the pretraining cache.")
+        else:
+            print("Neural network is not fitted yet, will be pretrained.")
+            # Pretrain neural network
+            # Custom networks do not necessarily support training_options
+            fit_kwargs = {} if training_options is None else {"training_options": training_options}
+            neural_network.fit(n_epochs=n_epochs, optimizer_params=optimizer_params, dataloader=trainloader,
+                               optimizer_class=optimizer_class, ssl_loss_fn=ssl_loss_fn, **fit_kwargs)
+            if cache_key is not None:
+                pretraining_cache.save(cache_key, neural_network)
+        if cache_key is not None:
+            # Loading from the cache does not consume random numbers. Reseed, so that the results do not depend on the cache
+            if random_state_before_pretraining is not None:
+                random_state.set_state(random_state_before_pretraining)
+            set_torch_seed(random_state)
     if neural_network.work_on_copy:
         # If neural network is used by multiple deep clustering algorithms, create a deep copy of the object
         neural_network = copy.deepcopy(neural_network)
@@ -177,7 +205,8 @@ def get_default_deep_clustering_initialization(X: np.ndarray | torch.Tensor, n_c
                                                random_state: np.random.RandomState,
                                                neural_network_class: torch.nn.Module = FeedforwardAutoencoder,
                                                neural_network_params: dict = None,
-                                               neural_network_weights: str = None) -> (
+                                               neural_network_weights: str = None,
+                                               training_options: TrainingOptions = None) -> (
         torch.device, torch.utils.data.DataLoader, torch.utils.data.DataLoader, int, torch.nn.Module, np.ndarray, int,
         np.ndarray, np.ndarray, ClusterMixin):
     """
@@ -225,6 +254,8 @@ def get_default_deep_clustering_initialization(X: np.ndarray | torch.Tensor, n_c
         Parameters to be used when creating a new neural network using the neural_network_class (default: None)
     neural_network_weights : str
         Path to a file containing the state_dict of the neural_network (default: None)
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the pretraining (default: None)
 
     Returns
     -------
@@ -248,7 +279,7 @@ def get_default_deep_clustering_initialization(X: np.ndarray | torch.Tensor, n_c
                                          neural_network=neural_network, neural_network_class=neural_network_class,
                                          neural_network_params=neural_network_params,
                                          neural_network_weights=neural_network_weights,
-                                         random_state=random_state)
+                                         random_state=random_state, training_options=training_options)
     # Execute initial clustering in embedded space
     embedded_data = encode_batchwise(testloader, neural_network)
     n_clusters, init_labels, init_centers, init_cluster_obj = run_initial_clustering(embedded_data, n_clusters,
@@ -0,0 +1,132 @@
+import torch
+from clustpy.deep._pretraining_cache import PretrainingCache
+from contextlib import contextmanager, nullcontext
+
+_PRECISION_DTYPES = {"fp32": None, "bf16": torch.bfloat16, "fp16": torch.float16}
+
+
+class TrainingOptions():
+    """
+    Options that define how the neural networks of deep clustering algorithms are trained.
+    Can be passed to get_trained_network, the fit method of autoencoders and all deep clustering algorithms.
+    The default options correspond to a training in fp32 without compilation.
+
+    Parameters
+    ----------
+    precision : str
+        the precision used for the forward pass. Can be 'fp32', 'bf16' or 'fp16'.
+        'bf16' and 'fp16' use torch.autocast. In case of 'fp16', the loss is additionally scaled using a torch.amp.GradScaler (default: 'fp32')
+    compile : bool
+        defines whether the encode and decode functions of the neural network should be compiled using torch.compile during the training (default: False)
+    compile_params : dict
+        additional parameters for torch.compile (default: {})
+    channels_last : bool
+        defines whether networks containing 2D convolutions (e.g., ConvolutionalAutoencoder) should use the channels-last memory format (default: False)
+    pretraining_cache : PretrainingCache | str
+        cache used by get_trained_network to store and load pretrained neural networks. Can also be the path to the cache directory.
+        If None, no cache will be used (default: None)
+
+    Examples
+    ----------
+    >>> from clustpy.data import create_subspace_data
+    >>> from clustpy.deep import DEC, TrainingOptions
+    >>> data, labels = create_subspace_data(1500, subspace_features=(3, 50), random_state=1)
+    >>> dec = DEC(n_clusters=3, pretrain_epochs=3, clustering_epochs=3, training_options=TrainingOptions(precision="bf16"))
+    >>> dec.fit(data)
+    """
+
+    def __init__(self, precision: str = "fp32", compile: bool = False, compile_params: dict = None,
+                 channels_last: bool = False, pretraining_cache: PretrainingCache | str = None):
+        assert precision in _PRECISION_DTYPES.keys(), "precision must be one of {0}. Your input: {1}".format(
+            list(_PRECISION_DTYPES.keys()), precision)
+        self.precision = precision
+        self.compile = compile
+        self.compile_params = {} if compile_params is None else compile_params
+        self.channels_last = channels_last
+        if type(pretraining_cache) is str:
+            pretraining_cache = PretrainingCache(pretraining_cache)
+        self.pretraining_cache = pretraining_cache
+
+    def autocast(self, device: torch.device):
+        """
+        Get the context manager for the forward pass.
+
+        Parameters
+        ----------
+        device : torch.device
+            device to be trained on
+
+        Returns
+        -------
+        context : contextlib.AbstractContextManager
+            torch.autocast using the specified precision or a nullcontext in case of 'fp32'
+        """
+        if self.precision == "fp32":
+            return nullcontext()
+        return torch.autocast(device_type=device.type, dtype=_PRECISION_DTYPES[self.precision])
+
+    def get_grad_scaler(self, device: torch.device) -> torch.amp.GradScaler:
+        """
+        Get the gradient scaler. Is only enabled in case of 'fp16'.
+
+        Parameters
+        ----------
+        device : torch.device
+            device to be trained on
+
+        Returns
+        -------
+        grad_scaler : torch.amp.GradScaler
+            the gradient scaler
+        """
+        grad_scaler = torch.amp.GradScaler(device.type, enabled=self.precision == "fp16")
+        return grad_scaler
+
+    def optimization_step(self, loss: torch.Tensor, optimizer: torch.optim.Optimizer,
+                          grad_scaler: torch.amp.GradScaler) -> None:
+        """
+        Execute the backward pass and update the parameters.
+        If the gradient scaler is disabled, this equals optimizer.zero_grad(), loss.backward() and optimizer.step().
+
+        Parameters
+        ----------
+        loss : torch.Tensor
+            the loss
+        optimizer : torch.optim.Optimizer
+            the optimizer
+        grad_scaler : torch.amp.GradScaler
+            the gradient scaler (see get_grad_scaler)
+        """
+        optimizer.zero_grad()
+        grad_scaler.scale(loss).backward()
+        grad_scaler.step(optimizer)
+        grad_scaler.update()
+
+    @contextmanager
+    def training_context(self, neural_network: torch.nn.Module):
+        """
+        Prepare the neural network for the training.
+        If channels_last is True and the network contains 2D convolutions, the network will be converted to the channels-last memory format.
+        If compile is True, the encode and decode functions will be replaced by compiled versions while the context is active.
+        The original functions are restored afterward so that the network can still be copied and saved.
+
+        Parameters
+        ----------
+        neural_network : torch.nn.Module
+            the neural network
+        """
+        if self.channels_last and any(isinstance(module, torch.nn.Conv2d) for module in neural_network.modules()):
+            neural_network.to(memory_format=torch.channels_last)
+        compiled_functions = []
+        if self.compile:
+            for function_name in ["encode", "decode"]:
+                # Do not replace functions that have been set on the instance by the user
+                if hasattr(neural_network, function_name) and function_name not in vars(neural_network):
+                    setattr(neural_network, function_name,
+                            torch.compile(getattr(neural_network, function_name), **self.compile_params))
+                    compiled_functions.append(function_name)
+        try:
+            yield neural_network
+        finally:
+            for function_name in compiled_functions:
+                delattr(neural_network, function_name)
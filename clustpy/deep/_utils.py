@@ -7,6 +7,7 @@ import random
 from sklearn.metrics.pairwise import pairwise_distances_argmin_min
 import os
 import subprocess
+from collections.abc import Callable
 
 
 def set_torch_seed(random_state: np.random.RandomState | int) -> None:
@@ -132,7 +133,92 @@ def get_device_from_module(neural_network: torch.nn.Module) -> torch.device:
     return device
 
 
-def encode_batchwise(dataloader: torch.utils.data.DataLoader, neural_network: torch.nn.Module) -> np.ndarray:
+def _get_inference_dataloader(dataloader: torch.utils.data.DataLoader,
+                              inference_batch_size: int) -> torch.utils.data.DataLoader:
+    """
+    Get a dataloader that can be used for inference.
+    If inference_batch_size is None or equal to the batch size of the dataloader, the input dataloader will be returned.
+    Else, a new non-shuffled dataloader on the same dataset (using the same collate_fn, num_workers and pin_memory settings) will be created.
+
+    Parameters
+    ----------
+    dataloader : torch.utils.data.DataLoader
+        the original dataloader
+    inference_batch_size : int
+        the batch size used for inference. Can be None
+
+    Returns
+    -------
+    inference_dataloader : torch.utils.data.DataLoader
+        The dataloader used for inference
+    """
+    if inference_batch_size is None or inference_batch_size == dataloader.batch_size:
+        return dataloader
+    assert type(inference_batch_size) is int and inference_batch_size > 0, "inference_batch_size must be None or a positive integer"
+    inference_dataloader = torch.utils.data.DataLoader(dataloader.dataset, batch_size=inference_batch_size,
+                                                       shuffle=False, drop_last=False,
+                                                       collate_fn=dataloader.collate_fn,
+                                                       num_workers=dataloader.num_workers,
+                                                       pin_memory=dataloader.pin_memory)
+    return inference_dataloader
+
+
+def _batchwise_inference(dataloader: torch.utils.data.DataLoader, neural_network: torch.nn.Module,
+                         batch_function: Callable, inference_batch_size: int) -> tuple:
+    """
+    Apply batch_function to all batches of the dataloader and gather the results.
+    The computation runs under torch.inference_mode(), so no autograd graph is built.
+    The results of each batch are written into preallocated output buffers.
+    If the neural network is located on a GPU, the output buffers will be pinned and the results are copied with non_blocking=True.
+
+    Parameters
+    ----------
+    dataloader : torch.utils.data.DataLoader
+        dataloader to be used
+    neural_network : torch.nn.Module
+        the neural network that is used for the computation (e.g. an autoencoder)
+    batch_function : Callable
+        function that receives the batch data (already moved to the device of the neural network) and returns a tuple of torch.Tensors
+    inference_batch_size : int
+        the batch size used for inference. If None, the batch size of the dataloader will be used.
+        Note that if inference_batch_size is specified, the samples will be processed in the order of the dataset, i.e., without shuffling
+
+    Returns
+    -------
+    results : tuple
+        Tuple containing one np.ndarray for each output of batch_function
+    """
+    device = get_device_from_module(neural_network)
+    use_pinned_memory = device.type == "cuda"
+    dataloader = _get_inference_dataloader(dataloader, inference_batch_size)
+    if dataloader.batch_size is not None and dataloader.drop_last:
+        n_samples = len(dataloader) * dataloader.batch_size
+    else:
+        n_samples = len(dataloader.dataset)
+    buffers = None
+    position = 0
+    with torch.inference_mode():
+        for batch in dataloader:
+            batch_data = batch[1].to(device, non_blocking=use_pinned_memory)
+            batch_results = batch_function(batch_data)
+            if buffers is None:
+                buffers = [torch.empty((n_samples,) + tuple(result.shape[1:]), dtype=result.dtype,
+                                       pin_memory=use_pinned_memory) for result in batch_results]
+            if position + batch_results[0].shape[0] > buffers[0].shape[0]:
+                # Can only occur for custom samplers -> enlarge buffers
+                buffers = [torch.cat([buffer, torch.empty_like(buffer)]) for buffer in buffers]
+            for buffer, result in zip(buffers, batch_results):
+                buffer[position:position + result.shape[0]].copy_(result, non_blocking=use_pinned_memory)
+            position += batch_results[0].shape[0]
+    if use_pinned_memory:
+        # Make sure that all asynchronous copies are finished
+        torch.cuda.synchronize(device)
+    results = tuple(buffer[:position].numpy() for buffer in buffers)
+    return results
+
+
+def encode_batchwise(dataloader: torch.utils.data.DataLoader, neural_network: torch.nn.Module,
+                     inference_batch_size: int = None) -> np.ndarray:
     """
     Utility function for embedding the whole data set in a mini-batch fashion
 
@@ -142,26 +228,28 @@ def encode_batchwise(dataloader: torch.utils.data.DataLoader, neural_network: to
         dataloader to be used
     neural_network : torch.nn.Module
         the neural network that is used for the encoding (e.g. an autoencoder)
+    inference_batch_size : int
+        the batch size used for the encoding. If None, the batch size of the dataloader will be used (default: None)
 
     Returns
     -------
     embeddings_numpy : np.ndarray
         The embedded data set
     """
-    device = get_device_from_module(neural_network)
-    embeddings = []
-    for batch in dataloader:
-        batch_data = batch[1].to(device)
+
+    def _encode(batch_data):
         embedded_data = neural_network.encode(batch_data)
         # In case encode() returns more than one value (e.g., for a variational autoencoder), we will pick the first
         if type(embedded_data) is tuple:
             embedded_data = embedded_data[0]
-        embeddings.append(embedded_data.detach().cpu())
-    embeddings_numpy = torch.cat(embeddings, dim=0).numpy()
+        return (embedded_data,)
+
+    embeddings_numpy, = _batchwise_inference(dataloader, neural_network, _encode, inference_batch_size)
     return embeddings_numpy
 
 
-def decode_batchwise(dataloader: torch.utils.data.DataLoader, neural_network: torch.nn.Module) -> np.ndarray:
+def decode_batchwise(dataloader: torch.utils.data.DataLoader, neural_network: torch.nn.Module,
+                     inference_batch_size: int = None) -> np.ndarray:
     """
     Utility function for decoding the whole data set in a mini-batch fashion, e.g., with an autoencoder.
     Note: Assumes an implemented decode function
@@ -172,31 +260,30 @@ def decode_batchwise(dataloader: torch.utils.data.DataLoader, neural_network: to
         dataloader to be used
     neural_network : torch.nn.Module
         the neural network that is used for the decoding (e.g. an autoencoder)
-    device : torch.device
-        device to be trained on
+    inference_batch_size : int
+        the batch size used for the decoding. If None, the batch size of the dataloader will be used (default: None)
 
     Returns
     -------
     reconstructions_numpy : np.ndarray
         The reconstructed data set
     """
-    device = get_device_from_module(neural_network)
-    reconstructions = []
-    for batch in dataloader:
-        batch_data = batch[1].to(device)
+
+    def _decode(batch_data):
         embedded_data = neural_network.encode(batch_data)
         # In case encode() returns more than one value (e.g., for a variational autoencoder), we all of them will be used for decoding
         if type(embedded_data) is tuple:
             decoded_data = neural_network.decode(*embedded_data)
         else:
             decoded_data = neural_network.decode(embedded_data)
-        reconstructions.append(decoded_data.detach().cpu())
-    reconstructions_numpy = torch.cat(reconstructions, dim=0).numpy()
+        return (decoded_data,)
+
+    reconstructions_numpy, = _batchwise_inference(dataloader, neural_network, _decode, inference_batch_size)
     return reconstructions_numpy
 
 
-def encode_decode_batchwise(dataloader: torch.utils.data.DataLoader, neural_network: torch.nn.Module) -> (
-        np.ndarray, np.ndarray):
+def encode_decode_batchwise(dataloader: torch.utils.data.DataLoader, neural_network: torch.nn.Module,
+                            inference_batch_size: int = None) -> (np.ndarray, np.ndarray):
     """
     Utility function for encoding and decoding the whole data set in a mini-batch fashion, e.g., with an autoencoder.
     Note: Assumes an implemented decode function
@@ -207,6 +294,8 @@ def encode_decode_batchwise(dataloader: torch.utils.data.DataLoader, neural_netw
         dataloader to be used
     neural_network : torch.nn.Module
         the neural network that is used for the encoding and decoding (e.g. an autoencoder)
+    inference_batch_size : int
+        the batch size used for the encoding and decoding. If None, the batch size of the dataloader will be used (default: None)
 
     Returns
     -------
@@ -214,21 +303,18 @@ def encode_decode_batchwise(dataloader: torch.utils.data.DataLoader, neural_netw
         The embedded data set,
         The reconstructed data set
     """
-    device = get_device_from_module(neural_network)
-    embeddings = []
-    reconstructions = []
-    for batch in dataloader:
-        batch_data = batch[1].to(device)
+
+    def _encode_decode(batch_data):
         embedding = neural_network.encode(batch_data)
-        embeddings.append(embedding.detach().cpu())
-        reconstructions.append(neural_network.decode(embedding).detach().cpu())
-    embeddings_numpy = torch.cat(embeddings, dim=0).numpy()
-    reconstructions_numpy = torch.cat(reconstructions, dim=0).numpy()
+        return embedding, neural_network.decode(embedding)
+
+    embeddings_numpy, reconstructions_numpy = _batchwise_inference(dataloader, neural_network, _encode_decode,
+                                                                   inference_batch_size)
     return embeddings_numpy, reconstructions_numpy
 
 
 def predict_batchwise(dataloader: torch.utils.data.DataLoader, neural_network: torch.nn.Module,
-                      cluster_module: torch.nn.Module) -> np.ndarray:
+                      cluster_module: torch.nn.Module, inference_batch_size: int = None) -> np.ndarray:
     """
     Utility function for predicting the cluster labels over the whole data set in a mini-batch fashion.
     Method calls the predict_hard method of the cluster_module for each batch of data.
@@ -241,19 +327,19 @@ def predict_batchwise(dataloader: torch.utils.data.DataLoader, neural_network: t
         the neural network that is used for the encoding (e.g. an autoencoder)
     cluster_module : torch.nn.Module
         the cluster module that is used for the encoding (e.g. DEC). Usually contains the predict method.
+    inference_batch_size : int
+        the batch size used for the prediction. If None, the batch size of the dataloader will be used (default: None)
 
     Returns
     -------
     predictions_numpy : np.ndarray
         The predictions of the cluster_module for the data set
     """
-    device = get_device_from_module(neural_network)
-    predictions = []
-    for batch in dataloader:
-        batch_data = batch[1].to(device)
-        prediction = cluster_module.predict_hard(neural_network.encode(batch_data)).detach().cpu()
-        predictions.append(prediction)
-    predictions_numpy = torch.cat(predictions, dim=0).numpy()
+
+    def _predict(batch_data):
+        return (cluster_module.predict_hard(neural_network.encode(batch_data)),)
+
+    predictions_numpy, = _batchwise_inference(dataloader, neural_network, _predict, inference_batch_size)
     return predictions_numpy
 
 
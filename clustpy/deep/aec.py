@@ -6,6 +6,7 @@ Collin Leiber
 from clustpy.deep._utils import embedded_kmeans_prediction, encode_batchwise
 from clustpy.deep._train_utils import get_default_deep_clustering_initialization
 from clustpy.deep._abstract_deep_clustering_algo import _AbstractDeepClusteringAlgo
+from clustpy.deep._training_options import TrainingOptions
 import torch
 import numpy as np
 from sklearn.base import ClusterMixin
@@ -19,8 +20,8 @@ def _aec(X: np.ndarray, n_clusters: int, batch_size: int, pretrain_optimizer_par
          neural_network: torch.nn.Module | tuple, neural_network_weights: str,
          embedding_size: int, clustering_loss_weight: float, ssl_loss_weight: float,
          custom_dataloaders: tuple, augmentation_invariance: bool, initial_clustering_class: ClusterMixin,
-         initial_clustering_params: dict, device: torch.device,
-         random_state: np.random.RandomState) -> (np.ndarray, np.ndarray, np.ndarray, np.ndarray, torch.nn.Module):
+         initial_clustering_params: dict, device: torch.device, random_state: np.random.RandomState,
+         training_options: TrainingOptions) -> (np.ndarray, np.ndarray, np.ndarray, np.ndarray, torch.nn.Module):
     """
     Start the actual AEC clustering procedure on the input data set.
 
@@ -71,6 +72,8 @@ def _aec(X: np.ndarray, n_clusters: int, batch_size: int, pretrain_optimizer_par
         The device on which to perform the computations
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training
 
     Returns
     -------
@@ -83,14 +86,14 @@ def _aec(X: np.ndarray, n_clusters: int, batch_size: int, pretrain_optimizer_par
     device, trainloader, testloader, _, neural_network, _, n_clusters, init_labels, init_centers, _ = get_default_deep_clustering_initialization(
         X, n_clusters, batch_size, pretrain_optimizer_params, pretrain_epochs, optimizer_class, ssl_loss_fn,
         neural_network, embedding_size, custom_dataloaders, initial_clustering_class, initial_clustering_params, device,
-        random_state, neural_network_weights=neural_network_weights)
+        random_state, neural_network_weights=neural_network_weights, training_options=training_options)
     # Setup AEC Module
     aec_module = _AEC_Module(init_labels, init_centers, augmentation_invariance).to_device(device)
     # Use AEC optimizer parameters (usually learning rate is reduced by a magnitude of 10)
     optimizer = optimizer_class(list(neural_network.parameters()), **clustering_optimizer_params)
     # AEC Training loop
     aec_module.fit(neural_network, trainloader, testloader, clustering_epochs, device, optimizer, ssl_loss_fn,
-                   clustering_loss_weight, ssl_loss_weight)
+                   clustering_loss_weight, ssl_loss_weight, training_options)
     # Get labels and centers as numpy arrays
     aec_labels = aec_module.labels.detach().cpu().numpy().astype(np.int32)
     aec_centers = aec_module.centers.detach().cpu().numpy()
@@ -149,7 +152,7 @@ class _AEC_Module(_DCN_Module):
     def fit(self, neural_network: torch.nn.Module, trainloader: torch.utils.data.DataLoader,
             testloader: torch.utils.data.DataLoader, n_epochs: int, device: torch.device,
             optimizer: torch.optim.Optimizer, ssl_loss_fn: torch.nn.modules.loss._Loss, clustering_loss_weight: float,
-            ssl_loss_weight: float) -> '_AEC_Module':
+            ssl_loss_weight: float, training_options: TrainingOptions = None) -> '_AEC_Module':
         """
         Trains the _AEC_Module in place.
 
@@ -173,36 +176,41 @@ class _AEC_Module(_DCN_Module):
             weight of the clustering loss
         ssl_loss_weight : float
             weight of the self-supervised learning (ssl) loss
+        training_options : TrainingOptions
+            options defining the precision, compilation and memory format used for the training.
+            If None, the default TrainingOptions will be used (default: None)
 
         Returns
         -------
         self : _AE_Module
             this instance of the _AEC_Module
         """
+        training_options = TrainingOptions() if training_options is None else training_options
+        grad_scaler = training_options.get_grad_scaler(device)
         # AEC training loop
         tbar = tqdm.trange(n_epochs, desc="AEC training")
-        for _ in tbar:
-            # Update Network
-            total_loss = 0
-            for batch in trainloader:
-                # Beware that the clustering loss of DCN is divided by 2, therefore we use 2 * clustering_loss_weight
-                loss = self._loss(batch, neural_network, ssl_loss_fn, ssl_loss_weight,
-                                  2 * clustering_loss_weight, device)
-                total_loss += loss.item()
-                # Backward pass - update weights
-                optimizer.zero_grad()
-                loss.backward()
-                optimizer.step()
-            postfix_str = {"Loss": total_loss}
-            tbar.set_postfix(postfix_str)
-            # Update Assignments and Centroids
-            embedded = encode_batchwise(testloader, neural_network)
-            # update centroids
-            centers = self.update_centroids(embedded, self.labels.cpu().detach().numpy())
-            self.centers = centers.to(device)
-            # update assignments
-            labels = self.predict_hard(torch.tensor(embedded).to(device))
-            self.labels = labels.to(device)
+        with training_options.training_context(neural_network):
+            for _ in tbar:
+                # Update Network
+                total_loss = 0
+                for batch in trainloader:
+                    with training_options.autocast(device):
+                        # Beware that the clustering loss of DCN is divided by 2, therefore we use 2 * clustering_loss_weight
+                        loss = self._loss(batch, neural_network, ssl_loss_fn, ssl_loss_weight,
+                                          2 * clustering_loss_weight, device)
+                    total_loss += loss.item()
+                    # Backward pass - update weights
+                    training_options.optimization_step(loss, optimizer, grad_scaler)
+                postfix_str = {"Loss": total_loss}
+                tbar.set_postfix(postfix_str)
+                # Update Assignments and Centroids
+                embedded = encode_batchwise(testloader, neural_network)
+                # update centroids
+                centers = self.update_centroids(embedded, self.labels.cpu().detach().numpy())
+                self.centers = centers.to(device)
+                # update assignments
+                labels = self.predict_hard(torch.tensor(embedded).to(device))
+                self.labels = labels.to(device)
         return self
 
 
@@ -260,6 +268,9 @@ class AEC(_AbstractDeepClusteringAlgo):
         If device is None then it will be automatically chosen: if a gpu is available the gpu with the highest amount of free memory will be chosen (default: None)
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training of the neural network.
+        If None, the default TrainingOptions will be used (default: None)
 
     Attributes
     ----------
@@ -293,8 +304,9 @@ class AEC(_AbstractDeepClusteringAlgo):
                  neural_network_weights: str = None, embedding_size: int = 10, custom_dataloaders: tuple = None,
                  augmentation_invariance: bool = False, initial_clustering_class: ClusterMixin = None,
                  initial_clustering_params: dict = None, device: torch.device = None,
-                 random_state: np.random.RandomState | int = None):
-        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state)
+                 random_state: np.random.RandomState | int = None, training_options: TrainingOptions = None):
+        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state,
+                         training_options)
         self.n_clusters = n_clusters
         self.pretrain_optimizer_params = {
             "lr": 1e-3} if pretrain_optimizer_params is None else pretrain_optimizer_params
@@ -345,7 +357,8 @@ class AEC(_AbstractDeepClusteringAlgo):
                                                        self.initial_clustering_class,
                                                        self.initial_clustering_params,
                                                        self.device,
-                                                       self.random_state)
+                                                       self.random_state,
+                                                       self.training_options)
         self.labels_ = aec_labels
         self.cluster_centers_ = aec_centers
         self.neural_network = neural_network
@@ -8,6 +8,8 @@ from clustpy.deep._utils import encode_batchwise, squared_euclidean_distance, pr
     embedded_kmeans_prediction
 from clustpy.deep._train_utils import get_default_deep_clustering_initialization
 from clustpy.deep._abstract_deep_clustering_algo import _AbstractDeepClusteringAlgo
+from clustpy.deep._training_options import TrainingOptions
+from clustpy.deep._early_stopping import EarlyStopping
 import torch
 import numpy as np
 from sklearn.cluster import KMeans
@@ -21,8 +23,9 @@ def _dcn(X: np.ndarray, n_clusters: int, batch_size: int, pretrain_optimizer_par
          neural_network: torch.nn.Module | tuple, neural_network_weights: str,
          embedding_size: int, clustering_loss_weight: float, ssl_loss_weight: float,
          custom_dataloaders: tuple, augmentation_invariance: bool, initial_clustering_class: ClusterMixin,
-         initial_clustering_params: dict, device: torch.device,
-         random_state: np.random.RandomState) -> (np.ndarray, np.ndarray, np.ndarray, np.ndarray, torch.nn.Module):
+         initial_clustering_params: dict, device: torch.device, random_state: np.random.RandomState,
+         training_options: TrainingOptions, clustering_patience: int) -> (
+        np.ndarray, np.ndarray, np.ndarray, np.ndarray, torch.nn.Module):
     """
     Start the actual DCN clustering procedure on the input data set.
 
@@ -73,6 +76,10 @@ def _dcn(X: np.ndarray, n_clusters: int, batch_size: int, pretrain_optimizer_par
         The device on which to perform the computations
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training
+    clustering_patience : int
+        number of epochs without an improvement of the loss after which the clustering procedure is stopped early
 
     Returns
     -------
@@ -87,14 +94,14 @@ def _dcn(X: np.ndarray, n_clusters: int, batch_size: int, pretrain_optimizer_par
     device, trainloader, testloader, _, neural_network, _, n_clusters, init_labels, init_centers, _ = get_default_deep_clustering_initialization(
         X, n_clusters, batch_size, pretrain_optimizer_params, pretrain_epochs, optimizer_class, ssl_loss_fn,
         neural_network, embedding_size, custom_dataloaders, initial_clustering_class, initial_clustering_params, device,
-        random_state, neural_network_weights=neural_network_weights)
+        random_state, neural_network_weights=neural_network_weights, training_options=training_options)
     # Setup DCN Module
     dcn_module = _DCN_Module(init_labels, init_centers, augmentation_invariance).to_device(device)
     # Use DCN optimizer parameters (usually learning rate is reduced by a magnitude of 10)
     optimizer = optimizer_class(list(neural_network.parameters()), **clustering_optimizer_params)
     # DEC Training loop
     dcn_module.fit(neural_network, trainloader, testloader, clustering_epochs, device, optimizer, ssl_loss_fn,
-                   clustering_loss_weight, ssl_loss_weight)
+                   clustering_loss_weight, ssl_loss_weight, training_options, clustering_patience)
     # Get labels
     dcn_labels = predict_batchwise(testloader, neural_network, dcn_module)
     dcn_centers = dcn_module.centers.detach().cpu().numpy()
@@ -249,6 +256,32 @@ class _DCN_Module(torch.nn.Module):
         self.to(device)
         return self
 
+    def get_extra_state(self) -> dict:
+        """
+        Get the labels, cluster centers and counts, which are not registered as parameters or buffers.
+        Makes them part of the state_dict so that they can be restored by early stopping.
+
+        Returns
+        -------
+        extra_state : dict
+            dictionary containing the labels, cluster centers and counts
+        """
+        extra_state = {"labels": self.labels, "centers": self.centers, "counts": self.counts}
+        return extra_state
+
+    def set_extra_state(self, extra_state: dict) -> None:
+        """
+        Set the labels, cluster centers and counts contained in the state_dict.
+
+        Parameters
+        ----------
+        extra_state : dict
+            dictionary containing the labels, cluster centers and counts (see get_extra_state)
+        """
+        self.labels = extra_state["labels"]
+        self.centers = extra_state["centers"]
+        self.counts = extra_state["counts"]
+
     def _loss(self, batch: list, neural_network: torch.nn.Module, ssl_loss_fn: torch.nn.modules.loss._Loss,
               ssl_loss_weight: float, clustering_loss_weight: float, device: torch.device) -> torch.Tensor:
         """
@@ -296,7 +329,7 @@ class _DCN_Module(torch.nn.Module):
     def fit(self, neural_network: torch.nn.Module, trainloader: torch.utils.data.DataLoader,
             testloader: torch.utils.data.DataLoader, n_epochs: int, device: torch.device,
             optimizer: torch.optim.Optimizer, ssl_loss_fn: torch.nn.modules.loss._Loss, clustering_loss_weight: float,
-            ssl_loss_weight: float) -> '_DCN_Module':
+            ssl_loss_weight: float, training_options: TrainingOptions = None, patience: int = None) -> '_DCN_Module':
         """
         Trains the _DCN_Module in place.
 
@@ -320,48 +353,65 @@ class _DCN_Module(torch.nn.Module):
             weight of the clustering loss
         ssl_loss_weight : float
             weight of the self-supervised learning (ssl) loss
+        training_options : TrainingOptions
+            options defining the precision, compilation and memory format used for the training.
+            If None, the default TrainingOptions will be used (default: None)
+        patience : int
+            number of epochs without an improvement of the loss after which the training is stopped early.
+            In this case, the state of the neural network and the module of the epoch with the lowest loss is restored.
+            If None, no early stopping will be performed (default: None)
 
         Returns
         -------
         self : _DCN_Module
             this instance of the _DCN_Module
         """
+        training_options = TrainingOptions() if training_options is None else training_options
+        grad_scaler = training_options.get_grad_scaler(device)
+        early_stopping = None if patience is None else EarlyStopping(patience=patience, restore_best_weights=True)
         # DCN training loop
         tbar = tqdm.trange(n_epochs, desc="DCN training")
-        for _ in tbar:
-            # Update Network
-            total_loss = 0
-            for batch in trainloader:
-                loss = self._loss(batch, neural_network, ssl_loss_fn, ssl_loss_weight, clustering_loss_weight,
-                                  device)
-                total_loss += loss.item()
-                # Backward pass - update weights
-                optimizer.zero_grad()
-                loss.backward()
-                optimizer.step()
-                # Update Assignments and Centroids
-                with torch.no_grad():
-                    if self.augmentation_invariance:
-                        # Convention is that the augmented sample is at the first position and the original one at the second position
-                        # We only use the original sample for updating the centroids and assignments
-                        batch_data = batch[2].to(device)
-                    else:
-                        batch_data = batch[1].to(device)
-                    embedded = neural_network.encode(batch_data)
-                    labels_new = self.predict_hard(embedded)
-                    self.labels[batch[0]] = labels_new
-
-                    ## update centroids [on gpu] About 40 seconds for 1000 iterations
-                    ## No overhead from loading between gpu and cpu
-                    # counts = cluster_module.update_centroid(embedded, counts, s)
-
-                    # update centroids [on cpu] About 30 Seconds for 1000 iterations
-                    # with additional overhead from loading between gpu and cpu
-                    centers, counts = self.update_centroids(embedded.cpu(), labels_new.cpu())
-                    self.centers = centers.to(device)
-                    self.counts = counts
-            postfix_str = {"Loss": total_loss}
-            tbar.set_postfix(postfix_str)
+        with training_options.training_context(neural_network):
+            for _ in tbar:
+                # Update Network
+                total_loss = 0
+                for batch in trainloader:
+                    with training_options.autocast(device):
+                        loss = self._loss(batch, neural_network, ssl_loss_fn, ssl_loss_weight, clustering_loss_weight,
+                                          device)
+                    total_loss += loss.item()
+                    # Backward pass - update weights
+                    training_options.optimization_step(loss, optimizer, grad_scaler)
+                    # Update Assignments and Centroids
+                    with torch.no_grad():
+                        if self.augmentation_invariance:
+                            # Convention is that the augmented sample is at the first position and the original one at the second position
+                            # We only use the original sample for updating the centroids and assignments
+                            batch_data = batch[2].to(device)
+                        else:
+                            batch_data = batch[1].to(device)
+                        embedded = neural_network.encode(batch_data)
+                        labels_new = self.predict_hard(embedded)
+                        self.labels[batch[0]] = labels_new
+
+                        ## update centroids [on gpu] About 40 seconds for 1000 iterations
+                        ## No overhead from loading between gpu and cpu
+                        # counts = cluster_module.update_centroid(embedded, counts, s)
+
+                        # update centroids [on cpu] About 30 Seconds for 1000 iterations
+                        # with additional overhead from loading between gpu and cpu
+                        centers, counts = self.update_centroids(embedded.cpu(), labels_new.cpu())
+                        self.centers = centers.to(device)
+                        self.counts = counts
+                postfix_str = {"Loss": total_loss}
+                tbar.set_postfix(postfix_str)
+                if early_stopping is not None:
+                    early_stopping(total_loss / len(trainloader), neural_network, self)
+                    if early_stopping.early_stop:
+                        break
+        if early_stopping is not None:
+            # Restore the state with the lowest loss
+            early_stopping.restore_best_state(neural_network, self)
         return self
 
 
@@ -418,6 +468,12 @@ class DCN(_AbstractDeepClusteringAlgo):
         If device is None then it will be automatically chosen: if a gpu is available the gpu with the highest amount of free memory will be chosen (default: None)
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training of the neural network.
+        If None, the default TrainingOptions will be used (default: None)
+    clustering_patience : int
+        number of epochs without an improvement of the loss after which the clustering procedure is stopped early.
+        In this case, the state of the epoch with the lowest loss is restored. If None, no early stopping will be performed (default: None)
 
     Attributes
     ----------
@@ -454,8 +510,11 @@ class DCN(_AbstractDeepClusteringAlgo):
                  neural_network_weights: str = None, embedding_size: int = 10, custom_dataloaders: tuple = None,
                  augmentation_invariance: bool = False, initial_clustering_class: ClusterMixin = KMeans,
                  initial_clustering_params: dict = None, device: torch.device = None,
-                 random_state: np.random.RandomState | int = None):
-        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state)
+                 random_state: np.random.RandomState | int = None, training_options: TrainingOptions = None,
+                 clustering_patience: int = None):
+        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state,
+                         training_options)
+        self.clustering_patience = clustering_patience
         self.n_clusters = n_clusters
         self.pretrain_optimizer_params = {
             "lr": 1e-3} if pretrain_optimizer_params is None else pretrain_optimizer_params
@@ -508,7 +567,9 @@ class DCN(_AbstractDeepClusteringAlgo):
                                                                                       self.initial_clustering_class,
                                                                                       self.initial_clustering_params,
                                                                                       self.device,
-                                                                                      self.random_state)
+                                                                                      self.random_state,
+                                                                                      self.training_options,
+                                                                                      self.clustering_patience)
         self.labels_ = kmeans_labels
         self.cluster_centers_ = kmeans_centers
         self.dcn_labels_ = dcn_labels
@@ -9,12 +9,17 @@ from clustpy.deep._utils import detect_device, encode_batchwise, run_initial_clu
 from clustpy.deep._data_utils import get_train_and_test_dataloader
 from clustpy.deep._train_utils import get_trained_network
 from clustpy.deep._abstract_deep_clustering_algo import _AbstractDeepClusteringAlgo
+from clustpy.deep._training_options import TrainingOptions
 from sklearn.manifold import TSNE
-from scipy.spatial.distance import pdist, squareform
+from scipy.spatial.distance import cdist
 from sklearn.base import TransformerMixin, BaseEstimator, ClusterMixin
 from sklearn.mixture import GaussianMixture as GMM
+from sklearn.neighbors import KDTree
+from sklearn.utils import check_random_state
 import inspect
 
+_MAX_N_POINTS_DISTANCE_ESTIMATION = 10000
+
 
 def _manifold_based_sequential_dc(X: np.ndarray, n_clusters: int, batch_size: int, pretrain_optimizer_params: dict,
                                   pretrain_epochs: int, optimizer_class: torch.optim.Optimizer,
@@ -22,7 +27,7 @@ def _manifold_based_sequential_dc(X: np.ndarray, n_clusters: int, batch_size: in
                                   neural_network_weights: str, embedding_size: int, custom_dataloaders: tuple,
                                   manifold_class: TransformerMixin, manifold_params: dict,
                                   clustering_class: ClusterMixin, clustering_params: dict, device: torch.device,
-                                  random_state: np.random.RandomState) -> (
+                                  random_state: np.random.RandomState, training_options: TrainingOptions) -> (
         int, np.ndarray, np.ndarray, torch.nn.Module, TransformerMixin):
     """
     Execute a manifold-based sequential deep clustering procedure on the input data set.
@@ -67,6 +72,8 @@ def _manifold_based_sequential_dc(X: np.ndarray, n_clusters: int, batch_size: in
         The device on which to perform the computations
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the pretraining
 
     Returns
     -------
@@ -85,7 +92,7 @@ def _manifold_based_sequential_dc(X: np.ndarray, n_clusters: int, batch_size: in
                                          optimizer_params=pretrain_optimizer_params, optimizer_class=optimizer_class,
                                          device=device, ssl_loss_fn=ssl_loss_fn, embedding_size=embedding_size,
                                          neural_network=neural_network, neural_network_weights=neural_network_weights,
-                                         random_state=random_state)
+                                         random_state=random_state, training_options=training_options)
     # Encode data
     X_embed = encode_batchwise(testloader, neural_network)
     # Get possible input parameters of the manifold class
@@ -105,11 +112,20 @@ def _manifold_based_sequential_dc(X: np.ndarray, n_clusters: int, batch_size: in
 class DDC_density_peak_clustering(BaseEstimator, ClusterMixin):
     """
     A variant of the Density Peak Algorithm as proposed in the DDC paper.
+    To be applicable to large data sets, the full distance matrix is never computed.
+    Instead, the neighbors of the points are obtained by radius queries on a KD-tree.
+    When calculating the density rho of a point, only the points within a distance of cutoff * d_c are considered.
+    The contribution of each ignored point is below exp(-cutoff^2).
+    If the data set contains more than 10000 points, the average and maximum pairwise distance (used to calculate d_c) are estimated on a random sample of 10000 points.
 
     Parameters
     ----------
     ratio : float
         The ratio parameter, defining the cutoff distance d_c by calculating: average pairwise distance * ratio
+    cutoff : float
+        Only points within a distance of cutoff * d_c are considered when calculating the densities (default: 3.)
+    random_state : np.random.RandomState | int
+        use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
 
     Attributes
     ----------
@@ -124,8 +140,10 @@ class DDC_density_peak_clustering(BaseEstimator, ClusterMixin):
     Knowledge-Based Systems 197 (2020): 105841.
     """
 
-    def __init__(self, ratio: float):
+    def __init__(self, ratio: float, cutoff: float = 3., random_state: np.random.RandomState | int = None):
         self.ratio = ratio
+        self.cutoff = cutoff
+        self.random_state = check_random_state(random_state)
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'DDC_density_peak_clustering':
         """
@@ -144,13 +162,190 @@ class DDC_density_peak_clustering(BaseEstimator, ClusterMixin):
         self : DDC_density_peak_clustering
             this instance of the DDC variant of the Density Peak Clsutering algorithm
         """
-        n_clusters, labels = _density_peak_clustering(X, self.ratio)
+        n_clusters, labels = _density_peak_clustering(X, self.ratio, self.cutoff, self.random_state)
         self.n_clusters_ = n_clusters
         self.labels_ = labels
         return self
 
 
-def _density_peak_clustering(X: np.ndarray, ratio: float) -> (int, np.ndarray):
+def _get_average_and_max_distance(X: np.ndarray, block_size: int = 2 ** 22) -> (float, float):
+    """
+    Calculate the average and the maximum pairwise distance of the points in X.
+    The distances are calculated in blocks of consecutive rows, so that each block contains at most block_size distances.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        The given data set
+    block_size : int
+        Maximum number of distances contained in a single block (default: 2**22)
+
+    Returns
+    -------
+    tuple : (float, float)
+        The average pairwise distance,
+        The maximum pairwise distance
+    """
+    n_points = X.shape[0]
+    sum_dist = 0.
+    max_dist = 0.
+    n_rows_per_block = max(1, block_size // n_points)
+    for start in range(0, n_points, n_rows_per_block):
+        end = min(start + n_rows_per_block, n_points)
+        # Only consider the upper triangle of the distance matrix
+        distances = cdist(X[start:end], X[start:])
+        distances[:, :end - start] = np.triu(distances[:, :end - start], 1)
+        sum_dist += np.sum(distances)
+        max_dist = max(max_dist, np.max(distances))
+    avg_dist = sum_dist / (n_points * (n_points - 1) / 2)
+    return avg_dist, max_dist
+
+
+def _iterate_radius_neighbors(tree: KDTree, X: np.ndarray, radius: float, batch_size: int = 256):
+    """
+    Iterate over the neighbors of the points in X within the given radius in batches of consecutive points.
+
+    Parameters
+    ----------
+    tree : KDTree
+        The KD-tree containing the candidate neighbors
+    X : np.ndarray
+        The points whose neighbors should be returned
+    radius : float
+        The radius of the queries
+    batch_size : int
+        Number of points queried at once (default: 256)
+
+    Returns
+    -------
+    generator : (slice, np.ndarray, np.ndarray, np.ndarray)
+        The positions of the queried points within X,
+        The number of neighbors of each queried point,
+        The ids of the neighbors within the tree (concatenated for all queried points),
+        The distances between the queried points and their neighbors (concatenated for all queried points)
+    """
+    for start in range(0, X.shape[0], batch_size):
+        batch_slice = slice(start, start + batch_size)
+        neighbors, distances = tree.query_radius(X[batch_slice], radius, return_distance=True)
+        n_neighbors = np.array([neighbors_i.shape[0] for neighbors_i in neighbors])
+        yield batch_slice, n_neighbors, np.concatenate(neighbors), np.concatenate(distances)
+
+
+def _get_densities(X: np.ndarray, tree: KDTree, d_c: float, cutoff: float) -> np.ndarray:
+    """
+    Calculate the density rho_i of each point (see Equation 7 of the paper).
+    Only points within a distance of cutoff * d_c are considered.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        The given data set
+    tree : KDTree
+        The KD-tree containing X
+    d_c : float
+        The cutoff distance
+    cutoff : float
+        Only points within a distance of cutoff * d_c are considered
+
+    Returns
+    -------
+    rhos : np.ndarray
+        The density of each point
+    """
+    n_points = X.shape[0]
+    rhos = np.zeros(n_points)
+    for batch_slice, n_neighbors, neighbors, distances in _iterate_radius_neighbors(tree, X, cutoff * d_c):
+        query_ids = np.repeat(np.arange(n_points)[batch_slice], n_neighbors)
+        # Each point is a neighbor of itself and must be skipped (subtracting its value of 1 afterward would cancel the significant digits of small densities)
+        is_other = neighbors != query_ids
+        adj_distances = np.exp(-((distances[is_other] / d_c) ** 2))  # Equation 7
+        rhos[batch_slice] = np.bincount(query_ids[is_other] - batch_slice.start, weights=adj_distances,
+                                        minlength=n_neighbors.shape[0])
+    return rhos
+
+
+def _get_nearest_neighbors_with_higher_density(X: np.ndarray, rhos: np.ndarray, tree: KDTree,
+                                               block_size: int = 2 ** 22) -> (np.ndarray, np.ndarray):
+    """
+    Get the nearest neighbor of each point with a higher density (see Equation 8 of the paper).
+    First, the k nearest neighbors are queried from the KD-tree, where k is increased for the points without a neighbor of higher density.
+    Afterward, the remaining points are compared to all points in blocks, so that each block contains at most block_size distances.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        The given data set
+    rhos : np.ndarray
+        The density of each point
+    tree : KDTree
+        The KD-tree containing all points of X
+    block_size : int
+        Maximum number of distances contained in a single block (default: 2**22)
+
+    Returns
+    -------
+    tuple : (np.ndarray, np.ndarray)
+        The ids of the nearest neighbors with higher density (-1 if a point has no neighbor with higher density),
+        The distances to the nearest neighbors with higher density (np.inf if a point has no neighbor with higher density)
+    """
+    n_points = X.shape[0]
+    nn_with_higher_dens = np.full(n_points, -1)
+    deltas = np.full(n_points, np.inf)
+    unresolved = np.arange(n_points)
+    n_neighbors = 32
+    while unresolved.shape[0] > 0 and n_neighbors <= 512 and n_neighbors < n_points:
+        n_rows_per_block = max(1, block_size // n_neighbors)
+        still_unresolved = []
+        for start in range(0, unresolved.shape[0], n_rows_per_block):
+            ids = unresolved[start:start + n_rows_per_block]
+            # Neighbors are sorted by their distance
+            distances, neighbors = tree.query(X[ids], k=n_neighbors)
+            has_higher_dens = rhos[neighbors] > rhos[ids, None]
+            found = np.any(has_higher_dens, axis=1)
+            first_higher = np.argmax(has_higher_dens[found], axis=1)
+            nn_with_higher_dens[ids[found]] = neighbors[found, first_higher]
+            deltas[ids[found]] = distances[found, first_higher]
+            still_unresolved.append(ids[~found])
+        unresolved = np.concatenate(still_unresolved)
+        n_neighbors *= 4
+    # Compare remaining points to all other points
+    n_rows_per_block = max(1, block_size // n_points)
+    for start in range(0, unresolved.shape[0], n_rows_per_block):
+        ids = unresolved[start:start + n_rows_per_block]
+        distances = cdist(X[ids], X)
+        distances[rhos[None, :] <= rhos[ids, None]] = np.inf
+        nn_ids = np.argmin(distances, axis=1)
+        nn_distances = distances[np.arange(ids.shape[0]), nn_ids]
+        found = nn_distances < np.inf
+        nn_with_higher_dens[ids[found]] = nn_ids[found]
+        deltas[ids[found]] = nn_distances[found]
+    return nn_with_higher_dens, deltas
+
+
+def _union_find_root(parents: np.ndarray, i: int) -> int:
+    """
+    Get the root of an element within a union-find structure. Uses path halving to shorten the paths (in place).
+
+    Parameters
+    ----------
+    parents : np.ndarray
+        The parent of each element in the union-find structure
+    i : int
+        The element
+
+    Returns
+    -------
+    root : int
+        The root of the element
+    """
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+
+def _density_peak_clustering(X: np.ndarray, ratio: float, cutoff: float = 3.,
+                             random_state: np.random.RandomState | int = None) -> (int, np.ndarray):
     """
     Execute the variant of the Density Peak Algorithm as proposed in the paper.
 
@@ -160,6 +355,10 @@ def _density_peak_clustering(X: np.ndarray, ratio: float) -> (int, np.ndarray):
         The given data set
     ratio : float
         The ratio parameter, defining the cutoff distance d_c by calculating: average pairwise distance * ratio
+    cutoff : float
+        Only points within a distance of cutoff * d_c are considered when calculating the densities (default: 3.)
+    random_state : np.random.RandomState | int
+        use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
 
     Returns
     -------
@@ -167,65 +366,65 @@ def _density_peak_clustering(X: np.ndarray, ratio: float) -> (int, np.ndarray):
         The number of clusters,
         The cluster labels
     """
-    distances = pdist(X)
-    max_dist = np.max(distances)
-    d_c = np.mean(distances) * ratio
+    n_points = X.shape[0]
+    if n_points > _MAX_N_POINTS_DISTANCE_ESTIMATION:
+        # Estimate the distances on a random sample
+        random_state = check_random_state(random_state)
+        X_sample = X[random_state.choice(n_points, _MAX_N_POINTS_DISTANCE_ESTIMATION, replace=False)]
+    else:
+        X_sample = X
+    avg_dist, max_dist = _get_average_and_max_distance(X_sample)
+    d_c = avg_dist * ratio
     if d_c >= max_dist:
         d_c = max_dist - 1e-8  # d_c can not be larger than the max distance
         print(
             "[WARNING] ratio parameter was chosen too large (ratio={0}). It is recommended to set ratio smaller than 1. d_c will be set to the maximum possible value of {1}".format(
                 ratio, d_c))
+    tree = KDTree(X)
     # Calculate rho_i
-    adj_distancse = np.exp(-((distances / d_c) ** 2))  # Equation 7
-    rhos = np.sum(squareform(adj_distancse), axis=1)
+    rhos = _get_densities(X, tree, d_c, cutoff)
     avg_rho = np.mean(rhos)  # Below Equation 9
     # Calculate delta_i and search for local cluster centers
-    distances = squareform(distances)  # Convert distances to symmetric matrix
-    deltas = np.zeros(X.shape[0])
-    labels = np.full(X.shape[0], -1, np.int32)
-    cluster_rhos = np.zeros((0, 2))
-    cluster_id = 0
-    chain_of_ids = []
-    queue = list(range(X.shape[0]))
-    while len(queue) > 0:
-        i = queue.pop(0)
-        if labels[i] == -1:
-            chain_of_ids.append(i)
-            distances_i = distances[i].copy()
-            distances_i[rhos <= rhos[i]] = max_dist  # Equation 8
-            nn_with_higher_dens = np.argmin(distances_i)  # Equation 8
-            deltas[i] = distances_i[nn_with_higher_dens]  # Equation 8
-            # Check if i is local cluster center
-            if deltas[i] > d_c and rhos[i] > avg_rho:  # Equation 9
-                labels[chain_of_ids] = cluster_id
-                cluster_rhos = np.r_[cluster_rhos, [[np.sum(rhos[chain_of_ids]), len(chain_of_ids)]]]
-                cluster_id += 1
-                chain_of_ids = []
-            elif labels[nn_with_higher_dens] != -1:
-                labels[chain_of_ids] = labels[nn_with_higher_dens]
-                cluster_rhos[labels[nn_with_higher_dens], 0] += np.sum(rhos[chain_of_ids])
-                cluster_rhos[labels[nn_with_higher_dens], 1] += len(chain_of_ids)
-                chain_of_ids = []
-            else:
-                queue.insert(0, nn_with_higher_dens)
+    nn_with_higher_dens, deltas = _get_nearest_neighbors_with_higher_density(X, rhos, tree)  # Equation 8
+    deltas[nn_with_higher_dens == -1] = max_dist
+    # Points without a neighbor of higher density are always cluster centers
+    is_center = ((deltas > d_c) & (rhos > avg_rho)) | (nn_with_higher_dens == -1)  # Equation 9
+    # Each point gets the label of the cluster center at the end of its chain of nearest neighbors with higher density
+    parents = np.where(is_center, np.arange(n_points), nn_with_higher_dens)
+    grandparents = parents[parents]
+    while not np.array_equal(parents, grandparents):
+        parents = grandparents
+        grandparents = parents[parents]
+    # Cluster ids are given in the order of the first point of each cluster
+    _, first_ids, labels = np.unique(parents, return_index=True, return_inverse=True)
+    cluster_order = np.zeros(first_ids.shape[0], dtype=np.int32)
+    cluster_order[np.argsort(first_ids)] = np.arange(first_ids.shape[0])
+    labels = cluster_order[labels.reshape(-1)]
     # ==> Start Merging of clusters
     # Average rho of clusters
-    avg_cluster_rho = cluster_rhos[:, 0] / cluster_rhos[:, 1]
+    avg_cluster_rho = np.bincount(labels, weights=rhos) / np.bincount(labels)
     # Get core points
     ids_core_points = np.where(rhos > avg_cluster_rho[labels])[0]  # Equation 10
-    # Are clusters density connected?
-    for i in range(len(ids_core_points) - 1):
-        core_point_i = ids_core_points[i]
-        for j in range(i + 1, len(ids_core_points)):
-            core_point_j = ids_core_points[j]
-            if distances[core_point_i, core_point_j] < d_c and labels[core_point_i] != labels[
-                core_point_j]:  # Equation 11
-                min_label = min(labels[core_point_i], labels[core_point_j])
-                max_label = max(labels[core_point_i], labels[core_point_j])
-                labels[labels == max_label] = min_label
-                labels[labels > max_label] -= 1
-                cluster_id -= 1
-    return cluster_id, labels
+    core_labels = labels[ids_core_points]
+    # Are clusters density connected? Connected clusters are merged using a union-find structure
+    cluster_parents = np.arange(first_ids.shape[0])
+    # If there are no core points (e.g., only singleton clusters or uniform densities), no clusters can be merged
+    core_neighbors = [] if ids_core_points.shape[0] == 0 else _iterate_radius_neighbors(
+        KDTree(X[ids_core_points]), X[ids_core_points], d_c)
+    for batch_slice, n_neighbors, neighbors, distances in core_neighbors:
+        ids = np.repeat(np.arange(ids_core_points.shape[0])[batch_slice], n_neighbors)
+        is_connected = (distances < d_c) & (core_labels[ids] != core_labels[neighbors])  # Equation 11
+        connected_labels = np.sort(np.c_[core_labels[ids[is_connected]], core_labels[neighbors[is_connected]]],
+                                   axis=1)
+        for label_1, label_2 in np.unique(connected_labels, axis=0):
+            root_1 = _union_find_root(cluster_parents, label_1)
+            root_2 = _union_find_root(cluster_parents, label_2)
+            # The smaller label is always the root
+            cluster_parents[max(root_1, root_2)] = min(root_1, root_2)
+    cluster_roots = np.array([_union_find_root(cluster_parents, c) for c in range(cluster_parents.shape[0])])
+    unique_roots, cluster_roots = np.unique(cluster_roots, return_inverse=True)
+    labels = cluster_roots.reshape(-1)[labels].astype(np.int32)
+    return unique_roots.shape[0], labels
 
 
 class DDC(_AbstractDeepClusteringAlgo):
@@ -268,6 +467,9 @@ class DDC(_AbstractDeepClusteringAlgo):
         If device is None then it will be automatically chosen: if a gpu is available the gpu with the highest amount of free memory will be chosen (default: None)
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the pretraining of the neural network.
+        If None, the default TrainingOptions will be used (default: None)
 
     Attributes
     ----------
@@ -299,8 +501,10 @@ class DDC(_AbstractDeepClusteringAlgo):
                  ssl_loss_fn: torch.nn.modules.loss._Loss = torch.nn.MSELoss(),
                  neural_network: torch.nn.Module | tuple = None, neural_network_weights: str = None,
                  embedding_size: int = 10, custom_dataloaders: tuple = None, tsne_params: dict = None,
-                 device: torch.device = None, random_state: np.random.RandomState | int = None):
-        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state)
+                 device: torch.device = None, random_state: np.random.RandomState | int = None,
+                 training_options: TrainingOptions = None):
+        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state,
+                         training_options)
         self.ratio = ratio
         if ratio > 1:
             print("[WARNING] ratio for DDC algorithm has been set to a value > 1 which can cause poor results")
@@ -341,8 +545,11 @@ class DDC(_AbstractDeepClusteringAlgo):
                                                                                     self.custom_dataloaders, TSNE,
                                                                                     self.tsne_params,
                                                                                     DDC_density_peak_clustering,
-                                                                                    {"ratio": self.ratio}, self.device,
-                                                                                    self.random_state)
+                                                                                    {"ratio": self.ratio,
+                                                                                     "random_state": self.random_state},
+                                                                                    self.device,
+                                                                                    self.random_state,
+                                                                                    self.training_options)
         self.labels_ = labels
         self.n_clusters_ = n_clusters
         self.neural_network = neural_network
@@ -392,6 +599,9 @@ class N2D(_AbstractDeepClusteringAlgo):
         If device is None then it will be automatically chosen: if a gpu is available the gpu with the highest amount of free memory will be chosen (default: None)
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the pretraining of the neural network.
+        If None, the default TrainingOptions will be used (default: None)
 
     Attributes
     ----------
@@ -418,8 +628,9 @@ class N2D(_AbstractDeepClusteringAlgo):
                  neural_network: torch.nn.Module | tuple = None, neural_network_weights: str = None,
                  embedding_size: int = 10, custom_dataloaders: tuple = None, manifold_class: TransformerMixin = TSNE,
                  manifold_params: dict = None, device: torch.device = None,
-                 random_state: np.random.RandomState | int = None):
-        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state)
+                 random_state: np.random.RandomState | int = None, training_options: TrainingOptions = None):
+        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state,
+                         training_options)
         self.n_clusters = n_clusters
         self.pretrain_optimizer_params = {
             "lr": 1e-3} if pretrain_optimizer_params is None else pretrain_optimizer_params
@@ -461,7 +672,8 @@ class N2D(_AbstractDeepClusteringAlgo):
                                                                                               self.manifold_class,
                                                                                               self.manifold_params,
                                                                                               GMM, {}, self.device,
-                                                                                              self.random_state)
+                                                                                              self.random_state,
+                                                                                              self.training_options)
         self.labels_ = labels.astype(np.int32)
         self.cluster_centers_ = centers
         self.neural_network = neural_network
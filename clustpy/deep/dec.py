@@ -9,6 +9,8 @@ from clustpy.deep._utils import encode_batchwise, squared_euclidean_distance, pr
     embedded_kmeans_prediction
 from clustpy.deep._train_utils import get_default_deep_clustering_initialization
 from clustpy.deep._abstract_deep_clustering_algo import _AbstractDeepClusteringAlgo
+from clustpy.deep._training_options import TrainingOptions
+from clustpy.deep._early_stopping import EarlyStopping
 import torch
 import numpy as np
 from sklearn.cluster import KMeans
@@ -22,7 +24,8 @@ def _dec(X: np.ndarray, n_clusters: int, alpha: float, batch_size: int, pretrain
          neural_network: torch.nn.Module | tuple, neural_network_weights: str, embedding_size: int,
          clustering_loss_weight: float, ssl_loss_weight: float, custom_dataloaders: tuple,
          augmentation_invariance: bool, initial_clustering_class: ClusterMixin, initial_clustering_params: dict,
-         device: torch.device, random_state: np.random.RandomState) -> (
+         device: torch.device, random_state: np.random.RandomState, training_options: TrainingOptions,
+         clustering_patience: int) -> (
         np.ndarray, np.ndarray, np.ndarray, np.ndarray, torch.nn.Module):
     """
     Start the actual DEC clustering procedure on the input data set.
@@ -76,6 +79,10 @@ def _dec(X: np.ndarray, n_clusters: int, alpha: float, batch_size: int, pretrain
         The device on which to perform the computations
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training
+    clustering_patience : int
+        number of epochs without an improvement of the loss after which the clustering procedure is stopped early
 
     Returns
     -------
@@ -90,7 +97,7 @@ def _dec(X: np.ndarray, n_clusters: int, alpha: float, batch_size: int, pretrain
     device, trainloader, testloader, _, neural_network, _, n_clusters, _, init_centers, _ = get_default_deep_clustering_initialization(
         X, n_clusters, batch_size, pretrain_optimizer_params, pretrain_epochs, optimizer_class, ssl_loss_fn,
         neural_network, embedding_size, custom_dataloaders, initial_clustering_class, initial_clustering_params, device,
-        random_state, neural_network_weights=neural_network_weights)
+        random_state, neural_network_weights=neural_network_weights, training_options=training_options)
     # Setup DEC Module
     dec_module = _DEC_Module(init_centers, alpha, augmentation_invariance).to(device)
     # Use DEC optimizer parameters (usually learning rate is reduced by a magnitude of 10)
@@ -98,7 +105,7 @@ def _dec(X: np.ndarray, n_clusters: int, alpha: float, batch_size: int, pretrain
                                 **clustering_optimizer_params)
     # DEC Training loop
     dec_module.fit(neural_network, trainloader, clustering_epochs, device, optimizer, ssl_loss_fn,
-                   clustering_loss_weight, ssl_loss_weight)
+                   clustering_loss_weight, ssl_loss_weight, training_options, clustering_patience)
     # Get labels
     dec_labels = predict_batchwise(testloader, neural_network, dec_module)
     dec_centers = dec_module.centers.detach().cpu().numpy()
@@ -359,7 +366,8 @@ class _DEC_Module(torch.nn.Module):
 
     def fit(self, neural_network: torch.nn.Module, trainloader: torch.utils.data.DataLoader, n_epochs: int,
             device: torch.device, optimizer: torch.optim.Optimizer, ssl_loss_fn: torch.nn.modules.loss._Loss,
-            clustering_loss_weight: float, ssl_loss_weight: float) -> '_DEC_Module':
+            clustering_loss_weight: float, ssl_loss_weight: float,
+            training_options: TrainingOptions = None, patience: int = None) -> '_DEC_Module':
         """
         Trains the _DEC_Module in place.
 
@@ -381,25 +389,42 @@ class _DEC_Module(torch.nn.Module):
             weight of the clustering loss
         ssl_loss_weight : float
             weight of the self-supervised learning (ssl) loss
+        training_options : TrainingOptions
+            options defining the precision, compilation and memory format used for the training.
+            If None, the default TrainingOptions will be used (default: None)
+        patience : int
+            number of epochs without an improvement of the loss after which the training is stopped early.
+            In this case, the state of the neural network and the module of the epoch with the lowest loss is restored.
+            If None, no early stopping will be performed (default: None)
 
         Returns
         -------
         self : _DEC_Module
             this instance of the _DEC_Module
         """
+        training_options = TrainingOptions() if training_options is None else training_options
+        grad_scaler = training_options.get_grad_scaler(device)
+        early_stopping = None if patience is None else EarlyStopping(patience=patience, restore_best_weights=True)
         tbar = tqdm.trange(n_epochs, desc="DEC training")
-        for _ in tbar:
-            total_loss = 0
-            for batch in trainloader:
-                loss = self._loss(batch, neural_network, clustering_loss_weight, ssl_loss_weight, ssl_loss_fn,
-                                  device)
-                total_loss += loss.item()
-                # Backward pass
-                optimizer.zero_grad()
-                loss.backward()
-                optimizer.step()
-            postfix_str = {"Loss": total_loss}
-            tbar.set_postfix(postfix_str)
+        with training_options.training_context(neural_network):
+            for _ in tbar:
+                total_loss = 0
+                for batch in trainloader:
+                    with training_options.autocast(device):
+                        loss = self._loss(batch, neural_network, clustering_loss_weight, ssl_loss_weight, ssl_loss_fn,
+                                          device)
+                    total_loss += loss.item()
+                    # Backward pass
+                    training_options.optimization_step(loss, optimizer, grad_scaler)
+                postfix_str = {"Loss": total_loss}
+                tbar.set_postfix(postfix_str)
+                if early_stopping is not None:
+                    early_stopping(total_loss / len(trainloader), neural_network, self)
+                    if early_stopping.early_stop:
+                        break
+        if early_stopping is not None:
+            # Restore the state with the lowest loss
+            early_stopping.restore_best_state(neural_network, self)
         return self
 
 
@@ -456,6 +481,12 @@ class DEC(_AbstractDeepClusteringAlgo):
         If device is None then it will be automatically chosen: if a gpu is available the gpu with the highest amount of free memory will be chosen (default: None)
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training of the neural network.
+        If None, the default TrainingOptions will be used (default: None)
+    clustering_patience : int
+        number of epochs without an improvement of the loss after which the clustering procedure is stopped early.
+        In this case, the state of the epoch with the lowest loss is restored. If None, no early stopping will be performed (default: None)
 
     Attributes
     ----------
@@ -493,8 +524,11 @@ class DEC(_AbstractDeepClusteringAlgo):
                  embedding_size: int = 10, clustering_loss_weight: float = 1., custom_dataloaders: tuple = None,
                  augmentation_invariance: bool = False, initial_clustering_class: ClusterMixin = KMeans,
                  initial_clustering_params: dict = None, device: torch.device = None,
-                 random_state: np.random.RandomState | int = None):
-        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state)
+                 random_state: np.random.RandomState | int = None, training_options: TrainingOptions = None,
+                 clustering_patience: int = None):
+        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state,
+                         training_options)
+        self.clustering_patience = clustering_patience
         self.n_clusters = n_clusters
         self.alpha = alpha
         self.pretrain_optimizer_params = {
@@ -547,7 +581,9 @@ class DEC(_AbstractDeepClusteringAlgo):
                                                                                       self.augmentation_invariance,
                                                                                       self.initial_clustering_class,
                                                                                       self.initial_clustering_params,
-                                                                                      self.device, self.random_state)
+                                                                                      self.device, self.random_state,
+                                                                                      self.training_options,
+                                                                                      self.clustering_patience)
         self.labels_ = kmeans_labels
         self.cluster_centers_ = kmeans_centers
         self.dec_labels_ = dec_labels
@@ -628,6 +664,12 @@ class IDEC(DEC):
         If device is None then it will be automatically chosen: if a gpu is available the gpu with the highest amount of free memory will be chosen (default: None)
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training of the neural network.
+        If None, the default TrainingOptions will be used (default: None)
+    clustering_patience : int
+        number of epochs without an improvement of the loss after which the clustering procedure is stopped early.
+        In this case, the state of the epoch with the lowest loss is restored. If None, no early stopping will be performed (default: None)
 
     Attributes
     ----------
@@ -664,10 +706,11 @@ class IDEC(DEC):
                  embedding_size: int = 10, clustering_loss_weight: float = 0.1, ssl_loss_weight: float = 1.0,
                  custom_dataloaders: tuple = None, augmentation_invariance: bool = False,
                  initial_clustering_class: ClusterMixin = KMeans, initial_clustering_params: dict = None,
-                 device: torch.device = None, random_state: np.random.RandomState | int = None):
+                 device: torch.device = None, random_state: np.random.RandomState | int = None,
+                 training_options: TrainingOptions = None, clustering_patience: int = None):
         super().__init__(n_clusters, alpha, batch_size, pretrain_optimizer_params, clustering_optimizer_params,
                          pretrain_epochs, clustering_epochs, optimizer_class, ssl_loss_fn, neural_network,
                          neural_network_weights, embedding_size, clustering_loss_weight, custom_dataloaders,
                          augmentation_invariance, initial_clustering_class,
-                         initial_clustering_params, device, random_state)
+                         initial_clustering_params, device, random_state, training_options, clustering_patience)
         self.ssl_loss_weight = ssl_loss_weight
@@ -11,9 +11,9 @@ from clustpy.deep._utils import squared_euclidean_distance, encode_batchwise, pr
 from clustpy.deep._train_utils import get_default_deep_clustering_initialization
 from sklearn.cluster import KMeans
 from clustpy.deep._abstract_deep_clustering_algo import _AbstractDeepClusteringAlgo
-from clustpy.hierarchical._cluster_tree import BinaryClusterTree, _ClusterTreeNode
+from clustpy.deep._training_options import TrainingOptions
+from clustpy.hierarchical._cluster_tree import BinaryClusterTree, _ClusterTreeNode, ArrayClusterTree
 import tqdm
-import copy
 
 
 class _DeepECT_ClusterTreeNode(_ClusterTreeNode):
@@ -376,7 +376,8 @@ class _DeepECT_Module(torch.nn.Module):
     def fit(self, neural_network: torch.nn.Module, trainloader: torch.utils.data.DataLoader,
             testloader: torch.utils.data.DataLoader, n_epochs: int, device: torch.device,
             optimizer: torch.optim.Optimizer, ssl_loss_fn: torch.nn.modules.loss._Loss, clustering_loss_weight: float,
-            ssl_loss_weight: float, random_state: np.random.RandomState) -> "_DeepECT_Module":
+            ssl_loss_weight: float, random_state: np.random.RandomState,
+            training_options: TrainingOptions = None) -> "_DeepECT_Module":
         """
         Trains the _DeepECT_Module in place.
 
@@ -402,43 +403,49 @@ class _DeepECT_Module(torch.nn.Module):
             weight of the self-supervised learning (ssl) loss
         random_state : np.random.RandomState
             use a fixed random state to get a repeatable solution
+        training_options : TrainingOptions
+            options defining the precision, compilation and memory format used for the training.
+            If None, the default TrainingOptions will be used (default: None)
 
         Returns
         -------
         self : _DeepECT_Module
             This instance of the _DeepECT_Module
         """
+        training_options = TrainingOptions() if training_options is None else training_options
+        grad_scaler = training_options.get_grad_scaler(device)
         cluster_id = 2  # Two clusters were created during the initialization of the algorithm
         leaf_nodes, split_nodes = self.cluster_tree.get_leaf_and_split_nodes()
         tbar = tqdm.trange(n_epochs, desc="DeepECT training")
-        for epoch in tbar:
-            # Update Network
-            total_loss = 0
-            with torch.no_grad():
-                # Grow tree
-                if (epoch % self.grow_interval == 0 or self.cluster_tree.n_leaf_nodes_ < 2) and len(
-                        leaf_nodes) < self.max_n_leaf_nodes:
-                    self._grow_tree(testloader, neural_network, leaf_nodes, cluster_id, optimizer, device, random_state)
-                    cluster_id += 1
-                    leaf_nodes, split_nodes = self.cluster_tree.get_leaf_and_split_nodes()
-            for batch in trainloader:
-                # Calculate loss
-                loss, labels = self._loss(batch, neural_network, ssl_loss_fn, clustering_loss_weight, ssl_loss_weight,
-                                          leaf_nodes, split_nodes, device)
-                total_loss += loss.item()
-                # Backward pass - update weights
-                optimizer.zero_grad()
-                loss.backward()
-                optimizer.step()
-                # Adapt centers and weights of split nodes analytically
+        with training_options.training_context(neural_network):
+            for epoch in tbar:
+                # Update Network
+                total_loss = 0
                 with torch.no_grad():
-                    nodes_to_prune = self._update_split_node_centers(split_nodes, leaf_nodes, labels)
-                    # Prune Tree
-                    if len(nodes_to_prune) > 0:
-                        self._prune_tree(nodes_to_prune, device)
+                    # Grow tree
+                    if (epoch % self.grow_interval == 0 or self.cluster_tree.n_leaf_nodes_ < 2) and len(
+                            leaf_nodes) < self.max_n_leaf_nodes:
+                        self._grow_tree(testloader, neural_network, leaf_nodes, cluster_id, optimizer, device,
+                                        random_state)
+                        cluster_id += 1
                         leaf_nodes, split_nodes = self.cluster_tree.get_leaf_and_split_nodes()
-            postfix_str = {"Loss": total_loss}
-            tbar.set_postfix(postfix_str)
+                for batch in trainloader:
+                    # Calculate loss
+                    with training_options.autocast(device):
+                        loss, labels = self._loss(batch, neural_network, ssl_loss_fn, clustering_loss_weight,
+                                                  ssl_loss_weight, leaf_nodes, split_nodes, device)
+                    total_loss += loss.item()
+                    # Backward pass - update weights
+                    training_options.optimization_step(loss, optimizer, grad_scaler)
+                    # Adapt centers and weights of split nodes analytically
+                    with torch.no_grad():
+                        nodes_to_prune = self._update_split_node_centers(split_nodes, leaf_nodes, labels)
+                        # Prune Tree
+                        if len(nodes_to_prune) > 0:
+                            self._prune_tree(nodes_to_prune, device)
+                            leaf_nodes, split_nodes = self.cluster_tree.get_leaf_and_split_nodes()
+                postfix_str = {"Loss": total_loss}
+                tbar.set_postfix(postfix_str)
         return self
 
 
@@ -448,7 +455,8 @@ def _deep_ect(X: np.ndarray, max_n_leaf_nodes: int, batch_size: int, pretrain_op
               ssl_loss_fn: torch.nn.modules.loss._Loss, neural_network: torch.nn.Module | tuple,
               neural_network_weights: str, embedding_size: int, clustering_loss_weight: float, ssl_loss_weight: float,
               custom_dataloaders: tuple, augmentation_invariance: bool, device: torch.device,
-              random_state: np.random.RandomState) -> (np.ndarray, np.ndarray, torch.nn.Module):
+              random_state: np.random.RandomState, training_options: TrainingOptions) -> (
+        np.ndarray, np.ndarray, torch.nn.Module):
     """
     Start the actual DeepECT clustering procedure on the input data set.
 
@@ -498,6 +506,8 @@ def _deep_ect(X: np.ndarray, max_n_leaf_nodes: int, batch_size: int, pretrain_op
         The device on which to perform the computations
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training
 
     Returns
     -------
@@ -510,7 +520,7 @@ def _deep_ect(X: np.ndarray, max_n_leaf_nodes: int, batch_size: int, pretrain_op
     device, trainloader, testloader, _, neural_network, _, _, _, init_leafnode_centers, _ = get_default_deep_clustering_initialization(
         X, 2, batch_size, pretrain_optimizer_params, pretrain_epochs, optimizer_class, ssl_loss_fn,
         neural_network, embedding_size, custom_dataloaders, KMeans, {"n_init": 20}, device,
-        random_state, neural_network_weights=neural_network_weights)
+        random_state, neural_network_weights=neural_network_weights, training_options=training_options)
     cluster_tree = BinaryClusterTree(_DeepECT_ClusterTreeNode)
     # Setup DeepECT Module
     deepect_module = _DeepECT_Module(cluster_tree, max_n_leaf_nodes, grow_interval, pruning_threshold,
@@ -526,7 +536,7 @@ def _deep_ect(X: np.ndarray, max_n_leaf_nodes: int, batch_size: int, pretrain_op
     # Change old center from torch.nn.Parameter to regular Tensor
     # Start fit
     deepect_module.fit(neural_network, trainloader, testloader, clustering_epochs, device, optimizer, ssl_loss_fn,
-                       clustering_loss_weight, ssl_loss_weight, random_state)
+                       clustering_loss_weight, ssl_loss_weight, random_state, training_options)
     # Get labels
     labels = predict_batchwise(testloader, neural_network, deepect_module)
     return cluster_tree, labels, neural_network
@@ -583,6 +593,9 @@ class DeepECT(_AbstractDeepClusteringAlgo):
         If device is None then it will be automatically chosen: if a gpu is available the gpu with the highest amount of free memory will be chosen (default: None)
     random_state : np.random.RandomState
         Use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training of the neural network.
+        If None, the default TrainingOptions will be used (default: None)
 
     Attributes
     ----------
@@ -602,8 +615,10 @@ class DeepECT(_AbstractDeepClusteringAlgo):
                  neural_network: torch.nn.Module | tuple = None, neural_network_weights: str = None,
                  embedding_size: int = 10, clustering_loss_weight: float = 1., ssl_loss_weight: float = 1.,
                  custom_dataloaders: tuple = None, augmentation_invariance: bool = False,
-                 device: torch.device = None, random_state: np.random.RandomState | int = None):
-        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state)
+                 device: torch.device = None, random_state: np.random.RandomState | int = None,
+                 training_options: TrainingOptions = None):
+        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state,
+                         training_options)
         self.max_n_leaf_nodes = max_n_leaf_nodes
         self.pretrain_optimizer_params = {
             "lr": 1e-3} if pretrain_optimizer_params is None else pretrain_optimizer_params
@@ -645,7 +660,7 @@ class DeepECT(_AbstractDeepClusteringAlgo):
                                                  self.neural_network, self.neural_network_weights, self.embedding_size,
                                                  self.clustering_loss_weight, self.ssl_loss_weight,
                                                  self.custom_dataloaders, self.augmentation_invariance, self.device,
-                                                 self.random_state)
+                                                 self.random_state, self.training_options)
         self.tree_ = tree
         self.labels_ = labels
         self.neural_network = neural_network
@@ -690,6 +705,7 @@ class DeepECT(_AbstractDeepClusteringAlgo):
             The new cluster labels
         """
         assert self.labels_ is not None, "The DeepECT algorithm has not run yet. Use the fit() function first."
-        tree_copy = copy.deepcopy(self.tree_)
-        labels_pruned = tree_copy.prune_to_n_leaf_nodes(n_leaf_nodes_to_keep, self.labels_)
+        # The array-based tree is not changed by the pruning, therefore, no copy of the tree (including the centers) is needed
+        array_tree = ArrayClusterTree.from_binary_cluster_tree(self.tree_)
+        labels_pruned = array_tree.prune_to_n_leaf_nodes(n_leaf_nodes_to_keep, self.labels_)
         return labels_pruned
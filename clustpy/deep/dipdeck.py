@@ -5,11 +5,12 @@ Collin Leiber
 
 from scipy.spatial.distance import cdist
 import numpy as np
-from clustpy.utils import dip_test, dip_pval
+from clustpy.utils import dip_test, dip_pval, dip_executor_map
 import torch
 from clustpy.deep._utils import encode_batchwise, squared_euclidean_distance, int_to_one_hot, embedded_kmeans_prediction
 from clustpy.deep._train_utils import get_default_deep_clustering_initialization
 from clustpy.deep._abstract_deep_clustering_algo import _AbstractDeepClusteringAlgo
+from clustpy.deep._training_options import TrainingOptions
 from sklearn.cluster import KMeans
 from sklearn.base import ClusterMixin
 import tqdm
@@ -20,10 +21,10 @@ def _dip_deck(X: np.ndarray, n_clusters_init: int, dip_merge_threshold: float, c
               pretrain_optimizer_params: dict, clustering_optimizer_params: dict, pretrain_epochs: int,
               clustering_epochs: int, optimizer_class: torch.optim.Optimizer, ssl_loss_fn: torch.nn.modules.loss._Loss,
               neural_network: torch.nn.Module | tuple, neural_network_weights: str, embedding_size: int,
-              max_cluster_size_diff_factor: float, pval_strategy: str, n_boots: int, custom_dataloaders: tuple,
-              augmentation_invariance: bool, initial_clustering_class: ClusterMixin, initial_clustering_params: dict,
-              device: torch.device, random_state: np.random.RandomState) -> (
-        np.ndarray, int, np.ndarray, torch.nn.Module):
+              max_cluster_size_diff_factor: float, pval_strategy: str, n_boots: int, n_jobs: int,
+              custom_dataloaders: tuple, augmentation_invariance: bool, initial_clustering_class: ClusterMixin,
+              initial_clustering_params: dict, device: torch.device, random_state: np.random.RandomState,
+              training_options: TrainingOptions) -> (np.ndarray, int, np.ndarray, torch.nn.Module):
     """
     Start the actual DipDECK clustering procedure on the input data set.
 
@@ -69,9 +70,11 @@ def _dip_deck(X: np.ndarray, n_clusters_init: int, dip_merge_threshold: float, c
         The maximum different in size when comparing two clusters regarding the number of samples.
         If one cluster surpasses this difference factor, only the max_cluster_size_diff_factor*(size of smaller cluster) closest samples will be used for the Dip calculation
     pval_strategy : str
-        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap'
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function', 'bootstrap' and 'cached_bootstrap'
     n_boots : int
-        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap'
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' or 'cached_bootstrap'
+    n_jobs : int
+        Number of threads used to calculate the Dip-values of the cluster pairs
     custom_dataloaders : tuple
         tuple consisting of a trainloader (random order) at the first and a test loader (non-random order) at the second position.
         Can also be a tuple of strings, where the first entry is the path to a saved trainloader and the second entry the path to a saved testloader.
@@ -88,6 +91,8 @@ def _dip_deck(X: np.ndarray, n_clusters_init: int, dip_merge_threshold: float, c
         The device on which to perform the computations
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training
 
     Returns
     -------
@@ -107,7 +112,7 @@ def _dip_deck(X: np.ndarray, n_clusters_init: int, dip_merge_threshold: float, c
     device, trainloader, testloader, _, neural_network, embedded_data, n_clusters_init, cluster_labels_cpu, init_centers, _ = get_default_deep_clustering_initialization(
         X, n_clusters_init, batch_size, pretrain_optimizer_params, pretrain_epochs, optimizer_class, ssl_loss_fn,
         neural_network, embedding_size, custom_dataloaders, initial_clustering_class, initial_clustering_params,
-        device, random_state, neural_network_weights=neural_network_weights)
+        device, random_state, neural_network_weights=neural_network_weights, training_options=training_options)
     if n_clusters_init < min_n_clusters:
         raise Exception("n_clusters_init ({0}) can not be smaller than min_n_clusters ({0})".format(n_clusters_init,
                                                                                                     min_n_clusters))
@@ -121,7 +126,7 @@ def _dip_deck(X: np.ndarray, n_clusters_init: int, dip_merge_threshold: float, c
     centers_cpu, embedded_centers_cpu = _get_nearest_points_to_optimal_centers(X, init_centers, embedded_data)
     # Initial dip values
     dip_matrix_cpu = _get_dip_matrix(embedded_data, embedded_centers_cpu, cluster_labels_cpu, n_clusters_init,
-                                     max_cluster_size_diff_factor, pval_strategy, n_boots, random_state)
+                                     max_cluster_size_diff_factor, pval_strategy, n_boots, n_jobs, random_state)
     # Use DipDECK optimizer parameters (usually learning rate is reduced by a magnitude of 10)
     optimizer = optimizer_class(neural_network.parameters(), **clustering_optimizer_params)
     # Start training
@@ -142,7 +147,9 @@ def _dip_deck(X: np.ndarray, n_clusters_init: int, dip_merge_threshold: float, c
                                                                                              augmentation_invariance,
                                                                                              max_cluster_size_diff_factor,
                                                                                              pval_strategy, n_boots,
-                                                                                             random_state)
+                                                                                             n_jobs,
+                                                                                             random_state,
+                                                                                             training_options)
     # Return results
     return cluster_labels_cpu, n_clusters_current, centers_cpu, neural_network
 
@@ -154,8 +161,8 @@ def _dip_deck_training(X: np.ndarray, n_clusters_current: int, dip_merge_thresho
                        optimizer: torch.optim.Optimizer, ssl_loss_fn: torch.nn.modules.loss._Loss,
                        neural_network: torch.nn.Module, device: torch.device, trainloader: torch.utils.data.DataLoader,
                        testloader: torch.utils.data.DataLoader, augmentation_invariance: bool,
-                       max_cluster_size_diff_factor: float, pval_strategy: str, n_boots: int,
-                       random_state: np.random.RandomState) -> (
+                       max_cluster_size_diff_factor: float, pval_strategy: str, n_boots: int, n_jobs: int,
+                       random_state: np.random.RandomState, training_options: TrainingOptions) -> (
         np.ndarray, int, np.ndarray, torch.nn.Module):
     """
     The training function of DipDECK. Contains most of the essential functionalities.
@@ -207,11 +214,15 @@ def _dip_deck_training(X: np.ndarray, n_clusters_current: int, dip_merge_thresho
         The maximum different in size when comparing two clusters regarding the number of samples.
         If one cluster surpasses this difference factor, only the max_cluster_size_diff_factor*(size of smaller cluster) closest samples will be used for the Dip calculation
     pval_strategy : str
-        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap'
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function', 'bootstrap' and 'cached_bootstrap'
     n_boots : int
-        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap'
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' or 'cached_bootstrap'
+    n_jobs : int
+        Number of threads used to calculate the Dip-values of the cluster pairs
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training
 
     Returns
     -------
@@ -221,138 +232,143 @@ def _dip_deck_training(X: np.ndarray, n_clusters_current: int, dip_merge_thresho
         The cluster centers as identified by DipDECK,
         The final neural network
     """
+    training_options = TrainingOptions() if training_options is None else training_options
+    grad_scaler = training_options.get_grad_scaler(device)
     i = 0
     merges_log = []
     tbar = tqdm.tqdm(total=clustering_epochs, desc="DipDECK training")
-    while i < clustering_epochs:
-        cluster_labels_torch = torch.from_numpy(cluster_labels_cpu).int().to(device)
-        centers_torch = torch.from_numpy(centers_cpu).float().to(device)
-        dip_matrix_torch = torch.from_numpy(dip_matrix_cpu).float().to(device)
-        # Get dip costs matrix
-        dip_matrix_eye = dip_matrix_torch + torch.eye(n_clusters_current, device=device)
-        dip_matrix_final = dip_matrix_eye / dip_matrix_eye.sum(1).reshape((-1, 1))
-        # Iterate over batches
-        total_loss = 0
-        for batch in trainloader:
-            ids = batch[0]
-            # Self-supervised Loss
-            if augmentation_invariance:
-                ssl_loss, embedded, _, embedded_aug, _ = neural_network.loss_augmentation(batch, ssl_loss_fn, device)
-            else:
-                ssl_loss, embedded, _ = neural_network.loss(batch, ssl_loss_fn, device)
-            # Encode centers
-            embedded_centers_torch = neural_network.encode(centers_torch)
-            # Get distances between points and centers. Get nearest center
-            squared_diffs = squared_euclidean_distance(embedded, embedded_centers_torch)
-            # Update labels? Pause is needed, so cluster labels can adjust to the new structure
-            if i != 0:
-                # Update labels
-                current_labels = squared_diffs.argmin(1)
-                # cluster_labels_torch[ids] = current_labels
-            else:
-                current_labels = cluster_labels_torch[ids]
-            onehot_labels = int_to_one_hot(current_labels, n_clusters_current).float()
-            cluster_relationships = torch.matmul(onehot_labels, dip_matrix_final)
-            escaped_diffs = cluster_relationships * squared_diffs
-            # Normalize loss by cluster distances
-            squared_center_diffs = squared_euclidean_distance(embedded_centers_torch, embedded_centers_torch)
-            # Ignore zero values (diagonal)
-            mask = torch.where(squared_center_diffs != 0)
-            masked_center_diffs = squared_center_diffs[mask[0], mask[1]]
-            sqrt_masked_center_diffs = masked_center_diffs.sqrt()
-            masked_center_diffs_std = sqrt_masked_center_diffs.std() if len(sqrt_masked_center_diffs) > 2 else 0
-            # Loss function
-            cluster_loss = escaped_diffs.sum(1).mean() * (
-                    1 + masked_center_diffs_std) / sqrt_masked_center_diffs.mean()
-            if augmentation_invariance:
-                # Augmendet cluster loss
-                squared_diffs_aug = squared_euclidean_distance(embedded_aug, embedded_centers_torch)
-                escaped_diffs_aug = cluster_relationships * squared_diffs_aug
-                cluster_loss_aug = escaped_diffs_aug.sum(1).mean() * (
-                        1 + masked_center_diffs_std) / sqrt_masked_center_diffs.mean()
-                cluster_loss = (cluster_loss + cluster_loss_aug) / 2
-            loss = ssl_loss_weight * ssl_loss + clustering_loss_weight * cluster_loss
-            total_loss += loss.item()
-            # Backward pass
-            optimizer.zero_grad()
-            loss.backward()
-            optimizer.step()
-        # Update centers
-        embedded_data = encode_batchwise(testloader, neural_network)
-        embedded_centers_cpu = neural_network.encode(centers_torch).detach().cpu().numpy()
-        cluster_labels_cpu = np.argmin(cdist(embedded_centers_cpu, embedded_data), axis=0).astype(np.int32)
-        optimal_centers = np.array([np.mean(embedded_data[cluster_labels_cpu == cluster_id], axis=0) for cluster_id in
-                                    range(n_clusters_current)])
-        centers_cpu, embedded_centers_cpu = _get_nearest_points_to_optimal_centers(X, optimal_centers, embedded_data)
-        # Update Dips
-        dip_matrix_cpu = _get_dip_matrix(embedded_data, embedded_centers_cpu, cluster_labels_cpu, n_clusters_current,
-                                         max_cluster_size_diff_factor, pval_strategy, n_boots, random_state)
-
-        postfix_str = {"n_clusters": n_clusters_current, "Loss": total_loss, "Max dip": np.max(dip_matrix_cpu)}
-        tbar.set_postfix(postfix_str)
-        tbar.update()
-        # print(
-        #     "Iteration {0}  (n_clusters = {4}) - network loss: {1} / cluster loss: {2} / total loss: {3}".format(
-        #         i, ssl_loss.item(), cluster_loss.item(), loss.item(), n_clusters_current))
-        # print("max dip", np.max(dip_matrix_cpu), " at ",
-        #       np.unravel_index(np.argmax(dip_matrix_cpu, axis=None), dip_matrix_cpu.shape))
-        # i is increased here. Else next iteration will start with i = 1 instead of 0 after a merge
-        i += 1
-        # Start merging procedure
-        dip_argmax = np.unravel_index(np.argmax(dip_matrix_cpu, axis=None), dip_matrix_cpu.shape)
-        # Is merge possible?
-        while dip_matrix_cpu[dip_argmax] >= dip_merge_threshold and n_clusters_current > min_n_clusters:
-            merges_log.append("Merge in iteration {0}. Merging clusters {1} with dip value {2}.".format(i, dip_argmax,
-                                                                                                        dip_matrix_cpu[
-                                                                                                            dip_argmax]))
-            # Reset iteration and reduce number of cluster
-            i = 0
-            tbar.reset()
-            n_clusters_current -= 1
-            cluster_labels_cpu, centers_cpu, embedded_centers_cpu, dip_matrix_cpu = \
-                _merge_by_dip_value(X, embedded_data, cluster_labels_cpu, dip_argmax, n_clusters_current, centers_cpu,
-                                    embedded_centers_cpu, max_cluster_size_diff_factor, pval_strategy, n_boots,
-                                    random_state)
+    with training_options.training_context(neural_network):
+        while i < clustering_epochs:
+            cluster_labels_torch = torch.from_numpy(cluster_labels_cpu).int().to(device)
+            centers_torch = torch.from_numpy(centers_cpu).float().to(device)
+            dip_matrix_torch = torch.from_numpy(dip_matrix_cpu).float().to(device)
+            # Get dip costs matrix
+            dip_matrix_eye = dip_matrix_torch + torch.eye(n_clusters_current, device=device)
+            dip_matrix_final = dip_matrix_eye / dip_matrix_eye.sum(1).reshape((-1, 1))
+            # Iterate over batches
+            total_loss = 0
+            for batch in trainloader:
+                ids = batch[0]
+                with training_options.autocast(device):
+                    # Self-supervised Loss
+                    if augmentation_invariance:
+                        ssl_loss, embedded, _, embedded_aug, _ = neural_network.loss_augmentation(batch, ssl_loss_fn,
+                                                                                                  device)
+                    else:
+                        ssl_loss, embedded, _ = neural_network.loss(batch, ssl_loss_fn, device)
+                    # Encode centers
+                    embedded_centers_torch = neural_network.encode(centers_torch)
+                    # Get distances between points and centers. Get nearest center
+                    squared_diffs = squared_euclidean_distance(embedded, embedded_centers_torch)
+                    # Update labels? Pause is needed, so cluster labels can adjust to the new structure
+                    if i != 0:
+                        # Update labels
+                        current_labels = squared_diffs.argmin(1)
+                        # cluster_labels_torch[ids] = current_labels
+                    else:
+                        current_labels = cluster_labels_torch[ids]
+                    onehot_labels = int_to_one_hot(current_labels, n_clusters_current).float()
+                    cluster_relationships = torch.matmul(onehot_labels, dip_matrix_final)
+                    escaped_diffs = cluster_relationships * squared_diffs
+                    # Normalize loss by cluster distances
+                    squared_center_diffs = squared_euclidean_distance(embedded_centers_torch, embedded_centers_torch)
+                    # Ignore zero values (diagonal)
+                    mask = torch.where(squared_center_diffs != 0)
+                    masked_center_diffs = squared_center_diffs[mask[0], mask[1]]
+                    sqrt_masked_center_diffs = masked_center_diffs.sqrt()
+                    masked_center_diffs_std = sqrt_masked_center_diffs.std() if len(sqrt_masked_center_diffs) > 2 else 0
+                    # Loss function
+                    cluster_loss = escaped_diffs.sum(1).mean() * (
+                            1 + masked_center_diffs_std) / sqrt_masked_center_diffs.mean()
+                    if augmentation_invariance:
+                        # Augmendet cluster loss
+                        squared_diffs_aug = squared_euclidean_distance(embedded_aug, embedded_centers_torch)
+                        escaped_diffs_aug = cluster_relationships * squared_diffs_aug
+                        cluster_loss_aug = escaped_diffs_aug.sum(1).mean() * (
+                                1 + masked_center_diffs_std) / sqrt_masked_center_diffs.mean()
+                        cluster_loss = (cluster_loss + cluster_loss_aug) / 2
+                    loss = ssl_loss_weight * ssl_loss + clustering_loss_weight * cluster_loss
+                total_loss += loss.item()
+                # Backward pass
+                training_options.optimization_step(loss, optimizer, grad_scaler)
+            # Update centers
+            embedded_data = encode_batchwise(testloader, neural_network)
+            embedded_centers_cpu = neural_network.encode(centers_torch).detach().cpu().numpy()
+            cluster_labels_cpu = np.argmin(cdist(embedded_centers_cpu, embedded_data), axis=0).astype(np.int32)
+            optimal_centers = np.array([np.mean(embedded_data[cluster_labels_cpu == cluster_id], axis=0) for
+                                        cluster_id in range(n_clusters_current)])
+            centers_cpu, embedded_centers_cpu = _get_nearest_points_to_optimal_centers(X, optimal_centers,
+                                                                                       embedded_data)
+            # Update Dips
+            dip_matrix_cpu = _get_dip_matrix(embedded_data, embedded_centers_cpu, cluster_labels_cpu,
+                                             n_clusters_current, max_cluster_size_diff_factor, pval_strategy, n_boots,
+                                             n_jobs, random_state)
+
+            postfix_str = {"n_clusters": n_clusters_current, "Loss": total_loss, "Max dip": np.max(dip_matrix_cpu)}
+            tbar.set_postfix(postfix_str)
+            tbar.update()
+            # print(
+            #     "Iteration {0}  (n_clusters = {4}) - network loss: {1} / cluster loss: {2} / total loss: {3}".format(
+            #         i, ssl_loss.item(), cluster_loss.item(), loss.item(), n_clusters_current))
+            # print("max dip", np.max(dip_matrix_cpu), " at ",
+            #       np.unravel_index(np.argmax(dip_matrix_cpu, axis=None), dip_matrix_cpu.shape))
+            # i is increased here. Else next iteration will start with i = 1 instead of 0 after a merge
+            i += 1
+            # Start merging procedure
             dip_argmax = np.unravel_index(np.argmax(dip_matrix_cpu, axis=None), dip_matrix_cpu.shape)
-        # Optional: Force merging of clusters
-        if i == clustering_epochs and n_clusters_current > max_n_clusters:
-            # Get smallest cluster
-            _, cluster_sizes = np.unique(cluster_labels_cpu, return_counts=True)
-            smallest_cluster_id = np.argmin(cluster_sizes)
-            smallest_cluster_size = cluster_sizes[smallest_cluster_id]
-            i = 0
-            tbar.reset()
-            n_clusters_current -= 1
-            # Is smallest cluster small enough for deletion?
-            if smallest_cluster_size < 0.2 * np.mean(cluster_sizes):
-                merges_log.append(
-                    "Remove smallest cluster {0} with size {1}".format(smallest_cluster_id, smallest_cluster_size))
-                distances_to_clusters = cdist(embedded_centers_cpu,
-                                              embedded_data[cluster_labels_cpu == smallest_cluster_id])
-                # Set dist to center which is being removed to inf
-                distances_to_clusters[smallest_cluster_id, :] = np.inf
-                cluster_labels_cpu[cluster_labels_cpu == smallest_cluster_id] = np.argmin(distances_to_clusters, axis=0)
-                cluster_labels_cpu[cluster_labels_cpu >= smallest_cluster_id] -= 1
-                optimal_centers = np.array(
-                    [np.mean(embedded_data[cluster_labels_cpu == cluster_id], axis=0) for cluster_id in
-                     range(n_clusters_current)])
-                centers_cpu, embedded_centers_cpu = _get_nearest_points_to_optimal_centers(X, optimal_centers,
-                                                                                           embedded_data)
-                # Update dip values
-                dip_matrix_cpu = _get_dip_matrix(embedded_data, embedded_centers_cpu, cluster_labels_cpu,
-                                                 n_clusters_current, max_cluster_size_diff_factor, pval_strategy,
-                                                 n_boots, random_state)
-            else:
-                # Else: merge clusters with highest dip
-                merges_log.append(
-                    "Force merge of clusters {0} with dip value {1}".format(dip_argmax, dip_matrix_cpu[dip_argmax]))
-                cluster_labels_cpu, centers_cpu, _, dip_matrix_cpu = \
+            # Is merge possible?
+            while dip_matrix_cpu[dip_argmax] >= dip_merge_threshold and n_clusters_current > min_n_clusters:
+                merges_log.append("Merge in iteration {0}. Merging clusters {1} with dip value {2}.".format(
+                    i, dip_argmax, dip_matrix_cpu[dip_argmax]))
+                # Reset iteration and reduce number of cluster
+                i = 0
+                tbar.reset()
+                n_clusters_current -= 1
+                cluster_labels_cpu, centers_cpu, embedded_centers_cpu, dip_matrix_cpu = \
                     _merge_by_dip_value(X, embedded_data, cluster_labels_cpu, dip_argmax, n_clusters_current,
-                                        centers_cpu, embedded_centers_cpu, max_cluster_size_diff_factor, pval_strategy,
-                                        n_boots, random_state)
-        if n_clusters_current == 1:
-            print("Abort DipDECK: Only one cluster left")
-            break
+                                        centers_cpu, embedded_centers_cpu, max_cluster_size_diff_factor,
+                                        pval_strategy, n_boots, n_jobs, random_state)
+                dip_argmax = np.unravel_index(np.argmax(dip_matrix_cpu, axis=None), dip_matrix_cpu.shape)
+            # Optional: Force merging of clusters
+            if i == clustering_epochs and n_clusters_current > max_n_clusters:
+                # Get smallest cluster
+                _, cluster_sizes = np.unique(cluster_labels_cpu, return_counts=True)
+                smallest_cluster_id = np.argmin(cluster_sizes)
+                smallest_cluster_size = cluster_sizes[smallest_cluster_id]
+                i = 0
+                tbar.reset()
+                n_clusters_current -= 1
+                # Is smallest cluster small enough for deletion?
+                if smallest_cluster_size < 0.2 * np.mean(cluster_sizes):
+                    merges_log.append(
+                        "Remove smallest cluster {0} with size {1}".format(smallest_cluster_id, smallest_cluster_size))
+                    distances_to_clusters = cdist(embedded_centers_cpu,
+                                                  embedded_data[cluster_labels_cpu == smallest_cluster_id])
+                    # Set dist to center which is being removed to inf
+                    distances_to_clusters[smallest_cluster_id, :] = np.inf
+                    cluster_labels_cpu[cluster_labels_cpu == smallest_cluster_id] = np.argmin(distances_to_clusters,
+                                                                                              axis=0)
+                    cluster_labels_cpu[cluster_labels_cpu >= smallest_cluster_id] -= 1
+                    optimal_centers = np.array(
+                        [np.mean(embedded_data[cluster_labels_cpu == cluster_id], axis=0) for cluster_id in
+                         range(n_clusters_current)])
+                    centers_cpu, embedded_centers_cpu = _get_nearest_points_to_optimal_centers(X, optimal_centers,
+                                                                                               embedded_data)
+                    # Update dip values
+                    dip_matrix_cpu = _get_dip_matrix(embedded_data, embedded_centers_cpu, cluster_labels_cpu,
+                                                     n_clusters_current, max_cluster_size_diff_factor, pval_strategy,
+                                                     n_boots, n_jobs, random_state)
+                else:
+                    # Else: merge clusters with highest dip
+                    merges_log.append(
+                        "Force merge of clusters {0} with dip value {1}".format(dip_argmax, dip_matrix_cpu[dip_argmax]))
+                    cluster_labels_cpu, centers_cpu, _, dip_matrix_cpu = \
+                        _merge_by_dip_value(X, embedded_data, cluster_labels_cpu, dip_argmax, n_clusters_current,
+                                            centers_cpu, embedded_centers_cpu, max_cluster_size_diff_factor,
+                                            pval_strategy, n_boots, n_jobs, random_state)
+            if n_clusters_current == 1:
+                print("Abort DipDECK: Only one cluster left")
+                break
     tbar.close()
     for merge_message in merges_log:
         print(merge_message)
@@ -362,7 +378,7 @@ def _dip_deck_training(X: np.ndarray, n_clusters_current: int, dip_merge_thresho
 def _merge_by_dip_value(X: np.ndarray, embedded_data: np.ndarray, cluster_labels_cpu: np.ndarray,
                         dip_argmax: np.ndarray, n_clusters_current: int, centers_cpu: np.ndarray,
                         embedded_centers_cpu: np.ndarray, max_cluster_size_diff_factor: float, pval_strategy: str,
-                        n_boots: int, random_state: np.random.RandomState) -> (
+                        n_boots: int, n_jobs: int, random_state: np.random.RandomState) -> (
         np.ndarray, np.ndarray, np.ndarray, np.ndarray):
     """
     Merge the clusters within dip_argmax because their Dip-value is larger than the threshold.
@@ -389,9 +405,11 @@ def _merge_by_dip_value(X: np.ndarray, embedded_data: np.ndarray, cluster_labels
         The maximum different in size when comparing two clusters regarding the number of samples.
         If one cluster surpasses this difference factor, only the max_cluster_size_diff_factor*(size of smaller cluster) closest samples will be used for the Dip calculation
     pval_strategy : str
-        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap'
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function', 'bootstrap' and 'cached_bootstrap'
     n_boots : int
-        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap'
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' or 'cached_bootstrap'
+    n_jobs : int
+        Number of threads used to calculate the Dip-values of the cluster pairs
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
 
@@ -429,7 +447,7 @@ def _merge_by_dip_value(X: np.ndarray, embedded_data: np.ndarray, cluster_labels
     embedded_centers_cpu = np.append(embedded_centers_cpu_tmp, new_embedded_center_cpu, axis=0)
     # Update dip values
     dip_matrix_cpu = _get_dip_matrix(embedded_data, embedded_centers_cpu, cluster_labels_cpu,
-                                     n_clusters_current, max_cluster_size_diff_factor, pval_strategy, n_boots,
+                                     n_clusters_current, max_cluster_size_diff_factor, pval_strategy, n_boots, n_jobs,
                                      random_state)
     return cluster_labels_cpu, centers_cpu, embedded_centers_cpu, dip_matrix_cpu
 
@@ -498,7 +516,7 @@ def _get_nearest_points(points_in_larger_cluster: np.ndarray, center: np.ndarray
 
 def _get_dip_matrix(embedded_data: np.ndarray, embedded_centers_cpu: np.ndarray, cluster_labels_cpu: np.ndarray,
                     n_clusters: int, max_cluster_size_diff_factor: float, pval_strategy: str, n_boots: int,
-                    random_state: np.random.RandomState) -> np.ndarray:
+                    n_jobs: int, random_state: np.random.RandomState) -> np.ndarray:
     """
     Calculate the dip matrix. Contains the pair-wise Dip-values between all cluster combinations.
     Here, the objects from the two clusters will be projected onto the connection axis between ther cluster centers.
@@ -517,9 +535,11 @@ def _get_dip_matrix(embedded_data: np.ndarray, embedded_centers_cpu: np.ndarray,
         The maximum different in size when comparing two clusters regarding the number of samples.
         If one cluster surpasses this difference factor, only the max_cluster_size_diff_factor*(size of smaller cluster) closest samples will be used for the Dip calculation
     pval_strategy : str
-        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap'
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function', 'bootstrap' and 'cached_bootstrap'
     n_boots : int
-        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap'
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' or 'cached_bootstrap'
+    n_jobs : int
+        Number of threads used to calculate the Dip-values of the cluster pairs
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
 
@@ -529,36 +549,70 @@ def _get_dip_matrix(embedded_data: np.ndarray, embedded_centers_cpu: np.ndarray,
         The final dip matrix
     """
     dip_matrix = np.zeros((n_clusters, n_clusters))
-    # Loop over all combinations of centers
-    for i in range(0, n_clusters - 1):
-        for j in range(i + 1, n_clusters):
-            center_diff = embedded_centers_cpu[i] - embedded_centers_cpu[j]
-            points_in_i = embedded_data[cluster_labels_cpu == i]
-            points_in_j = embedded_data[cluster_labels_cpu == j]
-            points_in_i_or_j = np.append(points_in_i, points_in_j, axis=0)
-            proj_points = np.dot(points_in_i_or_j, center_diff)
-            dip_value = dip_test(proj_points)
-            dip_p_value = dip_pval(dip_value, proj_points.shape[0], pval_strategy, n_boots, random_state)
-            # Check if clusters sizes differ heavily
-            if points_in_i.shape[0] > points_in_j.shape[0] * max_cluster_size_diff_factor or \
-                    points_in_j.shape[0] > points_in_i.shape[0] * max_cluster_size_diff_factor:
-                if points_in_i.shape[0] > points_in_j.shape[0] * max_cluster_size_diff_factor:
-                    points_in_i = _get_nearest_points(points_in_i, embedded_centers_cpu[j], points_in_j.shape[0],
-                                                      max_cluster_size_diff_factor)
-                elif points_in_j.shape[0] > points_in_i.shape[0] * max_cluster_size_diff_factor:
-                    points_in_j = _get_nearest_points(points_in_j, embedded_centers_cpu[i], points_in_i.shape[0],
-                                                      max_cluster_size_diff_factor)
-                points_in_i_or_j = np.append(points_in_i, points_in_j, axis=0)
-                proj_points = np.dot(points_in_i_or_j, center_diff)
-                dip_value_2 = dip_test(proj_points)
-                dip_p_value_2 = dip_pval(dip_value_2, proj_points.shape[0], pval_strategy, n_boots, random_state)
-                dip_p_value = min(dip_p_value, dip_p_value_2)
-            # Add pval to dip matrix
-            dip_matrix[i][j] = dip_p_value
-            dip_matrix[j][i] = dip_p_value
+    cluster_pairs = [(i, j) for i in range(0, n_clusters - 1) for j in range(i + 1, n_clusters)]
+    # The Dip-values of all combinations of centers are calculated in parallel
+    pair_dips = dip_executor_map(
+        lambda pair: _get_dip_values_of_cluster_pair(embedded_data, embedded_centers_cpu, cluster_labels_cpu, pair[0],
+                                                     pair[1], max_cluster_size_diff_factor), cluster_pairs, n_jobs)
+    # The p-values are calculated sequentially so that the random state is used in a fixed order
+    for (i, j), dip_results in zip(cluster_pairs, pair_dips):
+        dip_p_value = min([dip_pval(dip_value, n_points, pval_strategy, n_boots, random_state) for dip_value, n_points
+                           in dip_results])
+        # Add pval to dip matrix
+        dip_matrix[i][j] = dip_p_value
+        dip_matrix[j][i] = dip_p_value
     return dip_matrix
 
 
+def _get_dip_values_of_cluster_pair(embedded_data: np.ndarray, embedded_centers_cpu: np.ndarray,
+                                    cluster_labels_cpu: np.ndarray, i: int, j: int,
+                                    max_cluster_size_diff_factor: float) -> list:
+    """
+    Calculate the Dip-value of the objects from two clusters projected onto the connection axis between their cluster centers.
+    If the cluster sizes differ heavily, a second Dip-value is calculated using only the closest samples of the larger cluster.
+
+    Parameters
+    ----------
+    embedded_data : np.ndarray
+        the embedded data set
+    embedded_centers_cpu : np.ndarray
+        The embedded cluster centers, saved as numpy array (not torch.Tensor)
+    cluster_labels_cpu : np.ndarray
+        The current cluster labels, saved as numpy array (not torch.Tensor)
+    i : int
+        The id of the first cluster
+    j : int
+        The id of the second cluster
+    max_cluster_size_diff_factor : float
+        The maximum different in size when comparing two clusters regarding the number of samples.
+        If one cluster surpasses this difference factor, only the max_cluster_size_diff_factor*(size of smaller cluster) closest samples will be used for the Dip calculation
+
+    Returns
+    -------
+    dip_results : list
+        List containing one or two tuples consisting of the Dip-value and the number of projected samples
+    """
+    center_diff = embedded_centers_cpu[i] - embedded_centers_cpu[j]
+    points_in_i = embedded_data[cluster_labels_cpu == i]
+    points_in_j = embedded_data[cluster_labels_cpu == j]
+    points_in_i_or_j = np.append(points_in_i, points_in_j, axis=0)
+    proj_points = np.dot(points_in_i_or_j, center_diff)
+    dip_results = [(dip_test(proj_points), proj_points.shape[0])]
+    # Check if clusters sizes differ heavily
+    if points_in_i.shape[0] > points_in_j.shape[0] * max_cluster_size_diff_factor or \
+            points_in_j.shape[0] > points_in_i.shape[0] * max_cluster_size_diff_factor:
+        if points_in_i.shape[0] > points_in_j.shape[0] * max_cluster_size_diff_factor:
+            points_in_i = _get_nearest_points(points_in_i, embedded_centers_cpu[j], points_in_j.shape[0],
+                                              max_cluster_size_diff_factor)
+        elif points_in_j.shape[0] > points_in_i.shape[0] * max_cluster_size_diff_factor:
+            points_in_j = _get_nearest_points(points_in_j, embedded_centers_cpu[i], points_in_i.shape[0],
+                                              max_cluster_size_diff_factor)
+        points_in_i_or_j = np.append(points_in_i, points_in_j, axis=0)
+        proj_points = np.dot(points_in_i_or_j, center_diff)
+        dip_results.append((dip_test(proj_points), proj_points.shape[0]))
+    return dip_results
+
+
 class DipDECK(_AbstractDeepClusteringAlgo):
     """
     The Deep Embedded Clustering with k-Estimation (DipDECK) algorithm.
@@ -607,9 +661,9 @@ class DipDECK(_AbstractDeepClusteringAlgo):
         The maximum different in size when comparing two clusters regarding the number of samples.
         If one cluster surpasses this difference factor, only the max_cluster_size_diff_factor*(size of smaller cluster) closest samples will be used for the Dip calculation (default: 2)
     pval_strategy : str
-        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap' (default: 'table')
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function', 'bootstrap' and 'cached_bootstrap' (default: 'table')
     n_boots : int
-        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' (default: 1000)
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' or 'cached_bootstrap' (default: 1000)
     custom_dataloaders : tuple
         tuple consisting of a trainloader (random order) at the first and a test loader (non-random order) at the second position.
         Can also be a tuple of strings, where the first entry is the path to a saved trainloader and the second entry the path to a saved testloader.
@@ -622,11 +676,16 @@ class DipDECK(_AbstractDeepClusteringAlgo):
         clustering class to obtain the initial cluster labels after the pretraining (default: KMeans)
     initial_clustering_params : dict
         parameters for the initial clustering class (default: {})
-    random_state : np.random.RandomState | int
-        use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
     device : torch.device
         The device on which to perform the computations.
         If device is None then it will be automatically chosen: if a gpu is available the gpu with the highest amount of free memory will be chosen (default: None)
+    random_state : np.random.RandomState | int
+        use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    n_jobs : int
+        Number of threads used to calculate the Dip-values of the cluster pairs. None means 1 and -1 means using all processors (default: None)
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training of the neural network.
+        If None, the default TrainingOptions will be used (default: None)
 
     Attributes
     ----------
@@ -663,8 +722,10 @@ class DipDECK(_AbstractDeepClusteringAlgo):
                  embedding_size: int = 5, max_cluster_size_diff_factor: float = 2, pval_strategy: str = "table",
                  n_boots: int = 1000, custom_dataloaders: tuple = None, augmentation_invariance: bool = False,
                  initial_clustering_class: ClusterMixin = KMeans, initial_clustering_params: dict = None,
-                 device: torch.device = None, random_state: np.random.RandomState | int = None):
-        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state)
+                 device: torch.device = None, random_state: np.random.RandomState | int = None, n_jobs: int = None,
+                 training_options: TrainingOptions = None):
+        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state,
+                         training_options)
         self.n_clusters_init = n_clusters_init
         self.dip_merge_threshold = dip_merge_threshold
         self.clustering_loss_weight = clustering_loss_weight
@@ -686,6 +747,7 @@ class DipDECK(_AbstractDeepClusteringAlgo):
         self.augmentation_invariance = augmentation_invariance
         self.initial_clustering_class = initial_clustering_class
         self.initial_clustering_params = {} if initial_clustering_params is None else initial_clustering_params
+        self.n_jobs = n_jobs
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'DipDECK':
         """
@@ -715,12 +777,12 @@ class DipDECK(_AbstractDeepClusteringAlgo):
                                                                 self.optimizer_class, self.ssl_loss_fn,
                                                                 self.neural_network, self.neural_network_weights,
                                                                 self.embedding_size, self.max_cluster_size_diff_factor,
-                                                                self.pval_strategy, self.n_boots,
+                                                                self.pval_strategy, self.n_boots, self.n_jobs,
                                                                 self.custom_dataloaders,
                                                                 self.augmentation_invariance,
                                                                 self.initial_clustering_class,
                                                                 self.initial_clustering_params, self.device,
-                                                                self.random_state)
+                                                                self.random_state, self.training_options)
         self.labels_ = labels
         self.n_clusters_ = n_clusters
         self.cluster_centers_ = centers
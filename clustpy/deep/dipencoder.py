@@ -13,6 +13,7 @@ from clustpy.deep._utils import detect_device, encode_batchwise, run_initial_clu
 from clustpy.deep._data_utils import get_train_and_test_dataloader
 from clustpy.deep._train_utils import get_trained_network
 from clustpy.deep._abstract_deep_clustering_algo import _AbstractDeepClusteringAlgo
+from clustpy.deep._training_options import TrainingOptions
 from clustpy.deep.neural_networks._resnet_ae_modules import EncoderBlock, DecoderBlock
 import matplotlib.pyplot as plt
 from clustpy.utils import plot_scatter_matrix
@@ -476,7 +477,7 @@ def _dipencoder(X: np.ndarray, n_clusters: int, embedding_size: int, batch_size:
                 max_cluster_size_diff_factor: float, clustering_loss_weight: float, ssl_loss_weight: float,
                 custom_dataloaders: tuple, augmentation_invariance: bool, initial_clustering_class: ClusterMixin,
                 initial_clustering_params: dict, labels_gt: np.ndarray, device: torch.device,
-                random_state: np.random.RandomState) -> (
+                random_state: np.random.RandomState, training_options: TrainingOptions) -> (
         np.ndarray, np.ndarray, dict, torch.nn.Module):
     """
     Start the actual DipEncoder procedure on the input data set.
@@ -535,6 +536,8 @@ def _dipencoder(X: np.ndarray, n_clusters: int, embedding_size: int, batch_size:
         The device on which to perform the computations
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the pretraining
 
     Returns
     -------
@@ -553,7 +556,7 @@ def _dipencoder(X: np.ndarray, n_clusters: int, embedding_size: int, batch_size:
                                          optimizer_params=pretrain_optimizer_params, optimizer_class=optimizer_class,
                                          device=device, ssl_loss_fn=ssl_loss_fn, embedding_size=embedding_size,
                                          neural_network=neural_network, neural_network_weights=neural_network_weights,
-                                         random_state=random_state)
+                                         random_state=random_state, training_options=training_options)
     # Get factor for AE loss
     # rand_samples = torch.rand((batch_size, X.shape[1]))
     # data_min = np.min(X)
@@ -717,6 +720,9 @@ class DipEncoder(_AbstractDeepClusteringAlgo):
         If device is None then it will be automatically chosen: if a gpu is available the gpu with the highest amount of free memory will be chosen (default: None)
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the pretraining of the neural network.
+        If None, the default TrainingOptions will be used (default: None)
 
     Attributes
     ----------
@@ -753,10 +759,11 @@ class DipEncoder(_AbstractDeepClusteringAlgo):
                  clustering_loss_weight: float = 1., ssl_loss_weight: float = None,
                  custom_dataloaders: tuple = None, augmentation_invariance: bool = False,
                  initial_clustering_class: ClusterMixin = KMeans, initial_clustering_params: dict = None,
-                 device: torch.device = None, random_state: np.random.RandomState | int = None):
+                 device: torch.device = None, random_state: np.random.RandomState | int = None,
+                 training_options: TrainingOptions = None):
         assert batch_size is not None or n_clusters is not None, "n_clusters and batch_size can not both be None"
         super().__init__(25 * n_clusters if batch_size is None else batch_size, neural_network, neural_network_weights,
-                         embedding_size, device, random_state)
+                         embedding_size, device, random_state, training_options)
         self.n_clusters = n_clusters
         self.pretrain_optimizer_params = {
             "lr": 1e-3} if pretrain_optimizer_params is None else pretrain_optimizer_params
@@ -809,7 +816,8 @@ class DipEncoder(_AbstractDeepClusteringAlgo):
                                                                           self.augmentation_invariance,
                                                                           self.initial_clustering_class,
                                                                           self.initial_clustering_params,
-                                                                          y, self.device, self.random_state)
+                                                                          y, self.device, self.random_state,
+                                                                          self.training_options)
         self.labels_ = labels
         self.projection_axes_ = projection_axes
         self.index_dict_ = index_dict
@@ -7,6 +7,7 @@ from clustpy.deep._utils import encode_batchwise, squared_euclidean_distance, pr
     embedded_kmeans_prediction
 from clustpy.deep._train_utils import get_default_deep_clustering_initialization
 from clustpy.deep._abstract_deep_clustering_algo import _AbstractDeepClusteringAlgo
+from clustpy.deep._training_options import TrainingOptions
 import torch
 import numpy as np
 from sklearn.cluster import KMeans
@@ -20,7 +21,8 @@ def _dkm(X: np.ndarray, n_clusters: int, alphas: list | tuple, batch_size: int,
          neural_network: torch.nn.Module | tuple, neural_network_weights: str, embedding_size: int,
          clustering_loss_weight: float, ssl_loss_weight: float, custom_dataloaders: tuple,
          augmentation_invariance: bool, initial_clustering_class: ClusterMixin,
-         initial_clustering_params: dict, device: torch.device, random_state: np.random.RandomState) -> (
+         initial_clustering_params: dict, device: torch.device, random_state: np.random.RandomState,
+         training_options: TrainingOptions) -> (
         np.ndarray, np.ndarray, np.ndarray, np.ndarray, torch.nn.Module):
     """
     Start the actual DKM clustering procedure on the input data set.
@@ -76,6 +78,8 @@ def _dkm(X: np.ndarray, n_clusters: int, alphas: list | tuple, batch_size: int,
         The device on which to perform the computations
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training
 
     Returns
     -------
@@ -90,7 +94,7 @@ def _dkm(X: np.ndarray, n_clusters: int, alphas: list | tuple, batch_size: int,
     device, trainloader, testloader, _, neural_network, _, n_clusters, _, init_centers, _ = get_default_deep_clustering_initialization(
         X, n_clusters, batch_size, pretrain_optimizer_params, pretrain_epochs, optimizer_class, ssl_loss_fn,
         neural_network, embedding_size, custom_dataloaders, initial_clustering_class, initial_clustering_params, device,
-        random_state, neural_network_weights=neural_network_weights)
+        random_state, neural_network_weights=neural_network_weights, training_options=training_options)
     # Setup DKM Module
     dkm_module = _DKM_Module(init_centers, alphas, augmentation_invariance).to(device)
     # Use DKM optimizer parameters (usually learning rate is reduced by a magnitude of 10)
@@ -98,7 +102,7 @@ def _dkm(X: np.ndarray, n_clusters: int, alphas: list | tuple, batch_size: int,
                                 **clustering_optimizer_params)
     # DKM Training loop
     dkm_module.fit(neural_network, trainloader, clustering_epochs, device, optimizer, ssl_loss_fn,
-                   clustering_loss_weight, ssl_loss_weight)
+                   clustering_loss_weight, ssl_loss_weight, training_options)
     # Get labels
     dkm_labels = predict_batchwise(testloader, neural_network, dkm_module)
     dkm_centers = dkm_module.centers.detach().cpu().numpy()
@@ -324,7 +328,8 @@ class _DKM_Module(torch.nn.Module):
 
     def fit(self, neural_network: torch.nn.Module, trainloader: torch.utils.data.DataLoader, n_epochs: int,
             device: torch.device, optimizer: torch.optim.Optimizer, ssl_loss_fn: torch.nn.modules.loss._Loss,
-            clustering_loss_weight: float, ssl_loss_weight: float) -> '_DKM_Module':
+            clustering_loss_weight: float, ssl_loss_weight: float,
+            training_options: TrainingOptions = None) -> '_DKM_Module':
         """
         Trains the _DKM_Module in place.
 
@@ -347,27 +352,32 @@ class _DKM_Module(torch.nn.Module):
             weight of the clustering loss
         ssl_loss_weight : float
             weight of the self-supervised learning (ssl) loss
+        training_options : TrainingOptions
+            options defining the precision, compilation and memory format used for the training.
+            If None, the default TrainingOptions will be used (default: None)
 
         Returns
         -------
         self : _DKM_Module
             this instance of the _DKM_Module
         """
+        training_options = TrainingOptions() if training_options is None else training_options
+        grad_scaler = training_options.get_grad_scaler(device)
         tbar = tqdm.tqdm(total=n_epochs * len(self.alphas), desc="DKM training")
-        for alpha in self.alphas:
-            for _ in range(n_epochs):
-                total_loss = 0
-                for batch in trainloader:
-                    loss = self._loss(batch, alpha, neural_network, clustering_loss_weight, ssl_loss_weight,
-                                      ssl_loss_fn, device)
-                    total_loss += loss.item()
-                    # Backward pass
-                    optimizer.zero_grad()
-                    loss.backward()
-                    optimizer.step()
-                postfix_str = {"Loss": total_loss, "Alpha": alpha}
-                tbar.set_postfix(postfix_str)
-                tbar.update()
+        with training_options.training_context(neural_network):
+            for alpha in self.alphas:
+                for _ in range(n_epochs):
+                    total_loss = 0
+                    for batch in trainloader:
+                        with training_options.autocast(device):
+                            loss = self._loss(batch, alpha, neural_network, clustering_loss_weight, ssl_loss_weight,
+                                              ssl_loss_fn, device)
+                        total_loss += loss.item()
+                        # Backward pass
+                        training_options.optimization_step(loss, optimizer, grad_scaler)
+                    postfix_str = {"Loss": total_loss, "Alpha": alpha}
+                    tbar.set_postfix(postfix_str)
+                    tbar.update()
         return self
 
 
@@ -431,6 +441,9 @@ class DKM(_AbstractDeepClusteringAlgo):
         If device is None then it will be automatically chosen: if a gpu is available the gpu with the highest amount of free memory will be chosen (default: None)
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training of the neural network.
+        If None, the default TrainingOptions will be used (default: None)
 
     Attributes
     ----------
@@ -468,8 +481,10 @@ class DKM(_AbstractDeepClusteringAlgo):
                  embedding_size: int = 10, clustering_loss_weight: float = 1., ssl_loss_weight: float = 1.,
                  custom_dataloaders: tuple = None, augmentation_invariance: bool = False,
                  initial_clustering_class: ClusterMixin = KMeans, initial_clustering_params: dict = None,
-                 device: torch.device = None, random_state: np.random.RandomState | int = None):
-        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state)
+                 device: torch.device = None, random_state: np.random.RandomState | int = None,
+                 training_options: TrainingOptions = None):
+        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state,
+                         training_options)
         self.n_clusters = n_clusters
         if alphas is None:
             alphas = _get_default_alphas()
@@ -530,7 +545,8 @@ class DKM(_AbstractDeepClusteringAlgo):
                                                                                       self.initial_clustering_class,
                                                                                       self.initial_clustering_params,
                                                                                       self.device,
-                                                                                      self.random_state)
+                                                                                      self.random_state,
+                                                                                      self.training_options)
         self.labels_ = kmeans_labels
         self.cluster_centers_ = kmeans_centers
         self.dkm_labels_ = dkm_labels
@@ -7,6 +7,8 @@ import torch
 from sklearn.cluster import KMeans
 import numpy as np
 from clustpy.deep._abstract_deep_clustering_algo import _AbstractDeepClusteringAlgo
+from clustpy.deep._training_options import TrainingOptions
+from clustpy.deep._early_stopping import EarlyStopping
 from clustpy.deep._utils import int_to_one_hot, squared_euclidean_distance, encode_batchwise, detect_device
 from clustpy.deep._data_utils import get_dataloader, get_train_and_test_dataloader
 from clustpy.deep._train_utils import get_trained_network
@@ -115,6 +117,33 @@ class _ENRC_Module(torch.nn.Module):
         self.mask_sum = [i.to(device) for i in self.mask_sum]
         return self
 
+    def get_extra_state(self) -> dict:
+        """
+        Get the cluster centers and the corresponding statistics, which are not registered as parameters or buffers.
+        Makes them part of the state_dict so that they can be restored by early stopping.
+
+        Returns
+        -------
+        extra_state : dict
+            dictionary containing the centers, the lonely_centers_count and the mask_sum
+        """
+        extra_state = {"centers": self.centers, "lonely_centers_count": self.lonely_centers_count,
+                       "mask_sum": self.mask_sum}
+        return extra_state
+
+    def set_extra_state(self, extra_state: dict) -> None:
+        """
+        Set the cluster centers and the corresponding statistics contained in the state_dict.
+
+        Parameters
+        ----------
+        extra_state : dict
+            dictionary containing the centers, the lonely_centers_count and the mask_sum (see get_extra_state)
+        """
+        self.centers = extra_state["centers"]
+        self.lonely_centers_count = extra_state["lonely_centers_count"]
+        self.mask_sum = extra_state["mask_sum"]
+
     def subspace_betas(self) -> torch.Tensor:
         """
         Returns a len(P) x d matrix with softmax weights, where d is the number of dimensions of the embedded space, indicating
@@ -402,8 +431,8 @@ class _ENRC_Module(torch.nn.Module):
             batch_size: int, ssl_loss_fn: torch.nn.modules.loss._Loss = torch.nn.MSELoss(),
             device: torch.device = torch.device("cpu"), debug: bool = True,
             scheduler: torch.optim.lr_scheduler = None, fix_rec_error: bool = False,
-            tolerance_threshold: float = None, data: torch.Tensor | np.ndarray = None) -> (
-            torch.nn.Module, '_ENRC_Module'):
+            tolerance_threshold: float = None, data: torch.Tensor | np.ndarray = None,
+            training_options: TrainingOptions = None, patience: int = None) -> (torch.nn.Module, '_ENRC_Module'):
         """
         Trains ENRC and the neural network in place.
 
@@ -437,6 +466,13 @@ class _ENRC_Module(torch.nn.Module):
             will train as long as max_epochs (default: None)
         data : torch.Tensor | np.ndarray
             dataset to be used for training (default: None)
+        training_options : TrainingOptions
+            options defining the precision, compilation and memory format used for the training.
+            If None, the default TrainingOptions will be used (default: None)
+        patience : int
+            number of epochs without an improvement of the loss after which the training is stopped early.
+            In this case, the state of the neural network and the module of the epoch with the lowest loss is restored.
+            If None, no early stopping will be performed (default: None)
         Returns
         -------
         tuple : (torch.nn.Module, _ENRC_Module)
@@ -464,77 +500,89 @@ class _ENRC_Module(torch.nn.Module):
             # For numerical stability we add a small number
             init_ssl_loss += 1e-8
             if debug: print("Initial reconstruction error is ", init_ssl_loss)
+        training_options = TrainingOptions() if training_options is None else training_options
+        grad_scaler = training_options.get_grad_scaler(device)
+        early_stopping = None if patience is None else EarlyStopping(patience=patience, restore_best_weights=True)
         i = 0
         labels_old = None
         tbar = tqdm.trange(max_epochs, desc="ENRC training")
-        for _ in tbar:
-            total_loss = 0
-            for batch in trainloader:
-                if self.augmentation_invariance:
-                    batch_data_aug = batch[1].to(device)
-                    batch_data = batch[2].to(device)
-                else:
-                    batch_data = batch[1].to(device)
-
-                z = model.encode(batch_data)
-                subspace_loss, z_rot, z_rot_back, assignment_matrix_dict = self(z)
-
-                reconstruction = model.decode(z_rot_back)
-                ssl_loss = ssl_loss_fn(reconstruction, batch_data)
-
-                if self.augmentation_invariance:
-                    z_aug = model.encode(batch_data_aug)
-                    # reuse assignments
-                    subspace_loss_aug, _, z_rot_back_aug, _ = self(z_aug, assignment_matrix_dict=assignment_matrix_dict)
-                    reconstruction_aug = model.decode(z_rot_back_aug)
-                    ssl_loss_aug = ssl_loss_fn(reconstruction_aug, batch_data_aug)
-                    ssl_loss = (ssl_loss + ssl_loss_aug) / 2
-                    subspace_loss = (subspace_loss + subspace_loss_aug) / 2
-
-                if fix_rec_error:
-                    rec_weight = ssl_loss.item() / init_ssl_loss + subspace_loss.item() / ssl_loss.item()
-                    if rec_weight < 1:
-                        rec_weight = 1.0
-                    ssl_loss *= rec_weight
-
-                summed_loss = self.clustering_loss_weight * subspace_loss + self.ssl_loss_weight * ssl_loss
-                total_loss += summed_loss.item()
-                optimizer.zero_grad()
-                summed_loss.backward()
-                optimizer.step()
-
-                # Update Assignments and Centroids on GPU
+        with training_options.training_context(model):
+            for _ in tbar:
+                total_loss = 0
+                for batch in trainloader:
+                    if self.augmentation_invariance:
+                        batch_data_aug = batch[1].to(device)
+                        batch_data = batch[2].to(device)
+                    else:
+                        batch_data = batch[1].to(device)
+
+                    with training_options.autocast(device):
+                        z = model.encode(batch_data)
+                        subspace_loss, z_rot, z_rot_back, assignment_matrix_dict = self(z)
+
+                        reconstruction = model.decode(z_rot_back)
+                        ssl_loss = ssl_loss_fn(reconstruction, batch_data)
+
+                        if self.augmentation_invariance:
+                            z_aug = model.encode(batch_data_aug)
+                            # reuse assignments
+                            subspace_loss_aug, _, z_rot_back_aug, _ = self(
+                                z_aug, assignment_matrix_dict=assignment_matrix_dict)
+                            reconstruction_aug = model.decode(z_rot_back_aug)
+                            ssl_loss_aug = ssl_loss_fn(reconstruction_aug, batch_data_aug)
+                            ssl_loss = (ssl_loss + ssl_loss_aug) / 2
+                            subspace_loss = (subspace_loss + subspace_loss_aug) / 2
+
+                        if fix_rec_error:
+                            rec_weight = ssl_loss.item() / init_ssl_loss + subspace_loss.item() / ssl_loss.item()
+                            if rec_weight < 1:
+                                rec_weight = 1.0
+                            ssl_loss *= rec_weight
+
+                        summed_loss = self.clustering_loss_weight * subspace_loss + self.ssl_loss_weight * ssl_loss
+                    total_loss += summed_loss.item()
+                    training_options.optimization_step(summed_loss, optimizer, grad_scaler)
+
+                    # Update Assignments and Centroids on GPU
+                    with torch.no_grad():
+                        self.update_centers(z_rot, assignment_matrix_dict)
+                    # Check if clusters have to be reinitialized
+                    for subspace_i in range(len(self.centers)):
+                        reinit_centers(enrc=self, subspace_id=subspace_i, dataloader=trainloader, model=model,
+                                       n_samples=512, kmeans_steps=10, debug=debug)
+
+                    # Increase reinit_threshold over time
+                    self.reinit_threshold = int(np.sqrt(i + 1))
+
+                    i += 1
+                postfix_str = {"Loss": total_loss}
                 with torch.no_grad():
-                    self.update_centers(z_rot, assignment_matrix_dict)
-                # Check if clusters have to be reinitialized
-                for subspace_i in range(len(self.centers)):
-                    reinit_centers(enrc=self, subspace_id=subspace_i, dataloader=trainloader, model=model,
-                                   n_samples=512, kmeans_steps=10, debug=debug)
-
-                # Increase reinit_threshold over time
-                self.reinit_threshold = int(np.sqrt(i + 1))
-
-                i += 1
-            postfix_str = {"Loss": total_loss}
-            with torch.no_grad():
-                # Rotation loss is calculated to check if its deviation from an orthogonal matrix
-                rotation_loss = self.rotation_loss()
-                postfix_str["rotation_loss"] = rotation_loss.item()
-            tbar.set_postfix(postfix_str)
-
-            if scheduler is not None:
-                scheduler.step()
-
-            if tolerance_threshold is not None and tolerance_threshold > 0:
-                # Check if labels have changed
-                labels_new = self.predict_batchwise(model=model, dataloader=evalloader, device=device, use_P=True)
-                if _are_labels_equal(labels_new=labels_new, labels_old=labels_old, threshold=tolerance_threshold):
-                    # training has converged
-                    if debug:
-                        print("Clustering has converged")
-                    break
-                else:
-                    labels_old = labels_new.copy()
+                    # Rotation loss is calculated to check if its deviation from an orthogonal matrix
+                    rotation_loss = self.rotation_loss()
+                    postfix_str["rotation_loss"] = rotation_loss.item()
+                tbar.set_postfix(postfix_str)
+
+                if scheduler is not None:
+                    scheduler.step()
+
+                if tolerance_threshold is not None and tolerance_threshold > 0:
+                    # Check if labels have changed
+                    labels_new = self.predict_batchwise(model=model, dataloader=evalloader, device=device, use_P=True)
+                    if _are_labels_equal(labels_new=labels_new, labels_old=labels_old, threshold=tolerance_threshold):
+                        # training has converged
+                        if debug:
+                            print("Clustering has converged")
+                        break
+                    else:
+                        labels_old = labels_new.copy()
+
+                if early_stopping is not None:
+                    early_stopping(total_loss / len(trainloader), model, self)
+                    if early_stopping.early_stop:
+                        break
+        if early_stopping is not None:
+            # Restore the state with the lowest loss
+            early_stopping.restore_best_state(model, self)
 
         # Extract P and m
         self.P = self.get_P()
@@ -1723,7 +1771,7 @@ def _enrc(X: np.ndarray, n_clusters: list, V: np.ndarray, P: list, input_centers
           neural_network_weights: str, embedding_size: int, init: str, random_state: np.random.RandomState,
           device: torch.device, scheduler: torch.optim.lr_scheduler, scheduler_params: dict, tolerance_threshold: float,
           init_kwargs: dict, init_subsample_size: int, custom_dataloaders: tuple, augmentation_invariance: bool,
-          final_reclustering: bool, debug: bool) -> (
+          final_reclustering: bool, debug: bool, training_options: TrainingOptions, clustering_patience: int) -> (
         np.ndarray, list, np.ndarray, list, np.ndarray, list, list, torch.nn.Module):
     """
     Start the actual ENRC clustering procedure on the input data set.
@@ -1795,6 +1843,10 @@ def _enrc(X: np.ndarray, n_clusters: list, V: np.ndarray, P: list, input_centers
         If True, the final embedding will be reclustered with the provided init strategy. (defaul: False)
     debug : bool
         if True additional information during the training will be printed
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training
+    clustering_patience : int
+        number of epochs without an improvement of the loss after which the clustering procedure is stopped early
 
     Returns
     -------
@@ -1830,7 +1882,7 @@ def _enrc(X: np.ndarray, n_clusters: list, V: np.ndarray, P: list, input_centers
                                          optimizer_params=pretrain_optimizer_params, optimizer_class=optimizer_class,
                                          device=device, ssl_loss_fn=ssl_loss_fn, embedding_size=embedding_size,
                                          neural_network=neural_network, neural_network_weights=neural_network_weights,
-                                         random_state=random_state)
+                                         random_state=random_state, training_options=training_options)
     # Run ENRC init
     if debug:
         print("Run init: ", init)
@@ -1876,7 +1928,9 @@ def _enrc(X: np.ndarray, n_clusters: list, V: np.ndarray, P: list, input_centers
                     device=device,
                     scheduler=scheduler,
                     tolerance_threshold=tolerance_threshold,
-                    debug=debug)
+                    debug=debug,
+                    training_options=training_options,
+                    patience=clustering_patience)
 
     if debug:
         print("Betas after training")
@@ -1977,6 +2031,12 @@ class ENRC(_AbstractDeepClusteringAlgo):
         If True, the final embedding will be reclustered with the provided init strategy. (defaul: False)
     debug: bool
         if True additional information during the training will be printed (default: False)
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training of the neural network.
+        If None, the default TrainingOptions will be used (default: None)
+    clustering_patience : int
+        number of epochs without an improvement of the loss after which the clustering procedure is stopped early.
+        In this case, the state of the epoch with the lowest loss is restored. If None, no early stopping will be performed (default: None)
 
     Attributes
     ----------
@@ -2008,8 +2068,10 @@ class ENRC(_AbstractDeepClusteringAlgo):
                  device: torch.device = None, scheduler: torch.optim.lr_scheduler = None,
                  scheduler_params: dict = None, init_kwargs: dict = None, init_subsample_size: int = 10000,
                  random_state: np.random.RandomState | int = None, custom_dataloaders: tuple = None,
-                 augmentation_invariance: bool = False, final_reclustering: bool = True, debug: bool = False):
-        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state)
+                 augmentation_invariance: bool = False, final_reclustering: bool = True, debug: bool = False,
+                 training_options: TrainingOptions = None, clustering_patience: int = None):
+        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state,
+                         training_options)
         self.n_clusters = n_clusters.copy()
         self.pretrain_optimizer_params = {
             "lr": 1e-3} if pretrain_optimizer_params is None else pretrain_optimizer_params
@@ -2030,6 +2092,7 @@ class ENRC(_AbstractDeepClusteringAlgo):
         self.augmentation_invariance = augmentation_invariance
         self.final_reclustering = final_reclustering
         self.debug = debug
+        self.clustering_patience = clustering_patience
 
         if len(self.n_clusters) < 2:
             raise ValueError(f"n_clusters={n_clusters}, but should be <= 2.")
@@ -2091,7 +2154,9 @@ class ENRC(_AbstractDeepClusteringAlgo):
             custom_dataloaders=self.custom_dataloaders,
             augmentation_invariance=self.augmentation_invariance,
             final_reclustering=self.final_reclustering,
-            debug=self.debug)
+            debug=self.debug,
+            training_options=self.training_options,
+            clustering_patience=self.clustering_patience)
         # Update class variables
         self.labels_ = cluster_labels
         self.enrc_labels_ = cluster_labels_before_reclustering
@@ -2313,6 +2378,12 @@ class ACeDeC(ENRC):
         If True, the final embedding will be reclustered with the provided init strategy. (default: True)
     debug: bool
         if True additional information during the training will be printed (default: False)
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training of the neural network.
+        If None, the default TrainingOptions will be used (default: None)
+    clustering_patience : int
+        number of epochs without an improvement of the loss after which the clustering procedure is stopped early.
+        In this case, the state of the epoch with the lowest loss is restored. If None, no early stopping will be performed (default: None)
 
     Attributes
     ----------
@@ -2345,14 +2416,15 @@ class ACeDeC(ENRC):
                  scheduler_params: dict = None, init_kwargs: dict = None, init_subsample_size: int = 10000,
                  random_state: np.random.RandomState | int = None, custom_dataloaders: tuple = None,
                  augmentation_invariance: bool = False,
-                 final_reclustering: bool = True, debug: bool = False):
+                 final_reclustering: bool = True, debug: bool = False, training_options: TrainingOptions = None,
+                 clustering_patience: int = None):
         super().__init__([n_clusters, 1], V, P, input_centers,
                          batch_size, pretrain_optimizer_params, clustering_optimizer_params, pretrain_epochs,
                          clustering_epochs, tolerance_threshold, optimizer_class, ssl_loss_fn, clustering_loss_weight,
                          ssl_loss_weight, neural_network, neural_network_weights,
                          embedding_size, init, device, scheduler, scheduler_params, init_kwargs,
                          init_subsample_size, random_state, custom_dataloaders, augmentation_invariance,
-                         final_reclustering, debug)
+                         final_reclustering, debug, training_options, clustering_patience)
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'ACeDeC':
         """
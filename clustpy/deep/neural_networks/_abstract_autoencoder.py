@@ -13,6 +13,7 @@ import tqdm
 from collections.abc import Callable
 from sklearn.utils import check_random_state
 from clustpy.deep._utils import set_torch_seed
+from clustpy.deep._training_options import TrainingOptions
 
 
 class FullyConnectedBlock(torch.nn.Module):
@@ -278,7 +279,9 @@ class _AbstractAutoencoder(torch.nn.Module):
             optimizer_class: torch.optim.Optimizer = torch.optim.Adam,
             ssl_loss_fn: torch.nn.modules.loss._Loss = torch.nn.MSELoss(), patience: int = 5,
             scheduler: torch.optim.lr_scheduler = None, scheduler_params: dict = {},
-            corruption_fn: Callable = None, model_path: str = None) -> '_AbstractAutoencoder':
+            corruption_fn: Callable = None, model_path: str = None,
+            training_options: TrainingOptions = None, eval_frequency: int = 1,
+            restore_best_weights: bool = True) -> '_AbstractAutoencoder':
         """
         Trains the autoencoder in place.
 
@@ -303,7 +306,7 @@ class _AbstractAutoencoder(torch.nn.Module):
         ssl_loss_fn : torch.nn.modules.loss._Loss
             self-supervised learning (ssl) loss function for training the network, e.g. reconstruction loss (default: torch.nn.MSELoss())
         patience : int
-            patience parameter for EarlyStopping (default: 5)
+            patience parameter for EarlyStopping, i.e., the number of evaluations without improvement after which the training stops (default: 5)
         scheduler : torch.optim.lr_scheduler
             learning rate scheduler that should be used.
             If torch.optim.lr_scheduler.ReduceLROnPlateau is used then the behaviour is matched by providing the validation_loss calculated based on samples from evalloader (default: None)
@@ -315,6 +318,13 @@ class _AbstractAutoencoder(torch.nn.Module):
             For example, if the data is normalized, this may have to be taken into account in the corruption function - e.g. in case of salt and pepper noise (default: None)
         model_path : str
             if specified will save the trained model to the location. If evalloader is used, then only the best model w.r.t. evaluation loss is saved (default: None)
+        training_options : TrainingOptions
+            options defining the precision, compilation and memory format used for the training. If None, the default TrainingOptions will be used (default: None)
+        eval_frequency : int
+            the autoencoder is evaluated using the evalloader every eval_frequency epochs and after the last epoch (default: 1)
+        restore_best_weights : bool
+            if True, the parameters of the epoch with the best evaluation loss will be restored from memory at the end of the training.
+            Only relevant if evalloader is used (default: True)
 
         Returns
         -------
@@ -338,7 +348,8 @@ class _AbstractAutoencoder(torch.nn.Module):
         optimizer_params = {"lr": 1e-3} if optimizer_params is None else optimizer_params
         optimizer = optimizer_class(params=self.parameters(), **optimizer_params)
 
-        early_stopping = EarlyStopping(patience=patience)
+        assert eval_frequency > 0, "eval_frequency must be larger than 0. Your input: {0}".format(eval_frequency)
+        early_stopping = EarlyStopping(patience=patience, restore_best_weights=restore_best_weights)
         if scheduler is not None:
             scheduler = scheduler(optimizer=optimizer, **scheduler_params)
             # Depending on the scheduler type we need a different step function call.
@@ -349,40 +360,46 @@ class _AbstractAutoencoder(torch.nn.Module):
                         "scheduler=torch.optim.lr_scheduler.ReduceLROnPlateau, but evalloader is None. Specify evalloader such that validation loss can be computed.")
             else:
                 eval_step_scheduler = False
-        best_loss = np.inf
         # training loop
         device = get_device_from_module(self)
-        tbar = tqdm.trange(n_epochs, desc="AE training")
-        for epoch_i in tbar:
-            self.train()
-            total_loss = 0
-            for batch in dataloader:
-                loss, _, _ = self.loss(batch, ssl_loss_fn, device, corruption_fn)
-                total_loss += loss.item()
-                optimizer.zero_grad()
-                loss.backward()
-                optimizer.step()
-            postfix_str = {"Training Loss": total_loss}
-
-            if scheduler is not None and not eval_step_scheduler:
-                scheduler.step()
-            # Evaluate autoencoder
-            if evalloader is not None:
-                # self.evaluate calls self.eval()
-                val_loss = self.evaluate(dataloader=evalloader, ssl_loss_fn=ssl_loss_fn, device=device)
-                postfix_str["Eval Loss"] = val_loss.item()
-                early_stopping(val_loss)
-                if val_loss < best_loss:
-                    best_loss = val_loss
-                    best_epoch = epoch_i
-                    # Save best model
-                    if model_path is not None:
-                        self.save_parameters(model_path)
-                if early_stopping.early_stop:
-                    print(f"Stop training at epoch {best_epoch}. Best Loss: {best_loss:.6f}, Last Loss: {val_loss:.6f}")
-                if scheduler is not None and eval_step_scheduler:
-                    scheduler.step(val_loss)
-            tbar.set_postfix(postfix_str)
+        training_options = TrainingOptions() if training_options is None else training_options
+        grad_scaler = training_options.get_grad_scaler(device)
+        with training_options.training_context(self):
+            tbar = tqdm.trange(n_epochs, desc="AE training")
+            for epoch_i in tbar:
+                self.train()
+                total_loss = 0
+                for batch in dataloader:
+                    with training_options.autocast(device):
+                        loss, _, _ = self.loss(batch, ssl_loss_fn, device, corruption_fn)
+                    total_loss += loss.item()
+                    training_options.optimization_step(loss, optimizer, grad_scaler)
+                postfix_str = {"Training Loss": total_loss}
+
+                if scheduler is not None and not eval_step_scheduler:
+                    scheduler.step()
+                # Evaluate autoencoder
+                if evalloader is not None and ((epoch_i + 1) % eval_frequency == 0 or epoch_i == n_epochs - 1):
+                    # self.evaluate calls self.eval()
+                    val_loss = self.evaluate(dataloader=evalloader, ssl_loss_fn=ssl_loss_fn, device=device)
+                    postfix_str["Eval Loss"] = val_loss.item()
+                    early_stopping(val_loss, self)
+                    # Use the same criterion as early stopping to identify the best model
+                    if early_stopping.improved:
+                        best_epoch = epoch_i
+                        # Save best model
+                        if model_path is not None:
+                            self.save_parameters(model_path)
+                    if scheduler is not None and eval_step_scheduler:
+                        scheduler.step(val_loss)
+                    if early_stopping.early_stop:
+                        tbar.set_postfix(postfix_str)
+                        print(f"Stop training at epoch {epoch_i}. Best Loss: {early_stopping.best_loss:.6f} "
+                              f"(epoch {best_epoch}), Last Loss: {val_loss:.6f}")
+                        break
+                tbar.set_postfix(postfix_str)
+        # Restore the parameters with the best evaluation loss
+        early_stopping.restore_best_state(self)
         # change to eval mode after training
         self.eval()
         # Save last version of model
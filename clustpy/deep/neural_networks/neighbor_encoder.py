@@ -9,6 +9,7 @@ from scipy.spatial.distance import cdist
 from clustpy.deep.neural_networks.feedforward_autoencoder import FeedforwardAutoencoder
 from clustpy.deep.neural_networks._abstract_autoencoder import FullyConnectedBlock
 from collections.abc import Callable
+from clustpy.deep._training_options import TrainingOptions
 
 
 def get_neighbors_batchwise(X: np.ndarray, n_neighbors: int, metric: str = "sqeuclidean",
@@ -226,7 +227,9 @@ class NeighborEncoder(FeedforwardAutoencoder):
             optimizer_class: torch.optim.Optimizer = torch.optim.Adam,
             ssl_loss_fn: torch.nn.modules.loss._Loss = torch.nn.MSELoss(), patience: int = 5,
             scheduler: torch.optim.lr_scheduler = None, scheduler_params: dict = None,
-            corruption_fn: Callable = None, model_path: str = None) -> 'NeighborEncoder':
+            corruption_fn: Callable = None, model_path: str = None,
+            training_options: TrainingOptions = None, eval_frequency: int = 1,
+            restore_best_weights: bool = True) -> 'NeighborEncoder':
         """
         Trains the NeighborEncoder in place.
         Equal to fit function of the FeedforwardAutoencoder but does only work with a dataloader (not with a regular data array).
@@ -261,6 +264,14 @@ class NeighborEncoder(FeedforwardAutoencoder):
             For example, if the data is normalized, this may have to be taken into account in the corruption function - e.g. in case of salt and pepper noise (default: None)
         model_path : str
             if specified will save the trained model to the location. If evalloader is used, then only the best model w.r.t. evaluation loss is saved (default: None)
+        training_options : TrainingOptions
+            options defining the precision, compilation and memory format used for the training.
+            If None, the default TrainingOptions will be used (default: None)
+        eval_frequency : int
+            the autoencoder is evaluated using the evalloader every eval_frequency epochs and after the last epoch (default: 1)
+        restore_best_weights : bool
+            if True, the parameters of the epoch with the best evaluation loss will be restored from memory at the end of the training.
+            Only relevant if evalloader is used (default: True)
 
         Returns
         -------
@@ -268,5 +279,6 @@ class NeighborEncoder(FeedforwardAutoencoder):
             this instance of the NeighborEncoder
         """
         super().fit(n_epochs, optimizer_params, batch_size, None, None, dataloader, evalloader, optimizer_class,
-                    ssl_loss_fn, patience, scheduler, scheduler_params, corruption_fn, model_path)
+                    ssl_loss_fn, patience, scheduler, scheduler_params, corruption_fn, model_path,
+                    training_options, eval_frequency, restore_best_weights)
         return self
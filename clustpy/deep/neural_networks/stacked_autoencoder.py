@@ -11,6 +11,7 @@ import numpy as np
 import tqdm
 from collections.abc import Callable
 from clustpy.deep._utils import set_torch_seed
+from clustpy.deep._training_options import TrainingOptions
 
 
 class StackedAutoencoder(FeedforwardAutoencoder):
@@ -155,7 +156,9 @@ class StackedAutoencoder(FeedforwardAutoencoder):
             optimizer_class: torch.optim.Optimizer = torch.optim.Adam,
             ssl_loss_fn: torch.nn.modules.loss._Loss = torch.nn.MSELoss(), patience: int = 5,
             scheduler: torch.optim.lr_scheduler = None, scheduler_params: dict = {},
-            corruption_fn: Callable = None, model_path: str = None) -> 'StackedAutoencoder':
+            corruption_fn: Callable = None, model_path: str = None,
+            training_options: TrainingOptions = None, eval_frequency: int = 1,
+            restore_best_weights: bool = True) -> 'StackedAutoencoder':
         """
         Trains the autoencoder in place.
         First, a greedy layer-wise training is performed. Afterward, the weights are finetuned by training all layer simultaneously.
@@ -200,6 +203,15 @@ class StackedAutoencoder(FeedforwardAutoencoder):
             For example, if the data is normalized, this may have to be taken into account in the corruption function - e.g. in case of salt and pepper noise (default: None)
         model_path : str
             if specified will save the trained model to the location. If evalloader is used, then only the best model w.r.t. evaluation loss is saved (default: None)
+        training_options : TrainingOptions
+            options defining the precision, compilation and memory format used for the training.
+            Only used for finetuning.
+            If None, the default TrainingOptions will be used (default: None)
+        eval_frequency : int
+            the autoencoder is evaluated using the evalloader every eval_frequency epochs and after the last epoch (default: 1)
+        restore_best_weights : bool
+            if True, the parameters of the epoch with the best evaluation loss will be restored from memory at the end of the training.
+            Only relevant if evalloader is used (default: True)
 
         Returns
         -------
@@ -215,5 +227,6 @@ class StackedAutoencoder(FeedforwardAutoencoder):
         self.layerwise_training(n_epochs_per_layer, optimizer_params, batch_size, data, dataloader,
                                 optimizer_class, ssl_loss_fn, corruption_fn)
         super().fit(n_epochs, optimizer_params, batch_size, data, data_eval, dataloader, evalloader,
-                    optimizer_class, ssl_loss_fn, patience, scheduler, scheduler_params, corruption_fn, model_path)
+                    optimizer_class, ssl_loss_fn, patience, scheduler, scheduler_params, corruption_fn, model_path,
+                    training_options, eval_frequency, restore_best_weights)
         return self
@@ -1,6 +1,7 @@
 from clustpy.deep.neural_networks import FeedforwardAutoencoder
 from clustpy.data import create_subspace_data
 import torch
+import copy
 
 
 def test_feedforward_autoencoder():
@@ -22,3 +23,50 @@ def test_feedforward_autoencoder():
     assert autoencoder.fitted is False
     autoencoder.fit(n_epochs=3, optimizer_params={"lr": 1e-3}, data=data)
     assert autoencoder.fitted is True
+
+
+def test_feedforward_autoencoder_early_stopping():
+    data, _ = create_subspace_data(1000, subspace_features=(3, 50), random_state=1)
+    autoencoder = FeedforwardAutoencoder(layers=[data.shape[1], 128, 64, 10])
+    # Replace evaluate so that the evaluation loss is best after the second evaluation
+    eval_losses = iter([1., 0.5, 0.6, 0.7, 0.8, 0.9])
+    saved_states = []
+
+    def _evaluate(dataloader, ssl_loss_fn, device):
+        saved_states.append(copy.deepcopy(autoencoder.state_dict()))
+        return torch.tensor(next(eval_losses))
+
+    autoencoder.evaluate = _evaluate
+    autoencoder.fit(n_epochs=20, optimizer_params={"lr": 1e-3}, data=data, data_eval=data, patience=2,
+                    eval_frequency=2)
+    assert autoencoder.fitted is True
+    # Training should stop after the fourth evaluation (= epoch 8)
+    assert len(saved_states) == 4
+    # The parameters of the second evaluation should be restored
+    for key, value in autoencoder.state_dict().items():
+        assert torch.equal(value, saved_states[1][key])
+    assert not torch.equal(autoencoder.state_dict()["encoder.block.0.weight"],
+                           saved_states[-1]["encoder.block.0.weight"])
+
+
+def test_feedforward_autoencoder_early_stopping_with_model_path(tmp_path):
+    data, _ = create_subspace_data(1000, subspace_features=(3, 50), random_state=1)
+    autoencoder = FeedforwardAutoencoder(layers=[data.shape[1], 128, 64, 10])
+    # The third evaluation loss is smaller than the best one but the difference is below min_delta of EarlyStopping
+    eval_losses = iter([1., 0.5, 0.49999, 0.6, 0.7])
+    saved_states = []
+
+    def _evaluate(dataloader, ssl_loss_fn, device):
+        saved_states.append(copy.deepcopy(autoencoder.state_dict()))
+        return torch.tensor(next(eval_losses))
+
+    autoencoder.evaluate = _evaluate
+    model_path = str(tmp_path / "autoencoder.pth")
+    autoencoder.fit(n_epochs=20, optimizer_params={"lr": 1e-3}, data=data, data_eval=data, patience=3,
+                    model_path=model_path)
+    assert len(saved_states) == 5
+    # The restored parameters and the saved parameters should both correspond to the second evaluation
+    saved_model = torch.load(model_path)
+    for key, value in autoencoder.state_dict().items():
+        assert torch.equal(value, saved_states[1][key])
+        assert torch.equal(saved_model[key], saved_states[1][key])
@@ -1,5 +1,6 @@
 from clustpy.deep._data_utils import _ClustpyDataset, get_dataloader, get_train_and_test_dataloader, \
-    get_default_augmented_dataloaders, get_data_dim_from_dataloader
+    get_default_augmented_dataloaders, get_data_dim_from_dataloader, _BatchRandomAffine, _seed_worker
+from clustpy.deep import set_torch_seed
 from clustpy.data import create_subspace_data, load_optdigits
 import torch
 import torchvision
@@ -91,6 +92,94 @@ def test_get_datalaoder():
     assert torch.equal(entry[1], data_torch[entry[0]])
 
 
+def test_get_dataloader_batch_fetching():
+    data, labels = create_subspace_data(250, subspace_features=(3, 50), random_state=1)
+    data_torch = torch.from_numpy(data).float()
+    labels_torch = torch.from_numpy(labels)
+    for shuffle in [False, True]:
+        dataloader = get_dataloader(data_torch, shuffle=shuffle, batch_size=64, additional_inputs=[labels_torch])
+        assert dataloader.dataset.batch_fetching
+        # Compare with the batches created from single samples
+        torch.manual_seed(1)
+        batches = list(dataloader)
+        torch.manual_seed(1)
+        batches_default = list(torch.utils.data.DataLoader(_ClustpyDataset(data_torch, labels_torch), batch_size=64,
+                                                           shuffle=shuffle))
+        assert len(batches) == len(batches_default) == 4
+        for batch, batch_default in zip(batches, batches_default):
+            assert len(batch) == len(batch_default) == 3
+            for entry, entry_default in zip(batch, batch_default):
+                assert entry.dtype == entry_default.dtype
+                assert torch.equal(entry, entry_default)
+    # Batches must not share memory with the original data
+    batch = next(iter(get_dataloader(data_torch, shuffle=False, batch_size=64)))
+    batch[1][0, 0] += 1
+    assert not torch.equal(batch[1][0], data_torch[0])
+    # Not used if samples are transformed individually
+    dataloader = get_dataloader(data_torch, shuffle=False, batch_size=64,
+                                ds_kwargs={"orig_transforms_list": [torchvision.transforms.Lambda(lambda x: x + 1)]})
+    assert not dataloader.dataset.batch_fetching
+    batch = next(iter(dataloader))
+    assert torch.equal(batch[1], data_torch[:64] + 1)
+
+
+
+def test_get_dataloader_batch_transforms():
+    data = torch.rand((250, 1, 8, 8))
+    dataloader = get_dataloader(data, shuffle=False, batch_size=64, num_workers=0,
+                                ds_kwargs={"aug_transforms_list": [_BatchRandomAffine()],
+                                           "orig_transforms_list": [torch.nn.Flatten()], "batch_transforms": True})
+    assert dataloader.dataset.batch_fetching
+    assert dataloader.num_workers == 0
+    batch = next(iter(dataloader))
+    assert len(batch) == 3
+    assert batch[1].shape == (64, 1, 8, 8)
+    assert not torch.equal(batch[1], data[:64])
+    assert torch.equal(batch[2], data[:64].reshape(64, -1))
+    # Single samples are transformed as batches of size 1
+    sample = dataloader.dataset[3]
+    assert sample[0] == 3
+    assert sample[1].shape == (1, 8, 8)
+    assert torch.equal(sample[2], data[3].flatten())
+
+
+def test_get_dataloader_workers():
+    data, _ = create_subspace_data(250, subspace_features=(3, 50), random_state=1)
+    # No workers by default
+    assert get_dataloader(data, batch_size=64).num_workers == 0
+    assert get_dataloader(data, batch_size=64, ds_kwargs={"aug_transforms_list": [lambda x: x]}).num_workers == 0
+    # No workers without transforms if number of workers is chosen automatically
+    assert get_dataloader(data, batch_size=64, num_workers=None).num_workers == 0
+    # Explicit number of workers
+    dataloader = get_dataloader(data, batch_size=64, shuffle=False, num_workers=2)
+    assert dataloader.num_workers == 2
+    assert dataloader.persistent_workers
+    assert dataloader.worker_init_fn is _seed_worker
+    batches = list(dataloader)
+    assert torch.equal(torch.cat([batch[0] for batch in batches]), torch.arange(250))
+    # dl_kwargs have priority
+    assert get_dataloader(data, batch_size=64, num_workers=2, dl_kwargs={"num_workers": 0}).num_workers == 0
+
+
+def test_BatchRandomAffine():
+    batch = torch.zeros((2, 1, 9, 9))
+    batch[:, :, 4, :] = 1
+    # Rotation by 90 degrees
+    rotated = _BatchRandomAffine(degrees=(90, 90), translate=(0, 0), shear=(0, 0))(batch)
+    assert torch.equal(rotated, batch.transpose(2, 3))
+    # Each sample receives its own transformation
+    set_torch_seed(1)
+    batch = torch.rand((2, 3, 16, 16))
+    augmented = _BatchRandomAffine()(torch.cat([batch[:1], batch[:1]]))
+    assert augmented.shape == (2, 3, 16, 16)
+    assert not torch.equal(augmented[0], augmented[1])
+    # Check reproducibility
+    set_torch_seed(1)
+    augmented2 = _BatchRandomAffine()(torch.cat([batch[:1], batch[:1]]))
+    set_torch_seed(1)
+    augmented3 = _BatchRandomAffine()(torch.cat([batch[:1], batch[:1]]))
+    assert torch.equal(augmented2, augmented3)
+
 def test_get_data_dim_from_dataloader():
     data, labels = create_subspace_data(20, subspace_features=(3, 50), random_state=1)
     dataloader = get_dataloader(data, shuffle=False, batch_size=10)
@@ -182,6 +271,14 @@ def test_get_default_augmented_dataloaders():
     assert trainloader_batch[1].shape == (61, 64)
     assert trainloader_batch[2].shape == (61, 64)
     assert testloader_batch[1].shape == (61, 64)
+    # Each sample is transformed individually and no workers are used by default
+    assert not trainloader.dataset.batch_fetching
+    assert trainloader.num_workers == 0
+    # Transform whole batches
+    trainloader, testlaoder = get_default_augmented_dataloaders(X, 61, False, True, batch_augmentation=True)
+    trainloader_batch = next(iter(trainloader))
+    assert trainloader_batch[1].shape == (61, 64)
+    assert trainloader.dataset.batch_fetching
     # conv=False and flatten=True
     try:
         # Check for error
@@ -1,5 +1,5 @@
 from clustpy.deep import DCN, get_default_augmented_dataloaders
-from clustpy.deep.dcn import _compute_centroids
+from clustpy.deep.dcn import _compute_centroids, _DCN_Module
 from clustpy.data import create_subspace_data, load_optdigits
 import torch
 import numpy as np
@@ -25,6 +25,25 @@ def test_simple_dcn():
     assert np.array_equal(dcn.labels_, labels_predict)
 
 
+
+def test_dcn_with_clustering_patience():
+    X, labels = create_subspace_data(1000, subspace_features=(3, 50), random_state=1)
+    dcn = DCN(3, pretrain_epochs=3, clustering_epochs=10, random_state=1, clustering_patience=1)
+    dcn.fit(X)
+    assert dcn.labels_.shape == labels.shape
+    assert dcn.dcn_cluster_centers_.shape == (3, 10)
+
+
+def test_dcn_module_extra_state():
+    dcn_module = _DCN_Module(np.array([0, 1, 1], dtype=np.int32), np.array([[0., 0.], [1., 1.]]))
+    state = dcn_module.state_dict()
+    dcn_module.labels = torch.tensor([1, 1, 1], dtype=torch.int32)
+    dcn_module.centers = torch.tensor([[5., 5.], [6., 6.]], dtype=torch.float64)
+    # Labels and centers are restored from the state_dict
+    dcn_module.load_state_dict(state)
+    assert torch.equal(dcn_module.labels, torch.tensor([0, 1, 1], dtype=torch.int32))
+    assert torch.equal(dcn_module.centers, torch.tensor([[0., 0.], [1., 1.]], dtype=torch.float64))
+
 def test_compute_centroids():
     embedded = torch.tensor([[0., 1., 1.], [1., 0., 1.], [2., 2., 1.], [1., 2., 2.], [3., 4., 5.]])
     centers = torch.tensor([[1., 1., 1.], [2., 2., 2.], [3., 3., 3.]])
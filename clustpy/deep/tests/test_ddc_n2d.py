@@ -1,10 +1,13 @@
 from clustpy.deep import DDC, N2D
-from clustpy.deep.ddc_n2d import DDC_density_peak_clustering
+from clustpy.deep.ddc_n2d import DDC_density_peak_clustering, _get_average_and_max_distance, \
+    _get_nearest_neighbors_with_higher_density, _get_densities
 from clustpy.data import create_subspace_data
 from sklearn.datasets import make_blobs
 import torch
 import numpy as np
 from sklearn.manifold import Isomap
+from sklearn.neighbors import KDTree
+from scipy.spatial.distance import pdist, squareform
 
 
 def test_ddc_density_peak_clustering():
@@ -20,6 +23,74 @@ def test_ddc_density_peak_clustering():
         assert np.array_equal(np.unique(ddc_dpc.labels_), np.arange(ddc_dpc.n_clusters_))
 
 
+def test_ddc_density_peak_clustering_without_core_points():
+    # Only singleton clusters or uniform densities -> no core points exist and no clusters are merged
+    for X, ratio in [(np.array([[0], [1], [2.5], [4.2], [6.1]]), 0.05), (np.random.RandomState(0).rand(30, 2), 0.01)]:
+        ddc_dpc = DDC_density_peak_clustering(ratio=ratio)
+        ddc_dpc.fit(X)
+        assert ddc_dpc.labels_.dtype == np.int32
+        assert ddc_dpc.labels_.shape == (X.shape[0],)
+        assert np.array_equal(np.unique(ddc_dpc.labels_), np.arange(ddc_dpc.n_clusters_))
+
+
+def test_ddc_density_peak_clustering_with_sampling():
+    # More than 10000 points -> distances are estimated on a sample
+    X, labels = make_blobs(10500, 2, centers=3, random_state=1)
+    ddc_dpc = DDC_density_peak_clustering(ratio=0.05, cutoff=1, random_state=1)
+    ddc_dpc.fit(X)
+    assert ddc_dpc.labels_.dtype == np.int32
+    assert ddc_dpc.labels_.shape == labels.shape
+    assert np.array_equal(np.unique(ddc_dpc.labels_), np.arange(ddc_dpc.n_clusters_))
+    # Test if random state is working
+    ddc_dpc2 = DDC_density_peak_clustering(ratio=0.05, cutoff=1, random_state=1)
+    ddc_dpc2.fit(X)
+    assert ddc_dpc.n_clusters_ == ddc_dpc2.n_clusters_
+    assert np.array_equal(ddc_dpc.labels_, ddc_dpc2.labels_)
+
+
+def test_get_average_and_max_distance():
+    X, _ = make_blobs(100, 3, centers=2, random_state=1)
+    distances = pdist(X)
+    # Small block size to test multiple blocks
+    avg_dist, max_dist = _get_average_and_max_distance(X, block_size=250)
+    assert np.isclose(avg_dist, np.mean(distances))
+    assert max_dist == np.max(distances)
+
+
+def test_get_densities():
+    # Groups of three points that are far apart -> each point has at most two non-zero summands, so the densities are exact
+    random_state = np.random.RandomState(1)
+    X = (np.repeat(np.arange(20) * 100., 3) + random_state.rand(60) * 6).reshape(-1, 1)
+    # A point whose density is far smaller than 1 and an isolated point with density 0
+    X = np.r_[X, [[5000], [5005], [5005.5], [1e4]]]
+    rhos = _get_densities(X, KDTree(X), 1., 1e5)
+    # Compare with full distance matrix
+    rhos_full = np.sum(squareform(np.exp(-(pdist(X) ** 2))), axis=1)
+    assert np.array_equal(rhos, rhos_full)
+    assert rhos[-1] == 0 and 0 < rhos[-4] < 1e-10
+    # Smaller cutoff
+    X, _ = make_blobs(200, 2, centers=3, random_state=1)
+    rhos = _get_densities(X, KDTree(X), 0.5, 3)
+    adj_distances = np.exp(-((squareform(pdist(X)) / 0.5) ** 2))
+    adj_distances[squareform(pdist(X)) > 1.5] = 0
+    np.fill_diagonal(adj_distances, 0)
+    assert np.allclose(rhos, np.sum(adj_distances, axis=1))
+
+
+def test_get_nearest_neighbors_with_higher_density():
+    X, _ = make_blobs(200, 2, centers=3, random_state=1)
+    rhos = np.random.RandomState(1).rand(X.shape[0])
+    nn_with_higher_dens, deltas = _get_nearest_neighbors_with_higher_density(X, rhos, KDTree(X), block_size=1000)
+    # Compare with full distance matrix
+    distances = squareform(pdist(X))
+    distances[rhos[None, :] <= rhos[:, None]] = np.inf
+    expected_nn = np.argmin(distances, axis=1)
+    has_higher_dens = rhos < np.max(rhos)
+    assert np.array_equal(nn_with_higher_dens[has_higher_dens], expected_nn[has_higher_dens])
+    assert np.allclose(deltas[has_higher_dens], np.min(distances, axis=1)[has_higher_dens])
+    assert nn_with_higher_dens[~has_higher_dens] == -1 and deltas[~has_higher_dens] == np.inf
+
+
 def test_simple_ddc():
     torch.use_deterministic_algorithms(True)
     X, labels = create_subspace_data(1000, subspace_features=(3, 50), random_state=1)
@@ -1,4 +1,4 @@
-from clustpy.deep import DipDECK, get_default_augmented_dataloaders
+from clustpy.deep import DipDECK, TrainingOptions, get_default_augmented_dataloaders
 from clustpy.deep.dipdeck import _get_nearest_points_to_optimal_centers, _get_nearest_points, _get_dip_matrix
 from clustpy.data import create_subspace_data, load_optdigits
 import numpy as np
@@ -23,6 +23,19 @@ def test_simple_dipdeck():
     assert np.sum(dipdeck.labels_ == labels_predict) / labels_predict.shape[0] > 0.99
 
 
+def test_dipdeck_default_training_options():
+    torch.use_deterministic_algorithms(True)
+    X, labels = create_subspace_data(500, subspace_features=(3, 50), random_state=1)
+    # training_options=None should equal the default TrainingOptions
+    dipdeck = DipDECK(pretrain_epochs=3, clustering_epochs=3, random_state=1)
+    assert dipdeck.training_options is None
+    dipdeck.fit(X)
+    dipdeck2 = DipDECK(pretrain_epochs=3, clustering_epochs=3, random_state=1, training_options=TrainingOptions())
+    dipdeck2.fit(X)
+    assert np.array_equal(dipdeck.labels_, dipdeck2.labels_)
+    assert np.array_equal(dipdeck.cluster_centers_, dipdeck2.cluster_centers_)
+
+
 def test_dipdeck_augmentation():
     torch.use_deterministic_algorithms(True)
     dataset = load_optdigits()
@@ -82,9 +95,26 @@ def test_get_dip_matrix():
     dip_matrix = _get_dip_matrix(embedded_data=embedded_data, embedded_centers_cpu=embedded_centers,
                                  cluster_labels_cpu=cluster_labels,
                                  n_clusters=3, max_cluster_size_diff_factor=2.2, pval_strategy="table", n_boots=1000,
-                                 random_state=1)
+                                 n_jobs=None, random_state=1)
     assert dip_matrix.shape == (3, 3)
     assert np.array_equal(dip_matrix.diagonal(), np.array([0, 0, 0]))
     dip_matrix_tmp = dip_matrix + np.identity(3) * 0.1
     assert np.max(dip_matrix_tmp) <= 1
     assert np.min(dip_matrix_tmp) >= 0
+    # Parallel execution returns the same result
+    dip_matrix_parallel = _get_dip_matrix(embedded_data=embedded_data, embedded_centers_cpu=embedded_centers,
+                                          cluster_labels_cpu=cluster_labels, n_clusters=3,
+                                          max_cluster_size_diff_factor=2.2, pval_strategy="table", n_boots=1000,
+                                          n_jobs=2, random_state=1)
+    assert np.array_equal(dip_matrix, dip_matrix_parallel)
+    # Cached bootstrap does not depend on the random state
+    dip_matrix_cached = _get_dip_matrix(embedded_data=embedded_data, embedded_centers_cpu=embedded_centers,
+                                        cluster_labels_cpu=cluster_labels, n_clusters=3,
+                                        max_cluster_size_diff_factor=2.2, pval_strategy="cached_bootstrap", n_boots=100,
+                                        n_jobs=2, random_state=np.random.RandomState(1))
+    assert np.array_equal(dip_matrix_cached, _get_dip_matrix(embedded_data=embedded_data,
+                                                             embedded_centers_cpu=embedded_centers,
+                                                             cluster_labels_cpu=cluster_labels, n_clusters=3,
+                                                             max_cluster_size_diff_factor=2.2,
+                                                             pval_strategy="cached_bootstrap", n_boots=100,
+                                                             n_jobs=None, random_state=np.random.RandomState(2)))
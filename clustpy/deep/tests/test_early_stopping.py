@@ -6,24 +6,49 @@ def test_early_stopping():
     early_stopping(torch.tensor(2))
     assert early_stopping.best_loss == 2
     assert early_stopping.counter == 0
+    assert early_stopping.improved is True
     assert early_stopping.early_stop is False
     early_stopping(torch.tensor(2))
     assert early_stopping.best_loss == 2
     assert early_stopping.counter == 1
+    assert early_stopping.improved is False
     assert early_stopping.early_stop is False
     early_stopping(torch.tensor(1.5))
     assert early_stopping.best_loss == 1.5
     assert early_stopping.counter == 0
+    assert early_stopping.improved is True
     assert early_stopping.early_stop is False
     early_stopping(torch.tensor(1.6))
     assert early_stopping.best_loss == 1.5
     assert early_stopping.counter == 1
+    assert early_stopping.improved is False
     assert early_stopping.early_stop is False
     early_stopping(torch.tensor(1.4))
     assert early_stopping.best_loss == 1.5
     assert early_stopping.counter == 2
+    assert early_stopping.improved is False
     assert early_stopping.early_stop is False
     early_stopping(torch.tensor(1.5))
     assert early_stopping.best_loss == 1.5
     assert early_stopping.counter == 3
-    assert early_stopping.early_stop is True
\ No newline at end of file
+    assert early_stopping.improved is False
+    assert early_stopping.early_stop is True
+
+def test_early_stopping_restore_best_state():
+    module = torch.nn.Linear(2, 1)
+    early_stopping = EarlyStopping(patience=1, restore_best_weights=True)
+    early_stopping(torch.tensor(1.), module)
+    best_weight = module.weight.detach().clone()
+    assert early_stopping.best_state is not None
+    # Change the parameters without improving the loss
+    with torch.no_grad():
+        module.weight.add_(1)
+    early_stopping(torch.tensor(2.), module)
+    assert early_stopping.early_stop is True
+    assert not torch.equal(module.weight, best_weight)
+    early_stopping.restore_best_state(module)
+    assert torch.equal(module.weight, best_weight)
+    # Without restore_best_weights no state should be saved
+    early_stopping = EarlyStopping(patience=1)
+    early_stopping(torch.tensor(1.), module)
+    assert early_stopping.best_state is None
@@ -0,0 +1,105 @@
+from clustpy.deep import PretrainingCache, TrainingOptions, DEC, DCN, get_trained_network
+from clustpy.deep.neural_networks import FeedforwardAutoencoder
+from clustpy.deep.tests._helpers_for_tests import _get_test_dataloader
+from clustpy.data import create_subspace_data
+import numpy as np
+import torch
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_pretraining_cache(tmp_path):
+    data, _ = create_subspace_data(500, subspace_features=(3, 50), random_state=1)
+    dataloader = _get_test_dataloader(data, 256, True, False)
+    cache = PretrainingCache(str(tmp_path))
+    training_options = TrainingOptions(pretraining_cache=cache)
+    ae = get_trained_network(trainloader=dataloader, n_epochs=3, embedding_size=10, random_state=1,
+                             training_options=training_options)
+    assert len(cache._read_index()) == 1
+    # Same setting should be loaded from the cache
+    ae2 = FeedforwardAutoencoder(layers=[data.shape[1], 500, 500, 2000, 10], random_state=1)
+    ae2 = get_trained_network(trainloader=dataloader, n_epochs=3, neural_network=ae2, random_state=1,
+                              training_options=training_options)
+    assert ae2.fitted is True
+    assert len(cache._read_index()) == 1
+    for key, value in ae.state_dict().items():
+        assert torch.equal(value, ae2.state_dict()[key])
+    # Changing the number of epochs results in a new entry
+    get_trained_network(trainloader=dataloader, n_epochs=2, embedding_size=10, random_state=1,
+                        training_options=training_options)
+    assert len(cache._read_index()) == 2
+    # Without random state nothing is cached
+    get_trained_network(trainloader=dataloader, n_epochs=2, embedding_size=10, training_options=training_options)
+    assert len(cache._read_index()) == 2
+    cache.clear()
+    assert len(cache._read_index()) == 0
+    assert sorted(os.listdir(tmp_path)) == ["index.json", "index.lock"]
+
+
+def test_pretraining_cache_key_depends_on_initial_parameters(tmp_path):
+    data, _ = create_subspace_data(500, subspace_features=(3, 50), random_state=1)
+    dataloader = _get_test_dataloader(data, 256, True, False)
+    cache = PretrainingCache(str(tmp_path))
+    neural_network = FeedforwardAutoencoder(layers=[data.shape[1], 64, 10], random_state=1)
+    key_args = (dataloader, neural_network, 3, torch.optim.Adam, {"lr": 1e-3}, torch.nn.MSELoss(), 1, "fp32")
+    key = cache.get_key(*key_args)
+    assert cache.get_key(*key_args) == key
+    # Same architecture but different initial parameters (e.g., loaded weights) must result in a different key
+    with torch.no_grad():
+        next(neural_network.parameters())[0, 0] += 1
+    assert cache.get_key(*key_args) != key
+
+
+def test_pretraining_cache_concurrent_saves(tmp_path):
+    cache = PretrainingCache(str(tmp_path))
+    neural_network = FeedforwardAutoencoder(layers=[5, 3, 2])
+    keys = ["key{0}".format(i) for i in range(16)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda key: cache.save(key, neural_network), keys))
+    # No entry should be lost
+    assert sorted(cache._read_index().keys()) == sorted(keys)
+
+
+def test_pretraining_cache_eviction(tmp_path):
+    data, _ = create_subspace_data(500, subspace_features=(3, 50), random_state=1)
+    dataloader = _get_test_dataloader(data, 256, True, False)
+    # The cache can only contain a single network
+    cache = PretrainingCache(str(tmp_path), max_size=0.05)
+    training_options = TrainingOptions(pretraining_cache=cache)
+    params = {"layers": [data.shape[1], 64, 10]}
+    get_trained_network(trainloader=dataloader, n_epochs=2, neural_network_params=params, random_state=1,
+                        training_options=training_options)
+    first_key = list(cache._read_index().keys())[0]
+    get_trained_network(trainloader=dataloader, n_epochs=3, neural_network_params=params, random_state=1,
+                        training_options=training_options)
+    index = cache._read_index()
+    assert len(index) == 1 and first_key not in index
+    assert not os.path.isfile(os.path.join(tmp_path, first_key + ".pt"))
+    # An entry that is larger than max_size should still be stored
+    cache = PretrainingCache(str(tmp_path / "small"), max_size=1e-4)
+    neural_network = FeedforwardAutoencoder(layers=[data.shape[1], 64, 10])
+    cache.save("key1", neural_network)
+    cache.save("key2", neural_network)
+    index = cache._read_index()
+    assert list(index.keys()) == ["key2"]
+    assert os.path.isfile(os.path.join(tmp_path, "small", "key2.pt"))
+
+
+def test_deep_clustering_with_pretraining_cache(tmp_path):
+    X, labels = create_subspace_data(500, subspace_features=(3, 50), random_state=1)
+    training_options = TrainingOptions(pretraining_cache=str(tmp_path))
+    dec = DEC(3, pretrain_epochs=3, clustering_epochs=0, random_state=1, training_options=training_options)
+    dec.fit(X)
+    dcn = DCN(3, pretrain_epochs=3, clustering_epochs=0, random_state=1, training_options=training_options)
+    dcn.fit(X)
+    # DCN should have used the neural network pretrained by DEC
+    assert len(training_options.pretraining_cache._read_index()) == 1
+    assert np.allclose(dec.transform(X), dcn.transform(X))
+    # Results after loading from the cache should equal the results after pretraining (cold cache)
+    dec_cold = DEC(3, pretrain_epochs=3, clustering_epochs=3, random_state=1,
+                   training_options=TrainingOptions(pretraining_cache=str(tmp_path / "cold")))
+    dec_cold.fit(X)
+    dec_warm = DEC(3, pretrain_epochs=3, clustering_epochs=3, random_state=1, training_options=training_options)
+    dec_warm.fit(X)
+    assert np.array_equal(dec_cold.labels_, dec_warm.labels_)
+    assert np.allclose(dec_cold.cluster_centers_, dec_warm.cluster_centers_)
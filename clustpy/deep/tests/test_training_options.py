@@ -0,0 +1,76 @@
+from clustpy.deep import TrainingOptions, DEC, get_trained_network
+from clustpy.deep.neural_networks import FeedforwardAutoencoder
+from clustpy.deep.tests._helpers_for_tests import _get_test_dataloader
+from clustpy.data import create_subspace_data
+from contextlib import nullcontext
+import numpy as np
+import torch
+import pytest
+
+
+class _ConvNetwork(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.conv = torch.nn.Conv2d(3, 4, 3)
+
+    def encode(self, x):
+        return self.conv(x)
+
+    def decode(self, x):
+        return x
+
+
+def test_training_options():
+    training_options = TrainingOptions()
+    device = torch.device("cpu")
+    assert type(training_options.autocast(device)) is nullcontext
+    assert not training_options.get_grad_scaler(device).is_enabled()
+    training_options = TrainingOptions(precision="bf16")
+    assert type(training_options.autocast(device)) is torch.autocast
+    assert not training_options.get_grad_scaler(device).is_enabled()
+    with pytest.raises(AssertionError):
+        TrainingOptions(precision="fp8")
+
+
+def test_training_context():
+    network = _ConvNetwork()
+    training_options = TrainingOptions(compile=True, channels_last=True)
+    original_encode = network.encode
+    with training_options.training_context(network):
+        assert "encode" in vars(network) and "decode" in vars(network)
+        assert network.conv.weight.is_contiguous(memory_format=torch.channels_last)
+    # Compiled functions should be removed after training
+    assert "encode" not in vars(network) and "decode" not in vars(network)
+    assert network.encode == original_encode
+    # Without compile nothing should change
+    with TrainingOptions().training_context(network):
+        assert "encode" not in vars(network)
+
+
+def test_get_trained_network_with_training_options():
+    data, _ = create_subspace_data(500, subspace_features=(3, 50), random_state=1)
+    dataloader = _get_test_dataloader(data, 256, True, False)
+    device = torch.device('cpu')
+    ae = get_trained_network(trainloader=dataloader, n_epochs=3, device=device, embedding_size=10,
+                             neural_network_class=FeedforwardAutoencoder, random_state=1,
+                             training_options=TrainingOptions(precision="bf16"))
+    assert ae.fitted == True
+    # Parameters are still stored in fp32
+    assert all(param.dtype == torch.float32 for param in ae.parameters())
+    assert all(torch.isfinite(param).all() for param in ae.parameters())
+
+
+def test_dec_with_training_options():
+    X, labels = create_subspace_data(500, subspace_features=(3, 50), random_state=1)
+    # Default options should equal the regular training
+    dec = DEC(3, pretrain_epochs=3, clustering_epochs=3, random_state=1)
+    dec.fit(X)
+    dec2 = DEC(3, pretrain_epochs=3, clustering_epochs=3, random_state=1, training_options=TrainingOptions())
+    dec2.fit(X)
+    assert np.array_equal(dec.dec_labels_, dec2.dec_labels_)
+    assert np.allclose(dec.dec_cluster_centers_, dec2.dec_cluster_centers_)
+    # Mixed precision training
+    dec3 = DEC(3, pretrain_epochs=3, clustering_epochs=3, random_state=1,
+               training_options=TrainingOptions(precision="bf16"))
+    dec3.fit(X)
+    assert dec3.labels_.shape == labels.shape
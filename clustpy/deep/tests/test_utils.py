@@ -59,6 +59,20 @@ def test_encode_batchwise():
     desired = np.sum(data, axis=1).reshape((-1, 1))
     desired = np.tile(desired, embedding_size)
     assert np.allclose(encoded, desired, atol=1e-5)
+    # Larger inference batch size
+    encoded_2 = encode_batchwise(dataloader, autoencoder, inference_batch_size=1000)
+    assert np.array_equal(encoded, encoded_2)
+    # No gradients should be tracked
+    autoencoder_with_check = _TestAutoencoder(data.shape[1], embedding_size)
+    original_encode = autoencoder_with_check.encode
+
+    def encode_with_check(x):
+        assert not torch.is_grad_enabled()
+        return original_encode(x)
+
+    autoencoder_with_check.encode = encode_with_check
+    encoded_3 = encode_batchwise(dataloader, autoencoder_with_check)
+    assert np.array_equal(encoded, encoded_3)
 
 
 def test_predict_batchwise():
@@ -10,6 +10,7 @@ from clustpy.deep._utils import encode_batchwise, get_device_from_module
 from clustpy.deep._train_utils import get_default_deep_clustering_initialization
 from clustpy.deep.neural_networks.variational_autoencoder import VariationalAutoencoder, _vae_sampling
 from clustpy.deep._abstract_deep_clustering_algo import _AbstractDeepClusteringAlgo
+from clustpy.deep._training_options import TrainingOptions
 import numpy as np
 from sklearn.mixture import GaussianMixture
 from sklearn.base import ClusterMixin
@@ -23,7 +24,7 @@ def _vade(X: np.ndarray, n_clusters: int, batch_size: int, pretrain_optimizer_pa
           neural_network: torch.nn.Module | tuple, neural_network_weights: str,
           embedding_size: int, clustering_loss_weight: float, ssl_loss_weight: float,
           custom_dataloaders: tuple, initial_clustering_class: ClusterMixin, initial_clustering_params: dict,
-          device: torch.device, random_state: np.random.RandomState) -> (
+          device: torch.device, random_state: np.random.RandomState, training_options: TrainingOptions) -> (
         np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, torch.nn.Module):
     """
     Start the actual VaDE clustering procedure on the input data set.
@@ -72,6 +73,8 @@ def _vade(X: np.ndarray, n_clusters: int, batch_size: int, pretrain_optimizer_pa
         The device on which to perform the computations
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training
 
     Returns
     -------
@@ -88,7 +91,8 @@ def _vade(X: np.ndarray, n_clusters: int, batch_size: int, pretrain_optimizer_pa
     device, trainloader, testloader, _, neural_network, _, n_clusters, init_labels, init_means, init_clustering_algo = get_default_deep_clustering_initialization(
         X, n_clusters, batch_size, pretrain_optimizer_params, pretrain_epochs, optimizer_class, ssl_loss_fn,
         neural_network, embedding_size, custom_dataloaders, initial_clustering_class, initial_clustering_params, device,
-        random_state, _VaDE_VAE, neural_network_weights=neural_network_weights)
+        random_state, _VaDE_VAE, neural_network_weights=neural_network_weights,
+        training_options=training_options)
     # Get parameters from initial clustering algorithm
     init_weights = None if not hasattr(init_clustering_algo, "weights_") else init_clustering_algo.weights_
     init_covs = None if not hasattr(init_clustering_algo, "covariances_") else init_clustering_algo.covariances_
@@ -100,7 +104,7 @@ def _vade(X: np.ndarray, n_clusters: int, batch_size: int, pretrain_optimizer_pa
                                 **clustering_optimizer_params)
     # Vade Training loop
     vade_module.fit(neural_network, testloader, trainloader, clustering_epochs, device, optimizer, ssl_loss_fn,
-                    clustering_loss_weight, ssl_loss_weight)
+                    clustering_loss_weight, ssl_loss_weight, training_options)
     # Get labels
     vade_labels = _vade_predict_batchwise(testloader, neural_network, vade_module)
 
@@ -312,7 +316,7 @@ class _VaDE_Module(torch.nn.Module):
     def fit(self, neural_network: VariationalAutoencoder, testloader: torch.utils.data.DataLoader,
             trainloader: torch.utils.data.DataLoader, n_epochs: int, device: torch.device,
             optimizer: torch.optim.Optimizer, ssl_loss_fn: torch.nn.modules.loss._Loss, clustering_loss_weight: float,
-            ssl_loss_weight: float) -> '_VaDE_Module':
+            ssl_loss_weight: float, training_options: TrainingOptions = None) -> '_VaDE_Module':
         """
         Trains the _VaDE_Module in place.
 
@@ -336,29 +340,34 @@ class _VaDE_Module(torch.nn.Module):
             weight of the clustering loss
         ssl_loss_weight : float
             weight of the self-supervised learning (ssl) loss
+        training_options : TrainingOptions
+            options defining the precision, compilation and memory format used for the training.
+            If None, the default TrainingOptions will be used (default: None)
 
         Returns
         -------
         self : _VaDE_Module
             this instance of the _VaDE_Module
         """
+        training_options = TrainingOptions() if training_options is None else training_options
+        grad_scaler = training_options.get_grad_scaler(device)
         # lr_decrease = torch.optim.lr_scheduler.StepLR(optimizer, step_size=10, gamma=0.9)
         # training loop
         tbar = tqdm.trange(n_epochs, desc="VaDE training")
-        for _ in tbar:
-            self.train()
-            total_loss = 0
-            for batch in trainloader:
-                # load batch on device
-                batch_data = batch[1].to(device)
-                loss = self.vade_loss(neural_network, batch_data, ssl_loss_fn, clustering_loss_weight,
-                                      ssl_loss_weight)
-                total_loss += loss.item()
-                optimizer.zero_grad()
-                loss.backward()
-                optimizer.step()
-            postfix_str = {"Loss": total_loss}
-            tbar.set_postfix(postfix_str)
+        with training_options.training_context(neural_network):
+            for _ in tbar:
+                self.train()
+                total_loss = 0
+                for batch in trainloader:
+                    # load batch on device
+                    batch_data = batch[1].to(device)
+                    with training_options.autocast(device):
+                        loss = self.vade_loss(neural_network, batch_data, ssl_loss_fn, clustering_loss_weight,
+                                              ssl_loss_weight)
+                    total_loss += loss.item()
+                    training_options.optimization_step(loss, optimizer, grad_scaler)
+                postfix_str = {"Loss": total_loss}
+                tbar.set_postfix(postfix_str)
         return self
 
 
@@ -531,6 +540,9 @@ class VaDE(_AbstractDeepClusteringAlgo):
         If device is None then it will be automatically chosen: if a gpu is available the gpu with the highest amount of free memory will be chosen (default: None)
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    training_options : TrainingOptions
+        options defining the precision, compilation and memory format used for the training of the neural network.
+        If None, the default TrainingOptions will be used (default: None)
 
     Attributes
     ----------
@@ -572,8 +584,10 @@ class VaDE(_AbstractDeepClusteringAlgo):
                  neural_network: torch.nn.Module | tuple = None, neural_network_weights: str = None,
                  embedding_size: int = 10, custom_dataloaders: tuple = None,
                  initial_clustering_class: ClusterMixin = GaussianMixture, initial_clustering_params: dict = None,
-                 device: torch.device = None, random_state: np.random.RandomState | int = None):
-        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state)
+                 device: torch.device = None, random_state: np.random.RandomState | int = None,
+                 training_options: TrainingOptions = None):
+        super().__init__(batch_size, neural_network, neural_network_weights, embedding_size, device, random_state,
+                         training_options)
         self.n_clusters = n_clusters
         self.pretrain_optimizer_params = {
             "lr": 1e-3} if pretrain_optimizer_params is None else pretrain_optimizer_params
@@ -629,7 +643,8 @@ class VaDE(_AbstractDeepClusteringAlgo):
             self.initial_clustering_class,
             self.initial_clustering_params,
             self.device,
-            self.random_state)
+            self.random_state,
+            self.training_options)
         self.labels_ = gmm_labels
         self.cluster_centers_ = gmm_means
         self.covariances_ = gmm_covariances
@@ -61,8 +61,9 @@ class _ClusterTreeNode():
         """
         Split this node.
         Checks if the reference cluster is contained on the left or right side.
-        If the specific side already references to another node, this node will be recursively called.
+        If the specific side already references to another node, the search continues at this node.
         Else, two new nodes will be added as children by splitting the reference cluster.
+        The search is performed iteratively, so that also deep (e.g., unbalanced) trees can be split.
 
         Parameters
         ----------
@@ -80,18 +81,19 @@ class _ClusterTreeNode():
         """
         assert split_cluster_id in self.labels, "split_cluster_id ({0}) is not contained in this node. Following labels are contained: {1}".format(
             split_cluster_id, self.labels)
-        if self.is_leaf_node():
-            self.left_node_ = cluster_tree_node_class([split_cluster_id], self.tree, self)
-            self.right_node_ = cluster_tree_node_class([new_cluster_id], self.tree, self)
-            self.tree.n_split_nodes_ += 1
-            self.tree.n_leaf_nodes_ -= 1  # This node switches from split to leaf node
-            to_return = (self.left_node_, self.right_node_)
-        else:
-            if split_cluster_id in self.left_node_.labels:
-                to_return = self.left_node_.split_cluster(split_cluster_id, new_cluster_id, cluster_tree_node_class)
+        node = self
+        node.labels.append(new_cluster_id)
+        while not node.is_leaf_node():
+            if split_cluster_id in node.left_node_.labels:
+                node = node.left_node_
             else:
-                to_return = self.right_node_.split_cluster(split_cluster_id, new_cluster_id, cluster_tree_node_class)
-        self.labels.append(new_cluster_id)
+                node = node.right_node_
+            node.labels.append(new_cluster_id)
+        node.left_node_ = cluster_tree_node_class([split_cluster_id], node.tree, node)
+        node.right_node_ = cluster_tree_node_class([new_cluster_id], node.tree, node)
+        node.tree.n_split_nodes_ += 1
+        node.tree.n_leaf_nodes_ -= 1  # This node switches from split to leaf node
+        to_return = (node.left_node_, node.right_node_)
         return to_return
 
     def delete_node(self) -> '_ClusterTreeNode':
@@ -378,3 +380,473 @@ class BinaryClusterTree():
             The string
         """
         return str(self.root_node_)
+
+
+class ArrayClusterTree():
+    """
+    A compact, array-based representation of a binary cluster hierarchy.
+    In contrast to BinaryClusterTree, the nodes are not stored as Python objects but as arrays (struct of arrays), where each node is identified by its index.
+    The index of a child node is always larger than the index of its parent, i.e., index 0 is the root node and the nodes are ordered by their creation.
+    Each label is assigned to exactly one leaf node. The tree can not be changed after its creation.
+    Can be created from a sequence of splits (see from_splits), from a BinaryClusterTree (see from_binary_cluster_tree) or from a SciPy linkage matrix (see from_linkage).
+    Can be converted into a BinaryClusterTree (see to_binary_cluster_tree).
+
+    Parameters
+    ----------
+    parent : np.ndarray
+        the index of the parent of each node (-1 for the root)
+    left : np.ndarray
+        the index of the left child of each node (-1 for leaf nodes)
+    right : np.ndarray
+        the index of the right child of each node (-1 for leaf nodes)
+    label_to_leaf : np.ndarray
+        the index of the leaf node containing each label (-1 if a label is not contained in the tree)
+    height : np.ndarray
+        the height at which each node has been split. NaN for leaf nodes and unknown heights. If None, all heights are unknown (default: None)
+    size : np.ndarray
+        the number of objects contained in each node. -1 for unknown sizes. If None, all sizes are unknown (default: None)
+    centers : np.ndarray
+        the cluster center of each node. Can be None (default: None)
+
+    Attributes
+    ----------
+    n_leaf_nodes_ : int
+        the number of leaf nodes contained in the tree
+    n_split_nodes_ : int
+        the number of split nodes contained in the tree
+    depth_ : np.ndarray
+        the depth of each node (0 for the root)
+    """
+
+    def __init__(self, parent: np.ndarray, left: np.ndarray, right: np.ndarray, label_to_leaf: np.ndarray,
+                 height: np.ndarray = None, size: np.ndarray = None, centers: np.ndarray = None):
+        n_nodes = parent.shape[0]
+        assert left.shape[0] == n_nodes and right.shape[0] == n_nodes, "parent, left and right must have the same length"
+        assert np.all(parent[1:] < np.arange(1, n_nodes)) and parent[0] == -1, "The index of a child must be larger than the index of its parent"
+        self.parent = np.asarray(parent, dtype=np.int64)
+        self.left = np.asarray(left, dtype=np.int64)
+        self.right = np.asarray(right, dtype=np.int64)
+        self.label_to_leaf = np.asarray(label_to_leaf, dtype=np.int64)
+        self.height = np.full(n_nodes, np.nan) if height is None else np.asarray(height, dtype=np.float64)
+        self.size = -np.ones(n_nodes, dtype=np.int64) if size is None else np.asarray(size, dtype=np.int64)
+        self.centers = centers
+        is_leaf = self.left == -1
+        self.n_leaf_nodes_ = int(np.sum(is_leaf))
+        self.n_split_nodes_ = n_nodes - self.n_leaf_nodes_
+        # Children always have a larger index than their parents -> depths can be computed in a single pass
+        self.depth_ = np.zeros(n_nodes, dtype=np.int64)
+        for node in range(1, n_nodes):
+            self.depth_[node] = self.depth_[self.parent[node]] + 1
+        # Preorder numbering: the subtree of each node corresponds to a contiguous range
+        self._preorder_start = np.zeros(n_nodes, dtype=np.int64)
+        self._preorder_end = np.zeros(n_nodes, dtype=np.int64)
+        # Euler tour: a node is added each time it is visited (2 * n_nodes - 1 entries)
+        euler_tour = []
+        preorder_counter = 0
+        stack = [0]
+        next_child = np.zeros(n_nodes, dtype=np.int8)
+        while len(stack) != 0:
+            node = stack[-1]
+            euler_tour.append(node)
+            if next_child[node] == 0:
+                self._preorder_start[node] = preorder_counter
+                preorder_counter += 1
+            if not is_leaf[node] and next_child[node] < 2:
+                stack.append(self.left[node] if next_child[node] == 0 else self.right[node])
+                next_child[node] += 1
+            else:
+                self._preorder_end[node] = preorder_counter
+                stack.pop()
+        self._euler_tour = np.array(euler_tour, dtype=np.int64)
+        self._sparse_table = None
+
+    @classmethod
+    def from_splits(cls, split_cluster_ids: np.ndarray, heights: np.ndarray = None,
+                    sizes: np.ndarray = None) -> 'ArrayClusterTree':
+        """
+        Create the tree from a sequence of splits. Starts with a single cluster with label 0.
+        In the i-th split, the leaf node containing split_cluster_ids[i] is split into a left node containing split_cluster_ids[i] and a right node containing the new label i + 1.
+        This corresponds to calling BinaryClusterTree.split_cluster(split_cluster_ids[i]) for each split.
+
+        Parameters
+        ----------
+        split_cluster_ids : np.ndarray
+            the ids of the split clusters
+        heights : np.ndarray
+            the height of each split (default: None)
+        sizes : np.ndarray
+            array of shape (n_splits x 2) containing the number of objects in the two resulting clusters of each split (default: None)
+
+        Returns
+        -------
+        tree : ArrayClusterTree
+            The resulting tree
+        """
+        n_splits = len(split_cluster_ids)
+        n_nodes = 2 * n_splits + 1
+        parent = -np.ones(n_nodes, dtype=np.int64)
+        left = -np.ones(n_nodes, dtype=np.int64)
+        right = -np.ones(n_nodes, dtype=np.int64)
+        height = np.full(n_nodes, np.nan)
+        size = -np.ones(n_nodes, dtype=np.int64)
+        label_to_leaf = np.zeros(n_splits + 1, dtype=np.int64)
+        for i, split_cluster_id in enumerate(split_cluster_ids):
+            assert split_cluster_id <= i, "split_cluster_id ({0}) is not contained in the tree".format(split_cluster_id)
+            node = label_to_leaf[split_cluster_id]
+            left[node] = 2 * i + 1
+            right[node] = 2 * i + 2
+            parent[2 * i + 1:2 * i + 3] = node
+            label_to_leaf[split_cluster_id] = 2 * i + 1
+            label_to_leaf[i + 1] = 2 * i + 2
+            if heights is not None:
+                height[node] = heights[i]
+            if sizes is not None:
+                size[2 * i + 1:2 * i + 3] = sizes[i]
+                size[node] = sizes[i][0] + sizes[i][1]
+        tree = cls(parent, left, right, label_to_leaf, height, size)
+        return tree
+
+    @classmethod
+    def from_binary_cluster_tree(cls, tree: BinaryClusterTree) -> 'ArrayClusterTree':
+        """
+        Create the array-based representation of a BinaryClusterTree.
+        The nodes are ordered by their node_id_. If the nodes contain the attribute center (e.g., in case of DeepECT), the centers will also be stored.
+        Heights and sizes are not contained in a BinaryClusterTree and will therefore be unknown.
+
+        Parameters
+        ----------
+        tree : BinaryClusterTree
+            The BinaryClusterTree
+
+        Returns
+        -------
+        array_tree : ArrayClusterTree
+            The resulting tree
+        """
+        leaf_nodes, split_nodes = tree.get_leaf_and_split_nodes()
+        nodes = sorted(leaf_nodes + split_nodes, key=lambda node: node.node_id_)
+        index_of_node_id = {node.node_id_: i for i, node in enumerate(nodes)}
+        parent = np.array([-1 if node.parent_node is None else index_of_node_id[node.parent_node.node_id_]
+                           for node in nodes], dtype=np.int64)
+        left = np.array([-1 if node.is_leaf_node() else index_of_node_id[node.left_node_.node_id_] for node in nodes],
+                        dtype=np.int64)
+        right = np.array([-1 if node.is_leaf_node() else index_of_node_id[node.right_node_.node_id_] for node in nodes],
+                         dtype=np.int64)
+        label_to_leaf = -np.ones(np.max(tree.root_node_.labels) + 1, dtype=np.int64)
+        for node in leaf_nodes:
+            label_to_leaf[node.labels] = index_of_node_id[node.node_id_]
+        centers = None
+        if all(hasattr(node, "center") for node in nodes):
+            centers = np.array([node.center.data.detach().cpu().numpy() if hasattr(node.center, "data") else node.center
+                                for node in nodes])
+        array_tree = cls(parent, left, right, label_to_leaf, centers=centers)
+        return array_tree
+
+    def to_binary_cluster_tree(self, cluster_tree_node_class: '_ClusterTreeNode' = _ClusterTreeNode) -> BinaryClusterTree:
+        """
+        Convert the tree into a BinaryClusterTree.
+        The node_id_ of each node equals its index. Therefore, a tree created by from_splits results in the same BinaryClusterTree as the corresponding calls of BinaryClusterTree.split_cluster.
+        Heights, sizes and centers are not contained in a BinaryClusterTree and will therefore be lost.
+
+        Parameters
+        ----------
+        cluster_tree_node_class : _ClusterTreeNode
+            the class used to create the cluster tree nodes (default: _ClusterTreeNode)
+
+        Returns
+        -------
+        tree : BinaryClusterTree
+            The resulting BinaryClusterTree
+        """
+        n_nodes = self.parent.shape[0]
+        # Each node contains the labels of all leaf nodes below
+        labels_of_node = [[] for _ in range(n_nodes)]
+        for label, node in enumerate(self.label_to_leaf):
+            while node != -1:
+                labels_of_node[node].append(label)
+                node = self.parent[node]
+        tree = BinaryClusterTree(cluster_tree_node_class)
+        tree.root_node_.labels = labels_of_node[0]
+        nodes = [tree.root_node_]
+        # Children always have a larger index than their parents -> parents are created first
+        for node in range(1, n_nodes):
+            parent_node = nodes[self.parent[node]]
+            nodes.append(cluster_tree_node_class(labels_of_node[node], tree, parent_node))
+            if self.left[self.parent[node]] == node:
+                parent_node.left_node_ = nodes[node]
+            else:
+                parent_node.right_node_ = nodes[node]
+        tree.n_leaf_nodes_ = self.n_leaf_nodes_
+        tree.n_split_nodes_ = self.n_split_nodes_
+        return tree
+
+    @classmethod
+    def from_linkage(cls, Z: np.ndarray) -> 'ArrayClusterTree':
+        """
+        Create the tree from a SciPy linkage matrix (see scipy.cluster.hierarchy.linkage).
+        Each of the n original objects is a leaf node whose label equals the index of the object.
+        The merges are reversed, so the last merge corresponds to the first split.
+
+        Parameters
+        ----------
+        Z : np.ndarray
+            The linkage matrix of shape ((n - 1) x 4)
+
+        Returns
+        -------
+        tree : ArrayClusterTree
+            The resulting tree
+        """
+        n_objects = Z.shape[0] + 1
+        n_nodes = 2 * n_objects - 1
+        parent = -np.ones(n_nodes, dtype=np.int64)
+        left = -np.ones(n_nodes, dtype=np.int64)
+        right = -np.ones(n_nodes, dtype=np.int64)
+        height = np.full(n_nodes, np.nan)
+        size = np.ones(n_nodes, dtype=np.int64)
+        label_to_leaf = np.zeros(n_objects, dtype=np.int64)
+        # Index of the node corresponding to each cluster of the linkage matrix (objects and merges)
+        node_of_cluster = np.zeros(n_nodes, dtype=np.int64)
+        node_of_cluster[n_nodes - 1] = 0
+        for i, row in enumerate(reversed(range(Z.shape[0]))):
+            node = node_of_cluster[n_objects + row]
+            height[node] = Z[row, 2]
+            size[node] = Z[row, 3]
+            left[node] = 2 * i + 1
+            right[node] = 2 * i + 2
+            parent[2 * i + 1:2 * i + 3] = node
+            node_of_cluster[int(Z[row, 0])] = 2 * i + 1
+            node_of_cluster[int(Z[row, 1])] = 2 * i + 2
+        label_to_leaf[:] = node_of_cluster[:n_objects]
+        tree = cls(parent, left, right, label_to_leaf, height, size)
+        return tree
+
+    def to_linkage(self) -> np.ndarray:
+        """
+        Convert the tree into a SciPy linkage matrix (see scipy.cluster.hierarchy.linkage).
+        Each leaf node must contain exactly one label and the labels must be 0, ..., n_leaf_nodes_ - 1.
+        The labels are used as the indices of the original objects.
+        If the height of a split node is unknown, the maximum number of splits on a path to a leaf node below is used instead.
+
+        Returns
+        -------
+        Z : np.ndarray
+            The linkage matrix of shape ((n_leaf_nodes_ - 1) x 4)
+        """
+        assert self.label_to_leaf.shape[0] == self.n_leaf_nodes_ and np.all(
+            self.label_to_leaf >= 0), "Each leaf node must contain exactly one label and the labels must be 0, ..., n_leaf_nodes_ - 1"
+        n_nodes = self.parent.shape[0]
+        cluster_of_node = -np.ones(n_nodes, dtype=np.int64)
+        cluster_of_node[self.label_to_leaf] = np.arange(self.n_leaf_nodes_)
+        n_leaves_below = np.ones(n_nodes, dtype=np.int64)
+        levels_below = np.zeros(n_nodes)
+        Z = np.zeros((self.n_split_nodes_, 4))
+        # The children of the i-th split have the indices 2i+1 and 2i+2 -> merge in the reversed order of the splits
+        _, split_nodes = self.get_leaf_and_split_nodes()
+        split_nodes = split_nodes[np.argsort(-self.left[split_nodes])]
+        for row, node in enumerate(split_nodes):
+            left, right = self.left[node], self.right[node]
+            n_leaves_below[node] = n_leaves_below[left] + n_leaves_below[right]
+            levels_below[node] = max(levels_below[left], levels_below[right]) + 1
+            height = levels_below[node] if np.isnan(self.height[node]) else self.height[node]
+            Z[row] = [cluster_of_node[left], cluster_of_node[right], height, n_leaves_below[node]]
+            cluster_of_node[node] = self.n_leaf_nodes_ + row
+        return Z
+
+    def get_leaf_and_split_nodes(self) -> (np.ndarray, np.ndarray):
+        """
+        Get the indices of all leaf and split nodes of the tree.
+
+        Returns
+        -------
+        tuple : (np.ndarray, np.ndarray)
+            The indices of all leaf nodes,
+            The indices of all split nodes
+        """
+        is_leaf = self.left == -1
+        leaf_nodes = np.where(is_leaf)[0]
+        split_nodes = np.where(~is_leaf)[0]
+        return leaf_nodes, split_nodes
+
+    def get_labels_of_node(self, node: int) -> np.ndarray:
+        """
+        Get all labels that are contained in the specified node.
+
+        Parameters
+        ----------
+        node : int
+            the index of the node
+
+        Returns
+        -------
+        labels : np.ndarray
+            The labels below the node
+        """
+        contained_labels = np.where(self.label_to_leaf != -1)[0]
+        positions = self._preorder_start[self.label_to_leaf[contained_labels]]
+        labels = contained_labels[(positions >= self._preorder_start[node]) & (positions < self._preorder_end[node])]
+        return labels
+
+    def get_least_common_ancestors(self, labels_1: np.ndarray, labels_2: np.ndarray) -> np.ndarray:
+        """
+        Get the least common ancestors, i.e. the first nodes that contain both labels, of multiple pairs of labels.
+        Uses an Euler tour of the tree combined with a sparse table containing the positions of the minimum depth within all ranges of length 2^j.
+        After the sparse table has been created (at the first call), each query takes constant time.
+
+        Parameters
+        ----------
+        labels_1 : np.ndarray
+            The first labels
+        labels_2 : np.ndarray
+            The second labels
+
+        Returns
+        -------
+        least_common_ancestors : np.ndarray
+            The indices of the least common ancestors
+        """
+        nodes_1 = self.label_to_leaf[labels_1]
+        nodes_2 = self.label_to_leaf[labels_2]
+        assert np.all(nodes_1 != -1) and np.all(nodes_2 != -1), "All labels must be contained in the tree"
+        least_common_ancestors = self._get_least_common_ancestors_of_nodes(nodes_1, nodes_2)
+        return least_common_ancestors
+
+    def _get_least_common_ancestors_of_nodes(self, nodes_1: np.ndarray, nodes_2: np.ndarray) -> np.ndarray:
+        """
+        Get the least common ancestors of multiple pairs of nodes (see get_least_common_ancestors).
+
+        Parameters
+        ----------
+        nodes_1 : np.ndarray
+            The indices of the first nodes
+        nodes_2 : np.ndarray
+            The indices of the second nodes
+
+        Returns
+        -------
+        least_common_ancestors : np.ndarray
+            The indices of the least common ancestors
+        """
+        if self._sparse_table is None:
+            # Sparse table: sparse_table[j, i] is the position of the minimum depth within euler_tour[i:i + 2^j]
+            euler_depths = self.depth_[self._euler_tour]
+            n_levels = int(np.floor(np.log2(self._euler_tour.shape[0]))) + 1
+            self._sparse_table = np.zeros((n_levels, self._euler_tour.shape[0]), dtype=np.int64)
+            self._sparse_table[0] = np.arange(self._euler_tour.shape[0])
+            for j in range(1, n_levels):
+                self._sparse_table[j] = self._sparse_table[j - 1]
+                half = 2 ** (j - 1)
+                left = self._sparse_table[j - 1, :-half]
+                right = self._sparse_table[j - 1, half:]
+                self._sparse_table[j, :-half] = np.where(euler_depths[left] <= euler_depths[right], left, right)
+            # First position of each node within the Euler tour
+            _, self._first_occurrence = np.unique(self._euler_tour, return_index=True)
+        start = np.minimum(self._first_occurrence[nodes_1], self._first_occurrence[nodes_2])
+        end = np.maximum(self._first_occurrence[nodes_1], self._first_occurrence[nodes_2])
+        level = np.floor(np.log2(end - start + 1)).astype(np.int64)
+        ancestors_left = self._euler_tour[self._sparse_table[level, start]]
+        ancestors_right = self._euler_tour[self._sparse_table[level, end - 2 ** level + 1]]
+        least_common_ancestors = np.where(self.depth_[ancestors_left] <= self.depth_[ancestors_right],
+                                          ancestors_left, ancestors_right)
+        return least_common_ancestors
+
+    def prune_to_n_leaf_nodes(self, n_leaf_nodes_to_keep: int, labels: np.ndarray) -> np.ndarray:
+        """
+        Get the labels that result from only keeping the first n_leaf_nodes_to_keep leaf nodes in the tree, i.e., from only considering the first n_leaf_nodes_to_keep - 1 splits.
+        Corresponds to BinaryClusterTree.prune_to_n_leaf_nodes, but the tree itself will not be changed.
+
+        Parameters
+        ----------
+        n_leaf_nodes_to_keep : int
+            The number of leaf nodes to keep in the cluster tree
+        labels : np.ndarray
+            the labels array that should be adjusted
+
+        Returns
+        -------
+        labels_pruned : np.ndarray
+            The adjusted labels array
+        """
+        assert n_leaf_nodes_to_keep > 0, "n_nodes_to_keep must be larger than 0"
+        # Nodes are ordered by their creation. A split is kept if one of its children is among the first
+        # 2 * n_leaf_nodes_to_keep - 1 nodes. Since nodes may have been deleted (e.g., in DeepECT), the children of a
+        # split do not necessarily have consecutive indices. Therefore, the splits are checked in breadth-first order
+        # until enough nodes are kept (as in BinaryClusterTree.prune_to_n_leaf_nodes)
+        n_total_nodes_to_keep = 2 * n_leaf_nodes_to_keep - 1
+        is_removed_split = self.left != -1
+        nodes_to_check = [0]
+        i = 0
+        while i < len(nodes_to_check):
+            node = nodes_to_check[i]
+            if is_removed_split[node] and min(self.left[node], self.right[node]) < n_total_nodes_to_keep and len(
+                    nodes_to_check) < n_total_nodes_to_keep:
+                is_removed_split[node] = False
+                nodes_to_check.append(self.left[node])
+                nodes_to_check.append(self.right[node])
+            i += 1
+        labels_pruned = self._merge_subtrees(is_removed_split, labels)
+        return labels_pruned
+
+    def cut_at_height(self, height: float, labels: np.ndarray) -> np.ndarray:
+        """
+        Get a flat clustering by cutting the tree at the specified height.
+        All split nodes with a height lower or equal to height are treated as leaf nodes, i.e., all labels below them are merged.
+        In contrast to prune_to_n_leaf_nodes of BinaryClusterTree, the tree itself will not be changed.
+
+        Parameters
+        ----------
+        height : float
+            The height at which the tree should be cut
+        labels : np.ndarray
+            the labels array that should be adjusted
+
+        Returns
+        -------
+        labels_cut : np.ndarray
+            The adjusted labels array
+        """
+        is_split = self.left != -1
+        assert not np.any(np.isnan(self.height[is_split])), "The heights of all split nodes must be known"
+        labels_cut = self._merge_subtrees(is_split & (self.height <= height), labels)
+        return labels_cut
+
+    def _merge_subtrees(self, is_merged: np.ndarray, labels: np.ndarray) -> np.ndarray:
+        """
+        Merge all labels below the specified nodes. Each label is replaced by the minimum label of its outermost merged ancestor.
+        Afterward, the labels are transformed to 0, ..., n_clusters - 1 (see sklearn.preprocessing.LabelEncoder).
+
+        Parameters
+        ----------
+        is_merged : np.ndarray
+            boolean array defining for each node if the labels below should be merged
+        labels : np.ndarray
+            the labels array that should be adjusted
+
+        Returns
+        -------
+        labels_merged : np.ndarray
+            The adjusted labels array
+        """
+        label_mapping = np.arange(max(np.max(labels), self.label_to_leaf.shape[0] - 1) + 1)
+        contained_labels = np.where(self.label_to_leaf != -1)[0]
+        merged_nodes = np.where(is_merged)[0]
+        if merged_nodes.shape[0] > 0:
+            # Only keep the outermost merged nodes, i.e., nodes whose preorder range is not covered by a previous one
+            merged_nodes = merged_nodes[np.argsort(self._preorder_start[merged_nodes])]
+            starts = self._preorder_start[merged_nodes]
+            ends = self._preorder_end[merged_nodes]
+            previous_max_end = np.maximum.accumulate(np.concatenate(([-1], ends[:-1])))
+            is_outermost = starts >= previous_max_end
+            starts, ends = starts[is_outermost], ends[is_outermost]
+            # Find the outermost merged node containing the leaf of each label
+            positions = self._preorder_start[self.label_to_leaf[contained_labels]]
+            candidates = np.searchsorted(starts, positions, side="right") - 1
+            is_in_merged = (candidates >= 0) & (positions < ends[np.maximum(candidates, 0)])
+            merged_labels = contained_labels[is_in_merged]
+            groups = candidates[is_in_merged]
+            min_labels = np.full(starts.shape[0], label_mapping.shape[0])
+            np.minimum.at(min_labels, groups, merged_labels)
+            label_mapping[merged_labels] = min_labels[groups]
+        LE = LabelEncoder()
+        labels_merged = LE.fit_transform(label_mapping[labels])
+        return labels_merged
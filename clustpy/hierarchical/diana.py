@@ -5,13 +5,146 @@ Collin Leiber
 
 from sklearn.base import BaseEstimator, ClusterMixin
 import numpy as np
-from scipy.spatial.distance import pdist, squareform
-from clustpy.hierarchical._cluster_tree import BinaryClusterTree
-import copy
+from scipy.spatial.distance import pdist, cdist
+from clustpy.hierarchical._cluster_tree import ArrayClusterTree
+import heapq
 
 
-def _diana(X: np.ndarray, n_clusters: int, distance_threshold: float, construct_full_tree: bool, metric: str) -> (
-        np.ndarray, BinaryClusterTree):
+class _DianaDistances():
+    """
+    Provides blocks of pairwise distances for DIANA without materializing the full n x n distance matrix.
+    By default, the condensed distance vector (see scipy.spatial.distance.pdist) is stored, which halves the memory consumption.
+    If low_memory is True, no distances are stored at all and each block is computed on demand using scipy.spatial.distance.cdist.
+    In case of metric = "precomputed", X is used directly as the square distance matrix.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set or the square distance matrix in case of metric = "precomputed"
+    metric : str
+        Metric used to compute the dissimilarity (see scipy.spatial.distance.pdist)
+    low_memory : bool
+        Defines whether the distances should be computed on demand instead of storing the condensed distance vector
+    block_size : int
+        Maximum number of distances contained in a single block (default: 2**22)
+
+    Attributes
+    ----------
+    n_points : int
+        The number of objects
+    """
+
+    def __init__(self, X: np.ndarray, metric: str, low_memory: bool, block_size: int = 2 ** 22):
+        self.n_points = X.shape[0]
+        self.block_size = block_size
+        self.square_distances = None
+        self.condensed_distances = None
+        self.X = None
+        if metric == "precomputed":
+            assert X.ndim == 2 and X.shape[0] == X.shape[1], "In case of metric = precomputed, X must be a square distance matrix"
+            self.square_distances = X
+        elif low_memory:
+            self.X = X
+            self.metric = metric
+        else:
+            self.condensed_distances = pdist(X, metric=metric)
+
+    def get_block(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """
+        Get the pairwise distances between the objects in rows and the objects in cols.
+
+        Parameters
+        ----------
+        rows : np.ndarray
+            The ids of the objects defining the rows of the block
+        cols : np.ndarray
+            The ids of the objects defining the columns of the block
+
+        Returns
+        -------
+        block : np.ndarray
+            The distance matrix of shape (len(rows) x len(cols))
+        """
+        if self.square_distances is not None:
+            return self.square_distances[np.ix_(rows, cols)]
+        if self.condensed_distances is not None:
+            # Translate (i, j) with i < j into the position within the condensed distance vector
+            smaller = np.minimum(rows[:, None], cols[None, :]).astype(np.int64)
+            larger = np.maximum(rows[:, None], cols[None, :]).astype(np.int64)
+            positions = self.n_points * smaller - smaller * (smaller + 1) // 2 + larger - smaller - 1
+            is_diagonal = smaller == larger
+            positions[is_diagonal] = 0
+            block = self.condensed_distances[positions]
+        else:
+            block = cdist(self.X[rows], self.X[cols], metric=self.metric)
+            is_diagonal = rows[:, None] == cols[None, :]
+        block[is_diagonal] = 0
+        return block
+
+    def _iterate_row_blocks(self, rows: np.ndarray, cols: np.ndarray):
+        """
+        Iterate over the distance matrix of rows and cols in blocks of consecutive rows, so that each block contains at most block_size distances.
+
+        Parameters
+        ----------
+        rows : np.ndarray
+            The ids of the objects defining the rows
+        cols : np.ndarray
+            The ids of the objects defining the columns
+
+        Returns
+        -------
+        generator : (slice, np.ndarray)
+            The positions of the rows within the block and the block itself
+        """
+        n_rows_per_block = max(1, self.block_size // max(cols.shape[0], 1))
+        for start in range(0, rows.shape[0], n_rows_per_block):
+            row_slice = slice(start, start + n_rows_per_block)
+            yield row_slice, self.get_block(rows[row_slice], cols)
+
+    def row_sums(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """
+        Get the sum of distances of each object in rows to all objects in cols.
+
+        Parameters
+        ----------
+        rows : np.ndarray
+            The ids of the objects defining the rows
+        cols : np.ndarray
+            The ids of the objects defining the columns
+
+        Returns
+        -------
+        sums : np.ndarray
+            The sums of distances for each object in rows
+        """
+        sums = np.zeros(rows.shape[0])
+        for row_slice, block in self._iterate_row_blocks(rows, cols):
+            sums[row_slice] = np.sum(block, axis=1)
+        return sums
+
+    def diameter(self, points: np.ndarray) -> float:
+        """
+        Get the diameter of a set of objects, i.e. the largest distance between two of these objects.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            The ids of the objects
+
+        Returns
+        -------
+        diameter : float
+            The diameter. Is -1 if less than two objects are given
+        """
+        if points.shape[0] < 2:
+            return -1
+        diameter = max(np.max(block) for _, block in self._iterate_row_blocks(points, points))
+        return diameter
+
+
+def _diana(X: np.ndarray, n_clusters: int, distance_threshold: float, construct_full_tree: bool, metric: str,
+           low_memory: bool = False) -> (np.ndarray, ArrayClusterTree, np.ndarray):
     """
     Start the actual DIANA clustering procedure on the input data set.
     
@@ -27,92 +160,122 @@ def _diana(X: np.ndarray, n_clusters: int, distance_threshold: float, construct_
         Defines whether the full tree should be constructed after n_clusters has been reached
     metric : str
         Metric used to compute the dissimilarity. Can be "euclidean", "l1", "l2", "manhattan", "cosine", or "precomputed" (see scipy.spatial.distance.pdist)
+    low_memory : bool
+        Defines whether the pairwise distances should be computed on demand instead of storing the condensed distance vector (default: False)
 
     Returns
     -------
-    tuple : (np.ndarray, BinaryClusterTree)
+    tuple : (np.ndarray, ArrayClusterTree, np.ndarray)
         The final cluster labels,
-        The resulting tree containing the cluster hierarchy
+        The resulting tree containing the cluster hierarchy,
+        The labels corresponding to the leaf nodes of the tree
     """
     labels = np.zeros(X.shape[0], dtype=np.int32)
     final_labels = np.zeros(X.shape[0], dtype=np.int32)
     # Calculate pairwise distances (must only be done once)
-    global_distance_matrix = squareform(pdist(X, metric=metric))
-    # Start with a single cluster
+    distances = _DianaDistances(X, metric, low_memory)
+    # Start with a single cluster. The diameters of the clusters are kept in a max-heap, so only the two new clusters have to be added after a split
     current_n_clusters = 1
-    tree = BinaryClusterTree()
+    cluster_points = [np.arange(X.shape[0])]
+    diameter_heap = []
+    _add_to_diameter_heap(diameter_heap, 0, distances.diameter(cluster_points[0]), distance_threshold)
+    # The splits are recorded and converted into the tree in the end
+    split_cluster_ids = []
+    split_heights = []
+    split_sizes = []
     while current_n_clusters < n_clusters or construct_full_tree:
         # Get cluster with maximum diameter (largest distance between two poinst within a cluster)
-        split_cluster_id, cluster_distance_matrix = _get_cluster_with_max_diameter(
-            global_distance_matrix, labels, current_n_clusters, distance_threshold)
+        split_cluster_id, split_diameter = _get_cluster_with_max_diameter(diameter_heap)
         # Check if we only have clusters of size one or only clusters with diameter < distance_threshold
         if split_cluster_id is None:
             break
         else:
             # Split cluster by updating labels and tree
-            labels_new = _split_cluster(cluster_distance_matrix, split_cluster_id, current_n_clusters)
-            labels[labels == split_cluster_id] = labels_new
-            tree.split_cluster(split_cluster_id)
+            points = cluster_points[split_cluster_id]
+            labels_new = _split_cluster(distances, points, split_cluster_id, current_n_clusters)
+            is_new_cluster = labels_new == current_n_clusters
+            labels[points[is_new_cluster]] = current_n_clusters
+            cluster_points[split_cluster_id] = points[~is_new_cluster]
+            cluster_points.append(points[is_new_cluster])
+            _add_to_diameter_heap(diameter_heap, split_cluster_id, distances.diameter(cluster_points[split_cluster_id]),
+                                  distance_threshold)
+            _add_to_diameter_heap(diameter_heap, current_n_clusters,
+                                  distances.diameter(cluster_points[current_n_clusters]), distance_threshold)
+            # The diameter of the split cluster is used as the height of the split
+            split_cluster_ids.append(split_cluster_id)
+            split_heights.append(split_diameter)
+            split_sizes.append((cluster_points[split_cluster_id].shape[0], cluster_points[current_n_clusters].shape[0]))
             current_n_clusters += 1
         if current_n_clusters == n_clusters:
             # Save current labels in final labels -> relevant if n_clusters is specified and construct_full_tree is True
             final_labels = labels.copy()
-    return final_labels, tree
+    if current_n_clusters < n_clusters:
+        # The procedure stopped early (e.g., due to distance_threshold), therefore, the current labels are the final labels
+        final_labels = labels.copy()
+    tree = ArrayClusterTree.from_splits(split_cluster_ids, split_heights, split_sizes)
+    # The root contains all objects (also relevant if no split has been performed)
+    tree.size[0] = X.shape[0]
+    return final_labels, tree, labels
 
 
-def _get_cluster_with_max_diameter(global_distance_matrix: np.ndarray, labels: np.ndarray, n_clusters: int,
-                                   distance_threshold: float) -> (int, np.ndarray):
+def _add_to_diameter_heap(diameter_heap: list, cluster_id: int, diameter: float, distance_threshold: float) -> None:
     """
-    Identify the cluster with the largest diameter, i.e. with the largest distance between two objects assigned to this cluster.
-    Here, only diameters which are larger than distance_threshold are taken into account.
-    If only clusters of size one occur or all diameters are below distance_threshold, all return values will be None.
+    Add a cluster to the max-heap of diameters (in place).
+    Clusters of size one (diameter of -1) and clusters with a diameter below distance_threshold can not be split and are, therefore, not added.
 
     Parameters
     ----------
-    global_distance_matrix : np.ndarray
-        The global distance matrix containing the pairwise distances of all objects
-    labels : np.ndarray
-        The current cluster labels
-    n_clusters : int
-        The current number of clusters
+    diameter_heap : list
+        The heap containing tuples of the negative diameter and the id of each cluster that can be split
+    cluster_id : int
+        The id of the cluster
+    diameter : float
+        The diameter of the cluster
     distance_threshold : float
         The distance thresholds defines the minimum diameter that is considered
+    """
+    if diameter > -1 and diameter >= distance_threshold:
+        # heapq implements a min-heap, therefore, the diameter is negated. Ties are resolved by the smallest cluster id
+        heapq.heappush(diameter_heap, (-diameter, cluster_id))
+
+
+def _get_cluster_with_max_diameter(diameter_heap: list) -> (int, float):
+    """
+    Identify the cluster with the largest diameter, i.e. with the largest distance between two objects assigned to this cluster, and remove it from the heap.
+    The heap only contains clusters with more than one object and a diameter larger than distance_threshold (see _add_to_diameter_heap).
+    If the heap is empty, all return values will be None.
+
+    Parameters
+    ----------
+    diameter_heap : list
+        The heap containing tuples of the negative diameter and the id of each cluster that can be split
 
     Returns
     -------
-    tuple: (int, np.ndarray)
+    tuple : (int, float)
         The id of the cluster that should be split,
-        The pariwise distances of all points within that cluster
+        The diameter of that cluster
     """
-    max_diameter = -1
-    split_cluster_id = None
-    resulting_cluster_distance_matrix = None
-    # Search cluster with largest diamter (two objects within a cluster with largest distance)
-    for cluster_id in range(n_clusters):
-        points = labels == cluster_id
-        # Cluster must contain more than one object
-        if np.sum(points) > 1:
-            # Get pairwise distances of all points within cluster
-            cluster_distance_matrix = global_distance_matrix[np.ix_(points, points)]
-            diameter = np.max(cluster_distance_matrix)
-            if diameter > max_diameter and diameter >= distance_threshold:
-                # Save parameters of current cluster with largest diameter
-                max_diameter = diameter
-                split_cluster_id = cluster_id
-                resulting_cluster_distance_matrix = cluster_distance_matrix
-    return split_cluster_id, resulting_cluster_distance_matrix
-
-
-def _split_cluster(cluster_distance_matrix: np.ndarray, split_cluster_id: int, new_cluster_id: int) -> np.ndarray:
+    if len(diameter_heap) == 0:
+        return None, None
+    negative_diameter, split_cluster_id = heapq.heappop(diameter_heap)
+    return split_cluster_id, -negative_diameter
+
+
+def _split_cluster(distances: _DianaDistances, points: np.ndarray, split_cluster_id: int,
+                   new_cluster_id: int) -> np.ndarray:
     """
     Split the specified cluster into two.
     Therefore, it repeatedly calculates the average dissimilarity of the objects to the two subclusters.
     If the subclusters do not change for an iteration the splitting procedure terminates.
+    The sums of distances to the two subclusters are updated incrementally, so only the distances to the objects that move to the splinter group are requested in each iteration.
 
     Parameters
     ----------
-    cluster_distance_matrix : np.ndarray
-        The distance matrix of the specified cluster containing the pairwise distances of respective objects
+    distances : _DianaDistances
+        The object providing the pairwise distances
+    points : np.ndarray
+        The ids of the objects contained in the specified cluster
     split_cluster_id: int
         The id of the cluster that should be split
     new_cluster_id : int
@@ -121,16 +284,16 @@ def _split_cluster(cluster_distance_matrix: np.ndarray, split_cluster_id: int, n
     Returns
     -------
     labels_new : np.ndarray
-        The updated cluster labels
+        The updated cluster labels of the objects in points
     """
     # Create labels
-    labels_new = np.zeros(cluster_distance_matrix.shape[0], dtype=np.int32) + split_cluster_id
+    labels_new = np.zeros(points.shape[0], dtype=np.int32) + split_cluster_id
     # Initialize sum of distances for second subcluster
-    sum_distances_1 = np.sum(cluster_distance_matrix, axis=1)
-    sum_distances_2 = np.zeros(cluster_distance_matrix.shape[0])
+    sum_distances_1 = distances.row_sums(points, points)
+    sum_distances_2 = np.zeros(points.shape[0])
     splinter_group = np.array([np.argmax(sum_distances_1)])
     # Start splitting procedure
-    size_group_1 = cluster_distance_matrix.shape[0] - 1
+    size_group_1 = points.shape[0] - 1
     size_group_2 = 0
     while splinter_group.shape[0] > 0:
         # Update labels
@@ -138,13 +301,17 @@ def _split_cluster(cluster_distance_matrix: np.ndarray, split_cluster_id: int, n
         # Update sum of distances for each subcluster
         size_group_1 -= splinter_group.shape[0]
         size_group_2 += splinter_group.shape[0]
-        sum_splinter_group = np.sum(cluster_distance_matrix[:, splinter_group], axis=1)
+        sum_splinter_group = distances.row_sums(points, points[splinter_group])
         sum_distances_1 -= sum_splinter_group
         sum_distances_2 += sum_splinter_group
         if size_group_1 > 0:
             # Get new splinter group (only checks objects of the original cluster)
-            splinter_group = np.where((labels_new == split_cluster_id) &
-                                      (sum_distances_1 / size_group_1 > sum_distances_2 / size_group_2))[0]
+            remaining = np.where(labels_new == split_cluster_id)[0]
+            difference = sum_distances_1[remaining] / size_group_1 - sum_distances_2[remaining] / size_group_2
+            splinter_group = remaining[difference > 0]
+            if splinter_group.shape[0] == remaining.shape[0]:
+                # At least one object must stay in the original cluster, else the split would not change anything
+                splinter_group = np.delete(remaining, np.argmin(difference))
         else:
             break
     return labels_new
@@ -166,6 +333,10 @@ class Diana(BaseEstimator, ClusterMixin):
         Defines whether the full tree should be constructed after n_clusters has been reached (default: False)
     metric : str
         Metric used to compute the dissimilarity. Can be "euclidean", "l1", "l2", "manhattan", "cosine", or "precomputed" (see scipy.spatial.distance.pdist) (default: euclidean)
+    low_memory : bool
+        Defines whether the pairwise distances should be computed on demand in blocks instead of storing them.
+        Otherwise, the condensed distance vector containing n * (n - 1) / 2 distances is stored.
+        Reduces the memory consumption to a constant but increases the runtime, since distances are computed multiple times (default: False)
 
     Attributes
     ----------
@@ -173,6 +344,10 @@ class Diana(BaseEstimator, ClusterMixin):
         The final labels
     tree_ : BinaryClusterTree
         The resulting cluster tree
+    array_tree_ : ArrayClusterTree
+        The array-based representation of the resulting cluster tree. The height of each split node equals the diameter of the corresponding cluster and size equals the number of objects
+    leaf_labels_ : np.ndarray
+        The labels corresponding to the leaf nodes of the cluster tree. Differs from labels_ if construct_full_tree is True
 
     References
     ----------
@@ -181,11 +356,12 @@ class Diana(BaseEstimator, ClusterMixin):
     """
 
     def __init__(self, n_clusters: int = None, distance_threshold: float = 0, construct_full_tree: bool = False,
-                 metric: str = "euclidean"):
+                 metric: str = "euclidean", low_memory: bool = False):
         self.n_clusters = n_clusters
         self.distance_threshold = distance_threshold
         self.construct_full_tree = construct_full_tree
         self.metric = metric
+        self.low_memory = low_memory
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'Diana':
         """
@@ -207,21 +383,27 @@ class Diana(BaseEstimator, ClusterMixin):
         assert self.n_clusters is None or self.distance_threshold == 0, "If n_clusters is set, distance_threshold must be 0. Else the number of identified clusters can be incorrect"
         if self.n_clusters is None or self.n_clusters > X.shape[0]:
             self.n_clusters = X.shape[0]
-        labels, tree = _diana(X, self.n_clusters, self.distance_threshold, self.construct_full_tree, self.metric)
+        labels, tree, leaf_labels = _diana(X, self.n_clusters, self.distance_threshold, self.construct_full_tree,
+                                           self.metric, self.low_memory)
         self.labels_ = labels
-        self.tree_ = tree
+        self.tree_ = tree.to_binary_cluster_tree()
+        self.array_tree_ = tree
+        self.leaf_labels_ = leaf_labels
         return self
 
-    def flat_clustering(self, n_leaf_nodes_to_keep: int) -> np.ndarray:
+    def flat_clustering(self, n_leaf_nodes_to_keep: int = None, height: float = None) -> np.ndarray:
         """
-        Transform the predicted labels into a flat clustering result by only keeping n_leaf_nodes_to_keep leaf nodes in the tree.
-        Returns labels as if the clustering procedure would have stopped at the specified number of nodes.
+        Transform the predicted labels into a flat clustering result by only keeping n_leaf_nodes_to_keep leaf nodes in the tree or by cutting the tree at the specified height.
+        Returns labels as if the clustering procedure would have stopped at the specified number of nodes or at the specified diameter.
         Note that each leaf node corresponds to a cluster.
+        Exactly one of n_leaf_nodes_to_keep and height must be specified.
 
         Parameters
         ----------
         n_leaf_nodes_to_keep : int
-            The number of leaf nodes to keep in the cluster tree
+            The number of leaf nodes to keep in the cluster tree (default: None)
+        height : float
+            The height at which the tree should be cut, i.e., all clusters with a diameter lower or equal to height will not be split (default: None)
 
         Returns
         -------
@@ -229,6 +411,10 @@ class Diana(BaseEstimator, ClusterMixin):
             The new cluster labels
         """
         assert self.labels_ is not None, "The DIANA algorithm has not run yet. Use the fit() function first."
-        tree_copy = copy.deepcopy(self.tree_)
-        labels_pruned = tree_copy.prune_to_n_leaf_nodes(n_leaf_nodes_to_keep, self.labels_)
+        assert (n_leaf_nodes_to_keep is None) != (height is None), "Exactly one of n_leaf_nodes_to_keep and height must be specified"
+        # The tree is not changed, therefore, no copy is needed
+        if height is not None:
+            labels_pruned = self.array_tree_.cut_at_height(height, self.leaf_labels_)
+        else:
+            labels_pruned = self.array_tree_.prune_to_n_leaf_nodes(n_leaf_nodes_to_keep, self.leaf_labels_)
         return labels_pruned
@@ -1,6 +1,10 @@
 import numpy as np
+import pytest
+import copy
 
-from clustpy.hierarchical._cluster_tree import BinaryClusterTree, _ClusterTreeNode
+from clustpy.hierarchical._cluster_tree import BinaryClusterTree, _ClusterTreeNode, ArrayClusterTree
+from scipy.cluster.hierarchy import linkage, fcluster
+from sklearn.metrics import adjusted_rand_score
 
 
 def _check_node(node: _ClusterTreeNode, is_leaf_node: bool, node_id: int, labels: list, tree: BinaryClusterTree):
@@ -160,3 +164,107 @@ def test_get_least_common_ancestor():
     assert np.array_equal(ancestors, [1, 4])
     ancestors = bct.get_least_common_ancestor(1, 1).labels
     assert np.array_equal(ancestors, [1])
+
+
+def test_split_cluster_deep_tree():
+    bct = BinaryClusterTree()
+    # Always splitting the newest cluster creates a tree whose depth equals the number of splits
+    n_splits = 2000
+    for i in range(n_splits):
+        bct.split_cluster(i)
+    assert bct.n_leaf_nodes_ == n_splits + 1
+    assert bct.n_split_nodes_ == n_splits
+    assert bct.root_node_.labels == list(range(n_splits + 1))
+
+
+def test_array_cluster_tree():
+    bct = BinaryClusterTree()
+    random_state = np.random.RandomState(1)
+    split_cluster_ids = [random_state.randint(0, new_cluster_id) for new_cluster_id in range(1, 20)]
+    for split_cluster_id in split_cluster_ids:
+        bct.split_cluster(split_cluster_id)
+    act = ArrayClusterTree.from_splits(split_cluster_ids)
+    act_2 = ArrayClusterTree.from_binary_cluster_tree(bct)
+    assert act.n_leaf_nodes_ == 20 and act.n_split_nodes_ == 19
+    assert np.array_equal(act.parent, act_2.parent)
+    assert np.array_equal(act.left, act_2.left)
+    assert np.array_equal(act.label_to_leaf, act_2.label_to_leaf)
+    assert act.parent[0] == -1 and np.all(act.parent[1:] < np.arange(1, act.parent.shape[0]))
+    # Least common ancestors should equal the ones given by the tree
+    labels_1, labels_2 = np.triu_indices(20)
+    ancestors = act.get_least_common_ancestors(labels_1, labels_2)
+    for l1, l2, ancestor in zip(labels_1, labels_2, ancestors):
+        assert sorted(bct.get_least_common_ancestor(l1, l2).labels) == act.get_labels_of_node(ancestor).tolist()
+    # Pruning should equal the pruning of the tree without changing the array tree
+    labels = random_state.randint(0, 20, 100)
+    for n_leaf_nodes_to_keep in range(1, 21):
+        labels_pruned = copy.deepcopy(bct).prune_to_n_leaf_nodes(n_leaf_nodes_to_keep, labels)
+        assert np.array_equal(act.prune_to_n_leaf_nodes(n_leaf_nodes_to_keep, labels), labels_pruned)
+    assert act.n_leaf_nodes_ == 20
+    # Unknown heights can not be cut
+    with pytest.raises(AssertionError):
+        act.cut_at_height(1, labels)
+    # Converting back should result in the original tree
+    bct_2 = act.to_binary_cluster_tree()
+    assert str(bct_2) == str(bct)
+    assert bct_2.n_leaf_nodes_ == 20 and bct_2.n_split_nodes_ == 19
+    leaf_nodes, split_nodes = bct.get_leaf_and_split_nodes()
+    leaf_nodes_2, split_nodes_2 = bct_2.get_leaf_and_split_nodes()
+    assert [node.node_id_ for node in leaf_nodes + split_nodes] == [node.node_id_ for node in leaf_nodes_2 + split_nodes_2]
+    assert [node.labels for node in leaf_nodes + split_nodes] == [node.labels for node in leaf_nodes_2 + split_nodes_2]
+    bct_2.split_cluster(3)
+    assert bct_2.n_leaf_nodes_ == 21
+
+
+def test_array_cluster_tree_prune_after_delete_node():
+    # Deleting nodes (e.g., in DeepECT) results in splits whose children do not have consecutive indices
+    for seed in range(20):
+        random_state = np.random.RandomState(seed)
+        bct = BinaryClusterTree()
+        for _ in range(20):
+            leaf_nodes, _ = bct.get_leaf_and_split_nodes()
+            if random_state.rand() < 0.3 and len(leaf_nodes) > 2:
+                leaf_nodes[random_state.randint(len(leaf_nodes))].delete_node()
+            else:
+                bct.split_cluster(random_state.choice(bct.root_node_.labels), max(bct.root_node_.labels) + 1)
+        labels = random_state.choice(bct.root_node_.labels, 100)
+        act = ArrayClusterTree.from_binary_cluster_tree(bct)
+        for n_leaf_nodes_to_keep in range(1, bct.n_leaf_nodes_ + 1):
+            labels_pruned = copy.deepcopy(bct).prune_to_n_leaf_nodes(n_leaf_nodes_to_keep, labels)
+            labels_pruned_array = act.prune_to_n_leaf_nodes(n_leaf_nodes_to_keep, labels)
+            assert np.array_equal(labels_pruned_array, labels_pruned)
+            assert np.unique(labels_pruned_array).shape[0] <= n_leaf_nodes_to_keep
+
+
+def test_array_cluster_tree_cut_at_height():
+    act = ArrayClusterTree.from_splits([0, 0, 1], [5, 3, 2], [(3, 3), (2, 1), (2, 1)])
+    assert np.array_equal(act.size, [6, 3, 3, 2, 1, 2, 1])
+    assert np.array_equal(act.height[:3], [5, 3, 2])
+    assert np.all(np.isnan(act.height[3:]))
+    labels = np.array([0, 0, 2, 1, 1, 3])
+    assert np.array_equal(act.cut_at_height(6, labels), [0, 0, 0, 0, 0, 0])
+    assert np.array_equal(act.cut_at_height(4, labels), [0, 0, 0, 1, 1, 1])
+    assert np.array_equal(act.cut_at_height(2.5, labels), [0, 0, 2, 1, 1, 1])
+    assert np.array_equal(act.cut_at_height(1, labels), labels)
+    # The tree should not be changed
+    assert act.n_leaf_nodes_ == 4
+
+
+def test_array_cluster_tree_linkage():
+    X = np.random.RandomState(1).rand(30, 2)
+    Z = linkage(X, "average")
+    act = ArrayClusterTree.from_linkage(Z)
+    assert act.n_leaf_nodes_ == 30
+    assert act.size[0] == 30
+    assert np.array_equal(act.to_linkage(), Z)
+    for n_clusters in range(1, 31):
+        labels_scipy = fcluster(Z, n_clusters, criterion="maxclust")
+        assert adjusted_rand_score(labels_scipy, act.prune_to_n_leaf_nodes(n_clusters, np.arange(30))) == 1
+    for height in [0.05, 0.1, 0.3]:
+        labels_scipy = fcluster(Z, height, criterion="distance")
+        assert adjusted_rand_score(labels_scipy, act.cut_at_height(height, np.arange(30))) == 1
+    # Without heights, the number of split levels below each node is used
+    act = ArrayClusterTree.from_splits([0, 0, 1])
+    Z = act.to_linkage()
+    assert np.array_equal(Z[:, 2], [1, 1, 2])
+    assert np.array_equal(Z[:, 3], [2, 2, 4])
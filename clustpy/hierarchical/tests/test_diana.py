@@ -1,9 +1,32 @@
 from clustpy.hierarchical import Diana
-from clustpy.hierarchical.diana import _split_cluster, _get_cluster_with_max_diameter
+from clustpy.hierarchical.diana import _split_cluster, _get_cluster_with_max_diameter, _DianaDistances, \
+    _add_to_diameter_heap
+from clustpy.hierarchical._cluster_tree import BinaryClusterTree
 import numpy as np
+from scipy.spatial.distance import pdist, squareform
+from scipy.cluster.hierarchy import fcluster
+from sklearn.metrics import adjusted_rand_score
 from sklearn.datasets import make_blobs
 
 
+def test_diana_distances():
+    X, _ = make_blobs(50, 3, centers=2, random_state=1)
+    distance_matrix = squareform(pdist(X))
+    rows = np.array([3, 0, 7, 49, 7])
+    cols = np.array([0, 7, 12, 3])
+    # Condensed, on-demand and precomputed distances should be equal
+    for distances in [_DianaDistances(X, "euclidean", False), _DianaDistances(X, "euclidean", True),
+                      _DianaDistances(distance_matrix, "precomputed", False)]:
+        assert np.allclose(distances.get_block(rows, cols), distance_matrix[np.ix_(rows, cols)])
+        assert np.allclose(distances.row_sums(rows, cols), np.sum(distance_matrix[np.ix_(rows, cols)], axis=1))
+        assert np.isclose(distances.diameter(rows), np.max(distance_matrix[np.ix_(rows, rows)]))
+        assert distances.diameter(np.array([5])) == -1
+    # Small blocks
+    distances = _DianaDistances(X, "euclidean", False, block_size=3)
+    assert np.array_equal(distances.row_sums(rows, cols), np.sum(distance_matrix[np.ix_(rows, cols)], axis=1))
+    assert distances.diameter(np.arange(50)) == np.max(distance_matrix)
+
+
 def test_get_cluster_with_max_diameter():
     # Uses the example from the original paper
     global_distance_matrix = np.array([[0, 2, 6, 10, 9],
@@ -11,36 +34,48 @@ def test_get_cluster_with_max_diameter():
                                        [6, 5, 0, 4, 5],
                                        [10, 9, 4, 0, 3],
                                        [9, 8, 5, 3, 0]])
+    distances = _DianaDistances(global_distance_matrix, "precomputed", False)
     # First iteration
-    labels = np.array([0, 0, 0, 0, 0])
-    split_cluster_id, cluster_distance_matrix = _get_cluster_with_max_diameter(global_distance_matrix, labels, 1, 0)
+    diameter_heap = []
+    _add_to_diameter_heap(diameter_heap, 0, distances.diameter(np.array([0, 1, 2, 3, 4])), 0)
+    split_cluster_id, diameter = _get_cluster_with_max_diameter(diameter_heap)
     assert split_cluster_id == 0
-    assert np.array_equal(cluster_distance_matrix, global_distance_matrix)
+    assert diameter == 10
+    assert diameter_heap == []
     # Second iteration
-    labels = np.array([0, 0, 1, 1, 1])
-    split_cluster_id, cluster_distance_matrix = _get_cluster_with_max_diameter(global_distance_matrix, labels, 2, 0)
+    _add_to_diameter_heap(diameter_heap, 0, distances.diameter(np.array([0, 1])), 0)
+    _add_to_diameter_heap(diameter_heap, 1, distances.diameter(np.array([2, 3, 4])), 0)
+    split_cluster_id, diameter = _get_cluster_with_max_diameter(diameter_heap)
     assert split_cluster_id == 1
-    assert np.array_equal(cluster_distance_matrix, np.array([[0, 4, 5],
-                                                             [4, 0, 3],
-                                                             [5, 3, 0]]))
+    assert diameter == 5
+    # Ties are resolved by the smallest cluster id
+    _add_to_diameter_heap(diameter_heap, 2, 2, 0)
+    assert _get_cluster_with_max_diameter(diameter_heap) == (0, 2)
+    assert _get_cluster_with_max_diameter(diameter_heap) == (2, 2)
+    # Distance threshold and clusters of size one
+    _add_to_diameter_heap(diameter_heap, 3, 5, 6)
+    _add_to_diameter_heap(diameter_heap, 4, -1, 0)
+    assert _get_cluster_with_max_diameter(diameter_heap) == (None, None)
 
 
 def test_split_cluster():
     # Uses the example from the original paper
     # First iteration
-    cluster_distance_matrix = np.array([[0, 2, 6, 10, 9],
-                                        [2, 0, 5, 9, 8],
-                                        [6, 5, 0, 4, 5],
-                                        [10, 9, 4, 0, 3],
-                                        [9, 8, 5, 3, 0]])
-    labels = _split_cluster(cluster_distance_matrix, 0, 1)
+    global_distance_matrix = np.array([[0, 2, 6, 10, 9],
+                                       [2, 0, 5, 9, 8],
+                                       [6, 5, 0, 4, 5],
+                                       [10, 9, 4, 0, 3],
+                                       [9, 8, 5, 3, 0]])
+    distances = _DianaDistances(global_distance_matrix, "precomputed", False)
+    labels = _split_cluster(distances, np.array([0, 1, 2, 3, 4]), 0, 1)
     assert np.array_equal(labels, np.array([1, 1, 0, 0, 0]))
     # Second iteration
-    cluster_distance_matrix = np.array([[0, 4, 5],
-                                        [4, 0, 3],
-                                        [5, 3, 0]])
-    labels = _split_cluster(cluster_distance_matrix, 0, 2)
+    labels = _split_cluster(distances, np.array([2, 3, 4]), 0, 2)
     assert np.array_equal(labels, np.array([2, 0, 0]))
+    # At least one object must stay in the original cluster
+    X = np.array([[0.35, 0.29], [0.64, 0.37], [0.16, 0.48], [0.81, 0.84], [0.62, 1.0], [0.98, 0.24]])
+    labels = _split_cluster(_DianaDistances(X, "euclidean", False), np.arange(6), 0, 1)
+    assert np.array_equal(labels, np.array([1, 1, 1, 1, 0, 1]))
 
 
 """
@@ -74,6 +109,9 @@ def test_simple_Diana():
     assert diana.labels_.shape == labels.shape
     assert np.array_equal(np.unique(diana.labels_), np.arange(3))
     assert diana.tree_.n_leaf_nodes_ == X.shape[0]
+    assert type(diana.tree_) is BinaryClusterTree
+    assert diana.array_tree_.n_leaf_nodes_ == X.shape[0]
+    assert sorted(diana.tree_.root_node_.labels) == list(range(X.shape[0]))
 
 
 def test_flat_clustering():
@@ -83,3 +121,57 @@ def test_flat_clustering():
     assert np.array_equal(np.unique(diana.labels_), np.arange(X.shape[0]))
     labels_flat = diana.flat_clustering(5)
     assert np.array_equal(np.unique(labels_flat), np.arange(5))
+
+
+def test_diana_low_memory():
+    X, labels = make_blobs(200, 4, centers=3, random_state=1)
+    diana = Diana(n_clusters=3, construct_full_tree=True)
+    diana.fit(X)
+    # Computing the distances on demand should not change the result
+    diana_low_memory = Diana(n_clusters=3, construct_full_tree=True, low_memory=True)
+    diana_low_memory.fit(X)
+    assert np.array_equal(diana.labels_, diana_low_memory.labels_)
+    assert diana.tree_.n_leaf_nodes_ == diana_low_memory.tree_.n_leaf_nodes_
+    # Precomputed distances
+    diana_precomputed = Diana(n_clusters=3, metric="precomputed")
+    diana_precomputed.fit(squareform(pdist(X)))
+    assert np.array_equal(diana.labels_, diana_precomputed.labels_)
+
+
+def test_flat_clustering_at_height():
+    X, labels = make_blobs(200, 4, centers=3, random_state=1)
+    diana = Diana(n_clusters=3, construct_full_tree=True)
+    diana.fit(X)
+    leaf_nodes, split_nodes = diana.array_tree_.get_leaf_and_split_nodes()
+    assert diana.array_tree_.size[0] == X.shape[0]
+    assert np.all(diana.array_tree_.size[leaf_nodes] == 1)
+    assert np.array_equal(diana.array_tree_.size[split_nodes],
+                          diana.array_tree_.size[diana.array_tree_.left[split_nodes]] + diana.array_tree_.size[diana.array_tree_.right[split_nodes]])
+    # Heights of the splits are non-increasing
+    heights = diana.array_tree_.height[split_nodes[np.argsort(diana.array_tree_.left[split_nodes])]]
+    assert np.all(heights[:-1] >= heights[1:])
+    # Cutting between the second and third split should equal the labels of the first three clusters
+    labels_cut = diana.flat_clustering(height=(heights[1] + heights[2]) / 2)
+    assert np.array_equal(labels_cut, diana.labels_)
+    assert np.array_equal(labels_cut, diana.flat_clustering(3))
+    # Cut above the root and below all splits
+    assert np.array_equal(diana.flat_clustering(height=heights[0]), np.zeros(X.shape[0]))
+    assert np.array_equal(np.unique(diana.flat_clustering(height=-1)), np.arange(X.shape[0]))
+    # Fitting with distance_threshold should result in the same clustering
+    diana_threshold = Diana(distance_threshold=heights[5])
+    diana_threshold.fit(X)
+    assert np.array_equal(diana.flat_clustering(height=heights[5] - 1e-10), diana_threshold.labels_)
+
+
+def test_diana_tree_to_linkage():
+    X, labels = make_blobs(100, 3, centers=3, random_state=1)
+    diana = Diana()
+    diana.fit(X)
+    # The heights of the linkage matrix are the diameters of the clusters, so the tree can be cut using scipy
+    Z = diana.array_tree_.to_linkage()
+    assert Z.shape == (X.shape[0] - 1, 4)
+    assert Z[-1, 2] == np.max(pdist(X))
+    assert Z[-1, 3] == X.shape[0]
+    # The observations of the linkage matrix correspond to the labels of the leaf nodes
+    labels_scipy = fcluster(Z, 4, criterion="maxclust")[diana.leaf_labels_]
+    assert adjusted_rand_score(labels_scipy, diana.flat_clustering(4)) == 1
@@ -6,7 +6,7 @@ from .multipe_labelings_scoring import is_multi_labelings_n_clusters_correct, Mu
     MultipleLabelingsPairCountingScores, remove_noise_spaces_from_labels, multiple_labelings_pc_f1_score, \
     multiple_labelings_pc_jaccard_score, multiple_labelings_pc_precision_score, multiple_labelings_pc_rand_score, \
     multiple_labelings_pc_recall_score
-from .confusion_matrix import ConfusionMatrix
+from .confusion_matrix import ConfusionMatrix, contingency_table_cache
 from .hierarchical_metrics import dendrogram_purity, leaf_purity
 
 __all__ = ['variation_of_information',
@@ -18,6 +18,7 @@ __all__ = ['variation_of_information',
            'pc_rand_score',
            'pc_recall_score',
            'ConfusionMatrix',
+           'contingency_table_cache',
            'is_multi_labelings_n_clusters_correct',
            'MultipleLabelingsConfusionMatrix',
            'MultipleLabelingsPairCountingScores',
@@ -1,6 +1,6 @@
 import numpy as np
 from scipy.optimize import linear_sum_assignment
-from clustpy.metrics.confusion_matrix import ConfusionMatrix
+from clustpy.metrics.confusion_matrix import ConfusionMatrix, _get_contingency_table
 from scipy.special import comb
 from sklearn.metrics import normalized_mutual_info_score as nmi
 
@@ -54,19 +54,16 @@ def variation_of_information(labels_true: np.ndarray, labels_pred: np.ndarray) -
     """
     _check_number_of_points(labels_true, labels_pred)
     n = len(labels_true)
-    cluster_ids_true = np.unique(labels_true)
-    cluster_ids_pred = np.unique(labels_pred)
-    result = 0.0
-    for id_true in cluster_ids_true:
-        points_in_cluster_gt = np.argwhere(labels_true == id_true)[:, 0]
-        p = len(points_in_cluster_gt) / n
-        for id_pred in cluster_ids_pred:
-            points_in_cluster_pred = np.argwhere(labels_pred == id_pred)[:, 0]
-            q = len(points_in_cluster_pred) / n
-            r = len([point for point in points_in_cluster_gt if point in points_in_cluster_pred]) / n
-            if r != 0:
-                result += r * (np.log(r / p) + np.log(r / q))
-    vi = -1 * result
+    true_clusters, pred_clusters, rows, cols, counts = _get_contingency_table(labels_true, labels_pred)
+    # Cluster sizes of the ground truth (p) and the prediction (q)
+    p = np.zeros(true_clusters.shape[0])
+    np.add.at(p, rows, counts)
+    q = np.zeros(pred_clusters.shape[0])
+    np.add.at(q, cols, counts)
+    # Only non-empty cells (r != 0) are stored in the contingency table
+    r = counts / n
+    result = np.sum(r * (np.log(r / (p[rows] / n)) + np.log(r / (q[cols] / n))))
+    vi = -1 * float(result)
     return vi
 
 
@@ -96,10 +93,10 @@ def unsupervised_clustering_accuracy(labels_true: np.ndarray, labels_pred: np.nd
     IEEE Transactions on Image Processing 19.10 (2010): 2761-2773.
     """
     _check_number_of_points(labels_true, labels_pred)
-    max_label = int(max(labels_pred.max(), labels_true.max()) + 1)
-    match_matrix = np.zeros((max_label, max_label), dtype=np.int64)
-    for i in range(labels_true.shape[0]):
-        match_matrix[int(labels_true[i]), int(labels_pred[i])] -= 1
+    true_clusters, pred_clusters, rows, cols, counts = _get_contingency_table(labels_true, labels_pred)
+    # Empty rows and columns do not change the optimal assignment -> use the compact contingency matrix
+    match_matrix = np.zeros((true_clusters.shape[0], pred_clusters.shape[0]), dtype=np.int64)
+    match_matrix[rows, cols] = -counts
     indices = linear_sum_assignment(match_matrix)
     acc = -np.sum(match_matrix[indices]) / labels_pred.size
     return acc
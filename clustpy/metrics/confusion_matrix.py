@@ -1,7 +1,122 @@
 import numpy as np
 import matplotlib.pyplot as plt
+import hashlib
+import threading
+from contextlib import contextmanager
 from scipy.optimize import linear_sum_assignment
 
+# Each thread uses its own cache, so that contexts in different threads do not interfere
+_CONTINGENCY_TABLE_CACHE = threading.local()
+
+
+@contextmanager
+def contingency_table_cache():
+    """
+    Context manager that enables a cache for contingency tables.
+    Within the context, all metrics that are based on the contingency table (e.g., variation_of_information, unsupervised_clustering_accuracy, purity, the pair-counting scores or the ConfusionMatrix) share a single table for the same pair of labels_true and labels_pred.
+    The cache is cleared when the context is left.
+    The cache is local to the current thread, i.e., metrics calculated in other threads do not use it.
+
+    Examples
+    ----------
+    >>> from clustpy.metrics import contingency_table_cache, variation_of_information, unsupervised_clustering_accuracy
+    >>> with contingency_table_cache():
+    >>>     vi = variation_of_information(labels_true, labels_pred)
+    >>>     acc = unsupervised_clustering_accuracy(labels_true, labels_pred)
+    """
+    previous_cache = getattr(_CONTINGENCY_TABLE_CACHE, "cache", None)
+    _CONTINGENCY_TABLE_CACHE.cache = {} if previous_cache is None else previous_cache
+    try:
+        yield _CONTINGENCY_TABLE_CACHE.cache
+    finally:
+        _CONTINGENCY_TABLE_CACHE.cache = previous_cache
+
+
+def _get_labels_hash(labels: np.ndarray) -> str:
+    """
+    Get a hash of a labels array, considering its content, its dtype and its shape.
+
+    Parameters
+    ----------
+    labels : np.ndarray
+        The labels
+
+    Returns
+    -------
+    labels_hash : str
+        The hash of the labels
+    """
+    labels = np.ascontiguousarray(labels)
+    hash_object = hashlib.sha1(str((labels.dtype.str, labels.shape)).encode())
+    hash_object.update(labels.tobytes())
+    labels_hash = hash_object.hexdigest()
+    return labels_hash
+
+
+def _get_contingency_table(labels_true: np.ndarray, labels_pred: np.ndarray) -> (
+        np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray):
+    """
+    Get the sparse contingency table of the ground truth and the predicted labels.
+    Only cells that contain at least one object are stored (coordinate format), so memory and runtime scale with the number of objects and not with the number of label combinations.
+    All counts are given as int64 to avoid overflows for very large data sets.
+    If called within contingency_table_cache(), the table will be reused for identical labels.
+
+    Parameters
+    ----------
+    labels_true : np.ndarray
+        The ground truth labels of the data set
+    labels_pred : np.ndarray
+        The labels as predicted by a clustering algorithm
+
+    Returns
+    -------
+    tuple : (np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray)
+        The unique ground truth labels,
+        The unique predicted labels,
+        The row ids (index within the unique ground truth labels) of the non-empty cells,
+        The column ids (index within the unique predicted labels) of the non-empty cells,
+        The number of objects within each non-empty cell
+    """
+    assert labels_true.shape[0] == labels_pred.shape[0], "Number of true and predicted labels must match"
+    cache = getattr(_CONTINGENCY_TABLE_CACHE, "cache", None)
+    if cache is not None:
+        cache_key = (_get_labels_hash(labels_true), _get_labels_hash(labels_pred))
+        if cache_key not in cache:
+            cache[cache_key] = _compute_contingency_table(labels_true, labels_pred)
+        return cache[cache_key]
+    return _compute_contingency_table(labels_true, labels_pred)
+
+
+def _compute_contingency_table(labels_true: np.ndarray, labels_pred: np.ndarray) -> (
+        np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray):
+    """
+    Compute the sparse contingency table of the ground truth and the predicted labels (see _get_contingency_table).
+
+    Parameters
+    ----------
+    labels_true : np.ndarray
+        The ground truth labels of the data set
+    labels_pred : np.ndarray
+        The labels as predicted by a clustering algorithm
+
+    Returns
+    -------
+    tuple : (np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray)
+        The unique ground truth labels,
+        The unique predicted labels,
+        The row ids of the non-empty cells,
+        The column ids of the non-empty cells,
+        The number of objects within each non-empty cell
+    """
+    true_clusters, true_ids = np.unique(labels_true, return_inverse=True)
+    pred_clusters, pred_ids = np.unique(labels_pred, return_inverse=True)
+    # Encode each combination of labels by a single integer
+    combined_ids = true_ids.reshape(-1).astype(np.int64) * pred_clusters.shape[0] + pred_ids.reshape(-1)
+    combined_unique, counts = np.unique(combined_ids, return_counts=True)
+    rows = combined_unique // pred_clusters.shape[0]
+    cols = combined_unique % pred_clusters.shape[0]
+    return true_clusters, pred_clusters, rows, cols, counts.astype(np.int64)
+
 
 def _rearrange(confusion_matrix: np.ndarray) -> np.ndarray:
     """
@@ -98,16 +213,9 @@ class ConfusionMatrix():
 
     def __init__(self, labels_true: np.ndarray, labels_pred: np.ndarray):
         assert labels_true.shape[0] == labels_pred.shape[0], "Number of true and predicted labels must match"
-        self.true_clusters = np.unique(labels_true)
-        self.pred_clusters = np.unique(labels_pred)
-        conf_matrix = np.zeros((self.true_clusters.shape[0], self.pred_clusters.shape[0]), dtype=int)
-        for i, gt_label in enumerate(self.true_clusters):
-            # Get predictions which should be labeled with corresponding gt label
-            point_labels = labels_pred[labels_true == gt_label]
-            # Get different prediction labels
-            labels, cluster_sizes = np.unique(point_labels, return_counts=True)
-            for j, pred_label in enumerate(labels):
-                conf_matrix[i, np.where(self.pred_clusters == pred_label)[0][0]] = cluster_sizes[j]
+        self.true_clusters, self.pred_clusters, rows, cols, counts = _get_contingency_table(labels_true, labels_pred)
+        conf_matrix = np.zeros((self.true_clusters.shape[0], self.pred_clusters.shape[0]), dtype=np.int64)
+        conf_matrix[rows, cols] = counts
         self.confusion_matrix = conf_matrix
 
     def __str__(self):
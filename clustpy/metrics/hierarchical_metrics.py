@@ -1,9 +1,50 @@
-from clustpy.hierarchical._cluster_tree import BinaryClusterTree
+from clustpy.hierarchical._cluster_tree import BinaryClusterTree, ArrayClusterTree
 from clustpy.metrics import purity
+from clustpy.metrics.confusion_matrix import _get_contingency_table
 import numpy as np
 
 
-def leaf_purity(labels_true: np.ndarray, labels_pred: np.ndarray, tree: BinaryClusterTree) -> float:
+def _get_array_cluster_tree(tree: BinaryClusterTree | ArrayClusterTree) -> ArrayClusterTree:
+    """
+    Get the array-based representation of a cluster tree.
+
+    Parameters
+    ----------
+    tree : BinaryClusterTree | ArrayClusterTree
+        The clustering tree
+
+    Returns
+    -------
+    array_tree : ArrayClusterTree
+        The array-based clustering tree
+    """
+    array_tree = tree if type(tree) is ArrayClusterTree else ArrayClusterTree.from_binary_cluster_tree(tree)
+    return array_tree
+
+
+def _get_integral_labels(labels_pred: np.ndarray) -> np.ndarray:
+    """
+    Get the predicted labels as integer array, so they can be used to index the arrays of a cluster tree.
+    Labels with a float dtype are only accepted if all of them are integral.
+
+    Parameters
+    ----------
+    labels_pred : np.ndarray
+        The labels as predicted by a clustering algorithm
+
+    Returns
+    -------
+    labels_pred : np.ndarray
+        The predicted labels with dtype np.int64
+    """
+    labels_pred = np.asarray(labels_pred)
+    assert np.issubdtype(labels_pred.dtype, np.integer) or np.all(
+        np.mod(labels_pred, 1) == 0), "labels_pred must only contain integral values"
+    labels_pred = labels_pred.astype(np.int64)
+    return labels_pred
+
+
+def leaf_purity(labels_true: np.ndarray, labels_pred: np.ndarray, tree: BinaryClusterTree | ArrayClusterTree) -> float:
     """
     Calculates the leaf purity of the tree.
     Uses labels fromm leafs in the tree to calculate the purity (see clustpy.metrics.purity).
@@ -14,7 +55,7 @@ def leaf_purity(labels_true: np.ndarray, labels_pred: np.ndarray, tree: BinaryCl
         The ground truth labels of the data set
     labels_pred : np.ndarray
         The labels as predicted by a clustering algorithm
-    tree : BinaryClusterTree
+    tree : BinaryClusterTree | ArrayClusterTree
         The clustering tree
 
     Returns
@@ -27,15 +68,18 @@ def leaf_purity(labels_true: np.ndarray, labels_pred: np.ndarray, tree: BinaryCl
     Mautz, Dominik, Claudia Plant, and Christian Böhm. "Deepect: The deep embedded cluster tree."
     Data Science and Engineering 5 (2020): 419-432.
     """
-    leaf_nodes, _ = tree.get_leaf_and_split_nodes()
-    labels_pred_adj = -np.ones(labels_pred.shape[0])
-    for i, leaf_node in enumerate(leaf_nodes):
-        labels_pred_adj[np.isin(labels_pred, leaf_node.labels)] = i
+    labels_pred = _get_integral_labels(labels_pred)
+    tree = _get_array_cluster_tree(tree)
+    # Labels contained in the same leaf node are combined, labels that are not contained in the tree are set to -1
+    label_to_leaf = np.concatenate((tree.label_to_leaf, [-1]))
+    labels_pred_adj = label_to_leaf[np.where((labels_pred >= 0) & (labels_pred < tree.label_to_leaf.shape[0]),
+                                             labels_pred, -1)]
     leaf_purity = purity(labels_true, labels_pred_adj)
     return leaf_purity
 
 
-def dendrogram_purity(labels_true: np.ndarray, labels_pred: np.ndarray, tree: BinaryClusterTree) -> float:
+def dendrogram_purity(labels_true: np.ndarray, labels_pred: np.ndarray,
+                      tree: BinaryClusterTree | ArrayClusterTree) -> float:
     """
     Calculates the dendrogram purity of the tree.
 
@@ -45,7 +89,7 @@ def dendrogram_purity(labels_true: np.ndarray, labels_pred: np.ndarray, tree: Bi
         The ground truth labels of the data set
     labels_pred : np.ndarray
         The labels as predicted by a clustering algorithm
-    tree : BinaryClusterTree
+    tree : BinaryClusterTree | ArrayClusterTree
         The clustering tree
 
     Returns
@@ -63,25 +107,35 @@ def dendrogram_purity(labels_true: np.ndarray, labels_pred: np.ndarray, tree: Bi
     Kobren, Ari, et al. "A hierarchical algorithm for extreme clustering."
     Proceedings of the 23rd ACM SIGKDD international conference on knowledge discovery and data mining. 2017.
     """
-    cluster_ids_true, cluster_sizes_true = np.unique(labels_true, return_counts=True)
-    total_per_label_pairs_count = np.sum([cluster_size * (cluster_size - 1) / 2 for cluster_size in cluster_sizes_true])
+    labels_pred = _get_integral_labels(labels_pred)
+    true_clusters, pred_clusters, rows, cols, counts = _get_contingency_table(labels_true, labels_pred)
+    cluster_sizes_true = np.zeros(true_clusters.shape[0], dtype=np.int64)
+    np.add.at(cluster_sizes_true, rows, counts)
+    total_per_label_pairs_count = np.sum(cluster_sizes_true * (cluster_sizes_true - 1) / 2)
+    tree = _get_array_cluster_tree(tree)
+    for id_pred in pred_clusters:
+        assert 0 <= id_pred < tree.label_to_leaf.shape[0] and tree.label_to_leaf[
+            id_pred] != -1, "label {0} is not contained in the tree".format(id_pred)
+    leaf_of_pred_cluster = tree.label_to_leaf[pred_clusters]
+    # Bottom-up pass: number of objects of each ground truth cluster below each node
+    n_nodes = tree.parent.shape[0]
+    node_histograms = np.zeros((n_nodes, true_clusters.shape[0]), dtype=np.int64)
+    np.add.at(node_histograms, (leaf_of_pred_cluster[cols], rows), counts)
+    for node_index in range(n_nodes - 1, 0, -1):
+        # Children always have a larger index than their parents
+        node_histograms[tree.parent[node_index]] += node_histograms[node_index]
+    node_sizes = np.sum(node_histograms, axis=1)
+    # Cells of the contingency table are sorted by the ground truth cluster
+    class_borders = np.searchsorted(rows, np.arange(true_clusters.shape[0] + 1))
     purity_sum = 0
-    for id_true in cluster_ids_true:
-        points_in_true_cluster = (labels_true == id_true)
-        pred_labels_in_cluster, pred_labels_counts_in_cluster = np.unique(labels_pred[points_in_true_cluster],
-                                                                          return_counts=True)
-        for i, id_pred_1 in enumerate(pred_labels_in_cluster):
-            for j in range(i, len(pred_labels_counts_in_cluster)):
-                id_pred_2 = pred_labels_in_cluster[j]
-                if i == j:
-                    # Get all pairs with same cluster label
-                    occurrences_of_pair = pred_labels_counts_in_cluster[i] * (pred_labels_counts_in_cluster[i] - 1) / 2
-                else:
-                    # Get all pairs with different cluster label
-                    occurrences_of_pair = pred_labels_counts_in_cluster[i] * pred_labels_counts_in_cluster[j]
-                ancestor_labels = tree.get_least_common_ancestor(id_pred_1, id_pred_2).labels
-                contained_in_ancestor_labels = np.isin(labels_pred, ancestor_labels)
-                intersection_size = np.sum(contained_in_ancestor_labels & points_in_true_cluster)
-                purity_sum += occurrences_of_pair * (intersection_size / np.sum(contained_in_ancestor_labels))
+    for id_true in range(true_clusters.shape[0]):
+        counts_in_cluster = counts[class_borders[id_true]:class_borders[id_true + 1]]
+        labels_in_cluster = pred_clusters[cols[class_borders[id_true]:class_borders[id_true + 1]]]
+        # All pairs of predicted clusters (including pairs with the same cluster label)
+        i, j = np.triu_indices(counts_in_cluster.shape[0])
+        occurrences_of_pair = np.where(i == j, counts_in_cluster[i] * (counts_in_cluster[i] - 1) / 2,
+                                       counts_in_cluster[i] * counts_in_cluster[j])
+        ancestors = tree.get_least_common_ancestors(labels_in_cluster[i], labels_in_cluster[j])
+        purity_sum += np.sum(occurrences_of_pair * (node_histograms[ancestors, id_true] / node_sizes[ancestors]))
     dendrogram_purity = purity_sum / total_per_label_pairs_count
     return dendrogram_purity
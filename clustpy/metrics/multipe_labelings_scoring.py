@@ -1,11 +1,12 @@
 import numpy as np
 from clustpy.metrics.clustering_metrics import _check_number_of_points
 from clustpy.metrics.pair_counting_scores import PairCountingScores, _f1_score, _recall_score, _precision_score, \
-    _rand_score, _jaccard_score
+    _rand_score, _jaccard_score, _get_pair_counting_categories, _n_pairs
 from sklearn.metrics import normalized_mutual_info_score as nmi
 from clustpy.metrics.confusion_matrix import ConfusionMatrix, _plot_confusion_matrix
 from scipy.optimize import linear_sum_assignment
 from collections.abc import Callable
+from itertools import combinations
 
 """
 HELPERS
@@ -259,25 +260,47 @@ def _get_multiple_labelings_pair_counting_categories(labels_true: np.ndarray, la
     if remove_noise_spaces:
         labels_true = remove_noise_spaces_from_labels(labels_true)
         labels_pred = remove_noise_spaces_from_labels(labels_pred)
-    n_tp = 0
-    n_fp = 0
-    n_fn = 0
-    n_tn = 0
-    for i in range(labels_pred.shape[0] - 1):
-        for j in range(i + 1, labels_pred.shape[0]):
-            if _anywhere_same_cluster(labels_pred, i, j):
-                if _anywhere_same_cluster(labels_true, i, j):
-                    n_tp += 1
-                else:
-                    n_fp += 1
-            else:
-                if _anywhere_same_cluster(labels_true, i, j):
-                    n_fn += 1
-                else:
-                    n_tn += 1
+    if labels_true.shape[1] == 1 and labels_pred.shape[1] == 1:
+        # Only a single labeling on each side -> use the contingency table
+        return _get_pair_counting_categories(labels_true[:, 0], labels_pred[:, 0])
+    n_points = labels_true.shape[0]
+    # Number of pairs that share a cluster in any subspace of the prediction / the ground truth / any of both
+    n_anywhere_same_pred = _n_pairs_anywhere_same_cluster(labels_pred)
+    n_anywhere_same_true = _n_pairs_anywhere_same_cluster(labels_true)
+    n_anywhere_same_any = _n_pairs_anywhere_same_cluster(np.c_[labels_true, labels_pred])
+    n_tp = n_anywhere_same_pred + n_anywhere_same_true - n_anywhere_same_any
+    n_fp = n_anywhere_same_pred - n_tp
+    n_fn = n_anywhere_same_true - n_tp
+    n_tn = n_points * (n_points - 1) // 2 - n_anywhere_same_any
     return n_tp, n_fp, n_fn, n_tn
 
 
+def _n_pairs_anywhere_same_cluster(labels: np.ndarray) -> int:
+    """
+    Get the number of pairs of samples that share a cluster label in at least one subspace.
+    Uses the inclusion-exclusion principle over all non-empty subsets of subspaces.
+    For each subset, the number of pairs sharing the same joint label combination is obtained by grouping identical rows.
+    Therefore, the runtime is O(2^s * n log(n)) instead of O(n^2 * s), where s is the number of subspaces.
+
+    Parameters
+    ----------
+    labels : np.ndarray
+        The set of labelings
+
+    Returns
+    -------
+    n_pairs : int
+        The number of pairs that share a cluster label in at least one subspace
+    """
+    n_pairs = 0
+    for subset_size in range(1, labels.shape[1] + 1):
+        sign = 1 if subset_size % 2 == 1 else -1
+        for subset in combinations(range(labels.shape[1]), subset_size):
+            _, counts = np.unique(labels[:, subset], axis=0, return_counts=True)
+            n_pairs += sign * _n_pairs(counts)
+    return n_pairs
+
+
 def _anywhere_same_cluster(labels: np.ndarray, i: int, j: int) -> bool:
     """
     Check if the two samples i and j share a cluster label in any subspace.
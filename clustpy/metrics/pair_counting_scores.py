@@ -1,4 +1,5 @@
 from clustpy.metrics.clustering_metrics import _check_number_of_points
+from clustpy.metrics.confusion_matrix import _get_contingency_table
 import numpy as np
 
 """
@@ -314,9 +315,71 @@ def pc_f1_score(labels_true: np.ndarray, labels_pred: np.ndarray) -> float:
     return score
 
 
+def _n_pairs(counts: np.ndarray) -> int:
+    """
+    Get the total number of pairs that can be formed within each group (i.e., the sum of 'count choose 2').
+
+    Parameters
+    ----------
+    counts : np.ndarray
+        The number of objects within each group
+
+    Returns
+    -------
+    n_pairs : int
+        The total number of pairs
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    # Halve the even factor before multiplying to avoid overflows of count * (count - 1)
+    pairs = np.where(counts % 2 == 0, (counts // 2) * (counts - 1), counts * ((counts - 1) // 2))
+    n_pairs = int(np.sum(pairs))
+    return n_pairs
+
+
+def _get_pair_counting_categories_from_contingency_table(rows: np.ndarray, cols: np.ndarray,
+                                                         counts: np.ndarray) -> (int, int, int, int):
+    """
+    Get the number of 'true positives', 'false positives', 'false negatives' and 'true negatives' from a sparse contingency table.
+    The categories are obtained by combinatorial formulas, i.e., n_tp is the number of pairs within the cells, n_tp + n_fp the number of pairs within the predicted clusters (columns) and n_tp + n_fn the number of pairs within the ground truth clusters (rows).
+
+    Parameters
+    ----------
+    rows : np.ndarray
+        The row ids (ground truth clusters) of the non-empty cells
+    cols : np.ndarray
+        The column ids (predicted clusters) of the non-empty cells
+    counts : np.ndarray
+        The number of objects within each non-empty cell
+
+    Returns
+    -------
+    tuple : (int, int, int, int)
+        The number of true positives,
+        The number of false positives,
+        The number of false negatives,
+        The number of true negatives
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    n_points = int(np.sum(counts))
+    n_same_cell = _n_pairs(counts)
+    # Sum up the cells per column/row using integer arithmetic (bincount with weights would use float64)
+    pred_sizes = np.zeros(np.max(cols) + 1 if cols.shape[0] != 0 else 0, dtype=np.int64)
+    np.add.at(pred_sizes, cols, counts)
+    true_sizes = np.zeros(np.max(rows) + 1 if rows.shape[0] != 0 else 0, dtype=np.int64)
+    np.add.at(true_sizes, rows, counts)
+    n_same_pred = _n_pairs(pred_sizes)
+    n_same_true = _n_pairs(true_sizes)
+    n_tp = n_same_cell
+    n_fp = n_same_pred - n_same_cell
+    n_fn = n_same_true - n_same_cell
+    n_tn = n_points * (n_points - 1) // 2 - n_tp - n_fp - n_fn
+    return n_tp, n_fp, n_fn, n_tn
+
+
 def _get_pair_counting_categories(labels_true: np.ndarray, labels_pred: np.ndarray) -> (int, int, int, int):
     """
     Get the number of 'true positives', 'false positives', 'false negatives' and 'true negatives' to calculate pair-counting scores.
+    The categories are derived from the contingency table of the labels, resulting in a runtime of O(n + k_true * k_pred) instead of O(n^2).
 
     Parameters
     ----------
@@ -336,15 +399,8 @@ def _get_pair_counting_categories(labels_true: np.ndarray, labels_pred: np.ndarr
     _check_number_of_points(labels_true, labels_pred)
     if labels_true.ndim != 1 or labels_pred.ndim != 1:
         raise Exception("labels_true and labels_pred labels should just contain a single column.")
-    n_tp = 0
-    n_fp = 0
-    n_fn = 0
-    n_tn = 0
-    for i in range(labels_pred.shape[0] - 1):
-        n_tp += np.sum((labels_pred[i] == labels_pred[i + 1:]) & (labels_true[i] == labels_true[i + 1:]))
-        n_fp += np.sum((labels_pred[i] == labels_pred[i + 1:]) & (labels_true[i] != labels_true[i + 1:]))
-        n_fn += np.sum((labels_pred[i] != labels_pred[i + 1:]) & (labels_true[i] == labels_true[i + 1:]))
-        n_tn += np.sum((labels_pred[i] != labels_pred[i + 1:]) & (labels_true[i] != labels_true[i + 1:]))
+    _, _, rows, cols, counts = _get_contingency_table(labels_true, labels_pred)
+    n_tp, n_fp, n_fn, n_tn = _get_pair_counting_categories_from_contingency_table(rows, cols, counts)
     return n_tp, n_fp, n_fn, n_tn
 
 
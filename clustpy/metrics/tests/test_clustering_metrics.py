@@ -1,9 +1,10 @@
 import numpy as np
 from clustpy.metrics import unsupervised_clustering_accuracy, variation_of_information, \
-    information_theoretic_external_cluster_validity_measure, fair_normalized_mutual_information, purity
+    information_theoretic_external_cluster_validity_measure, fair_normalized_mutual_information, purity, \
+    contingency_table_cache
 from clustpy.metrics.clustering_metrics import _check_number_of_points
 import pytest
-from sklearn.metrics import normalized_mutual_info_score as nmi
+from sklearn.metrics import normalized_mutual_info_score as nmi, mutual_info_score
 
 
 def test_check_number_of_points():
@@ -38,6 +39,62 @@ def test_variation_of_information():
     l1 = np.array([1, 1, 1, 1, 0, 0, 0, 0])
     l2 = np.array([0, 0, 1, 1, 1, 1, 1, 1])
     assert np.isclose(variation_of_information(l1, l2), 0.82395922)
+    # Compare with sklearn's mutual information: VI = H(true) + H(pred) - 2 * MI
+    random_state = np.random.RandomState(1)
+    l1 = random_state.randint(-1, 6, 500)
+    l2 = random_state.randint(0, 9, 500)
+    _, counts_1 = np.unique(l1, return_counts=True)
+    _, counts_2 = np.unique(l2, return_counts=True)
+    entropy_1 = -np.sum(counts_1 / 500 * np.log(counts_1 / 500))
+    entropy_2 = -np.sum(counts_2 / 500 * np.log(counts_2 / 500))
+    assert np.isclose(variation_of_information(l1, l2), entropy_1 + entropy_2 - 2 * mutual_info_score(l1, l2))
+
+
+def test_contingency_table_cache():
+    l1 = np.array([0, 0, 1, 1, 2, 2, 3, 3, 4, 4])
+    l2 = np.array([0, 0, 1, 1, 1, 2, 3, 3, 4, 4])
+    acc = unsupervised_clustering_accuracy(l1, l2)
+    vi = variation_of_information(l1, l2)
+    pur = purity(l1, l2)
+    with contingency_table_cache() as cache:
+        assert unsupervised_clustering_accuracy(l1, l2) == acc
+        assert len(cache) == 1
+        assert variation_of_information(l1, l2) == vi
+        assert purity(l1, l2) == pur
+        assert len(cache) == 1
+        # Different labels result in a new table
+        assert variation_of_information(l2, l1) == vi
+        assert len(cache) == 2
+    assert len(cache) == 2
+    # Cache is only used within the context
+    with contingency_table_cache() as cache:
+        assert len(cache) == 0
+
+
+def test_contingency_table_cache_multiple_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    from threading import Barrier
+    random_state = np.random.RandomState(1)
+    labels = [(random_state.randint(0, 5, 100), random_state.randint(0, 5, 100)) for _ in range(4)]
+    barrier = Barrier(4)
+
+    def _evaluate(labels_pair):
+        with contingency_table_cache() as cache:
+            # All threads are within their context at the same time
+            barrier.wait()
+            vi = variation_of_information(*labels_pair)
+            barrier.wait()
+            assert len(cache) == 1
+        return vi
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(_evaluate, labels))
+    assert results == [variation_of_information(*labels_pair) for labels_pair in labels]
+    # A context in another thread does not affect the current thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with contingency_table_cache() as cache:
+            executor.submit(variation_of_information, *labels[0]).result()
+            assert len(cache) == 0
 
 
 def test_information_theoretic_external_cluster_validity_measure():
@@ -1,6 +1,6 @@
 import numpy as np
 from clustpy.metrics import ConfusionMatrix
-from clustpy.metrics.confusion_matrix import _rearrange
+from clustpy.metrics.confusion_matrix import _rearrange, _get_contingency_table
 from unittest.mock import patch
 
 
@@ -37,6 +37,18 @@ def test_rearrange():
                                                                  [0, 5, 5, 35]]))
 
 
+def test_get_contingency_table():
+    labels_true = np.array([3, 3, 1, 1, 1, -1, 3])
+    labels_pred = np.array([0, 5, 5, 5, 0, 0, 0])
+    true_clusters, pred_clusters, rows, cols, counts = _get_contingency_table(labels_true, labels_pred)
+    assert np.array_equal(true_clusters, [-1, 1, 3])
+    assert np.array_equal(pred_clusters, [0, 5])
+    assert np.array_equal(rows, [0, 1, 1, 2, 2])
+    assert np.array_equal(cols, [0, 0, 1, 0, 1])
+    assert np.array_equal(counts, [1, 1, 2, 2, 1])
+    assert counts.dtype == np.int64
+
+
 """
 Tests regarding the ConfusionMatrix object
 """
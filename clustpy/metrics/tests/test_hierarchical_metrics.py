@@ -1,6 +1,7 @@
 from clustpy.metrics import dendrogram_purity, leaf_purity
-from clustpy.hierarchical._cluster_tree import BinaryClusterTree
+from clustpy.hierarchical._cluster_tree import BinaryClusterTree, ArrayClusterTree
 import numpy as np
+import pytest
 
 
 def test_leaf_purity():
@@ -46,3 +47,35 @@ def test_dendrogram_purity():
     assert np.isclose(dendrogram_purity(l1, l2, bct), 1 / 5)
     l2 = np.array([0, 0, 0, 1, 1, 1, 2, 2, 2, 0, 0, 0, 3, 3, 3])
     assert np.isclose(dendrogram_purity(l1, l2, bct), (3 * 3 * 1 + 2 * 3 * 0.5) / 15)
+
+
+def test_hierarchical_metrics_with_array_cluster_tree():
+    bct = BinaryClusterTree()
+    random_state = np.random.RandomState(1)
+    for new_cluster_id in range(1, 10):
+        bct.split_cluster(random_state.randint(0, new_cluster_id))
+    act = ArrayClusterTree.from_binary_cluster_tree(bct)
+    l1 = random_state.randint(0, 4, 100)
+    l2 = random_state.randint(0, 10, 100)
+    assert leaf_purity(l1, l2, bct) == leaf_purity(l1, l2, act)
+    assert dendrogram_purity(l1, l2, bct) == dendrogram_purity(l1, l2, act)
+
+
+def test_hierarchical_metrics_with_float_labels():
+    bct = BinaryClusterTree()
+    bct.split_cluster(0)
+    bct.split_cluster(0)
+    bct.split_cluster(0)
+    bct.split_cluster(1)
+    bct.split_cluster(1)
+    l1 = np.array([0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 4])
+    l2 = np.array([0, 0, 0, 1, 1, 1, 2, 2, 2, 0, 0, 0, 3, 3, 3])
+    l2_float = l2.astype(np.float64)
+    assert leaf_purity(l1, l2_float, bct) == leaf_purity(l1, l2, bct)
+    assert dendrogram_purity(l1, l2_float, bct) == dendrogram_purity(l1, l2, bct)
+    # Labels that are not integral can not be mapped to the tree
+    l2_float[0] = 0.5
+    with pytest.raises(AssertionError):
+        leaf_purity(l1, l2_float, bct)
+    with pytest.raises(AssertionError):
+        dendrogram_purity(l1, l2_float, bct)
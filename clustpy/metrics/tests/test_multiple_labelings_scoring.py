@@ -2,7 +2,8 @@ from clustpy.metrics import remove_noise_spaces_from_labels, MultipleLabelingsPa
     MultipleLabelingsConfusionMatrix, multiple_labelings_pc_f1_score, multiple_labelings_pc_jaccard_score, \
     multiple_labelings_pc_precision_score, multiple_labelings_pc_rand_score, multiple_labelings_pc_recall_score, \
     is_multi_labelings_n_clusters_correct
-from clustpy.metrics.multipe_labelings_scoring import _anywhere_same_cluster
+from clustpy.metrics.multipe_labelings_scoring import _anywhere_same_cluster, \
+    _get_multiple_labelings_pair_counting_categories
 import numpy as np
 from unittest.mock import patch
 
@@ -32,6 +33,23 @@ def test_anywhere_same_cluster():
     assert _anywhere_same_cluster(labels, 0, 2) == True
 
 
+def test_get_multiple_labelings_pair_counting_categories():
+    random_state = np.random.RandomState(1)
+    labels_true = np.c_[random_state.randint(0, 3, 60), random_state.randint(-1, 4, 60)]
+    labels_pred = np.c_[random_state.randint(0, 2, 60), random_state.randint(0, 5, 60), random_state.randint(0, 6, 60)]
+    # Compare with naive pair-counting
+    n_tp, n_fp, n_fn, n_tn = 0, 0, 0, 0
+    for i in range(59):
+        for j in range(i + 1, 60):
+            same_true = _anywhere_same_cluster(labels_true, i, j)
+            same_pred = _anywhere_same_cluster(labels_pred, i, j)
+            n_tp += same_true and same_pred
+            n_fp += not same_true and same_pred
+            n_fn += same_true and not same_pred
+            n_tn += not same_true and not same_pred
+    assert _get_multiple_labelings_pair_counting_categories(labels_true, labels_pred, False) == (n_tp, n_fp, n_fn, n_tn)
+
+
 def test_MultipleLabelingsPairCountingScores():
     labels_true = np.array(
         [[0, 0, 0, 1, 1, 1, 2, 2, 2],
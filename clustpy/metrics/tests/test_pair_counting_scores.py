@@ -1,5 +1,7 @@
 from clustpy.metrics import PairCountingScores, pc_jaccard_score, pc_rand_score, pc_precision_score, pc_recall_score, \
     pc_f1_score
+from clustpy.metrics.pair_counting_scores import _get_pair_counting_categories, \
+    _get_pair_counting_categories_from_contingency_table
 import numpy as np
 
 
@@ -22,3 +24,25 @@ def testPairCountingScores():
     assert pcs.recall() == pc_recall_score(labels_true, labels_pred)
     assert pcs.f1() == 2 * (7 / 16) * (7 / 9) / ((7 / 16) + (7 / 9))
     assert pcs.f1() == pc_f1_score(labels_true, labels_pred)
+
+
+def test_get_pair_counting_categories():
+    random_state = np.random.RandomState(1)
+    labels_true = random_state.randint(-1, 5, 200)
+    labels_pred = random_state.randint(0, 8, 200)
+    # Compare with naive pair-counting
+    same_true = labels_true[:, None] == labels_true[None, :]
+    same_pred = labels_pred[:, None] == labels_pred[None, :]
+    upper = np.triu(np.ones((200, 200), dtype=bool), 1)
+    n_tp, n_fp, n_fn, n_tn = _get_pair_counting_categories(labels_true, labels_pred)
+    assert n_tp == np.sum(same_pred & same_true & upper)
+    assert n_fp == np.sum(same_pred & ~same_true & upper)
+    assert n_fn == np.sum(~same_pred & same_true & upper)
+    assert n_tn == np.sum(~same_pred & ~same_true & upper)
+    # Counts should not overflow for very large data sets
+    n_tp, n_fp, n_fn, n_tn = _get_pair_counting_categories_from_contingency_table(np.array([0, 1]), np.array([0, 0]),
+                                                                                  np.array([3 * 10 ** 9, 10 ** 9]))
+    assert n_tp == 3 * 10 ** 9 * (3 * 10 ** 9 - 1) // 2 + 10 ** 9 * (10 ** 9 - 1) // 2
+    assert n_fp == 3 * 10 ** 18
+    assert n_fn == 0
+    assert n_tn == 0
@@ -4,7 +4,7 @@ Benjamin Schelling and Sam Maurus (original R implementation),
 Collin Leiber
 """
 
-from clustpy.utils import dip_test, dip_gradient
+from clustpy.utils import dip_test, dip_test_batch, dip_executor_map, dip_gradient
 import numpy as np
 from sklearn.cluster import KMeans
 from sklearn.base import BaseEstimator, ClusterMixin, TransformerMixin
@@ -12,7 +12,7 @@ from sklearn.utils import check_random_state
 
 
 def _dip_ext(X: np.ndarray, n_components: int, do_dip_scaling: bool, step_size: float, momentum: float,
-             dip_threshold: float, n_starting_vectors: int, ambiguous_triangle_strategy: str,
+             dip_threshold: float, n_starting_vectors: int, ambiguous_triangle_strategy: str, n_jobs: int,
              random_state: np.random.RandomState) -> (np.ndarray, np.ndarray, list, np.ndarray):
     """
     Start the actual DipExt dimensionality-reduction procedure on the input data set.
@@ -37,6 +37,8 @@ def _dip_ext(X: np.ndarray, n_components: int, do_dip_scaling: bool, step_size:
         The strategy with which to handle an ambiguous modal triangle. Can be 'ignore', 'random' or 'all'.
         In the case of 'random', a valid triangle is created at random.
         In the case of 'all', for each possible triangle the gradient is calculated and it is checked for which gradient the following result looks most promising - this strategy can increase the runtime noticeably
+    n_jobs : int
+        Number of threads used to calculate dip-values and to perform gradient descent from the different starting vectors
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution. Only used if ambiguous_triangle_strategy is 'random'
 
@@ -65,7 +67,7 @@ def _dip_ext(X: np.ndarray, n_components: int, do_dip_scaling: bool, step_size:
     while True:
         dip_value, projection, projected_data = _find_max_dip_by_sgd(remaining_X, step_size, momentum,
                                                                      n_starting_vectors, ambiguous_triangle_strategy,
-                                                                     random_state)
+                                                                     n_jobs, random_state)
         if dip_value < max_dip * dip_threshold and n_components is None:
             break
         # Always use the highest dip value
@@ -89,7 +91,7 @@ def _dip_ext(X: np.ndarray, n_components: int, do_dip_scaling: bool, step_size:
 
 
 def _find_max_dip_by_sgd(X: np.ndarray, step_size: float, momentum: float, n_starting_vectors: int,
-                         ambiguous_triangle_strategy: str, random_state: np.random.RandomState) -> (
+                         ambiguous_triangle_strategy: str, n_jobs: int, random_state: np.random.RandomState) -> (
         float, np.ndarray, np.ndarray):
     """
     Find the axes with n_starting_vectors highest dip-values and start gradient descent from there.
@@ -108,6 +110,8 @@ def _find_max_dip_by_sgd(X: np.ndarray, step_size: float, momentum: float, n_sta
         The strategy with which to handle an ambiguous modal triangle. Can be 'ignore', 'random' or 'all'.
         In the case of 'random', a valid triangle is created at random.
         In the case of 'all', for each possible triangle the gradient is calculated and it is checked for which gradient the following result looks most promising - this strategy can increase the runtime noticeably
+    n_jobs : int
+        Number of threads used to calculate dip-values and to perform gradient descent from the different starting vectors
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution. Only used if ambiguous_triangle_strategy is 'random'
 
@@ -119,7 +123,7 @@ def _find_max_dip_by_sgd(X: np.ndarray, step_size: float, momentum: float, n_sta
         The data set projected onto this projection axis
     """
     # Get dip-value of each axis
-    axis_dips = [dip_test(X[:, i], just_dip=True, is_data_sorted=False) for i in range(X.shape[1])]
+    axis_dips = dip_test_batch(X, axis=0, just_dip=True, is_data_sorted=False, n_jobs=n_jobs)
     if X.shape[1] == 1:
         return axis_dips[0], np.array([1]), X
     # Sort axes by dip-values
@@ -130,13 +134,15 @@ def _find_max_dip_by_sgd(X: np.ndarray, step_size: float, momentum: float, n_sta
     best_projected_data = X[:, dips_argsorted[0]]
     # Start from n_starting_vectors features (max is current total number of features)
     n_starting_vectors = min(n_starting_vectors, X.shape[1])
-    for i in range(n_starting_vectors):
-        # Initial projection vector
-        start_projection = np.zeros(X.shape[1])
-        start_projection[dips_argsorted[i]] = 1
-        dip_value, projection, projected_data = _find_max_dip_by_sgd_with_start(X, start_projection, step_size,
-                                                                                momentum, ambiguous_triangle_strategy,
-                                                                                random_state)
+    # Initial projection vectors
+    start_projections = np.zeros((n_starting_vectors, X.shape[1]))
+    start_projections[np.arange(n_starting_vectors), dips_argsorted[:n_starting_vectors]] = 1
+    # Gradient descents are independent. If triangles are created at random, they run sequentially (reproducibility)
+    sgd_results = dip_executor_map(
+        lambda start_projection: _find_max_dip_by_sgd_with_start(X, start_projection, step_size, momentum,
+                                                                 ambiguous_triangle_strategy, random_state),
+        start_projections, 1 if ambiguous_triangle_strategy == "random" else n_jobs)
+    for dip_value, projection, projected_data in sgd_results:
         if dip_value > max_dip:
             max_dip = dip_value
             best_projection = projection
@@ -580,6 +586,9 @@ class DipExt(TransformerMixin, BaseEstimator):
         In the case of 'all', for each possible triangle the gradient is calculated and it is checked for which gradient the following result looks most promising - this strategy can increase the runtime noticeably (default: 'ignore')
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int. Only used if ambiguous_triangle_strategy is 'random' (default: None)
+    n_jobs : int
+        Number of threads used to calculate dip-values and to perform gradient descent from the different starting vectors.
+        None means 1 and -1 means using all processors. Gradient descent always runs sequentially if ambiguous_triangle_strategy is 'random' (default: None)
 
     Attributes
     ----------
@@ -598,7 +607,8 @@ class DipExt(TransformerMixin, BaseEstimator):
 
     def __init__(self, n_components: int = None, do_dip_scaling: bool = True, step_size: float = 0.1,
                  momentum: float = 0.95, dip_threshold: float = 0.5, n_starting_vectors: int = None,
-                 ambiguous_triangle_strategy: str = "ignore", random_state: np.random.RandomState | int = None):
+                 ambiguous_triangle_strategy: str = "ignore", random_state: np.random.RandomState | int = None,
+                 n_jobs: int = None):
         self.n_components = n_components
         self.do_dip_scaling = do_dip_scaling
         self.step_size = step_size
@@ -607,6 +617,7 @@ class DipExt(TransformerMixin, BaseEstimator):
         self.n_starting_vectors = n_starting_vectors
         self.ambiguous_triangle_strategy = ambiguous_triangle_strategy
         self.random_state = check_random_state(random_state)
+        self.n_jobs = n_jobs
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'DipExt':
         """
@@ -667,7 +678,7 @@ class DipExt(TransformerMixin, BaseEstimator):
         subspace, dip_values, projections, argsorted_dip = _dip_ext(X, self.n_components, self.do_dip_scaling,
                                                                     self.step_size, self.momentum, self.dip_threshold,
                                                                     self.n_starting_vectors,
-                                                                    self.ambiguous_triangle_strategy,
+                                                                    self.ambiguous_triangle_strategy, self.n_jobs,
                                                                     self.random_state)
         self.n_components = len(dip_values)
         self.dip_values_ = dip_values
@@ -707,6 +718,9 @@ class DipInit(DipExt, BaseEstimator, ClusterMixin):
         In the case of 'all', for each possible triangle the gradient is calculated and it is checked for which gradient the following result looks most promising - this strategy can increase the runtime noticeably (default: 'ignore')
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int. Only used if ambiguous_triangle_strategy is 'random' (default: None)
+    n_jobs : int
+        Number of threads used to calculate dip-values and to perform gradient descent from the different starting vectors.
+        None means 1 and -1 means using all processors. Gradient descent always runs sequentially if ambiguous_triangle_strategy is 'random' (default: None)
 
     Attributes
     ----------
@@ -723,9 +737,10 @@ class DipInit(DipExt, BaseEstimator, ClusterMixin):
 
     def __init__(self, n_clusters: int, n_components: int = None, do_dip_scaling: bool = True, step_size: float = 0.1,
                  momentum: float = 0.95, dip_threshold: float = 0.5, n_starting_vectors: int = None,
-                 ambiguous_triangle_strategy: str = "ignore", random_state: np.random.RandomState | int = None):
+                 ambiguous_triangle_strategy: str = "ignore", random_state: np.random.RandomState | int = None,
+                 n_jobs: int = None):
         super().__init__(n_components, do_dip_scaling, step_size, momentum, dip_threshold, n_starting_vectors,
-                         ambiguous_triangle_strategy, random_state)
+                         ambiguous_triangle_strategy, random_state, n_jobs)
         self.n_clusters = n_clusters
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'DipInit':
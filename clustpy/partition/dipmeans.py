@@ -4,16 +4,60 @@ Collin Leiber
 """
 
 import numpy as np
-from scipy.spatial.distance import pdist, squareform
-from clustpy.utils import dip_test, dip_pval, dip_boot_samples
+from scipy.spatial.distance import pdist, squareform, cdist
+from clustpy.utils import dip_test_batch, dip_pval, dip_boot_samples, dip_boot_samples_cached
+from clustpy.utils.diptest import DIP_BOOT_CACHE_DEFAULT_SEED
 from clustpy.partition.xmeans import _initial_kmeans_clusters, _execute_two_means
 from sklearn.base import BaseEstimator, ClusterMixin
 from sklearn.utils import check_random_state
 
 
+def _get_split_viewer_dips(X: np.ndarray, ids_in_cluster: np.ndarray, ids_of_viewers: np.ndarray,
+                           data_dist_matrix: np.ndarray, n_jobs: int, block_size: int = 2 ** 22) -> np.ndarray:
+    """
+    Calculate the dip-values of the distances of each viewer to all points in its cluster.
+    If data_dist_matrix is None, the distances will be calculated in blocks of consecutive viewers, so that each block contains at most block_size distances.
+    Each block is directly passed to the batched dip-test, therefore, the complete distance matrix is never held in memory.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    ids_in_cluster : np.ndarray
+        The ids of the points in the cluster
+    ids_of_viewers : np.ndarray
+        The ids of the points that act as viewers (must be a subset of ids_in_cluster)
+    data_dist_matrix : np.ndarray
+        The pairwise distances of all points in the data set. Can be None
+    n_jobs : int
+        Number of threads used to calculate the dip-values. None means 1 and -1 means using all processors
+    block_size : int
+        Maximum number of distances contained in a single block (default: 2**22)
+
+    Returns
+    -------
+    cluster_dips : np.ndarray
+        The dip-value of each viewer
+    """
+    if data_dist_matrix is not None:
+        cluster_dist_matrix = data_dist_matrix[np.ix_(ids_of_viewers, ids_in_cluster)]
+        cluster_dips = dip_test_batch(cluster_dist_matrix, axis=1, just_dip=True, is_data_sorted=False, n_jobs=n_jobs)
+    else:
+        cluster_dips = np.zeros(ids_of_viewers.shape[0])
+        X_cluster = X[ids_in_cluster]
+        n_rows_per_block = max(1, block_size // ids_in_cluster.shape[0])
+        for start in range(0, ids_of_viewers.shape[0], n_rows_per_block):
+            ids_in_block = ids_of_viewers[start:start + n_rows_per_block]
+            cluster_dist_block = cdist(X[ids_in_block], X_cluster, 'euclidean')
+            cluster_dips[start:start + n_rows_per_block] = dip_test_batch(cluster_dist_block, axis=1, just_dip=True,
+                                                                          is_data_sorted=False, n_jobs=n_jobs)
+    return cluster_dips
+
+
 def _dipmeans(X: np.ndarray, significance: float, split_viewers_threshold: float, pval_strategy: str, n_boots: int,
-              n_split_trials: int, n_clusters_init: int, max_n_clusters: int, random_state: np.random.RandomState) -> (
-        int, np.ndarray, np.ndarray):
+              n_split_trials: int, n_clusters_init: int, max_n_clusters: int, n_jobs: int,
+              random_state: np.random.RandomState, low_memory: bool = False,
+              max_n_viewers: int = None) -> (int, np.ndarray, np.ndarray):
     """
     Start the actual DipMeans clustering procedure on the input data set.
 
@@ -26,17 +70,23 @@ def _dipmeans(X: np.ndarray, significance: float, split_viewers_threshold: float
     split_viewers_threshold : float
         Threshold to decide whether a cluster has a unimodal or multimodal structure. Must be within [0, 1]
     pval_strategy : str
-        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap'
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function', 'bootstrap' and 'cached_bootstrap'
     n_boots : int
-        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap'
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' or 'cached_bootstrap'
     n_split_trials : int
         Number tries to split a cluster. For each try 2-KMeans is executed with different cluster centers
     n_clusters_init : int
         The initial number of clusters. Can also by of type np.ndarray if initial cluster centers are specified
     max_n_clusters : int
         Maximum number of clusters. Must be larger than n_clusters_init
+    n_jobs : int
+        Number of threads used to calculate the dip-values. None means 1 and -1 means using all processors
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    low_memory : bool
+        If True, the distances will not be stored in a full distance matrix but calculated in blocks for each cluster (default: False)
+    max_n_viewers : int
+        Maximum number of randomly selected viewers per cluster. If None, all points of a cluster are used as viewers (default: None)
 
     Returns
     -------
@@ -47,8 +97,9 @@ def _dipmeans(X: np.ndarray, significance: float, split_viewers_threshold: float
     """
     assert max_n_clusters >= n_clusters_init, "max_n_clusters can not be smaller than n_clusters_init"
     assert significance >= 0 and significance <= 1, "significance must be a value in the range [0, 1]"
+    assert max_n_viewers is None or max_n_viewers > 0, "max_n_viewers must be None or larger than 0"
     # Calculate distance matrix
-    data_dist_matrix = squareform(pdist(X, 'euclidean'))
+    data_dist_matrix = None if low_memory else squareform(pdist(X, 'euclidean'))
     # Initialize parameters
     n_clusters, labels, centers, _ = _initial_kmeans_clusters(X, n_clusters_init, random_state)
     while n_clusters <= max_n_clusters:
@@ -57,23 +108,30 @@ def _dipmeans(X: np.ndarray, significance: float, split_viewers_threshold: float
         ids_in_each_cluster = [np.where(labels == c)[0] for c in range(n_clusters)]
         for c in range(n_clusters):
             ids_in_cluster = ids_in_each_cluster[c]
-            # Get pairwise distances of points in cluster
-            cluster_dist_matrix = data_dist_matrix[np.ix_(ids_in_cluster, ids_in_cluster)]
-            # Calculate dip values for the distances of each point
-            cluster_dips = np.array([dip_test(cluster_dist_matrix[p, :], just_dip=True, is_data_sorted=False) for p in
-                                     range(ids_in_cluster.shape[0])])
+            # Get viewers (only a random subset of the points if max_n_viewers is specified)
+            if max_n_viewers is not None and ids_in_cluster.shape[0] > max_n_viewers:
+                ids_of_viewers = np.sort(random_state.choice(ids_in_cluster, max_n_viewers, replace=False))
+            else:
+                ids_of_viewers = ids_in_cluster
+            # Calculate dip values for the distances of each viewer to the points in the cluster
+            cluster_dips = _get_split_viewer_dips(X, ids_in_cluster, ids_of_viewers, data_dist_matrix, n_jobs)
             # Calculate p-values
-            if pval_strategy == "bootstrap":
+            if pval_strategy in ["bootstrap", "cached_bootstrap"]:
                 # Bootstrap values here so it is not needed for each pval separately
-                boot_dips = dip_boot_samples(ids_in_cluster.shape[0], n_boots, random_state)
+                if pval_strategy == "bootstrap":
+                    boot_dips = dip_boot_samples(ids_in_cluster.shape[0], n_boots, random_state)
+                else:
+                    boot_dips = dip_boot_samples_cached(ids_in_cluster.shape[0], n_boots,
+                                                        DIP_BOOT_CACHE_DEFAULT_SEED)
                 cluster_pvals = np.array([np.mean(point_dip <= boot_dips) for point_dip in cluster_dips])
             else:
                 cluster_pvals = np.array([dip_pval(point_dip, ids_in_cluster.shape[0], pval_strategy=pval_strategy,
-                                                   random_state=random_state) for point_dip in cluster_dips])
+                                                   n_boots=n_boots, random_state=random_state) for point_dip in
+                                          cluster_dips])
             # Get split viewers (points with dip-p-value of < significance)
             split_viewers = cluster_dips[cluster_pvals < significance]
             # Check if percentage share of split viewers in cluster is larger than threshold
-            if split_viewers.shape[0] / ids_in_cluster.shape[0] > split_viewers_threshold:
+            if split_viewers.shape[0] / ids_of_viewers.shape[0] > split_viewers_threshold:
                 # Calculate cluster score
                 cluster_scores[c] = np.mean(split_viewers)
         # Get cluster with maximum score
@@ -98,6 +156,12 @@ class DipMeans(BaseEstimator, ClusterMixin):
     If that amount of so called split viewers is above the split_viewers_threshold, the cluster will be split using 2-Means.
     The algorithm terminates if all clusters show a unimdoal behaviour.
 
+    For large data sets, low_memory should be True, so that the pairwise distances are computed in blocks for each cluster instead of storing the full distance matrix.
+    Furthermore, max_n_viewers can be used to test only a random subset of viewers per cluster.
+    Since the viewers are drawn uniformly at random, the share of split viewers is an unbiased estimate.
+    By Hoeffding's inequality, the probability that it deviates from the actual share by more than eps is at most 2 * exp(-2 * max_n_viewers * eps^2),
+    e.g., max_n_viewers = 5000 results in a deviation of at most 0.02 with a probability of more than 0.96.
+
     Parameters
     ----------
     significance : float
@@ -105,9 +169,9 @@ class DipMeans(BaseEstimator, ClusterMixin):
     split_viewers_threshold : float
         Threshold to decide whether a cluster has a unimodal or multimodal structure. Must be within [0, 1] (default: 0.01)
     pval_strategy : str
-        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap' (default: 'table')
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function', 'bootstrap' and 'cached_bootstrap' (default: 'table')
     n_boots : int
-        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' (default: 1000)
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' or 'cached_bootstrap' (default: 1000)
     n_split_trials : int
         Number tries to split a cluster. For each try 2-KMeans is executed with different cluster centers (default: 10)
     n_clusters_init : int
@@ -116,6 +180,12 @@ class DipMeans(BaseEstimator, ClusterMixin):
         Maximum number of clusters. Must be larger than n_clusters_init (default: np.inf)
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    n_jobs : int
+        Number of threads used to calculate the dip-values. None means 1 and -1 means using all processors (default: None)
+    low_memory : bool
+        If True, the distances will not be stored in a full distance matrix but calculated in blocks for each cluster (default: False)
+    max_n_viewers : int
+        Maximum number of randomly selected viewers per cluster. If None, all points of a cluster are used as viewers (default: None)
 
     Attributes
     ----------
@@ -134,7 +204,8 @@ class DipMeans(BaseEstimator, ClusterMixin):
 
     def __init__(self, significance: float = 0.001, split_viewers_threshold: float = 0.01,
                  pval_strategy: str = "table", n_boots: int = 1000, n_split_trials: int = 10, n_clusters_init: int = 1,
-                 max_n_clusters: int = np.inf, random_state: np.random.RandomState | int = None):
+                 max_n_clusters: int = np.inf, random_state: np.random.RandomState | int = None, n_jobs: int = None,
+                 low_memory: bool = False, max_n_viewers: int = None):
         self.significance = significance
         self.split_viewers_threshold = split_viewers_threshold
         self.pval_strategy = pval_strategy
@@ -142,7 +213,10 @@ class DipMeans(BaseEstimator, ClusterMixin):
         self.n_split_trials = n_split_trials
         self.n_clusters_init = n_clusters_init
         self.max_n_clusters = max_n_clusters
+        self.n_jobs = n_jobs
         self.random_state = check_random_state(random_state)
+        self.low_memory = low_memory
+        self.max_n_viewers = max_n_viewers
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'DipMeans':
         """
@@ -163,7 +237,8 @@ class DipMeans(BaseEstimator, ClusterMixin):
         """
         n_clusters, labels, centers = _dipmeans(X, self.significance, self.split_viewers_threshold,
                                                 self.pval_strategy, self.n_boots, self.n_split_trials,
-                                                self.n_clusters_init, self.max_n_clusters, self.random_state)
+                                                self.n_clusters_init, self.max_n_clusters, self.n_jobs,
+                                                self.random_state, self.low_memory, self.max_n_viewers)
         self.n_clusters_ = n_clusters
         self.labels_ = labels
         self.cluster_centers_ = centers
@@ -5,14 +5,14 @@ Collin Leiber
 
 import numpy as np
 from sklearn.decomposition import PCA
-from clustpy.utils import dip_test, dip_pval
+from clustpy.utils import dip_test_batch, dip_pval
 from sklearn.base import BaseEstimator, ClusterMixin
 from sklearn.utils import check_random_state
 from clustpy.partition.xmeans import _initial_kmeans_clusters, _execute_two_means
 
 
 def _proj_dipmeans(X: np.ndarray, significance: float, n_random_projections: int, pval_strategy: str, n_boots: int,
-                   n_split_trials: int, n_clusters_init: int, max_n_clusters: int,
+                   n_split_trials: int, n_clusters_init: int, max_n_clusters: int, n_jobs: int,
                    random_state: np.random.RandomState) -> (int, np.ndarray, np.ndarray):
     """
     Start the actual ProjectedDipMeans clustering procedure on the input data set.
@@ -26,15 +26,17 @@ def _proj_dipmeans(X: np.ndarray, significance: float, n_random_projections: int
     n_random_projections : int
         Number of random projections that should be applied in addition to the projections from PCA
     pval_strategy : str
-        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap'
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function', 'bootstrap' and 'cached_bootstrap'
     n_boots : int
-        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap'
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' or 'cached_bootstrap'
     n_split_trials : int
         Number tries to split a cluster. For each try 2-KMeans is executed with different cluster centers
     n_clusters_init : int
         The initial number of clusters. Can also by of type np.ndarray if initial cluster centers are specified
     max_n_clusters : int
         Maximum number of clusters. Must be larger than n_clusters_init
+    n_jobs : int
+        Number of threads used to calculate the dip-values. None means 1 and -1 means using all processors
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
 
@@ -59,8 +61,7 @@ def _proj_dipmeans(X: np.ndarray, significance: float, n_random_projections: int
             # Get projections
             projected_data = _get_projected_data(X[ids_in_cluster], n_random_projections, random_state)
             # Calculate dip values for the distances of each point
-            cluster_dips = np.array([dip_test(projected_data[:, p], just_dip=True, is_data_sorted=False) for p in
-                                     range(projected_data.shape[1])])
+            cluster_dips = dip_test_batch(projected_data, axis=0, just_dip=True, is_data_sorted=False, n_jobs=n_jobs)
             # Calculate p-values of maximum dip
             pval = dip_pval(np.max(cluster_dips), ids_in_cluster.shape[0], pval_strategy=pval_strategy, n_boots=n_boots,
                             random_state=random_state)
@@ -126,9 +127,9 @@ class ProjectedDipMeans(BaseEstimator, ClusterMixin):
     n_random_projections : int
         Number of random projections that should be applied in addition to the original features and the components from a PCA (default: 0)
     pval_strategy : str
-        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap' (default: 'table')
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function', 'bootstrap' and 'cached_bootstrap' (default: 'table')
     n_boots : int
-        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' (default: 1000)
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' or 'cached_bootstrap' (default: 1000)
     n_split_trials : int
         Number tries to split a cluster. For each try 2-KMeans is executed with different cluster centers (default: 10)
     n_clusters_init : int
@@ -137,6 +138,8 @@ class ProjectedDipMeans(BaseEstimator, ClusterMixin):
         Maximum number of clusters. Must be larger than n_clusters_init (default: np.inf)
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    n_jobs : int
+        Number of threads used to calculate the dip-values. None means 1 and -1 means using all processors (default: None)
 
     Attributes
     ----------
@@ -155,7 +158,7 @@ class ProjectedDipMeans(BaseEstimator, ClusterMixin):
 
     def __init__(self, significance: float = 0.001, n_random_projections: int = 0, pval_strategy: str = "table",
                  n_boots: int = 1000, n_split_trials: int = 10, n_clusters_init: int = 1, max_n_clusters: int = np.inf,
-                 random_state: np.random.RandomState | int = None):
+                 random_state: np.random.RandomState | int = None, n_jobs: int = None):
         self.significance = significance
         self.n_random_projections = n_random_projections
         self.pval_strategy = pval_strategy
@@ -163,6 +166,7 @@ class ProjectedDipMeans(BaseEstimator, ClusterMixin):
         self.n_split_trials = n_split_trials
         self.n_clusters_init = n_clusters_init
         self.max_n_clusters = max_n_clusters
+        self.n_jobs = n_jobs
         self.random_state = check_random_state(random_state)
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'ProjectedDipMeans':
@@ -184,7 +188,8 @@ class ProjectedDipMeans(BaseEstimator, ClusterMixin):
         """
         n_clusters, labels, centers = _proj_dipmeans(X, self.significance, self.n_random_projections,
                                                      self.pval_strategy, self.n_boots, self.n_split_trials,
-                                                     self.n_clusters_init, self.max_n_clusters, self.random_state)
+                                                     self.n_clusters_init, self.max_n_clusters, self.n_jobs,
+                                                     self.random_state)
         self.n_clusters_ = n_clusters
         self.labels_ = labels
         self.cluster_centers_ = centers
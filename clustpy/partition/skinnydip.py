@@ -3,7 +3,7 @@
 Collin Leiber
 """
 
-from clustpy.utils import dip_test, dip_pval
+from clustpy.utils import dip_test, dip_pval, IncrementalDip
 import numpy as np
 from sklearn.base import BaseEstimator, ClusterMixin
 from sklearn.utils import check_random_state
@@ -22,9 +22,9 @@ def _skinnydip(X: np.ndarray, significance: float, pval_strategy: str, n_boots:
     significance : float
         Threshold to decide if the result of the dip-test is unimodal or multimodal
     pval_strategy : str
-        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap'
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function', 'bootstrap' and 'cached_bootstrap'
     n_boots : int
-        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap'
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' or 'cached_bootstrap'
     add_tails : bool
         Defines if TailoredDip should try to add tails to the surrounding clusters
     outliers : bool
@@ -93,9 +93,9 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
     already_sorted: bool
         Is the input data set already sorted?
     pval_strategy : str
-        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap'
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function', 'bootstrap' and 'cached_bootstrap'
     n_boots : int
-        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap'
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' or 'cached_bootstrap'
     max_cluster_size_diff_factor : float
         The maximum different in size when comparing two clusters regarding the number of samples.
         If one cluster surpasses this difference factor, only the max_cluster_size_diff_factor*(size of smaller cluster) closest samples will be used for merging
@@ -128,6 +128,8 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
     else:
         argsorted = np.argsort(X_1d)
         X_1d_sorted = X_1d[argsorted]
+    # The incremental dip reuses the minorant and majorant of the full data set for all sub-ranges
+    dip_engine = IncrementalDip(X_1d_sorted)
     # tmp_borders contains: (start and end value to search. Should be mirrored?. Current search space (equals position of next left and right cluster))
     tmp_borders = [(0, X_1d.shape[0], True, 0, X_1d.shape[0])]
     while len(tmp_borders) > 0:
@@ -136,7 +138,7 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
             print("[UniDip] Checking interval {0} / Current clusters: {1}".format((start, end), cluster_boundaries))
         # Get part of data
         tmp_X_1d = X_1d_sorted[start:end]
-        dip_value, modal_interval, _ = dip_test(tmp_X_1d, just_dip=False, is_data_sorted=True)
+        dip_value, modal_interval, _ = dip_engine.dip_test(start, end, just_dip=False)
         dip_pvalue = dip_pval(dip_value, n_points=tmp_X_1d.shape[0], pval_strategy=pval_strategy,
                               n_boots=n_boots, random_state=random_state)
         low = modal_interval[0]
@@ -151,7 +153,7 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
         else:  # Data is unimodal
             # If the current cluster wasn't a modal before, mirror data
             if should_mirror:
-                _, low, high = _dip_mirrored_data(tmp_X_1d, (low, high))
+                _, low, high = _dip_mirrored_data(tmp_X_1d, (low, high), dip_engine, start)
                 cluster_start = start + low
                 cluster_end = start + high + 1
                 if debug:
@@ -168,7 +170,7 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
             # Other clusters to the right? (right must be handled before left)
             if cluster_end != search_space_end:
                 right_X_1d = X_1d_sorted[cluster_start:search_space_end]
-                dip_value, modal_interval, _ = dip_test(right_X_1d, just_dip=False, is_data_sorted=True)
+                dip_value, modal_interval, _ = dip_engine.dip_test(cluster_start, search_space_end, just_dip=False)
                 low, high = modal_interval
                 dip_pvalue = dip_pval(dip_value, n_points=right_X_1d.shape[0], pval_strategy=pval_strategy,
                                       n_boots=n_boots, random_state=random_state)
@@ -182,7 +184,7 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
                     tmp_borders.insert(0, (cluster_end, search_space_end, True, cluster_end, search_space_end))
                 else:  # Data is unimodal
                     # Update current cluster boundaries
-                    _, low, high = _dip_mirrored_data(right_X_1d, (low, high))
+                    _, low, high = _dip_mirrored_data(right_X_1d, (low, high), dip_engine, cluster_start)
                     cluster_boundaries[-1] = (min(cluster_start + low, cluster_boundaries[-1][0]),
                                               max(cluster_start + 1 + high, cluster_boundaries[-1][1]))
                     if debug:
@@ -191,7 +193,7 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
             # Other clusters to the left?
             if cluster_start != search_space_start:
                 left_X_1d = X_1d_sorted[search_space_start:cluster_end]
-                dip_value, modal_interval, _ = dip_test(left_X_1d, just_dip=False, is_data_sorted=True)
+                dip_value, modal_interval, _ = dip_engine.dip_test(search_space_start, cluster_end, just_dip=False)
                 low, high = modal_interval
                 dip_pvalue = dip_pval(dip_value, n_points=left_X_1d.shape[0], pval_strategy=pval_strategy,
                                       n_boots=n_boots, random_state=random_state)
@@ -205,7 +207,7 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
                     tmp_borders.insert(0, (search_space_start, cluster_start, True, search_space_start, cluster_start))
                 else:  # Data is unimodal
                     # Update current cluster boundaries
-                    _, low, high = _dip_mirrored_data(left_X_1d, (low, high))
+                    _, low, high = _dip_mirrored_data(left_X_1d, (low, high), dip_engine, search_space_start)
                     cluster_boundaries[-1] = (min(search_space_start + low, cluster_boundaries[-1][0]),
                                               max(search_space_start + 1 + high, cluster_boundaries[-1][1]))
                     if debug:
@@ -224,13 +226,15 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
     # Merge nearby clusters
     n_clusters, labels, cluster_boundaries = _merge_clusters(X_1d_sorted, argsorted, labels, n_clusters,
                                                              cluster_boundaries, significance, pval_strategy,
-                                                             n_boots, max_cluster_size_diff_factor, random_state)
+                                                             n_boots, max_cluster_size_diff_factor, random_state,
+                                                             dip_engine)
     if debug:
         print("[UniDip] Clusters after merging:", cluster_boundaries)
     return n_clusters, labels, X_1d_sorted, argsorted, cluster_boundaries
 
 
-def _dip_mirrored_data(X_1d_sorted: np.ndarray, orig_modal_interval: tuple) -> (float, int, int):
+def _dip_mirrored_data(X_1d_sorted: np.ndarray, orig_modal_interval: tuple, dip_engine: IncrementalDip = None,
+                       start: int = 0) -> (float, int, int):
     """
     Mirror the data to get a more accurate modal interval.
     For more information see 'The DipEncoder: Enforcing Multimodality in Autoencoders'.
@@ -241,6 +245,10 @@ def _dip_mirrored_data(X_1d_sorted: np.ndarray, orig_modal_interval: tuple) -> (
         the input data set, must be sorted
     orig_modal_interval : tuple
         Tuple containing the starting and ending index of the original modal interval. Can be None
+    dip_engine : IncrementalDip
+        An IncrementalDip object containing X_1d_sorted starting at position start. If None, the Dip-values will be calculated from scratch (default: None)
+    start : int
+        The position of X_1d_sorted within the data set of dip_engine. Only relevant if dip_engine is not None (default: 0)
 
     Returns
     -------
@@ -254,14 +262,19 @@ def _dip_mirrored_data(X_1d_sorted: np.ndarray, orig_modal_interval: tuple) -> (
     Leiber, Collin, et al. "The DipEncoder: Enforcing Multimodality in Autoencoders."
     Proceedings of the 28th ACM SIGKDD Conference on Knowledge Discovery and Data Mining. 2022.
     """
-    # Left mirror
-    mirrored_addition_left = X_1d_sorted[0] - np.flip(X_1d_sorted[1:] - X_1d_sorted[0])
-    X_1d_left_mirrored = np.append(mirrored_addition_left, X_1d_sorted)
-    dip_value_left, modal_interval_left, _ = dip_test(X_1d_left_mirrored, just_dip=False, is_data_sorted=True)
-    # Right mirror
-    mirrored_addition_right = X_1d_sorted[-1] + np.flip(X_1d_sorted[-1] - X_1d_sorted[:-1])
-    X_1d_right_mirrored = np.append(X_1d_sorted, mirrored_addition_right)
-    dip_value_right, modal_interval_right, _ = dip_test(X_1d_right_mirrored, just_dip=False, is_data_sorted=True)
+    if dip_engine is not None:
+        end = start + X_1d_sorted.shape[0]
+        dip_value_left, modal_interval_left, _ = dip_engine.dip_test_mirrored(start, end, "left")
+        dip_value_right, modal_interval_right, _ = dip_engine.dip_test_mirrored(start, end, "right")
+    else:
+        # Left mirror
+        mirrored_addition_left = X_1d_sorted[0] - np.flip(X_1d_sorted[1:] - X_1d_sorted[0])
+        X_1d_left_mirrored = np.append(mirrored_addition_left, X_1d_sorted)
+        dip_value_left, modal_interval_left, _ = dip_test(X_1d_left_mirrored, just_dip=False, is_data_sorted=True)
+        # Right mirror
+        mirrored_addition_right = X_1d_sorted[-1] + np.flip(X_1d_sorted[-1] - X_1d_sorted[:-1])
+        X_1d_right_mirrored = np.append(X_1d_sorted, mirrored_addition_right)
+        dip_value_right, modal_interval_right, _ = dip_test(X_1d_right_mirrored, just_dip=False, is_data_sorted=True)
     # Get interval of larger dip
     if dip_value_left > dip_value_right:
         low = modal_interval_left[0]
@@ -291,8 +304,8 @@ def _dip_mirrored_data(X_1d_sorted: np.ndarray, orig_modal_interval: tuple) -> (
 
 def _merge_clusters(X_1d_sorted: np.ndarray, argsorted: np.ndarray, labels: np.ndarray, n_clusters: int,
                     cluster_boundaries: list, significance: float, pval_strategy: str, n_boots: int,
-                    max_cluster_size_diff_factor: float, random_state: np.random.RandomState) -> (
-        int, np.ndarray, list):
+                    max_cluster_size_diff_factor: float, random_state: np.random.RandomState,
+                    dip_engine: IncrementalDip = None) -> (int, np.ndarray, list):
     """
     Check for each cluster if it can be merged with the left or right neighboring cluster.
     The first and the last cluster will hereby handled by its more central neighbors.
@@ -313,14 +326,16 @@ def _merge_clusters(X_1d_sorted: np.ndarray, argsorted: np.ndarray, labels: np.n
     significance : float
         Threshold to decide if the result of the dip-test is unimodal or multimodal
     pval_strategy : str
-        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap'
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function', 'bootstrap' and 'cached_bootstrap'
     n_boots : int
-        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap'
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' or 'cached_bootstrap'
     max_cluster_size_diff_factor : float
         The maximum different in size when comparing two clusters regarding the number of samples.
         If one cluster surpasses this difference factor, only the max_cluster_size_diff_factor*(size of smaller cluster) closest samples will be used
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution. Only relevant if pval_strategy is 'bootstrap'
+    dip_engine : IncrementalDip
+        An IncrementalDip object of X_1d_sorted. If None, a new one will be created (default: None)
 
     Returns
     -------
@@ -329,6 +344,8 @@ def _merge_clusters(X_1d_sorted: np.ndarray, argsorted: np.ndarray, labels: np.n
         The labels after merging,
         Updated list of tuples containing the id of the first sample in a cluster and the first sample that is not part of the cluster anymore
     """
+    if dip_engine is None:
+        dip_engine = IncrementalDip(X_1d_sorted)
     i = 1
     while i < len(cluster_boundaries) - 1:
         cluster_size_center = cluster_boundaries[i][1] - cluster_boundaries[i][0]
@@ -338,10 +355,9 @@ def _merge_clusters(X_1d_sorted: np.ndarray, argsorted: np.ndarray, labels: np.n
                          int(cluster_boundaries[i - 1][1] - max_cluster_size_diff_factor * cluster_size_center))
         end_left = min(cluster_boundaries[i][1],
                        int(cluster_boundaries[i][0] + max_cluster_size_diff_factor * cluster_size_left))
-        tmp_X_1d = X_1d_sorted[start_left:end_left]
-        # Run dip-test
-        dip_value = dip_test(tmp_X_1d, just_dip=True, is_data_sorted=True)
-        dip_pvalue_left = dip_pval(dip_value, n_points=tmp_X_1d.shape[0], pval_strategy=pval_strategy,
+        # Run dip-test (repeated sub-ranges are answered by the memory of dip_engine)
+        dip_value = dip_engine.dip_test(start_left, end_left, just_dip=True)
+        dip_pvalue_left = dip_pval(dip_value, n_points=end_left - start_left, pval_strategy=pval_strategy,
                                    n_boots=n_boots, random_state=random_state)
         # Dip of i combined with right (i + 1)
         cluster_size_right = cluster_boundaries[i + 1][1] - cluster_boundaries[i + 1][0]
@@ -349,10 +365,9 @@ def _merge_clusters(X_1d_sorted: np.ndarray, argsorted: np.ndarray, labels: np.n
                           int(cluster_boundaries[i][1] - max_cluster_size_diff_factor * cluster_size_right))
         end_right = min(cluster_boundaries[i + 1][1],
                         int(cluster_boundaries[i + 1][0] + max_cluster_size_diff_factor * cluster_size_center))
-        tmp_X_1d = X_1d_sorted[start_right:end_right]
         # Run dip-test
-        dip_value = dip_test(tmp_X_1d, just_dip=True, is_data_sorted=True)
-        dip_pvalue_right = dip_pval(dip_value, n_points=tmp_X_1d.shape[0], pval_strategy=pval_strategy,
+        dip_value = dip_engine.dip_test(start_right, end_right, just_dip=True)
+        dip_pvalue_right = dip_pval(dip_value, n_points=end_right - start_right, pval_strategy=pval_strategy,
                                     n_boots=n_boots, random_state=random_state)
         if dip_pvalue_left >= dip_pvalue_right and dip_pvalue_left >= significance:
             # Merge i - 1 and i. Overwrite labels (beware, outliers can be in between)
@@ -393,9 +408,9 @@ def _tailoreddip(X_1d: np.ndarray, significance: float, pval_strategy: str, n_bo
     significance : float
         Threshold to decide if the result of the dip-test is unimodal or multimodal
     pval_strategy : str
-        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap'
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function', 'bootstrap' and 'cached_bootstrap'
     n_boots : int
-        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap'
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' or 'cached_bootstrap'
     add_tails : bool
         Defines if TailoredDip should try to add tails to the surrounding clusters
     outliers : bool
@@ -459,9 +474,9 @@ def _add_tails(X_1d: np.ndarray, labels: np.ndarray, sorted_X_1d: np.ndarray, ar
     significance : float
         Threshold to decide if the result of the dip-test is unimodal or multimodal
     pval_strategy : str
-        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap'
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function', 'bootstrap' and 'cached_bootstrap'
     n_boots : int
-        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap'
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' or 'cached_bootstrap'
     max_cluster_size_diff_factor : float
         The maximum different in size when comparing two clusters regarding the number of samples.
         If one cluster surpasses this difference factor, only the max_cluster_size_diff_factor*(size of smaller cluster) closest samples will be used for merging and assigning tails of distributions if 'add_tails' is True
@@ -476,6 +491,7 @@ def _add_tails(X_1d: np.ndarray, labels: np.ndarray, sorted_X_1d: np.ndarray, ar
         The updated labels after adding the tails,
         Updated list of tuples containing the id of the first sample in a cluster and the first sample that is not part of the cluster anymore
     """
+    dip_engine = IncrementalDip(sorted_X_1d)
     # Add cluster tails to the clusters. Check all areas between clusters and the area before the first and after the last cluster
     for i in range(len(cluster_boundaries_orig) + 1):
         while True:
@@ -495,7 +511,7 @@ def _add_tails(X_1d: np.ndarray, labels: np.ndarray, sorted_X_1d: np.ndarray, ar
                 break
             X_tmp = sorted_X_1d[start:end]
             # Calculate mirrored dip to see if there is some relevant structure left between the clusters
-            dip_value_mirror, _, _ = _dip_mirrored_data(X_tmp, (None, None))
+            dip_value_mirror, _, _ = _dip_mirrored_data(X_tmp, (None, None), dip_engine, start)
             dip_pvalue_mirror = dip_pval(dip_value_mirror, n_points=(X_tmp.shape[0] * 2 - 1),
                                          pval_strategy=pval_strategy, n_boots=n_boots, random_state=random_state)
             if debug:
@@ -521,7 +537,7 @@ def _add_tails(X_1d: np.ndarray, labels: np.ndarray, sorted_X_1d: np.ndarray, ar
                     start_left = max(cluster_boundaries_orig[i - 1][0],
                                      int(cluster_boundaries_orig[i - 1][1] - max_cluster_size_diff_factor * cluster_range))
                     end_left = start + cluster_boundaries_new[0][1]
-                    dip_value_left = dip_test(sorted_X_1d[start_left:end_left], just_dip=True, is_data_sorted=True)
+                    dip_value_left = dip_engine.dip_test(start_left, end_left, just_dip=True)
                     dip_pvalue_left = dip_pval(dip_value_left, n_points=end_left - start_left,
                                                pval_strategy=pval_strategy, n_boots=n_boots, random_state=random_state)
                     if debug:
@@ -536,8 +552,7 @@ def _add_tails(X_1d: np.ndarray, labels: np.ndarray, sorted_X_1d: np.ndarray, ar
                     # Use a maximum of cluster_range points of right cluster to see if transition is unimodal
                     end_right = min(cluster_boundaries_orig[i][1],
                                     int(cluster_boundaries_orig[i][0] + max_cluster_size_diff_factor * cluster_range))
-                    dip_value_right = dip_test(sorted_X_1d[start_right:end_right], just_dip=True,
-                                               is_data_sorted=True)
+                    dip_value_right = dip_engine.dip_test(start_right, end_right, just_dip=True)
                     dip_pvalue_right = dip_pval(dip_value_right, n_points=end_right - start_right,
                                                 pval_strategy=pval_strategy, n_boots=n_boots, random_state=random_state)
                     if debug:
@@ -642,9 +657,9 @@ class SkinnyDip(BaseEstimator, ClusterMixin):
     significance : float
         Threshold to decide if the result of the dip-test is unimodal or multimodal (default: 0.05)
     pval_strategy : str
-        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap' (default: 'table')
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function', 'bootstrap' and 'cached_bootstrap' (default: 'table')
     n_boots : int
-        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' (default: 1000)
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' or 'cached_bootstrap' (default: 1000)
     add_tails : bool
         Defines if TailoredDip should try to add tails to the surrounding clusters (default: False)
     outliers : bool
@@ -732,9 +747,9 @@ class UniDip(BaseEstimator, ClusterMixin):
     significance : float
         Threshold to decide if the result of the dip-test is unimodal or multimodal (default: 0.05)
     pval_strategy : str
-        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap' (default: 'table')
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function', 'bootstrap' and 'cached_bootstrap' (default: 'table')
     n_boots : int
-        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' (default: 1000)
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap' or 'cached_bootstrap' (default: 1000)
     add_tails : bool
         Defines if TailoredDip should try to add tails to the surrounding clusters (default: False)
     outliers : bool
@@ -118,6 +118,12 @@ def test_DipExt_with_parameters():
     dipext2 = DipExt(ambiguous_triangle_strategy="random", random_state=1)
     subspace2 = dipext2.fit_transform(X)
     assert np.array_equal(subspace, subspace2)
+    # Check if parallel execution produces the same result
+    dipext = DipExt(n_starting_vectors=3, random_state=1)
+    subspace = dipext.fit_transform(X)
+    dipext2 = DipExt(n_starting_vectors=3, random_state=1, n_jobs=2)
+    subspace2 = dipext2.fit_transform(X)
+    assert np.array_equal(subspace, subspace2)
 
 
 """
@@ -32,3 +32,40 @@ def test_simple_DipMeans():
     assert dipmeans.cluster_centers_.shape == (dipmeans.n_clusters_, X.shape[1])
     assert len(np.unique(dipmeans.labels_)) == dipmeans.n_clusters_
     assert np.array_equal(np.unique(dipmeans.labels_), np.arange(dipmeans.n_clusters_))
+    # Test with cached bootstrap
+    dipmeans = DipMeans(pval_strategy="cached_bootstrap", n_boots=10, random_state=1)
+    dipmeans.fit(X)
+    assert dipmeans.labels_.shape == labels.shape
+    assert np.array_equal(np.unique(dipmeans.labels_), np.arange(dipmeans.n_clusters_))
+
+
+def test_DipMeans_low_memory():
+    X, labels = make_blobs(200, 4, centers=3, random_state=1)
+    dipmeans = DipMeans(random_state=1)
+    dipmeans.fit(X)
+    # Blockwise distances should not change the result
+    dipmeans_low_memory = DipMeans(random_state=1, low_memory=True)
+    dipmeans_low_memory.fit(X)
+    assert dipmeans.n_clusters_ == dipmeans_low_memory.n_clusters_
+    assert np.array_equal(dipmeans.labels_, dipmeans_low_memory.labels_)
+    assert np.allclose(dipmeans.cluster_centers_, dipmeans_low_memory.cluster_centers_)
+    # Test with subset of viewers
+    dipmeans = DipMeans(random_state=1, low_memory=True, max_n_viewers=50)
+    dipmeans.fit(X)
+    assert dipmeans.labels_.shape == labels.shape
+    assert dipmeans.cluster_centers_.shape == (dipmeans.n_clusters_, X.shape[1])
+    assert np.array_equal(np.unique(dipmeans.labels_), np.arange(dipmeans.n_clusters_))
+
+
+def test_get_split_viewer_dips():
+    from clustpy.partition.dipmeans import _get_split_viewer_dips
+    from scipy.spatial.distance import pdist, squareform
+    X, _ = make_blobs(100, 3, centers=2, random_state=1)
+    data_dist_matrix = squareform(pdist(X))
+    ids_in_cluster = np.arange(10, 90)
+    ids_of_viewers = np.array([10, 15, 40, 41, 89])
+    dips = _get_split_viewer_dips(X, ids_in_cluster, ids_of_viewers, data_dist_matrix, None)
+    # Small block size to test multiple blocks
+    dips_blockwise = _get_split_viewer_dips(X, ids_in_cluster, ids_of_viewers, None, None, block_size=100)
+    assert dips.shape == (5,)
+    assert np.allclose(dips, dips_blockwise)
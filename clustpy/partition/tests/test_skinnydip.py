@@ -1,5 +1,7 @@
 import numpy as np
 from clustpy.partition import SkinnyDip, UniDip
+from clustpy.partition.skinnydip import _dip_mirrored_data
+from clustpy.utils import IncrementalDip, dip_test
 from sklearn.datasets import make_blobs
 
 """
@@ -27,6 +29,17 @@ def test_simple_SkinnyDip():
     assert np.array_equal(np.unique(skinny.labels_), np.arange(skinny.n_clusters_))
 
 
+def test_dip_mirrored_data():
+    random_state = np.random.RandomState(1)
+    X = np.sort(np.r_[random_state.rand(50), random_state.rand(50) + 3, random_state.rand(20) + 7])
+    incremental_dip = IncrementalDip(X)
+    for start, end in [(0, X.shape[0]), (0, 50), (30, 100), (60, 120)]:
+        _, modal_interval, _ = dip_test(X[start:end], just_dip=False, is_data_sorted=True)
+        result = _dip_mirrored_data(X[start:end], modal_interval)
+        result_incremental = _dip_mirrored_data(X[start:end], modal_interval, incremental_dip, start)
+        assert result == result_incremental
+
+
 """
 Tests regarding the UniDip object
 """
@@ -0,0 +1,22 @@
+import os
+
+
+def _get_n_jobs(n_jobs: int) -> int:
+    """
+    Get the actual number of jobs. None means 1 and negative values mean using all processors (-1), all processors but one (-2), etc.
+
+    Parameters
+    ----------
+    n_jobs : int
+        The specified number of jobs
+
+    Returns
+    -------
+    n_jobs : int
+        The actual number of jobs (at least 1)
+    """
+    if n_jobs is None:
+        n_jobs = 1
+    elif n_jobs < 0:
+        n_jobs = os.cpu_count() + 1 + n_jobs
+    return max(n_jobs, 1)
@@ -50,7 +50,7 @@ Compile Linux: cc -fPIC -shared -o dip.so dip.c
 
 /* Subroutine */
 double fast_diptest(const double x[], int *low_high, int *modaltriangle,
-        int *gcm, int *lcm, int *mn, int *mj, const int n, const int debug) {
+        int *gcm, int *lcm, int *mn, int *mj, const int n, const int debug, const int reuse_mn_mj) {
     int mnj, mnmnj, mjk, mjmjk, ig, ih, iv, ix,  i, j, k, l_lcm, l_gcm;
     double dip_l, dip_u, dipnew;
 
@@ -75,9 +75,12 @@ double fast_diptest(const double x[], int *low_high, int *modaltriangle,
 
 /* Establish the indices   mn[0..n-1]  over which combination is necessary
    for the convex MINORANT (GCM) fit.
+   If reuse_mn_mj is 1, all non-negative entries of mn and mj are already correct
+   (e.g. taken from a larger sorted array containing x) and only the negative entries are calculated.
 */
     mn[0] = 0;
     for (j = 1; j <= (n - 1); ++j) {
+    if (reuse_mn_mj == 1 && mn[j] >= 0) continue;
     mn[j] = j - 1;
     while(1) {
       mnj = mn[j];
@@ -94,6 +97,7 @@ double fast_diptest(const double x[], int *low_high, int *modaltriangle,
 */
     mj[n - 1] = n - 1;
     for (k = n - 2; k >= 0; k--) {
+    if (reuse_mn_mj == 1 && mj[k] >= 0) continue;
     mj[k] = k + 1;
     while(1) {
       mjk = mj[k];
@@ -301,8 +305,9 @@ static PyObject *method_c_diptest(PyObject *self, PyObject *args) {
   PyArrayObject *py_low_high, *py_modaltriangle, *py_gcm, *py_lcm, *py_mn, *py_mj;
   int *c_low_high, *c_modaltriangle, *c_gcm, *c_lcm, *c_mn, *c_mj;
   int n, debug;
-  // Convert input parameters to C PyObejects
-  if (!PyArg_ParseTuple(args, "O!O!O!O!O!O!O!ii", &PyArray_Type, &py_x, &PyArray_Type, &py_low_high, &PyArray_Type, &py_modaltriangle, &PyArray_Type, &py_gcm, &PyArray_Type, &py_lcm, &PyArray_Type, &py_mn, &PyArray_Type, &py_mj, &n, &debug)) {
+  int reuse_mn_mj = 0;
+  // Convert input parameters to C PyObejects (reuse_mn_mj is optional)
+  if (!PyArg_ParseTuple(args, "O!O!O!O!O!O!O!ii|i", &PyArray_Type, &py_x, &PyArray_Type, &py_low_high, &PyArray_Type, &py_modaltriangle, &PyArray_Type, &py_gcm, &PyArray_Type, &py_lcm, &PyArray_Type, &py_mn, &PyArray_Type, &py_mj, &n, &debug, &reuse_mn_mj)) {
     return NULL;
   }
   // Convert PyObjects to C arrays
@@ -313,14 +318,56 @@ static PyObject *method_c_diptest(PyObject *self, PyObject *args) {
   c_lcm = (int*)py_lcm->data;
   c_mn = (int*)py_mn->data;
   c_mj = (int*)py_mj->data;
-  // Execute C diptest method
-  double dip_value = fast_diptest(c_x, c_low_high, c_modaltriangle, c_gcm, c_lcm, c_mn, c_mj, n, debug);
+  // Execute C diptest method (the GIL is released so that multiple threads can calculate dip values simultaneously)
+  double dip_value;
+  Py_BEGIN_ALLOW_THREADS
+  dip_value = fast_diptest(c_x, c_low_high, c_modaltriangle, c_gcm, c_lcm, c_mn, c_mj, n, debug, reuse_mn_mj);
+  Py_END_ALLOW_THREADS
   // Return dip value
   return PyFloat_FromDouble(dip_value);
 }
 
+static PyObject *method_c_diptest_batch(PyObject *self, PyObject *args) {
+  // Needed variables
+  PyArrayObject *py_X, *py_dips, *py_modal_intervals, *py_modal_triangles;
+  int n_tests, n, t;
+  int memory_error = 0;
+  // Convert input parameters to C PyObejects
+  if (!PyArg_ParseTuple(args, "O!O!O!O!ii", &PyArray_Type, &py_X, &PyArray_Type, &py_dips, &PyArray_Type, &py_modal_intervals, &PyArray_Type, &py_modal_triangles, &n_tests, &n)) {
+    return NULL;
+  }
+  // Convert PyObjects to C arrays (X has shape n_tests x n, must be C-contiguous and each row must be sorted)
+  double *c_X = (double*)PyArray_DATA(py_X);
+  double *c_dips = (double*)PyArray_DATA(py_dips);
+  int *c_modal_intervals = (int*)PyArray_DATA(py_modal_intervals);
+  int *c_modal_triangles = (int*)PyArray_DATA(py_modal_triangles);
+  // The work arrays (gcm, lcm, mn, mj) are shared by all tests
+  Py_BEGIN_ALLOW_THREADS
+  int *work = (int*)malloc(4 * (size_t)n * sizeof(int));
+  if (work == NULL) {
+    memory_error = 1;
+  } else {
+    for (t = 0; t < n_tests; t++) {
+      const double *x = c_X + (size_t)t * n;
+      int *modaltriangle = c_modal_triangles + (size_t)t * 3;
+      modaltriangle[0] = -1;
+      modaltriangle[1] = -1;
+      modaltriangle[2] = -1;
+      c_dips[t] = fast_diptest(x, c_modal_intervals + (size_t)t * 2, modaltriangle,
+                               work, work + n, work + 2 * (size_t)n, work + 3 * (size_t)n, n, 0, 0);
+    }
+  }
+  free(work);
+  Py_END_ALLOW_THREADS
+  if (memory_error) {
+    return PyErr_NoMemory();
+  }
+  Py_RETURN_NONE;
+}
+
 static PyMethodDef diptestMethods[] = {
   {"c_diptest", method_c_diptest, METH_VARARGS, "Function for calculating the dip value in c"},
+  {"c_diptest_batch", method_c_diptest_batch, METH_VARARGS, "Function for calculating the dip values of multiple samples in c"},
   {NULL, NULL, 0, NULL}
 };
 
@@ -1,12 +1,35 @@
 try:
-    from clustpy.utils.dipModule import c_diptest  # noqa - Import from C file (could be marked as unresolved)
+    from clustpy.utils.dipModule import c_diptest, c_diptest_batch  # noqa - Import from C file (could be marked as unresolved)
+    _C_DIP_AVAILABLE = True
 except:
-    print("[WARNING] Could not import c_diptest in clustpy.utils.dipModule. Therefore, C implementation can not be used for dip calculations which can lead to slow executions")
+    _C_DIP_AVAILABLE = False
+# Numba is only needed if the C implementation is not available
+njit = None
+if not _C_DIP_AVAILABLE:
+    try:
+        from numba import njit
+    except:
+        pass
+    if njit is None:
+        print("[WARNING] Could not import c_diptest in clustpy.utils.dipModule and Numba is not installed. Therefore, the python implementation will be used for dip calculations which can lead to slow executions")
+    else:
+        print("[WARNING] Could not import c_diptest in clustpy.utils.dipModule. Therefore, the Numba implementation will be used for dip calculations")
 import numpy as np
 import matplotlib.pyplot as plt
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from clustpy.utils.plots import plot_histogram
+from clustpy.utils._utils import _get_n_jobs
 from sklearn.utils import check_random_state
 
+DIP_BOOT_CACHE_MAX_SIZE = 64
+DIP_BOOT_CACHE_DEFAULT_SEED = 0
+_DIP_BOOT_CACHE = OrderedDict()
+# The in-memory cache can be accessed by multiple threads, e.g., when using dip_executor_map
+_DIP_BOOT_CACHE_LOCK = threading.Lock()
+
 
 def dip_test(X: np.ndarray, just_dip: bool = True, is_data_sorted: bool = False, return_gcm_lcm_mn_mj: bool = False,
              use_c: bool = True, debug: bool = False) -> (
@@ -29,7 +52,8 @@ def dip_test(X: np.ndarray, just_dip: bool = True, is_data_sorted: bool = False,
     return_gcm_lcm_mn_mj : bool
         Defines whether the gcm, lcm, mn and mj arrays should be returned. In this case just_dip must be False (default: False)
     use_c : bool
-        Defines whether the C implementation should be used (defualt: True)
+        Defines whether the C implementation should be used. If the C implementation is not available, the Numba implementation will be used instead (if installed).
+        See backend() for the active engine (defualt: True)
     debug : bool
         If true, additional information will be printed to the console (default: False)
 
@@ -69,7 +93,10 @@ def dip_test(X: np.ndarray, just_dip: bool = True, is_data_sorted: bool = False,
         try:
             dip_value, modal_interval, modal_triangle, _, _, mn, mj = _dip_c_impl(X, debug)
         except Exception:
-            dip_value, modal_interval, modal_triangle, _, _, mn, mj = _dip_python_impl(X, debug)
+            if _dip_numba_kernel is not None:
+                dip_value, modal_interval, modal_triangle, _, _, mn, mj = _dip_numba_impl(X, debug)
+            else:
+                dip_value, modal_interval, modal_triangle, _, _, mn, mj = _dip_python_impl(X, debug)
     else:
         dip_value, modal_interval, modal_triangle, _, _, mn, mj = _dip_python_impl(X, debug)
     # Return results
@@ -85,9 +112,313 @@ def dip_test(X: np.ndarray, just_dip: bool = True, is_data_sorted: bool = False,
         return dip_value, modal_interval, modal_triangle
 
 
-def _dip_c_impl(X: np.ndarray, debug: bool) -> (float, tuple, tuple, np.ndarray, np.ndarray, np.ndarray, np.ndarray):
+def dip_test_batch(X: np.ndarray, axis: int = 0, just_dip: bool = True, is_data_sorted: bool = False,
+                   use_c: bool = True, n_jobs: int = None) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    Calculate the Dip-values of multiple univariate samples at once.
+    The samples are given by the columns (axis=0) or rows (axis=1) of a two-dimensional array.
+    In contrast to calling dip_test for each sample separately, all samples are sorted at once and the C implementation calculates all Dip-values in a single call (without holding the GIL).
+    If just_dip is False, the modal intervals and modal triangles are returned in addition to the Dip-values.
+    Note that these indices refer to the sorted version of each sample.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given two-dimensional array containing the univariate samples
+    axis : int
+        The axis along which the Dip-test should be performed, i.e., 0 means that each column is a sample and 1 that each row is a sample (default: 0)
+    just_dip : bool
+        Defines whether only the Dip-values should be returned or also the modal intervals and modal triangles (default: True)
+    is_data_sorted : bool
+        Should be True if all samples are already sorted (default: False)
+    use_c : bool
+        Defines whether the C implementation should be used (defualt: True)
+    n_jobs : int
+        Number of threads used to calculate the Dip-values. None means 1 and -1 means using all processors (default: None)
+
+    Returns
+    -------
+    tuple : (np.ndarray, np.ndarray, np.ndarray)
+        The resulting Dip-values,
+        The indices of the modal intervals, shape (n_samples, 2) (if just_dip is False),
+        The indices of the modal triangles, shape (n_samples, 3) (if just_dip is False)
+    """
+    assert X.ndim == 2, "Data must be 2-dimensional for the batched dip-test. Your shape:{0}".format(X.shape)
+    assert axis in [0, 1, -1, -2], "axis must be 0 or 1. Your input: {0}".format(axis)
+    # Each row of X_batch is one sorted sample
+    X_batch = X.T if axis in [0, -2] else X
+    if not is_data_sorted:
+        X_batch = np.sort(X_batch, axis=1)
+    X_batch = np.ascontiguousarray(X_batch, dtype=np.float64)
+    n_tests, n_points = X_batch.shape
+    dip_values = np.zeros(n_tests, dtype=np.float64)
+    modal_intervals = np.zeros((n_tests, 2), dtype=np.int32)
+    modal_triangles = -np.ones((n_tests, 3), dtype=np.int32)
+    n_jobs = min(_get_n_jobs(n_jobs), max(n_tests, 1))
+    # Each thread processes a contiguous block of samples and writes into the corresponding part of the result arrays
+    blocks = np.array_split(np.arange(n_tests), n_jobs)
+    dip_executor_map(lambda block: _dip_test_batch_block(X_batch, dip_values, modal_intervals, modal_triangles,
+                                                         block, use_c), blocks, n_jobs)
+    if just_dip:
+        return dip_values
+    else:
+        return dip_values, modal_intervals, modal_triangles
+
+
+def _dip_test_batch_block(X_batch: np.ndarray, dip_values: np.ndarray, modal_intervals: np.ndarray,
+                          modal_triangles: np.ndarray, block: np.ndarray, use_c: bool) -> None:
+    """
+    Calculate the Dip-values of a contiguous block of sorted samples and write the results into the given arrays.
+    The C implementation is used if possible, else dip_test will be called for each sample.
+
+    Parameters
+    ----------
+    X_batch : np.ndarray
+        C-contiguous two-dimensional array where each row is a sorted sample
+    dip_values : np.ndarray
+        The array in which the Dip-values will be written
+    modal_intervals : np.ndarray
+        The array in which the modal intervals will be written
+    modal_triangles : np.ndarray
+        The array in which the modal triangles will be written
+    block : np.ndarray
+        The consecutive indices of the samples that should be processed
+    use_c : bool
+        Defines whether the C implementation should be used
+    """
+    if block.shape[0] == 0:
+        return
+    start, end = block[0], block[-1] + 1
+    if use_c:
+        try:
+            # Slices of the rows are views, therefore, the C function writes directly into the result arrays
+            c_diptest_batch(X_batch[start:end], dip_values[start:end], modal_intervals[start:end],
+                            modal_triangles[start:end], end - start, X_batch.shape[1])
+            return
+        except Exception:
+            pass
+    for t in range(start, end):
+        dip_values[t], modal_intervals[t], modal_triangles[t] = dip_test(X_batch[t], just_dip=False,
+                                                                         is_data_sorted=True, use_c=use_c)
+
+
+def dip_executor_map(function, iterable, n_jobs: int = None) -> list:
+    """
+    Apply a function to each element of an iterable using a thread pool with n_jobs threads.
+    Since the C implementation of the Dip-test releases the GIL, independent Dip-tests can be executed in parallel this way.
+    The results are returned in the order of the input. If n_jobs is 1, no thread pool will be created.
+
+    Parameters
+    ----------
+    function : Callable
+        The function that should be applied to each element
+    iterable : Iterable
+        The input elements
+    n_jobs : int
+        Number of threads. None means 1 and -1 means using all processors (default: None)
+
+    Returns
+    -------
+    results : list
+        List containing the results of the function for each element
+    """
+    n_jobs = _get_n_jobs(n_jobs)
+    if n_jobs == 1:
+        results = [function(element) for element in iterable]
+    else:
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(function, iterable))
+    return results
+
+
+class IncrementalDip():
+    """
+    Calculate the Dip-values of arbitrary sub-ranges of a sorted univariate data set (and of their mirrored versions).
+    The indices over which combination is necessary for the Greatest Convex Minorant (mn) and the Least Concave Majorant (mj) are calculated once for the full data set.
+    For a sub-range [start, end), every minorant index that is larger or equal to start and every majorant index that is smaller than end stays valid.
+    Therefore, only the remaining indices have to be recalculated by the C implementation.
+    Furthermore, all results are memorized, so repeated queries of the same sub-range are answered directly.
+    The results are equal to those of dip_test(X_sorted[start:end], just_dip=False, is_data_sorted=True).
+    If the C implementation is not available, dip_test will be called for each (new) sub-range.
+
+    Parameters
+    ----------
+    X_sorted : np.ndarray
+        the given univariate data set, must be sorted
+    use_c : bool
+        Defines whether the C implementation should be used (default: True)
+
+    Attributes
+    ----------
+    mn_ : np.ndarray
+        The minorant indices of the full data set. Is None if the C implementation is not used or the full data set is trivial (less than 4 samples or constant)
+    mj_ : np.ndarray
+        The majorant indices of the full data set. Is None if the C implementation is not used or the full data set is trivial (less than 4 samples or constant)
+
+    Examples
+    ----------
+    >>> X = np.sort(np.random.rand(1000))
+    >>> incremental_dip = IncrementalDip(X)
+    >>> dip_value, modal_interval, modal_triangle = incremental_dip.dip_test(100, 600, just_dip=False)
+    """
+
+    def __init__(self, X_sorted: np.ndarray, use_c: bool = True):
+        assert X_sorted.ndim == 1, "Data must be 1-dimensional for the dip-test. Your shape:{0}".format(X_sorted.shape)
+        self.X_sorted = np.ascontiguousarray(X_sorted, dtype=np.float64)
+        self.use_c = use_c
+        self.mn_ = None
+        self.mj_ = None
+        self._results = {}
+        self._last_range = None
+        self._last_mn_mj = None
+        # Calculate the dip of the full data set, which also returns mn and mj
+        self.dip_test(0, self.X_sorted.shape[0])
+
+    def dip_test(self, start: int, end: int, just_dip: bool = True) -> (float, tuple, tuple):
+        """
+        Calculate the Dip-value of the sub-range [start, end) of the sorted data set.
+        Note that the modal interval and modal triangle refer to the sub-range, i.e., index 0 corresponds to start.
+
+        Parameters
+        ----------
+        start : int
+            The first index of the sub-range
+        end : int
+            The first index that is not part of the sub-range anymore
+        just_dip : bool
+            Defines whether only the Dip-value should be returned or also the modal interval and modal triangle (default: True)
+
+        Returns
+        -------
+        tuple : (float, tuple, tuple)
+            The resulting Dip-value,
+            The indices of the modal_interval - corresponds to the steepest slope in the ECDF (if just_dip is False),
+            The indices of the modal triangle (if just_dip is False)
+        """
+        assert 0 <= start <= end <= self.X_sorted.shape[0], "start and end must fulfill 0 <= start <= end <= n_samples"
+        if (start, end) not in self._results:
+            X_range = self.X_sorted[start:end]
+            if not self.use_c or not _C_DIP_AVAILABLE or X_range.shape[0] < 4 or X_range[0] == X_range[-1]:
+                result = dip_test(X_range, just_dip=False, is_data_sorted=True, use_c=self.use_c)
+            else:
+                mn, mj = self._get_reusable_mn_mj(start, end)
+                dip_value, modal_interval, modal_triangle, _, _, mn, mj = _dip_c_impl(X_range, False, mn, mj)
+                if self.mn_ is None:
+                    self.mn_, self.mj_ = mn, mj
+                self._last_range = (start, end)
+                self._last_mn_mj = (mn, mj)
+                result = (dip_value, modal_interval, modal_triangle)
+            self._results[(start, end)] = result
+        result = self._results[(start, end)]
+        return result[0] if just_dip else result
+
+    def dip_test_mirrored(self, start: int, end: int, side: str) -> (float, tuple, tuple):
+        """
+        Calculate the Dip-value of the mirrored version of the sub-range [start, end) of the sorted data set.
+        If side is 'left', the data is mirrored at the first sample of the sub-range. In this case, the mirrored data contains the sub-range as suffix and the majorant indices of the sub-range can be reused.
+        If side is 'right', the data is mirrored at the last sample of the sub-range. In this case, the mirrored data contains the sub-range as prefix and the minorant indices of the sub-range can be reused.
+        Note that the modal interval and modal triangle refer to the mirrored data set (containing 2 * (end - start) - 1 samples).
+
+        Parameters
+        ----------
+        start : int
+            The first index of the sub-range
+        end : int
+            The first index that is not part of the sub-range anymore
+        side : str
+            The side at which the data should be mirrored. Can be 'left' or 'right'
+
+        Returns
+        -------
+        tuple : (float, tuple, tuple)
+            The resulting Dip-value,
+            The indices of the modal_interval - corresponds to the steepest slope in the ECDF,
+            The indices of the modal triangle
+        """
+        assert side in ["left", "right"], "side must be 'left' or 'right'. Your input: {0}".format(side)
+        assert 0 <= start < end <= self.X_sorted.shape[0], "start and end must fulfill 0 <= start < end <= n_samples"
+        if (side, start, end) not in self._results:
+            X_range = self.X_sorted[start:end]
+            n_range = X_range.shape[0]
+            if side == "left":
+                mirrored_addition = X_range[0] - np.flip(X_range[1:] - X_range[0])
+                X_mirrored = np.append(mirrored_addition, X_range)
+            else:
+                mirrored_addition = X_range[-1] + np.flip(X_range[-1] - X_range[:-1])
+                X_mirrored = np.append(X_range, mirrored_addition)
+            if not self.use_c or not _C_DIP_AVAILABLE or n_range < 4 or X_range[0] == X_range[-1]:
+                result = dip_test(X_mirrored, just_dip=False, is_data_sorted=True, use_c=self.use_c)
+            else:
+                mn_range, mj_range = self._get_mn_mj(start, end)
+                mn = -np.ones(X_mirrored.shape[0], dtype=np.int32)
+                mj = -np.ones(X_mirrored.shape[0], dtype=np.int32)
+                if side == "left":
+                    mj[n_range - 1:] = mj_range + (n_range - 1)
+                else:
+                    mn[:n_range] = mn_range
+                dip_value, modal_interval, modal_triangle, _, _, _, _ = _dip_c_impl(X_mirrored, False, mn, mj)
+                result = (dip_value, modal_interval, modal_triangle)
+            self._results[(side, start, end)] = result
+        return self._results[(side, start, end)]
+
+    def _get_reusable_mn_mj(self, start: int, end: int) -> (np.ndarray, np.ndarray):
+        """
+        Get the minorant and majorant indices of the full data set that are still valid for the sub-range [start, end).
+        All indices that must be recalculated are set to -1.
+
+        Parameters
+        ----------
+        start : int
+            The first index of the sub-range
+        end : int
+            The first index that is not part of the sub-range anymore
+
+        Returns
+        -------
+        tuple : (np.ndarray, np.ndarray)
+            The reusable minorant indices (relative to start),
+            The reusable majorant indices (relative to start)
+        """
+        n_range = end - start
+        if self.mn_ is None:
+            return -np.ones(n_range, dtype=np.int32), -np.ones(n_range, dtype=np.int32)
+        mn = self.mn_[start:end] - start
+        mn[mn < 0] = -1
+        mj = self.mj_[start:end] - start
+        mj[mj >= n_range] = -1
+        return mn, mj
+
+    def _get_mn_mj(self, start: int, end: int) -> (np.ndarray, np.ndarray):
+        """
+        Get the final minorant and majorant indices of the sub-range [start, end).
+        The indices of the last calculated sub-range are stored. Otherwise, they will be calculated.
+
+        Parameters
+        ----------
+        start : int
+            The first index of the sub-range
+        end : int
+            The first index that is not part of the sub-range anymore
+
+        Returns
+        -------
+        tuple : (np.ndarray, np.ndarray)
+            The minorant indices of the sub-range,
+            The majorant indices of the sub-range
+        """
+        if self._last_range != (start, end):
+            mn, mj = self._get_reusable_mn_mj(start, end)
+            _, _, _, _, _, mn, mj = _dip_c_impl(self.X_sorted[start:end], False, mn, mj)
+            self._last_range = (start, end)
+            self._last_mn_mj = (mn, mj)
+        return self._last_mn_mj
+
+
+def _dip_c_impl(X: np.ndarray, debug: bool, mn: np.ndarray = None, mj: np.ndarray = None) -> (
+        float, tuple, tuple, np.ndarray, np.ndarray, np.ndarray, np.ndarray):
     """
     Calls the Dip C implementation by Martin Maechler.
+    Already known minorant and majorant indices can be given. In this case, only the negative entries will be calculated.
 
     Parameters
     ----------
@@ -95,6 +426,10 @@ def _dip_c_impl(X: np.ndarray, debug: bool) -> (float, tuple, tuple, np.ndarray,
         the given univariate data set
     debug : bool
         If true, additional information will be printed to the console
+    mn : np.ndarray
+        The known minorant indices (int32). Entries that should be calculated must be -1. Will be updated in place (default: None)
+    mj : np.ndarray
+        The known majorant indices (int32). Entries that should be calculated must be -1. Will be updated in place (default: None)
 
     Returns
     -------
@@ -112,11 +447,13 @@ def _dip_c_impl(X: np.ndarray, debug: bool) -> (float, tuple, tuple, np.ndarray,
     modal_triangle = -np.ones(3, dtype=np.int32)
     gcm = np.zeros(X.shape, dtype=np.int32)
     lcm = np.zeros(X.shape, dtype=np.int32)
-    mj = np.zeros(X.shape, dtype=np.int32)
-    mn = np.zeros(X.shape, dtype=np.int32)
+    reuse_mn_mj = mn is not None and mj is not None
+    if not reuse_mn_mj:
+        mj = np.zeros(X.shape, dtype=np.int32)
+        mn = np.zeros(X.shape, dtype=np.int32)
     # Execute C function
     dip_value = c_diptest(X.astype(np.float64), modal_interval, modal_triangle, gcm, lcm, mn, mj, X.shape[0],
-                          1 if debug else 0)
+                          1 if debug else 0, 1 if reuse_mn_mj else 0)
     return dip_value, (modal_interval[0], modal_interval[1]), (
         modal_triangle[0], modal_triangle[1], modal_triangle[2]), gcm, lcm, mn, mj
 
@@ -125,6 +462,7 @@ def _dip_python_impl(X: np.ndarray, debug: bool) -> (
         float, tuple, tuple, np.ndarray, np.ndarray, np.ndarray, np.ndarray):
     """
     A python version of the Dip C implementation by Martin Maechler.
+    Executes the uncompiled _dip_kernel.
 
     Parameters
     ----------
@@ -149,6 +487,70 @@ def _dip_python_impl(X: np.ndarray, debug: bool) -> (
     if N < 4 or X[0] == X[-1]:
         d = 0.0
         return d, (0, 0), (-1, -1, -1), None, None, None, None
+    dip_value, low, high, modaltriangle_i1, modaltriangle_i2, modaltriangle_i3, gcm, lcm, mn, mj = _dip_kernel(X, debug)
+    return dip_value, (low, high), (modaltriangle_i1, modaltriangle_i2, modaltriangle_i3), gcm, lcm, mn, mj
+
+
+def _dip_numba_impl(X: np.ndarray, debug: bool) -> (
+        float, tuple, tuple, np.ndarray, np.ndarray, np.ndarray, np.ndarray):
+    """
+    Calls the JIT-compiled (Numba) version of _dip_kernel.
+    Is only available if the C implementation could not be imported and Numba is installed. The first call triggers the compilation of the kernel.
+    If debug is True, the python implementation is used.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given univariate data set
+    debug : bool
+        If true, additional information will be printed to the console
+
+    Returns
+    -------
+    tuple : (float, tuple, tuple, np.ndarray, np.ndarray, np.ndarray, np.ndarray)
+        The resulting Dip-value,
+        The indices of the modal_interval - corresponds to the steepest slope in the ECDF,
+        The indices of the modal triangle
+        The indices of points that are part of the Greatest Convex Minorant (gcm),
+        The indices of points that are part of the Least Concave Majorant (lcm),
+        The minorant values,
+        The majorant values
+    """
+    assert _dip_numba_kernel is not None, "Numba is not available. Therefore, the compiled Dip implementation can not be used"
+    if debug:
+        return _dip_python_impl(X, debug)
+    dip_value, low, high, modaltriangle_i1, modaltriangle_i2, modaltriangle_i3, gcm, lcm, mn, mj = _dip_numba_kernel(
+        np.ascontiguousarray(X, dtype=np.float64), False)
+    return dip_value, (low, high), (modaltriangle_i1, modaltriangle_i2, modaltriangle_i3), gcm, lcm, mn, mj
+
+
+def _dip_kernel(X: np.ndarray, debug: bool = False) -> (
+        float, int, int, int, int, int, np.ndarray, np.ndarray, np.ndarray, np.ndarray):
+    """
+    The Dip algorithm following the C implementation by Martin Maechler.
+    Uses flat return values and only prints numbers and strings, so that it can also be compiled using Numba.
+    Data set must contain at least four points and must not be constant.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given sorted univariate data set
+    debug : bool
+        If true, additional information will be printed to the console (default: False)
+
+    Returns
+    -------
+    tuple : (float, int, int, int, int, int, np.ndarray, np.ndarray, np.ndarray, np.ndarray)
+        The resulting Dip-value,
+        The start of the modal_interval,
+        The end of the modal_interval,
+        The three indices of the modal triangle,
+        The indices of points that are part of the Greatest Convex Minorant (gcm),
+        The indices of points that are part of the Least Concave Majorant (lcm),
+        The minorant values,
+        The majorant values
+    """
+    N = X.shape[0]
     low = 0
     high = N - 1
     dip_value = 0.0
@@ -158,7 +560,6 @@ def _dip_python_impl(X: np.ndarray, debug: bool) -> (
     modaltriangle_i3 = -1
     # Establish the indices mn[0..n-1] over which combination is necessary for the convex MINORANT (GCM) fit.
     mn = np.zeros(N, dtype=np.int32)
-    mn[0] = 0
     for j in range(1, N):
         mn[j] = j - 1
         while True:
@@ -178,8 +579,8 @@ def _dip_python_impl(X: np.ndarray, debug: bool) -> (
             if mjk == N - 1 or (X[k] - X[mjk]) * (mjk - mjmjk) < (X[mjk] - X[mjmjk]) * (k - mjk):
                 break
             mj[k] = mjmjk
-    gcm = np.zeros(N, dtype=int)  # np.arange(N)
-    lcm = np.zeros(N, dtype=int)  # np.arange(N, -1, -1)
+    gcm = np.zeros(N, dtype=np.int64)
+    lcm = np.zeros(N, dtype=np.int64)
     while True:
         # GCM
         gcm[0] = high
@@ -200,9 +601,11 @@ def _dip_python_impl(X: np.ndarray, debug: bool) -> (
         l_lcm = i
         iv = 1
         if debug:
-            print("'dip': LOOP-BEGIN: 2n*D= {0}  [low,high] = [{1},{2}]:".format(dip_value, low, high))
-            print("gcm[0:{0}] = {1}".format(l_gcm, gcm[:l_gcm + 1]))
-            print("lcm[0:{0}] = {1}".format(l_lcm, lcm[:l_lcm + 1]))
+            print("'dip': LOOP-BEGIN: 2n*D=", dip_value, " [low,high] =", low, high)
+            for i in range(l_gcm + 1):
+                print("gcm[", i, "] =", gcm[i])
+            for i in range(l_lcm + 1):
+                print("lcm[", i, "] =", lcm[i])
         d = 0.0
         if l_gcm != 1 or l_lcm != 1:
             if debug:
@@ -219,7 +622,7 @@ def _dip_python_impl(X: np.ndarray, debug: bool) -> (
                         ig = ix + 1
                         ih = iv - 1
                         if debug:
-                            print("L({0},{1})".format(ig, ih))
+                            print("L(", ig, ",", ih, ")")
                 else:
                     lcmivl = lcm[iv - 1]
                     dx = (X[gcmix] - X[lcmivl]) * (lcmiv - lcmivl) / (X[lcmiv] - X[lcmivl]) - (gcmix - lcmivl - 1)
@@ -229,19 +632,17 @@ def _dip_python_impl(X: np.ndarray, debug: bool) -> (
                         ig = ix + 1
                         ih = iv
                         if debug:
-                            print("G({0},{1})".format(ig, ih))
+                            print("G(", ig, ",", ih, ")")
                 if ix < 0:
                     ix = 0
                 if iv > l_lcm:
                     iv = l_lcm
                 if debug:
-                    print("  --> ix = {0}, iv = {1}".format(ix, iv))
+                    print("  --> ix =", ix, ", iv =", iv)
                 if gcm[ix] == lcm[iv]:
                     break
-        else:
-            d = 0.0
-            if debug:
-                print("  ** (l_lcm,l_gcm) = ({0},{1}) ==> d := {2}".format(l_lcm, l_gcm, d))
+        elif debug:
+            print("  ** (l_lcm,l_gcm) = (", l_lcm, ",", l_gcm, ") ==> d := 0.0")
         if d < dip_value:
             break
         if debug:
@@ -253,9 +654,9 @@ def _dip_python_impl(X: np.ndarray, debug: bool) -> (
         gcm_modalTriangle_i1 = -1
         gcm_modalTriangle_i3 = -1
         # The DIP for the convex minorant
-        dip_l = 0
+        dip_l = 0.0
         for j in range(ig, l_gcm):
-            max_t = 1
+            max_t = 1.0
             j_ = -1
             jb = gcm[j + 1]
             je = gcm[j]
@@ -272,9 +673,9 @@ def _dip_python_impl(X: np.ndarray, debug: bool) -> (
                 gcm_modalTriangle_i1 = jb
                 gcm_modalTriangle_i3 = je
         # The DIP for the concave majorant
-        dip_u = 0
+        dip_u = 0.0
         for j in range(ih, l_lcm):
-            max_t = 1
+            max_t = 1.0
             j_ = -1
             jb = lcm[j]
             je = lcm[j + 1]
@@ -291,23 +692,19 @@ def _dip_python_impl(X: np.ndarray, debug: bool) -> (
                 lcm_modalTriangle_i1 = jb
                 lcm_modalTriangle_i3 = je
         if debug:
-            print(" (dip_l, dip_u) = ({0}, {1})".format(dip_l, dip_u))
+            print(" (dip_l, dip_u) = (", dip_l, ",", dip_u, ")")
         if dip_u > dip_l:
             dip_new = dip_u
             j_best = j_u
             if debug:
-                print(" -> new larger dip {0} (j_best = {1}) gcm-centred triple ({2},{3},{4})".format(dip_new, j_best,
-                                                                                                      lcm_modalTriangle_i1,
-                                                                                                      j_best,
-                                                                                                      lcm_modalTriangle_i3))
+                print(" -> new larger dip", dip_new, "(j_best =", j_best, ") gcm-centred triple (",
+                      lcm_modalTriangle_i1, ",", j_best, ",", lcm_modalTriangle_i3, ")")
         else:
             dip_new = dip_l
             j_best = j_l
             if debug:
-                print(" -> new larger dip {0} (j_best = {1}) lcm-centred triple ({2},{3},{4})".format(dip_new, j_best,
-                                                                                                      gcm_modalTriangle_i1,
-                                                                                                      j_best,
-                                                                                                      gcm_modalTriangle_i3))
+                print(" -> new larger dip", dip_new, "(j_best =", j_best, ") lcm-centred triple (",
+                      gcm_modalTriangle_i1, ",", j_best, ",", gcm_modalTriangle_i3, ")")
         if dip_value < dip_new:
             dip_value = dip_new
             if dip_u > dip_l:
@@ -320,21 +717,48 @@ def _dip_python_impl(X: np.ndarray, debug: bool) -> (
                 modaltriangle_i3 = gcm_modalTriangle_i3
         if low == gcm[ig] and high == lcm[ih]:
             if debug:
-                print("No improvement in  low = {0}  nor  high = {1} --> END".format(low, high))
+                print("No improvement in  low =", low, " nor  high =", high, "--> END")
             break
         low = gcm[ig]
         high = lcm[ih]
     dip_value /= (2 * N)
-    return dip_value, (low, high), (modaltriangle_i1, modaltriangle_i2, modaltriangle_i3), gcm, lcm, mn, mj
+    return dip_value, low, high, modaltriangle_i1, modaltriangle_i2, modaltriangle_i3, gcm, lcm, mn, mj
+
+
+if njit is not None:
+    _dip_numba_kernel = njit(cache=True, nogil=True)(_dip_kernel)
+else:
+    _dip_numba_kernel = None
+
+
+def backend() -> str:
+    """
+    Get the engine that is used by dip_test and dip_test_batch if use_c is True.
+    The C implementation is preferred. If the C module could not be built, the Numba implementation is used (if Numba is installed).
+    Else, the pure python implementation is used.
+
+    Returns
+    -------
+    backend : str
+        The active engine. Can be 'c', 'numba' or 'python'
+    """
+    if _C_DIP_AVAILABLE:
+        return "c"
+    elif _dip_numba_kernel is not None:
+        return "numba"
+    else:
+        return "python"
 
 
 def dip_pval(dip_value: float, n_points: int, pval_strategy: str = "table", n_boots: int = 1000,
-             random_state: np.random.RandomState | int = None) -> float:
+             random_state: np.random.RandomState | int = None, cache_dir: str = None,
+             interpolation_tolerance: float = 0.) -> float:
     """
     Get the p-value of a corresponding Dip-value.
     P-values depend on the input Dip-value and the sample size.
     There are several strategies to calculate the p-value. These are:
-    'table' (most common), 'function' (available for all sample sizes) and 'bootstrap' (slow for large sample sizes)
+    'table' (most common), 'function' (available for all sample sizes), 'bootstrap' (slow for large sample sizes) and
+    'cached_bootstrap' (bootstrap, but the Dip-values of the random data sets are only calculated once for each sample size, see dip_boot_samples_cached)
 
     Parameters
     ----------
@@ -345,9 +769,17 @@ def dip_pval(dip_value: float, n_points: int, pval_strategy: str = "table", n_bo
     pval_strategy : str
         Specifies the strategy that should be used to calculate the p-value (default: 'table')
     n_boots : int
-        Number of random data sets that should be created to calculate Dip-values. Only relevant if pval_strategy is 'bootstrap' (default: 1000)
+        Number of random data sets that should be created to calculate Dip-values. Only relevant if pval_strategy is 'bootstrap' or 'cached_bootstrap' (default: 1000)
     random_state : np.random.RandomState | int
-        use a fixed random state to get a repeatable solution. Can also be of type int. Only relevant if pval_strategy is 'bootstrap' (default: None)
+        use a fixed random state to get a repeatable solution. Can also be of type int. Only relevant if pval_strategy is 'bootstrap' or 'cached_bootstrap'.
+        In the case of 'cached_bootstrap', integers are directly used as seed of the cached entry.
+        Else, DIP_BOOT_CACHE_DEFAULT_SEED is used and the random state is not consumed, so that the cached entry can be reused across calls (default: None)
+    cache_dir : str
+        Directory in which the Dip-values of the random data sets should be stored on disk. Only relevant if pval_strategy is 'cached_bootstrap'.
+        See dip_boot_samples_cached (default: None)
+    interpolation_tolerance : float
+        Maximum relative difference between n_points and the number of samples of a cached entry so that this entry can be used for interpolation.
+        Only relevant if pval_strategy is 'cached_bootstrap'. See dip_boot_samples_cached (default: 0.)
 
     Returns
     -------
@@ -366,26 +798,33 @@ def dip_pval(dip_value: float, n_points: int, pval_strategy: str = "table", n_bo
     """
     assert type(pval_strategy) is str, "pval_stratgegy must be of type string"
     pval_strategy = pval_strategy.lower()
-    assert pval_strategy in ["bootstrap", "table",
-                             "function"], "pval_strategy must match 'bootstrap', 'table' or 'function'. " \
+    assert pval_strategy in ["bootstrap", "cached_bootstrap", "table",
+                             "function"], "pval_strategy must match 'bootstrap', 'cached_bootstrap', 'table' or 'function'. " \
                                           "Your input: {0}".format(pval_strategy)
     if n_points < 4:
         pval = 1.0
     elif pval_strategy == "bootstrap":
         boot_dips = dip_boot_samples(int(n_points), n_boots, random_state)
         pval = np.mean(dip_value <= boot_dips)
+    elif pval_strategy == "cached_bootstrap":
+        # Drawing a new seed for each call would create a new cache entry for each call
+        seed = int(random_state) if isinstance(random_state, (int, np.integer)) else DIP_BOOT_CACHE_DEFAULT_SEED
+        boot_dips = dip_boot_samples_cached(int(n_points), n_boots, seed, cache_dir, interpolation_tolerance)
+        # boot_dips are sorted, therefore, np.mean(dip_value <= boot_dips) can be calculated using a binary search
+        pval = 1. - np.searchsorted(boot_dips, dip_value, side="left") / boot_dips.shape[0]
     elif pval_strategy == "table":
         pval = _dip_pval_table(dip_value, n_points)
     elif pval_strategy == "function":
         pval = _dip_pval_function(dip_value, n_points)
     else:
         raise Exception(
-            "pval_strategy must match 'bootstrap', 'table' or 'function. Your input: {0}".format(pval_strategy))
+            "pval_strategy must match 'bootstrap', 'cached_bootstrap', 'table' or 'function. Your input: {0}".format(
+                pval_strategy))
     return pval
 
 
-def dip_boot_samples(n_points: int, n_boots: int = 1000,
-                     random_state: np.random.RandomState | int = None) -> np.ndarray:
+def dip_boot_samples(n_points: int, n_boots: int = 1000, random_state: np.random.RandomState | int = None,
+                     n_jobs: int = None) -> np.ndarray:
     """
     Sample random data sets and calculate corresponding Dip-values.
     E.g. used to determine p-values.
@@ -398,6 +837,9 @@ def dip_boot_samples(n_points: int, n_boots: int = 1000,
         Number of random data sets that should be created to calculate Dip-values (default: 1000)
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    n_jobs : int
+        Number of processes used to calculate the Dip-values. The random data sets are always created in the main process, so the result does not depend on n_jobs.
+        None means 1 and -1 means using all processors (default: None)
 
     Returns
     -------
@@ -407,7 +849,162 @@ def dip_boot_samples(n_points: int, n_boots: int = 1000,
     # random uniform vectors
     random_state = check_random_state(random_state)
     boot_samples = random_state.rand(n_boots, n_points)
-    boot_dips = np.array([dip_test(boot_s, just_dip=True, is_data_sorted=False) for boot_s in boot_samples])
+    n_jobs = min(_get_n_jobs(n_jobs), n_boots)
+    if n_jobs > 1:
+        boot_samples_split = np.array_split(boot_samples, n_jobs)
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            boot_dips = np.concatenate(list(executor.map(dip_test_batch, boot_samples_split, [1] * n_jobs)))
+    else:
+        boot_dips = dip_test_batch(boot_samples, axis=1)
+    return boot_dips
+
+
+def dip_boot_samples_cached(n_points: int, n_boots: int = 1000, seed: int = 0, cache_dir: str = None,
+                            interpolation_tolerance: float = 0., n_jobs: int = None) -> np.ndarray:
+    """
+    Get the sorted Dip-values of random data sets as created by dip_boot_samples.
+    The results are stored in an in-memory LRU cache (with DIP_BOOT_CACHE_MAX_SIZE entries) and, optionally, as .npy files on disk.
+    Both caches are keyed by (n_points, n_boots, seed), so the Dip-values for a specific setting are only calculated once.
+    If interpolation_tolerance is larger than 0 and no entry for n_points exists, cached entries with a similar number of samples are used instead.
+    Since sqrt(n_points) * Dip-value is approximately independent of n_points, the quantiles of sqrt(n) * Dip-value of the next smaller and larger cached sample sizes are linearly interpolated.
+    Interpolated Dip-values are only stored in the in-memory cache, keyed by (n_points, n_boots, seed, interpolation_tolerance).
+
+    Parameters
+    ----------
+    n_points : int
+        The number of samples
+    n_boots : int
+        Number of random data sets that should be created to calculate Dip-values (default: 1000)
+    seed : int
+        The seed used to create the random data sets (default: 0)
+    cache_dir : str
+        Directory in which the Dip-values should be stored on disk.
+        If None, the global python environment variable 'CLUSTPY_DIP_CACHE' will be used if it is defined, else only the in-memory cache is used (default: None)
+    interpolation_tolerance : float
+        Maximum relative difference between n_points and the number of samples of a cached entry so that this entry can be used for interpolation.
+        0 means that no interpolation will be performed (default: 0.)
+    n_jobs : int
+        Number of processes used to calculate the Dip-values if they are not cached. None means 1 and -1 means using all processors (default: None)
+
+    Returns
+    -------
+    boot_dips : np.ndarray
+        Sorted array of Dip-values. The array is read-only since it is shared with the cache
+    """
+    key = (n_points, n_boots, seed)
+    with _DIP_BOOT_CACHE_LOCK:
+        if key in _DIP_BOOT_CACHE:
+            _DIP_BOOT_CACHE.move_to_end(key)
+            return _DIP_BOOT_CACHE[key]
+    if cache_dir is None:
+        cache_dir = os.environ.get("CLUSTPY_DIP_CACHE", None)
+    boot_dips = None
+    if cache_dir is not None and os.path.isfile(_get_dip_boot_cache_file(cache_dir, *key)):
+        boot_dips = np.load(_get_dip_boot_cache_file(cache_dir, *key))
+    elif interpolation_tolerance > 0:
+        # Interpolated Dip-values use a separate key, so they are neither returned if interpolation is disabled nor used for further interpolations
+        key = (n_points, n_boots, seed, interpolation_tolerance)
+        with _DIP_BOOT_CACHE_LOCK:
+            if key in _DIP_BOOT_CACHE:
+                _DIP_BOOT_CACHE.move_to_end(key)
+                return _DIP_BOOT_CACHE[key]
+        boot_dips = _interpolate_cached_dip_boot_samples(n_points, n_boots, seed, cache_dir, interpolation_tolerance)
+    if boot_dips is None:
+        key = (n_points, n_boots, seed)
+        boot_dips = np.sort(dip_boot_samples(n_points, n_boots, seed, n_jobs))
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write to a temporary file first so that parallel runs never read incomplete files
+            cache_file = _get_dip_boot_cache_file(cache_dir, *key)
+            temp_file = "{0}.{1}_{2}.tmp.npy".format(cache_file[:-len(".npy")], os.getpid(), threading.get_ident())
+            np.save(temp_file, boot_dips)
+            os.replace(temp_file, cache_file)
+    # Callers must not be able to modify the cached array
+    boot_dips.flags.writeable = False
+    # Add to in-memory cache and remove least recently used entry if necessary
+    with _DIP_BOOT_CACHE_LOCK:
+        _DIP_BOOT_CACHE[key] = boot_dips
+        if len(_DIP_BOOT_CACHE) > DIP_BOOT_CACHE_MAX_SIZE:
+            _DIP_BOOT_CACHE.popitem(last=False)
+    return boot_dips
+
+
+def _get_dip_boot_cache_file(cache_dir: str, n_points: int, n_boots: int, seed: int) -> str:
+    """
+    Get the path of the file containing the cached Dip-values of random data sets.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory in which the Dip-values are stored
+    n_points : int
+        The number of samples
+    n_boots : int
+        Number of random data sets
+    seed : int
+        The seed used to create the random data sets
+
+    Returns
+    -------
+    cache_file : str
+        The path of the cache file
+    """
+    cache_file = os.path.join(cache_dir, "dip_boot_{0}_{1}_{2}.npy".format(n_points, n_boots, seed))
+    return cache_file
+
+
+def _interpolate_cached_dip_boot_samples(n_points: int, n_boots: int, seed: int, cache_dir: str,
+                                         interpolation_tolerance: float) -> np.ndarray:
+    """
+    Approximate the sorted Dip-values of random data sets with n_points samples using cached entries with a similar number of samples.
+    If cached entries with a smaller and a larger number of samples exist, the quantiles of sqrt(n) * Dip-value are linearly interpolated.
+    If only one of them exists, its Dip-values are rescaled by sqrt(n_cached / n_points).
+
+    Parameters
+    ----------
+    n_points : int
+        The number of samples
+    n_boots : int
+        Number of random data sets
+    seed : int
+        The seed used to create the random data sets
+    cache_dir : str
+        Directory in which the Dip-values are stored on disk. Can be None
+    interpolation_tolerance : float
+        Maximum relative difference between n_points and the number of samples of a cached entry
+
+    Returns
+    -------
+    boot_dips : np.ndarray
+        Sorted array of approximated Dip-values, None if no suitable cached entry exists
+    """
+    # Collect the sample sizes of all cached entries with matching n_boots and seed (interpolated entries are skipped)
+    with _DIP_BOOT_CACHE_LOCK:
+        cached_n_points = {key[0] for key in _DIP_BOOT_CACHE.keys() if
+                           len(key) == 3 and key[1] == n_boots and key[2] == seed}
+    if cache_dir is not None and os.path.isdir(cache_dir):
+        file_suffix = "_{0}_{1}.npy".format(n_boots, seed)
+        for file in os.listdir(cache_dir):
+            if file.startswith("dip_boot_") and file.endswith(file_suffix):
+                cached_n_points.add(int(file[len("dip_boot_"):-len(file_suffix)]))
+    cached_n_points = np.array([n for n in cached_n_points if abs(n - n_points) <= interpolation_tolerance * n_points])
+    smaller_n_points = cached_n_points[cached_n_points < n_points]
+    larger_n_points = cached_n_points[cached_n_points > n_points]
+    if smaller_n_points.shape[0] == 0 and larger_n_points.shape[0] == 0:
+        return None
+    # sqrt(n) * Dip-value is approximately independent of n
+    neighbors = []
+    if smaller_n_points.shape[0] != 0:
+        neighbors.append(np.max(smaller_n_points))
+    if larger_n_points.shape[0] != 0:
+        neighbors.append(np.min(larger_n_points))
+    scaled_dips = [np.sqrt(n) * dip_boot_samples_cached(int(n), n_boots, seed, cache_dir) for n in neighbors]
+    if len(neighbors) == 2:
+        fn = (n_points - neighbors[0]) / (neighbors[1] - neighbors[0])
+        scaled_boot_dips = scaled_dips[0] + fn * (scaled_dips[1] - scaled_dips[0])
+    else:
+        scaled_boot_dips = scaled_dips[0]
+    boot_dips = scaled_boot_dips / np.sqrt(n_points)
     return boot_dips
 
 
@@ -6,7 +6,20 @@ from sklearn.base import ClusterMixin
 from collections.abc import Callable
 import os
 import inspect
+import functools
+import types
+import json
+import hashlib
+import sys
+import tracemalloc
+from contextlib import nullcontext, contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from threadpoolctl import threadpool_limits
 from sklearn.datasets._base import Bunch
+from clustpy.utils._utils import _get_n_jobs
+from clustpy.metrics.confusion_matrix import contingency_table_cache
+
+_PROFILING_MEASUREMENTS = ("wall_time", "cpu_time", "peak_memory")
 
 
 def _preprocess_dataset(X: np.ndarray, preprocess_methods: list, preprocess_params: list) -> np.ndarray:
@@ -77,17 +90,833 @@ def _get_n_clusters_from_algo(algo_obj: ClusterMixin) -> int:
     return n_clusters
 
 
-def evaluate_dataset(X: np.ndarray, evaluation_algorithms: list, evaluation_metrics: list = None,
-                     labels_true: np.ndarray = None, n_repetitions: int = 10,
-                     X_test: np.ndarray = None, labels_true_test: np.ndarray = None,
-                     aggregation_functions: tuple = (np.mean, np.std), add_runtime: bool = True,
-                     add_n_clusters: bool = False, save_path: str = None, save_labels_path: str = None,
-                     ignore_algorithms: tuple = (), dataset_name: str = None,
-                     random_state: np.random.RandomState | int = None) -> pd.DataFrame:
+class _EvaluationProfiler():
     """
-    Evaluate the clustering result of different clustering algorithms (as specified by evaluation_algorithms) on a given data set using different metrics (as specified by evaluation_metrics).
-    Each algorithm will be executed n_repetitions times and all specified metrics will be used to evaluate the clustering result.
-    The final result is a pandas DataFrame containing all the information.
+    Measures the wall time, the CPU time and the peak memory of the phases (e.g. preprocessing, fit, predict and each metric) of an evaluation.
+    The peak memory is the peak of the memory allocated by python (measured using tracemalloc).
+    If torch uses a GPU, the peak of the allocated GPU memory is also added to the trace.
+    Furthermore, the peak resident set size since the creation of the profiler is measured (see _reset_peak_rss).
+    If the profiler is not enabled, no measurements are performed.
+
+    Parameters
+    ----------
+    enabled : bool
+        Defines whether the phases should be measured
+
+    Attributes
+    ----------
+    trace : dict
+        Dictionary containing the name of each measured phase and a dictionary with the corresponding measurements
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.trace = {}
+        self._peak_rss_start = _reset_peak_rss() if enabled else np.nan
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Context manager that measures a single phase.
+
+        Parameters
+        ----------
+        name : str
+            The name of the phase
+        """
+        if not self.enabled:
+            yield
+            return
+        started_tracemalloc = not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        torch = sys.modules.get("torch")
+        use_cuda = torch is not None and torch.cuda.is_available()
+        if use_cuda:
+            torch.cuda.reset_peak_memory_stats()
+        start_wall_time = time.perf_counter()
+        start_cpu_time = time.process_time()
+        try:
+            yield
+        finally:
+            measurements = {"wall_time": time.perf_counter() - start_wall_time,
+                            "cpu_time": time.process_time() - start_cpu_time,
+                            "peak_memory": tracemalloc.get_traced_memory()[1]}
+            if use_cuda:
+                measurements["peak_torch_memory"] = torch.cuda.max_memory_allocated()
+            if started_tracemalloc:
+                tracemalloc.stop()
+            self.trace[name] = measurements
+
+    def get_columns(self) -> dict:
+        """
+        Get the measurements as flat dictionary that can be added to the evaluation DataFrame.
+        The keys are of the form '{phase}_{measurement}' (e.g. 'fit_wall_time'). Additionally, the peak resident set size since the creation of the profiler ('peak_rss') is added.
+
+        Returns
+        -------
+        columns : dict
+            The flat dictionary containing the measurements
+        """
+        columns = {}
+        for phase_name, measurements in self.trace.items():
+            for measurement in _PROFILING_MEASUREMENTS:
+                columns["{0}_{1}".format(phase_name, measurement)] = measurements[measurement]
+        columns["peak_rss"] = _get_peak_rss(self._peak_rss_start)
+        return columns
+
+
+def _reset_peak_rss() -> float:
+    """
+    Reset the peak resident set size of the current process, so that the following measurements only cover the current unit.
+    Resetting is only possible on Linux (via /proc/self/clear_refs). On other systems, the peak of the process lifetime is returned instead, so that its increase can be measured.
+
+    Returns
+    -------
+    peak_rss_start : float
+        None if the peak has been reset, otherwise the peak resident set size of the process lifetime (see _get_process_peak_rss)
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        peak_rss_start = None
+    except OSError:
+        peak_rss_start = _get_process_peak_rss()
+    return peak_rss_start
+
+
+def _get_peak_rss(peak_rss_start: float) -> float:
+    """
+    Get the peak resident set size (in bytes) of the current process since the last call of _reset_peak_rss.
+    If the peak could not be reset, the increase of the peak of the process lifetime is returned, which is 0 if the previous peak has not been exceeded.
+
+    Parameters
+    ----------
+    peak_rss_start : float
+        The result of _reset_peak_rss
+
+    Returns
+    -------
+    peak_rss : float
+        The peak resident set size. Is NaN if it can not be measured (e.g. on Windows)
+    """
+    if peak_rss_start is None:
+        peak_rss = np.nan
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                # VmHWM is reported in kilobytes
+                if line.startswith("VmHWM:"):
+                    peak_rss = int(line.split()[1]) * 1024
+    else:
+        peak_rss = _get_process_peak_rss() - peak_rss_start
+    return float(peak_rss)
+
+
+def _get_process_peak_rss() -> float:
+    """
+    Get the peak resident set size (in bytes) of the process lifetime.
+
+    Returns
+    -------
+    peak_rss : float
+        The peak resident set size. Is NaN if the resource module is not available (e.g. on Windows)
+    """
+    try:
+        import resource
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        if sys.platform != "darwin":
+            peak_rss *= 1024
+    except ImportError:
+        peak_rss = np.nan
+    return float(peak_rss)
+
+
+def _get_profiling_column_names(evaluation_metrics: list, use_test_data: bool) -> list:
+    """
+    Get the names of all columns that are added to the evaluation DataFrame if profiling is enabled.
+
+    Parameters
+    ----------
+    evaluation_metrics : list
+        Contains objects of type EvaluationMetric which are wrappers for the metrics. Can be None
+    use_test_data : bool
+        Defines whether a test data set is given, i.e., whether the predict phase is measured
+
+    Returns
+    -------
+    column_names : list
+        List containing the names of the columns
+    """
+    phases = ["preprocessing", "fit"] + (["predict"] if use_test_data else [])
+    if evaluation_metrics is not None:
+        phases += [m.name for m in evaluation_metrics]
+    column_names = ["{0}_{1}".format(phase_name, measurement) for phase_name in phases for measurement in
+                    _PROFILING_MEASUREMENTS] + ["peak_rss"]
+    return column_names
+
+
+def _execute_evaluation_unit(X: np.ndarray, X_processed: np.ndarray, X_test: np.ndarray, X_test_processed: np.ndarray,
+                             labels_true: np.ndarray, labels_true_test: np.ndarray,
+                             eval_algo: 'EvaluationAlgorithm', params: dict, seed: int, rep: int,
+                             evaluation_metrics: list, add_runtime: bool, add_n_clusters: bool,
+                             save_labels_path: str, cache_dir: str, cache_key: str, add_profiling: bool) -> (
+        dict, dict):
+    """
+    Execute a single unit of an evaluation, i.e., a single repetition of a clustering algorithm on a data set, and evaluate the result using all metrics.
+    Units are independent of each other, so they can be executed in separate processes.
+    The seed is set at the beginning of the unit, so the result does not depend on the order of execution.
+    If a cached clustering result exists for cache_key, the algorithm will not be executed and only the metrics are calculated using the stored labels.
+    If add_profiling is True, the fit, predict and metric phases are measured (see _EvaluationProfiler).
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    X_processed : np.ndarray
+        the data set after the preprocessing steps of the algorithm have been applied
+    X_test : np.ndarray
+        An optional test data set that will be evaluated using the predict method of the clustering algorithm
+    X_test_processed : np.ndarray
+        the test data set after the preprocessing steps of the algorithm have been applied
+    labels_true : np.ndarray
+        The ground truth labels of the data set
+    labels_true_test : np.ndarray
+        The ground truth labels of the test data set
+    eval_algo : EvaluationAlgorithm
+        The wrapper of the clustering algorithm
+    params : dict
+        The parameters of the clustering algorithm in this repetition
+    seed : int
+        The seed of this repetition
+    rep : int
+        The number of the repetition
+    evaluation_metrics : list
+        Contains objects of type EvaluationMetric which are wrappers for the metrics
+    add_runtime : bool
+        Add runtime of the execution to the result
+    add_n_clusters : bool
+        Add the resulting number of clusters to the result
+    save_labels_path : str
+        The path where the clustering labels should be saved as csv. If None, the labels will not be saved
+    cache_dir : str
+        The directory containing the cached clustering results. Can be None
+    cache_key : str
+        The key of the clustering result of this unit (see _get_evaluation_cache_key). Can be None
+    add_profiling : bool
+        Defines whether the phases of the unit should be measured
+
+    Returns
+    -------
+    tuple : (dict, dict)
+        Dictionary containing the name of each metric (or 'runtime'/'n_clusters'/profiling column) and the corresponding result. Is None if the algorithm raised an exception,
+        The profiling trace of the unit (see _EvaluationProfiler). Is None if add_profiling is False or the algorithm raised an exception
+    """
+    thread_limit = nullcontext() if eval_algo.n_threads is None else threadpool_limits(limits=eval_algo.n_threads)
+    with thread_limit:
+        print("- {0}: Iteration {1}".format(eval_algo.name, rep))
+        result = {}
+        profiler = _EvaluationProfiler(add_profiling)
+        # Use the stored clustering result if the same algorithm was already executed with the same data, parameters and seed
+        clustering_result = _load_cached_clustering_result(cache_dir, cache_key)
+        is_cached = clustering_result is not None
+        if is_cached:
+            print("-- Use cached clustering result")
+        else:
+            clustering_result = _fit_evaluation_algorithm(X_processed, X_test_processed, eval_algo, params, seed, rep,
+                                                          profiler)
+            if clustering_result is None:
+                return None, None
+            _save_cached_clustering_result(cache_dir, cache_key, *clustering_result)
+        labels_pred, labels_predicted_test, runtime, n_clusters = clustering_result
+        if add_runtime:
+            result["runtime"] = runtime
+            print("-- runtime: {0}".format(runtime))
+        if add_n_clusters:
+            result["n_clusters"] = n_clusters
+            print("-- n_clusters: {0}".format(n_clusters))
+        # Optional: Save labels
+        if save_labels_path is not None:
+            save_labels_path_algo = "{0}_{1}_{2}.{3}".format(save_labels_path.split(".")[0], eval_algo.name, rep,
+                                                             save_labels_path.split(".")[1])
+            # Check if directory exists
+            parent_directory = os.path.dirname(save_labels_path_algo)
+            if parent_directory != "":
+                os.makedirs(parent_directory, exist_ok=True)
+            np.savetxt(save_labels_path_algo, labels_pred)
+            # Also save predict labels
+            if X_test is not None and labels_predicted_test is not None:
+                save_labels_path_algo_test = "{0}_TEST.{1}".format(save_labels_path_algo.split(".")[0],
+                                                                   save_labels_path_algo.split(".")[1])
+                np.savetxt(save_labels_path_algo_test, labels_predicted_test)
+        # Get result of all metrics
+        if evaluation_metrics is not None:
+            # Metrics using the same labels share a single contingency table
+            with contingency_table_cache():
+                for eval_metric in evaluation_metrics:
+                    try:
+                        assert type(eval_metric) is EvaluationMetric, "All metrics must be of type EvaluationMetric"
+                        with profiler.phase(eval_metric.name):
+                            # Check if metric uses ground truth (e.g. NMI, ACC, ...)
+                            if eval_metric.use_gt:
+                                assert labels_true is not None, "Ground truth can not be None if it is used for the chosen metric"
+                                metric_result = eval_metric.method(labels_true, labels_pred, **eval_metric.params)
+                                if X_test is not None and labels_predicted_test is not None:
+                                    metric_result_test = eval_metric.method(labels_true_test, labels_predicted_test,
+                                                                            **eval_metric.params)
+                            else:
+                                # Metric does not use ground truth (e.g. Silhouette, ...)
+                                metric_result = eval_metric.method(X, labels_pred, **eval_metric.params)
+                                if X_test is not None and labels_predicted_test is not None:
+                                    metric_result_test = eval_metric.method(X_test, labels_predicted_test,
+                                                                            **eval_metric.params)
+                        result[eval_metric.name] = metric_result
+                        print("-- {0}: {1}".format(eval_metric.name, metric_result))
+                        if X_test is not None and labels_predicted_test is not None:
+                            result[eval_metric.name + "_TEST"] = metric_result_test
+                            print("-- {0} (TEST): {1}".format(eval_metric.name, metric_result_test))
+                    except Exception as e:
+                        print("Metric {0} raised an exception and will be skipped".format(eval_metric.name))
+                        print(e)
+        trace = None
+        if add_profiling:
+            result.update(profiler.get_columns())
+            if is_cached:
+                # The algorithm has not been executed, so the memory usage of this unit is not meaningful
+                result["peak_rss"] = np.nan
+            trace = profiler.trace
+    return result, trace
+
+
+def _fit_evaluation_algorithm(X_processed: np.ndarray, X_test_processed: np.ndarray, eval_algo: 'EvaluationAlgorithm',
+                              params: dict, seed: int, rep: int, profiler: _EvaluationProfiler = None) -> (
+        np.ndarray, np.ndarray, float, int):
+    """
+    Execute a clustering algorithm and obtain the labels of the (optional) test data set using its predict method.
+
+    Parameters
+    ----------
+    X_processed : np.ndarray
+        the data set after the preprocessing steps of the algorithm have been applied
+    X_test_processed : np.ndarray
+        the test data set after the preprocessing steps of the algorithm have been applied. Can be None
+    eval_algo : EvaluationAlgorithm
+        The wrapper of the clustering algorithm
+    params : dict
+        The parameters of the clustering algorithm in this repetition
+    seed : int
+        The seed of this repetition
+    rep : int
+        The number of the repetition
+    profiler : _EvaluationProfiler
+        The profiler used to measure the fit and predict phases. If None, no measurements are performed (default: None)
+
+    Returns
+    -------
+    tuple : (np.ndarray, np.ndarray, float, int)
+        The predicted labels,
+        The predicted labels of the test data set (None if no test data set is given or the predict method failed),
+        The runtime,
+        The number of clusters.
+        Is None if the algorithm raised an exception
+    """
+    if profiler is None:
+        profiler = _EvaluationProfiler(False)
+    # set seed
+    np.random.seed(seed)
+    # Execute algorithm
+    start_time = time.perf_counter()
+    algo_obj = eval_algo.algorithm(**params)
+    try:
+        with profiler.phase("fit"):
+            algo_obj.fit(X_processed)
+    except Exception as e:
+        print("Execution of {0} raised an exception in iteration {1}".format(eval_algo.name, rep))
+        print(e)
+        return None
+    # Optional: Obtain labels from the predict method
+    labels_predicted_test = None
+    if X_test_processed is not None:
+        try:
+            with profiler.phase("predict"):
+                predict_params = inspect.getfullargspec(algo_obj.predict).args
+                # Normally, there should not be X_train and X_test as input
+                if "X_train" in predict_params and "X_test" in predict_params:
+                    labels_predicted_test = algo_obj.predict(X_train=X_processed,
+                                                             X_test=X_test_processed)  # TODO Remove special case for DipEncoder
+                else:
+                    labels_predicted_test = algo_obj.predict(X_test_processed)
+        except Exception as e:
+            print("Problem when running the predict method of {0} in iteration {1}".format(eval_algo.name, rep))
+            print(e)
+    runtime = time.perf_counter() - start_time
+    n_clusters = _get_n_clusters_from_algo(algo_obj)
+    return algo_obj.labels_, labels_predicted_test, runtime, n_clusters
+
+
+def _get_hashable_representation(obj) -> str:
+    """
+    Get a deterministic and content-based string representation of an object that can be used to create a hash.
+    Dictionaries, lists, tuples and sets are converted recursively and numpy arrays and torch tensors are represented by the hash of their content.
+    Classes are represented by their qualified name, functions additionally by their byte code, constants, default arguments and the contents of their closure.
+    Torch modules are represented by their architecture and the hash of their state_dict.
+    Primitive objects (e.g., int, float, str or None) are represented by repr.
+    For all other objects, repr is not guaranteed to be stable and content-based, so no representation is created.
+
+    Parameters
+    ----------
+    obj : object
+        The input object
+
+    Returns
+    -------
+    representation : str
+        The string representation of the object. Is None if no reliable representation can be created
+    """
+    torch = sys.modules.get("torch")
+    if type(obj) is dict:
+        keys = sorted(obj.keys(), key=str)
+        representations = [_get_hashable_representation(k) for k in keys] + [_get_hashable_representation(obj[k])
+                                                                             for k in keys]
+        if None in representations:
+            return None
+        representation = "{" + ",".join("{0}:{1}".format(representations[i], representations[len(keys) + i]) for i in
+                                        range(len(keys))) + "}"
+    elif type(obj) in (list, tuple, set, frozenset):
+        representations = [_get_hashable_representation(o) for o in obj]
+        if None in representations:
+            return None
+        if type(obj) in (set, frozenset):
+            representations = sorted(representations)
+        representation = "{0}[{1}]".format(type(obj).__name__, ",".join(representations))
+    elif type(obj) is np.ndarray:
+        # The bytes of object arrays are pointers
+        representation = None if obj.dtype == object else _get_array_hash(obj)
+    elif obj is None or type(obj) in (bool, int, float, complex, str, bytes, range, slice) or obj is Ellipsis or \
+            isinstance(obj, (np.generic, np.dtype)):
+        representation = repr(obj)
+    elif inspect.isclass(obj) or inspect.isbuiltin(obj):
+        representation = "{0}.{1}".format(obj.__module__, obj.__qualname__)
+    elif inspect.isfunction(obj):
+        try:
+            closure = [] if obj.__closure__ is None else [cell.cell_contents for cell in obj.__closure__]
+        except ValueError:
+            # Closure contains an empty cell
+            return None
+        representations = [_get_code_representation(obj.__code__), _get_hashable_representation(obj.__defaults__),
+                           _get_hashable_representation(obj.__kwdefaults__), _get_hashable_representation(closure)]
+        if None in representations:
+            return None
+        representation = "{0}.{1}({2})".format(obj.__module__, obj.__qualname__, "|".join(representations))
+    elif isinstance(obj, functools.partial):
+        representations = [_get_hashable_representation(obj.func), _get_hashable_representation(obj.args),
+                           _get_hashable_representation(obj.keywords)]
+        if None in representations:
+            return None
+        representation = "partial({0})".format("|".join(representations))
+    elif torch is not None and isinstance(obj, torch.Tensor):
+        representation = _get_tensor_hash(obj)
+    elif torch is not None and isinstance(obj, torch.nn.Module):
+        state_dict = obj.state_dict()
+        representation = "{0}.{1}({2}|{3})".format(type(obj).__module__, type(obj).__qualname__, repr(obj),
+                                                   ",".join("{0}:{1}".format(k, _get_tensor_hash(state_dict[k])) for
+                                                            k in sorted(state_dict.keys())))
+    else:
+        representation = None
+    return representation
+
+
+def _get_code_representation(code: types.CodeType) -> str:
+    """
+    Get a deterministic string representation of a code object, consisting of its name, byte code, constants and referenced names.
+    Nested code objects (e.g., of inner functions) are converted recursively.
+
+    Parameters
+    ----------
+    code : types.CodeType
+        The input code object
+
+    Returns
+    -------
+    representation : str
+        The string representation of the code object. Is None if a constant has no reliable representation
+    """
+    representations = [_get_code_representation(c) if inspect.iscode(c) else _get_hashable_representation(c) for c in
+                       code.co_consts]
+    if None in representations:
+        return None
+    representation = "{0}|{1}|[{2}]|{3}".format(code.co_name, code.co_code.hex(), ",".join(representations),
+                                                code.co_names)
+    return representation
+
+
+def _get_tensor_hash(tensor: 'torch.Tensor') -> str:
+    """
+    Get the hash of the content, shape and data type of a torch tensor.
+
+    Parameters
+    ----------
+    tensor : torch.Tensor
+        The input tensor
+
+    Returns
+    -------
+    tensor_hash : str
+        The hexadecimal sha256 hash
+    """
+    import torch
+    hasher = hashlib.sha256()
+    tensor = tensor.detach().cpu().contiguous()
+    hasher.update("{0}{1}".format(tuple(tensor.shape), tensor.dtype).encode())
+    # Viewing the data as bytes also works for data types that are not supported by numpy (e.g., bfloat16)
+    hasher.update(tensor.reshape(-1).view(torch.uint8).numpy().tobytes())
+    tensor_hash = hasher.hexdigest()
+    return tensor_hash
+
+
+def _get_array_hash(X: np.ndarray) -> str:
+    """
+    Get the hash of the content, shape and data type of a numpy array.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        The input array. Can be None
+
+    Returns
+    -------
+    array_hash : str
+        The hexadecimal sha256 hash
+    """
+    hasher = hashlib.sha256()
+    if X is not None:
+        hasher.update("{0}{1}".format(X.shape, X.dtype).encode())
+        hasher.update(np.ascontiguousarray(X).tobytes())
+    array_hash = hasher.hexdigest()
+    return array_hash
+
+
+def _get_evaluation_cache_key(data_hash: str, eval_algo: 'EvaluationAlgorithm', params: dict, seed: int) -> str:
+    """
+    Get the key of a clustering result within the cache.
+    The key is the hash of the (preprocessed) data, the algorithm class, its parameters and the seed.
+
+    Parameters
+    ----------
+    data_hash : str
+        The hash of the preprocessed data set (and the preprocessed test data set)
+    eval_algo : EvaluationAlgorithm
+        The wrapper of the clustering algorithm
+    params : dict
+        The parameters of the clustering algorithm in this repetition
+    seed : int
+        The seed of this repetition
+
+    Returns
+    -------
+    cache_key : str
+        The hexadecimal sha256 hash. Is None if the algorithm or a parameter has no reliable representation (see _get_hashable_representation)
+    """
+    algorithm_representation = _get_hashable_representation(eval_algo.algorithm)
+    params_representation = _get_hashable_representation(params)
+    if algorithm_representation is None or params_representation is None:
+        return None
+    representation = "{0}|{1}|{2}|{3}".format(data_hash, algorithm_representation, params_representation, seed)
+    cache_key = hashlib.sha256(representation.encode()).hexdigest()
+    return cache_key
+
+
+def _load_cached_clustering_result(cache_dir: str, cache_key: str) -> (np.ndarray, np.ndarray, float, int):
+    """
+    Load a clustering result from the cache.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory containing the cached clustering results. Can be None
+    cache_key : str
+        The key of the clustering result (see _get_evaluation_cache_key)
+
+    Returns
+    -------
+    tuple : (np.ndarray, np.ndarray, float, int)
+        The predicted labels,
+        The predicted labels of the test data set (can be None),
+        The runtime,
+        The number of clusters.
+        Is None if cache_dir is None or no cached result exists
+    """
+    if cache_dir is None:
+        return None
+    cache_file = os.path.join(cache_dir, "{0}.npz".format(cache_key))
+    if not os.path.isfile(cache_file):
+        return None
+    cached = np.load(cache_file)
+    labels_predicted_test = cached["labels_predicted_test"] if "labels_predicted_test" in cached else None
+    n_clusters = cached["n_clusters"].tolist()
+    return cached["labels_pred"], labels_predicted_test, float(cached["runtime"]), n_clusters
+
+
+def _save_cached_clustering_result(cache_dir: str, cache_key: str, labels_pred: np.ndarray,
+                                   labels_predicted_test: np.ndarray, runtime: float, n_clusters: int) -> None:
+    """
+    Save a clustering result in the cache. Nothing will be saved if cache_dir is None.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory containing the cached clustering results. Can be None
+    cache_key : str
+        The key of the clustering result (see _get_evaluation_cache_key)
+    labels_pred : np.ndarray
+        The predicted labels
+    labels_predicted_test : np.ndarray
+        The predicted labels of the test data set. Can be None
+    runtime : float
+        The runtime of the algorithm
+    n_clusters : int
+        The number of clusters
+    """
+    if cache_dir is None:
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_file = os.path.join(cache_dir, "{0}.npz".format(cache_key))
+    arrays = {"labels_pred": labels_pred, "runtime": runtime, "n_clusters": np.array(n_clusters)}
+    if labels_predicted_test is not None:
+        arrays["labels_predicted_test"] = labels_predicted_test
+    # Write to a temporary file first, so an interrupted execution can not leave a corrupted cache entry
+    with open(cache_file + ".tmp", "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(cache_file + ".tmp", cache_file)
+
+
+def _get_evaluation_settings_hash(X: np.ndarray, X_test: np.ndarray, labels_true: np.ndarray,
+                                  labels_true_test: np.ndarray, evaluation_metrics: list, add_runtime: bool,
+                                  add_n_clusters: bool, add_profiling: bool) -> str:
+    """
+    Get the hash of the settings of an evaluation that influence the result of a unit but are not part of the cache key of its clustering result (see _get_evaluation_cache_key).
+    These are the data sets, the ground truth labels, the metrics and the additional columns.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    X_test : np.ndarray
+        An optional test data set. Can be None
+    labels_true : np.ndarray
+        The ground truth labels of the data set. Can be None
+    labels_true_test : np.ndarray
+        The ground truth labels of the test data set. Can be None
+    evaluation_metrics : list
+        Contains objects of type EvaluationMetric which are wrappers for the metrics. Can be None
+    add_runtime : bool
+        Defines whether the runtime is added to the result
+    add_n_clusters : bool
+        Defines whether the resulting number of clusters is added to the result
+    add_profiling : bool
+        Defines whether the profiling measurements are added to the result
+
+    Returns
+    -------
+    settings_hash : str
+        The hexadecimal sha256 hash. Is None if a metric has no reliable representation (see _get_hashable_representation)
+    """
+    metrics = [] if evaluation_metrics is None else [(m.name, m.method, m.params, m.use_gt) for m in
+                                                     evaluation_metrics]
+    metrics_representation = _get_hashable_representation(metrics)
+    if metrics_representation is None:
+        return None
+    representation = "{0}|{1}|{2}|{3}|{4}|{5}|{6}|{7}".format(_get_array_hash(X), _get_array_hash(X_test),
+                                                            _get_array_hash(labels_true),
+                                                            _get_array_hash(labels_true_test),
+                                                            metrics_representation, add_runtime, add_n_clusters,
+                                                            add_profiling)
+    settings_hash = hashlib.sha256(representation.encode()).hexdigest()
+    return settings_hash
+
+
+def _get_evaluation_checkpoint_key(cache_key: str, settings_hash: str) -> str:
+    """
+    Get the key of the checkpoint of a single unit of an evaluation.
+    The key is the hash of the cache key of the clustering result (data, algorithm, parameters and seed) and the settings of the evaluation.
+    Therefore, changed settings never load a stale checkpoint.
+
+    Parameters
+    ----------
+    cache_key : str
+        The key of the clustering result of the unit (see _get_evaluation_cache_key)
+    settings_hash : str
+        The hash of the settings of the evaluation (see _get_evaluation_settings_hash)
+
+    Returns
+    -------
+    checkpoint_key : str
+        The hexadecimal sha256 hash. Is None if cache_key or settings_hash is None
+    """
+    if cache_key is None or settings_hash is None:
+        return None
+    checkpoint_key = hashlib.sha256("{0}|{1}".format(cache_key, settings_hash).encode()).hexdigest()
+    return checkpoint_key
+
+
+def _get_evaluation_checkpoint_file(checkpoint_dir: str, algo_name: str, rep: int, checkpoint_key: str) -> str:
+    """
+    Get the path of the checkpoint file of a single unit of an evaluation.
+
+    Parameters
+    ----------
+    checkpoint_dir : str
+        The directory containing the checkpoints
+    algo_name : str
+        The name of the algorithm
+    rep : int
+        The number of the repetition
+    checkpoint_key : str
+        The key of the unit (see _get_evaluation_checkpoint_key)
+
+    Returns
+    -------
+    checkpoint_file : str
+        The path of the checkpoint file
+    """
+    checkpoint_file = os.path.join(checkpoint_dir, "{0}_{1}_{2}.json".format(algo_name, rep, checkpoint_key))
+    return checkpoint_file
+
+
+def _load_evaluation_checkpoint(checkpoint_dir: str, algo_name: str, rep: int, checkpoint_key: str) -> dict:
+    """
+    Load the result of a single unit of an evaluation from its checkpoint file.
+
+    Parameters
+    ----------
+    checkpoint_dir : str
+        The directory containing the checkpoints. Can be None
+    algo_name : str
+        The name of the algorithm
+    rep : int
+        The number of the repetition
+    checkpoint_key : str
+        The key of the unit (see _get_evaluation_checkpoint_key). Can be None
+
+    Returns
+    -------
+    result : dict
+        The stored result. Is None if checkpoint_dir or checkpoint_key is None or no checkpoint exists
+    """
+    if checkpoint_dir is None or checkpoint_key is None:
+        return None
+    checkpoint_file = _get_evaluation_checkpoint_file(checkpoint_dir, algo_name, rep, checkpoint_key)
+    if not os.path.isfile(checkpoint_file):
+        return None
+    with open(checkpoint_file, "r") as f:
+        result = json.load(f)
+    return result
+
+
+def _save_evaluation_checkpoint(checkpoint_dir: str, algo_name: str, rep: int, checkpoint_key: str,
+                                result: dict) -> None:
+    """
+    Save the result of a single unit of an evaluation to its checkpoint file.
+    The file is first written to a temporary file and then renamed, so an interrupted execution can not leave a corrupted checkpoint.
+    Nothing will be saved if checkpoint_dir, checkpoint_key or result is None.
+
+    Parameters
+    ----------
+    checkpoint_dir : str
+        The directory containing the checkpoints. Can be None
+    algo_name : str
+        The name of the algorithm
+    rep : int
+        The number of the repetition
+    checkpoint_key : str
+        The key of the unit (see _get_evaluation_checkpoint_key)
+    result : dict
+        The result of the unit
+    """
+    if checkpoint_dir is None or checkpoint_key is None or result is None:
+        return
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    checkpoint_file = _get_evaluation_checkpoint_file(checkpoint_dir, algo_name, rep, checkpoint_key)
+    with open(checkpoint_file + ".tmp", "w") as f:
+        json.dump(result, f, default=float)
+    os.replace(checkpoint_file + ".tmp", checkpoint_file)
+
+
+def _submit_evaluation_units(units: list, executor: ProcessPoolExecutor, checkpoint_dir: str) -> (list, list, dict):
+    """
+    Start the execution of all units of an evaluation. Units with an existing checkpoint are not executed again.
+    If executor is None, the units are executed directly in the current process. Else, they are submitted to the executor.
+
+    Parameters
+    ----------
+    units : list
+        List containing tuples of the form (eval_algo, rep, checkpoint_key, unit_args) (see _prepare_evaluation)
+    executor : ProcessPoolExecutor
+        The executor used to execute the units. Can be None
+    checkpoint_dir : str
+        The directory containing the checkpoints. Can be None
+
+    Returns
+    -------
+    tuple : (list, list, dict)
+        The results of the units (None if the unit was submitted to the executor or raised an exception),
+        The profiling traces of the units,
+        Dictionary containing the futures of the submitted units (key is the index of the unit)
+    """
+    results = [None] * len(units)
+    traces = [None] * len(units)
+    futures = {}
+    for i, (eval_algo, rep, checkpoint_key, unit_args) in enumerate(units):
+        results[i] = _load_evaluation_checkpoint(checkpoint_dir, eval_algo.name, rep, checkpoint_key)
+        if results[i] is not None:
+            print("Loaded checkpoint of algorithm {0} in iteration {1}".format(eval_algo.name, rep))
+        elif executor is None:
+            results[i], traces[i] = _execute_evaluation_unit(*unit_args)
+            _save_evaluation_checkpoint(checkpoint_dir, eval_algo.name, rep, checkpoint_key, results[i])
+        else:
+            futures[i] = executor.submit(_execute_evaluation_unit, *unit_args)
+    return results, traces, futures
+
+
+def _collect_evaluation_units(units: list, results: list, traces: list, futures: dict, checkpoint_dir: str) -> None:
+    """
+    Wait for all submitted units of an evaluation and store their results and profiling traces.
+    The results are also saved as checkpoints.
+
+    Parameters
+    ----------
+    units : list
+        List containing tuples of the form (eval_algo, rep, checkpoint_key, unit_args) (see _prepare_evaluation)
+    results : list
+        The results of the units. Will be updated in-place
+    traces : list
+        The profiling traces of the units. Will be updated in-place
+    futures : dict
+        Dictionary containing the futures of the submitted units (key is the index of the unit)
+    checkpoint_dir : str
+        The directory containing the checkpoints. Can be None
+    """
+    for i in futures.keys():
+        eval_algo, rep, checkpoint_key, _ = units[i]
+        try:
+            results[i], traces[i] = futures[i].result()
+            _save_evaluation_checkpoint(checkpoint_dir, eval_algo.name, rep, checkpoint_key, results[i])
+        except Exception as e:
+            print("Execution of {0} raised an exception in iteration {1}".format(eval_algo.name, rep))
+            print(e)
+
+
+def _prepare_evaluation(X: np.ndarray, evaluation_algorithms: list, evaluation_metrics: list,
+                        labels_true: np.ndarray, n_repetitions: int, X_test: np.ndarray,
+                        labels_true_test: np.ndarray, aggregation_functions: tuple, add_runtime: bool,
+                        add_n_clusters: bool, save_labels_path: str, ignore_algorithms: tuple, dataset_name: str,
+                        checkpoint_dir: str, cache_dir: str, add_profiling: bool, save_profiling_path: str,
+                        random_state: np.random.RandomState | int) -> (pd.DataFrame, list, dict):
+    """
+    Prepare the evaluation of a single data set (see evaluate_dataset).
+    Creates the empty DataFrame, applies the preprocessing of each algorithm and collects all units, i.e., combinations of algorithms and repetitions.
+    The units can afterward be executed using _submit_evaluation_units and _collect_evaluation_units.
 
     Parameters
     ----------
@@ -96,64 +925,48 @@ def evaluate_dataset(X: np.ndarray, evaluation_algorithms: list, evaluation_metr
     evaluation_algorithms : list
         Contains objects of type EvaluationAlgorithm which are wrappers for the clustering algorithms
     evaluation_metrics : list
-        Contains objects of type EvaluationMetric which are wrappers for the metrics (default: None)
+        Contains objects of type EvaluationMetric which are wrappers for the metrics
     labels_true : np.ndarray
-        The ground truth labels of the data set (default: None)
+        The ground truth labels of the data set
     n_repetitions : int
-        Number of times that the clustering procedure should be executed on the same data set (default: 10)
+        Number of times that the clustering procedure should be executed on the same data set
     X_test : np.ndarray
-        An optional test data set that will be evaluated using the predict method of the clustering algorithms (default: None)
+        An optional test data set that will be evaluated using the predict method of the clustering algorithms
     labels_true_test : np.ndarray
-        The ground truth labels of the test data set (default: None)
+        The ground truth labels of the test data set
     aggregation_functions : tuple
-        List of aggregation functions that should be applied to the n_repetitions different results of a single clustering algorithm (default: [np.mean, np.std])
+        List of aggregation functions that should be applied to the n_repetitions different results of a single clustering algorithm
     add_runtime : bool
-        Add runtime of each execution to the final table (default: True)
+        Add runtime of each execution to the final table
     add_n_clusters : bool
-        Add the resulting number of clusters to the final table (default: False)
-    save_path : str
-        The path where the final DataFrame should be saved as csv. If None, the DataFrame will not be saved (default: None)
+        Add the resulting number of clusters to the final table
     save_labels_path : str
-        The path where the clustering labels should be saved as csv. If None, the labels will not be saved (default: None)
+        The path where the clustering labels should be saved as csv. If None, the labels will not be saved
     ignore_algorithms : tuple
-        List of algorithm names (as specified in the EvaluationAlgorithm object) that should be ignored for this specific data set (default: [])
+        List of algorithm names (as specified in the EvaluationAlgorithm object) that should be ignored for this specific data set
     dataset_name : str
-        The name of the dataset; only relevant if iteration_specific_params are defined for an EvaluationAlgorithm (default: None)
-    random_state : np.random.RandomState | int
-        use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+        The name of the dataset
+    checkpoint_dir : str
+        Directory where the result of each finished unit is stored. Can be None
+    cache_dir : str
+        Directory of the content-addressed cache for clustering results. Can be None
+    add_profiling : bool
+        Defines whether the phases of each execution should be measured
+    save_profiling_path : str
+        The path where the profiling trace of all executions should be saved as json. Can be None
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution
 
     Returns
     -------
-    df : pd.DataFrame
-        The final DataFrame
-
-    Examples
-    ----------
-    >>> from sklearn.cluster import KMeans, DBSCAN
-    >>> from sklearn.metrics import normalized_mutual_info_score as nmi, silhouette_score as silhouette
-    >>>
-    >>> def _add_value(x, value):
-    >>>     return x + value
-    >>>
-    >>> X = np.array([[0, 0], [1, 1], [2, 2], [5, 5], [6, 6], [7, 7]])
-    >>> L = np.array([0] * 3 + [1] * 3)
-    >>> n_repetitions = 2
-    >>> aggregations = [np.mean, np.std, np.max]
-    >>> algorithms = [
-    >>>     EvaluationAlgorithm(name="KMeans", algorithm=KMeans, params={"n_clusters": 2}),
-    >>>     EvaluationAlgorithm(name="KMeans_with_preprocess", algorithm=KMeans, params={"n_clusters": 2},
-    >>>                         preprocess_methods=[_add_value],
-    >>>                         preprocess_params=[{"value": 1}]),
-    >>>     EvaluationAlgorithm(name="DBSCAN", algorithm=DBSCAN, params={"eps": 0.5, "min_samples": 2}, deterministic=True)]
-    >>> metrics = [EvaluationMetric(name="nmi", metric=nmi, params={"average_method": "geometric"}, use_gt=True),
-    >>>            EvaluationMetric(name="silhouette", metric=silhouette, use_gt=False)]
-    >>> df = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L,
-    >>>                       n_repetitions=n_repetitions, aggregation_functions=aggregations, add_runtime=True,
-    >>>                       add_n_clusters=True, save_path=None, ignore_algorithms=["KMeans_with_preprocess"],
-    >>>                       random_state=1)
+    tuple : (pd.DataFrame, list, dict)
+        The empty DataFrame,
+        List containing tuples of the form (eval_algo, rep, checkpoint_key, unit_args), where unit_args are the arguments of _execute_evaluation_unit,
+        Dictionary containing the profiler of the preprocessing of each algorithm
     """
-    assert evaluation_metrics is not None or add_runtime or add_n_clusters, \
-        "Either evaluation metrics must be defined or add_runtime/add_n_clusters must be True"
+    assert evaluation_metrics is not None or add_runtime or add_n_clusters or add_profiling, \
+        "Either evaluation metrics must be defined or add_runtime/add_n_clusters/add_profiling must be True"
+    assert save_profiling_path is None or add_profiling, "save_profiling_path can only be used if add_profiling is True"
     assert type(aggregation_functions) is list or type(
         aggregation_functions) is tuple, "aggregation_functions must be list or tuple"
     if type(evaluation_algorithms) is not list:
@@ -178,11 +991,23 @@ def evaluate_dataset(X: np.ndarray, evaluation_algorithms: list, evaluation_metr
         metric_names += ["runtime"]
     if add_n_clusters:
         metric_names += ["n_clusters"]
+    if add_profiling:
+        metric_names += _get_profiling_column_names(evaluation_metrics, X_test is not None)
     assert len(metric_names) == 0 or max(np.unique(metric_names, return_counts=True)[
                                              1]) == 1, "Some names of your metrics do not seem to be unique! Note that metrics must not be named 'runtime' or 'n_clusters'"
     header = pd.MultiIndex.from_product([algo_names, metric_names], names=["algorithm", "metric"])
     value_placeholder = np.zeros((n_repetitions, len(algo_names) * len(metric_names)))
     df = pd.DataFrame(value_placeholder, columns=header, index=range(n_repetitions))
+    # Checkpoints depend on all settings of the evaluation
+    settings_hash = None if checkpoint_dir is None else _get_evaluation_settings_hash(X, X_test, labels_true,
+                                                                                      labels_true_test,
+                                                                                      evaluation_metrics, add_runtime,
+                                                                                      add_n_clusters, add_profiling)
+    if checkpoint_dir is not None and settings_hash is None:
+        print("No checkpoints will be used since the metrics can not be hashed reliably")
+    # Collect all units, i.e., combinations of algorithms and repetitions
+    units = []
+    preprocessing_profilers = {}
     for eval_algo in evaluation_algorithms:
         automatically_set_n_clusters = False
         try:
@@ -203,20 +1028,21 @@ def evaluate_dataset(X: np.ndarray, evaluation_algorithms: list, evaluation_metr
                     eval_algo.params["n_clusters"] = [len(np.unique(labels_true[labels_true[:, i] >= 0, i])) for i in
                                                       range(labels_true.shape[1])]
             # Algorithms can preprocess datasets (e.g. PCA + K-means)
-            if eval_algo.preprocess_methods is not None:
-                X_processed = _preprocess_dataset(X, eval_algo.preprocess_methods, eval_algo.preprocess_params)
-                if X_test is not None:
-                    X_test_processed = _preprocess_dataset(X_test, eval_algo.preprocess_methods,
-                                                           eval_algo.preprocess_params)
-            else:
-                X_processed = X
-                if X_test is not None:
+            preprocessing_profilers[eval_algo.name] = _EvaluationProfiler(add_profiling)
+            with preprocessing_profilers[eval_algo.name].phase("preprocessing"):
+                if eval_algo.preprocess_methods is not None:
+                    X_processed = _preprocess_dataset(X, eval_algo.preprocess_methods, eval_algo.preprocess_params)
+                    X_test_processed = None
+                    if X_test is not None:
+                        X_test_processed = _preprocess_dataset(X_test, eval_algo.preprocess_methods,
+                                                               eval_algo.preprocess_params)
+                else:
+                    X_processed = X
                     X_test_processed = X_test
-            # Execute the algorithm multiple times
-            for rep in range(n_repetitions):
-                print("- Iteration {0}".format(rep))
-                # set seed
-                np.random.seed(seeds[rep])
+            data_hash = None if cache_dir is None and checkpoint_dir is None else _get_array_hash(
+                X_processed) + _get_array_hash(X_test_processed)
+            # Execute the algorithm multiple times (deterministic algorithms only once)
+            for rep in range(1 if eval_algo.deterministic else n_repetitions):
                 tmp_params = eval_algo.params.copy()
                 # Check if algorithm uses iteration_specific_params and if length of values is correct
                 if eval_algo.iteration_specific_params is not None:
@@ -233,99 +1059,82 @@ def evaluate_dataset(X: np.ndarray, evaluation_algorithms: list, evaluation_metr
                         elif iteration_params_key[0] == dataset_name:
                             tmp_params[iteration_params_key[1]] = \
                                 eval_algo.iteration_specific_params[iteration_params_key][rep]
-                # Execute algorithm
-                start_time = time.time()
-                algo_obj = eval_algo.algorithm(**tmp_params)
-                try:
-                    algo_obj.fit(X_processed)
-                except Exception as e:
-                    print("Execution of {0} raised an exception in iteration {1}".format(eval_algo.name, rep))
-                    print(e)
-                    continue
-                # Optional: Obtain labels from the predict method
-                if X_test is not None:
-                    try:
-                        predict_params = inspect.getfullargspec(algo_obj.predict).args
-                        # Normally, there should not be X_train and X_test as input
-                        if "X_train" in predict_params and "X_test" in predict_params:
-                            labels_predicted_test = algo_obj.predict(X_train=X_processed,
-                                                                     X_test=X_test_processed)  # TODO Remove special case for DipEncoder
-                        else:
-                            labels_predicted_test = algo_obj.predict(X_test_processed)
-                    except Exception as e:
-                        print("Problem when running the predict method of {0} in iteration {1}".format(eval_algo.name,
-                                                                                                       rep))
-                        print(e)
-                        labels_predicted_test = None
-                runtime = time.time() - start_time
-                if add_runtime:
-                    df.at[rep, (eval_algo.name, "runtime")] = runtime
-                    print("-- runtime: {0}".format(runtime))
-                if add_n_clusters:
-                    n_clusters = _get_n_clusters_from_algo(algo_obj)
-                    df.at[rep, (eval_algo.name, "n_clusters")] = n_clusters
-                    print("-- n_clusters: {0}".format(n_clusters))
-                # Optional: Save labels
-                if save_labels_path is not None:
-                    save_labels_path_algo = None if save_labels_path is None else "{0}_{1}_{2}.{3}".format(
-                        save_labels_path.split(".")[0], eval_algo.name, rep, save_labels_path.split(".")[1])
-                    # Check if directory exists
-                    parent_directory = os.path.dirname(save_labels_path_algo)
-                    if parent_directory != "" and not os.path.isdir(parent_directory):
-                        os.makedirs(parent_directory)
-                    np.savetxt(save_labels_path_algo, algo_obj.labels_)
-                    # Also save predict labels
-                    if X_test is not None and labels_predicted_test is not None:
-                        save_labels_path_algo_test = "{0}_TEST.{1}".format(save_labels_path_algo.split(".")[0],
-                                                                           save_labels_path_algo.split(".")[1])
-                        np.savetxt(save_labels_path_algo_test, labels_predicted_test)
-                # Get result of all metrics
-                if evaluation_metrics is not None:
-                    for eval_metric in evaluation_metrics:
-                        try:
-                            assert type(eval_metric) is EvaluationMetric, "All metrics must be of type EvaluationMetric"
-                            # Check if metric uses ground truth (e.g. NMI, ACC, ...)
-                            if eval_metric.use_gt:
-                                assert labels_true is not None, "Ground truth can not be None if it is used for the chosen metric"
-                                result = eval_metric.method(labels_true, algo_obj.labels_, **eval_metric.params)
-                                if X_test is not None and labels_predicted_test is not None:
-                                    result_test = eval_metric.method(labels_true_test, labels_predicted_test,
-                                                                     **eval_metric.params)
-                            else:
-                                # Metric does not use ground truth (e.g. Silhouette, ...)
-                                result = eval_metric.method(X, algo_obj.labels_, **eval_metric.params)
-                                if X_test is not None and labels_predicted_test is not None:
-                                    result_test = eval_metric.method(X_test, labels_predicted_test,
-                                                                     **eval_metric.params)
-                            df.at[rep, (eval_algo.name, eval_metric.name)] = result
-                            print("-- {0}: {1}".format(eval_metric.name, result))
-                            if X_test is not None and labels_predicted_test is not None:
-                                df.at[rep, (eval_algo.name, eval_metric.name + "_TEST")] = result_test
-                                print("-- {0} (TEST): {1}".format(eval_metric.name, result_test))
-                        except Exception as e:
-                            print("Metric {0} raised an exception and will be skipped".format(eval_metric.name))
-                            print(e)
-                if eval_algo.deterministic:
-                    for element in range(1, n_repetitions):
-                        if add_runtime:
-                            df.at[element, (eval_algo.name, "runtime")] = df.at[
-                                0, (eval_algo.name, "runtime")]
-                        if add_n_clusters:
-                            df.at[element, (eval_algo.name, "n_clusters")] = df.at[
-                                0, (eval_algo.name, "n_clusters")]
-                        for eval_metric in evaluation_metrics:
-                            df.at[element, (eval_algo.name, eval_metric.name)] = df.at[
-                                0, (eval_algo.name, eval_metric.name)]
-                            if X_test is not None:
-                                df.at[element, (eval_algo.name, eval_metric.name + "_TEST")] = df.at[
-                                    0, (eval_algo.name, eval_metric.name + "_TEST")]
-                    break
+                cache_key = None if data_hash is None else _get_evaluation_cache_key(data_hash, eval_algo, tmp_params,
+                                                                                     seeds[rep])
+                if data_hash is not None and cache_key is None:
+                    print("Results of algorithm {0} in iteration {1} will not be cached since its parameters can not be "
+                          "hashed reliably".format(eval_algo.name, rep))
+                checkpoint_key = None if checkpoint_dir is None else _get_evaluation_checkpoint_key(cache_key,
+                                                                                                    settings_hash)
+                units.append((eval_algo, rep, checkpoint_key,
+                              (X, X_processed, X_test, X_test_processed, labels_true, labels_true_test, eval_algo,
+                               tmp_params, seeds[rep], rep, evaluation_metrics, add_runtime, add_n_clusters,
+                               save_labels_path, cache_dir, None if cache_dir is None else cache_key, add_profiling)))
         except Exception as e:
             print("Algorithm {0} raised an exception and will be skipped".format(eval_algo.name))
             print(e)
         # Prepare eval_algo params for next dataset
         if automatically_set_n_clusters:
             eval_algo.params["n_clusters"] = None
+    return df, units, preprocessing_profilers
+
+
+def _finish_evaluation(df: pd.DataFrame, units: list, results: list, traces: list,
+                       preprocessing_profilers: dict, n_repetitions: int, aggregation_functions: tuple,
+                       add_profiling: bool, save_path: str, save_profiling_path: str,
+                       dataset_name: str) -> pd.DataFrame:
+    """
+    Write the results of all units of the evaluation of a single data set into the DataFrame (see evaluate_dataset).
+    Afterward, the aggregations are added and the DataFrame and the profiling traces are saved (if specified).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The empty DataFrame (see _prepare_evaluation)
+    units : list
+        List containing tuples of the form (eval_algo, rep, checkpoint_key, unit_args) (see _prepare_evaluation)
+    results : list
+        The results of the units
+    traces : list
+        The profiling traces of the units
+    preprocessing_profilers : dict
+        Dictionary containing the profiler of the preprocessing of each algorithm
+    n_repetitions : int
+        Number of times that the clustering procedure has been executed on the same data set
+    aggregation_functions : tuple
+        List of aggregation functions that should be applied to the n_repetitions different results of a single clustering algorithm
+    add_profiling : bool
+        Defines whether the phases of each execution have been measured
+    save_path : str
+        The path where the final DataFrame should be saved as csv. If None, the DataFrame will not be saved
+    save_profiling_path : str
+        The path where the profiling trace of all executions should be saved as json. If None, the trace will not be saved
+    dataset_name : str
+        The name of the dataset
+
+    Returns
+    -------
+    df : pd.DataFrame
+        The final DataFrame
+    """
+    # Write results into the DataFrame (results are written in the same order as in a sequential execution)
+    profiling_trace = []
+    for (eval_algo, rep, _, unit_args), result, trace in zip(units, results, traces):
+        if result is None:
+            continue
+        if add_profiling:
+            # Add the measurements of the preprocessing (is executed once for each algorithm)
+            preprocessing_trace = preprocessing_profilers[eval_algo.name].trace
+            for measurement in _PROFILING_MEASUREMENTS:
+                result["preprocessing_{0}".format(measurement)] = preprocessing_trace["preprocessing"][measurement]
+            if trace is not None:
+                profiling_trace.append({"algorithm": eval_algo.name, "repetition": rep, "seed": int(unit_args[8]),
+                                        "phases": {**preprocessing_trace, **trace},
+                                        "peak_rss": result["peak_rss"]})
+        # Results of deterministic algorithms are used for all repetitions
+        for element in (range(n_repetitions) if eval_algo.deterministic else [rep]):
+            for metric_name, value in result.items():
+                df.at[element, (eval_algo.name, metric_name)] = value
     for agg in aggregation_functions:
         df.loc[agg.__name__] = agg(df.values, axis=0)
     if save_path is not None:
@@ -334,6 +1143,131 @@ def evaluate_dataset(X: np.ndarray, evaluation_algorithms: list, evaluation_metr
         if parent_directory != "" and not os.path.isdir(parent_directory):
             os.makedirs(parent_directory)
         df.to_csv(save_path)
+    if save_profiling_path is not None:
+        # Check if directory exists
+        parent_directory = os.path.dirname(save_profiling_path)
+        if parent_directory != "" and not os.path.isdir(parent_directory):
+            os.makedirs(parent_directory)
+        with open(save_profiling_path, "w") as f:
+            json.dump({"dataset": dataset_name, "units": profiling_trace}, f, indent=2, default=float)
+    return df
+
+
+def evaluate_dataset(X: np.ndarray, evaluation_algorithms: list, evaluation_metrics: list = None,
+                     labels_true: np.ndarray = None, n_repetitions: int = 10,
+                     X_test: np.ndarray = None, labels_true_test: np.ndarray = None,
+                     aggregation_functions: tuple = (np.mean, np.std), add_runtime: bool = True,
+                     add_n_clusters: bool = False, save_path: str = None, save_labels_path: str = None,
+                     ignore_algorithms: tuple = (), dataset_name: str = None, n_jobs: int = None,
+                     checkpoint_dir: str = None, cache_dir: str = None, add_profiling: bool = False,
+                     save_profiling_path: str = None, random_state: np.random.RandomState | int = None) -> pd.DataFrame:
+    """
+    Evaluate the clustering result of different clustering algorithms (as specified by evaluation_algorithms) on a given data set using different metrics (as specified by evaluation_metrics).
+    Each algorithm will be executed n_repetitions times and all specified metrics will be used to evaluate the clustering result.
+    The final result is a pandas DataFrame containing all the information.
+    Each combination of algorithm and repetition is an independent unit, which can be executed in a separate process (see n_jobs).
+    Since the seed of each repetition is set at the beginning of the unit, the results (except the runtime) do not depend on n_jobs.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    evaluation_algorithms : list
+        Contains objects of type EvaluationAlgorithm which are wrappers for the clustering algorithms
+    evaluation_metrics : list
+        Contains objects of type EvaluationMetric which are wrappers for the metrics (default: None)
+    labels_true : np.ndarray
+        The ground truth labels of the data set (default: None)
+    n_repetitions : int
+        Number of times that the clustering procedure should be executed on the same data set (default: 10)
+    X_test : np.ndarray
+        An optional test data set that will be evaluated using the predict method of the clustering algorithms (default: None)
+    labels_true_test : np.ndarray
+        The ground truth labels of the test data set (default: None)
+    aggregation_functions : tuple
+        List of aggregation functions that should be applied to the n_repetitions different results of a single clustering algorithm (default: [np.mean, np.std])
+    add_runtime : bool
+        Add runtime of each execution to the final table (default: True)
+    add_n_clusters : bool
+        Add the resulting number of clusters to the final table (default: False)
+    save_path : str
+        The path where the final DataFrame should be saved as csv. If None, the DataFrame will not be saved (default: None)
+    save_labels_path : str
+        The path where the clustering labels should be saved as csv. If None, the labels will not be saved (default: None)
+    ignore_algorithms : tuple
+        List of algorithm names (as specified in the EvaluationAlgorithm object) that should be ignored for this specific data set (default: [])
+    dataset_name : str
+        The name of the dataset; only relevant if iteration_specific_params are defined for an EvaluationAlgorithm (default: None)
+    n_jobs : int
+        Number of processes used to execute the units (combinations of algorithms and repetitions). None means 1 and -1 means using all processors.
+        If n_jobs is larger than 1, all algorithms, parameters and metrics must be picklable (default: None)
+    checkpoint_dir : str
+        Directory where the result of each finished unit is stored. Units with an existing checkpoint will not be executed again, so an interrupted evaluation can be resumed.
+        The name of a checkpoint contains a hash of the data, the algorithm, its parameters, the seed and the metrics, so checkpoints of changed settings are never loaded.
+        If None, no checkpoints will be used (default: None)
+    cache_dir : str
+        Directory of a content-addressed cache for clustering results. The key of a result is a hash of the preprocessed data, the algorithm class, its parameters and the seed.
+        The cache stores the labels, the runtime and the number of clusters. If a result is cached, the algorithm will not be executed again and the metrics are calculated using the stored labels.
+        Therefore, new metrics can be evaluated without re-fitting the algorithms.
+        Results of algorithms with parameters that can not be hashed reliably (e.g., arbitrary objects without content-based representation) are not cached. If None, no cache will be used (default: None)
+    add_profiling : bool
+        Measure the wall time, the CPU time and the peak memory (tracemalloc) of the preprocessing, fit, predict and metric phases of each execution and add them to the final table.
+        The columns are named '{phase}_wall_time', '{phase}_cpu_time' and '{phase}_peak_memory', where phase is 'preprocessing', 'fit', 'predict' or the name of a metric.
+        Additionally, the column 'peak_rss' contains the peak resident set size of the execution (NaN for cached results).
+        On Linux, the peak is reset at the beginning of each execution. On other systems, the increase of the peak of the executing process is reported.
+        Note that tracemalloc slows down the execution and that cached results (see cache_dir) do not contain fit and predict measurements (default: False)
+    save_profiling_path : str
+        The path where the profiling trace of all executions should be saved as json. Requires add_profiling to be True. If None, the trace will not be saved (default: None)
+    random_state : np.random.RandomState | int
+        use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+
+    Returns
+    -------
+    df : pd.DataFrame
+        The final DataFrame
+
+    Examples
+    ----------
+    >>> from sklearn.cluster import KMeans, DBSCAN
+    >>> from sklearn.metrics import normalized_mutual_info_score as nmi, silhouette_score as silhouette
+    >>>
+    >>> def _add_value(x, value):
+    >>>     return x + value
+    >>>
+    >>> X = np.array([[0, 0], [1, 1], [2, 2], [5, 5], [6, 6], [7, 7]])
+    >>> L = np.array([0] * 3 + [1] * 3)
+    >>> n_repetitions = 2
+    >>> aggregations = [np.mean, np.std, np.max]
+    >>> algorithms = [
+    >>>     EvaluationAlgorithm(name="KMeans", algorithm=KMeans, params={"n_clusters": 2}),
+    >>>     EvaluationAlgorithm(name="KMeans_with_preprocess", algorithm=KMeans, params={"n_clusters": 2},
+    >>>                         preprocess_methods=[_add_value],
+    >>>                         preprocess_params=[{"value": 1}]),
+    >>>     EvaluationAlgorithm(name="DBSCAN", algorithm=DBSCAN, params={"eps": 0.5, "min_samples": 2}, deterministic=True)]
+    >>> metrics = [EvaluationMetric(name="nmi", metric=nmi, params={"average_method": "geometric"}, use_gt=True),
+    >>>            EvaluationMetric(name="silhouette", metric=silhouette, use_gt=False)]
+    >>> df = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L,
+    >>>                       n_repetitions=n_repetitions, aggregation_functions=aggregations, add_runtime=True,
+    >>>                       add_n_clusters=True, save_path=None, ignore_algorithms=["KMeans_with_preprocess"],
+    >>>                       random_state=1)
+    """
+    df, units, preprocessing_profilers = _prepare_evaluation(X, evaluation_algorithms, evaluation_metrics,
+                                                             labels_true, n_repetitions, X_test, labels_true_test,
+                                                             aggregation_functions, add_runtime, add_n_clusters,
+                                                             save_labels_path, ignore_algorithms, dataset_name,
+                                                             checkpoint_dir, cache_dir, add_profiling,
+                                                             save_profiling_path, random_state)
+    # Execute all units (units with existing checkpoints are skipped)
+    n_jobs = _get_n_jobs(n_jobs)
+    executor = ProcessPoolExecutor(max_workers=n_jobs) if n_jobs > 1 and len(units) > 1 else None
+    try:
+        results, traces, futures = _submit_evaluation_units(units, executor, checkpoint_dir)
+        _collect_evaluation_units(units, results, traces, futures, checkpoint_dir)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    df = _finish_evaluation(df, units, results, traces, preprocessing_profilers, n_repetitions,
+                            aggregation_functions, add_profiling, save_path, save_profiling_path, dataset_name)
     return df
 
 
@@ -341,6 +1275,8 @@ def evaluate_multiple_datasets(evaluation_datasets: list, evaluation_algorithms:
                                n_repetitions: int = 10, aggregation_functions: tuple = (np.mean, np.std),
                                add_runtime: bool = True, add_n_clusters: bool = False, save_path: str = None,
                                save_intermediate_results: bool = False, save_labels_path: str = None,
+                               n_jobs: int = None, checkpoint_dir: str = None, cache_dir: str = None,
+                               add_profiling: bool = False, save_profiling_path: str = None,
                                random_state: np.random.RandomState | int = None) -> pd.DataFrame:
     """
     Evaluate the clustering result of different clustering algorithms (as specified by evaluation_algorithms) on a set of data sets (as specified by evaluation_datasets) using different metrics (as specified by evaluation_metrics).
@@ -369,6 +1305,24 @@ def evaluate_multiple_datasets(evaluation_datasets: list, evaluation_algorithms:
         Defines whether the result of each data set should be separately saved. Useful if the evaluation takes a lot of time (default: False)
     save_labels_path : str
         The path where the clustering labels should be saved as csv. If None, the labels will not be saved (default: None)
+    n_jobs : int
+        Number of processes used to execute the combinations of data sets, algorithms and repetitions. The units of all data sets are submitted to a single shared process pool.
+        Therefore, all data sets are loaded before the execution starts if n_jobs is larger than 1. None means 1 and -1 means using all processors.
+        If n_jobs is larger than 1, all algorithms, parameters and metrics must be picklable (default: None)
+    checkpoint_dir : str
+        Directory where the result of each finished combination of data set, algorithm and repetition is stored (in a separate subdirectory for each data set).
+        Combinations with an existing checkpoint will not be executed again, so an interrupted evaluation can be resumed.
+        The name of a checkpoint contains a hash of the data, the algorithm, its parameters, the seed and the metrics, so checkpoints of changed settings are never loaded.
+        If None, no checkpoints will be used (default: None)
+    cache_dir : str
+        Directory of a content-addressed cache for clustering results, which is shared by all data sets (see evaluate_dataset).
+        Already cached combinations of data set, algorithm, parameters and seed will not be executed again, e.g., when a new algorithm or metric is added.
+        If None, no cache will be used (default: None)
+    add_profiling : bool
+        Measure the wall time, the CPU time and the peak memory of the preprocessing, fit, predict and metric phases of each execution and add them to the final table (see evaluate_dataset) (default: False)
+    save_profiling_path : str
+        The path where the profiling traces should be saved as json. A separate file will be created for each data set (the name of the data set is appended to the path).
+        Requires add_profiling to be True. If None, the traces will not be saved (default: None)
     random_state : np.random.RandomState | int
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
 
@@ -419,41 +1373,74 @@ def evaluate_multiple_datasets(evaluation_datasets: list, evaluation_algorithms:
         save_labels_path = save_labels_path + ".csv"
     assert save_labels_path is None or len(
         save_labels_path.split(".")) == 2, "save_labels_path must only contain a single dot. E.g., NAME.csv"
+    if save_profiling_path is not None and not "." in save_profiling_path:
+        save_profiling_path = save_profiling_path + ".json"
+    assert save_profiling_path is None or len(
+        save_profiling_path.split(".")) == 2, "save_profiling_path must only contain a single dot. E.g., NAME.json"
     data_names = [d.name for d in evaluation_datasets]
     assert max(
         np.unique(data_names, return_counts=True)[1]) == 1, "Some names of your datasets do not seem to be unique!"
+    # The units of all data sets are executed by a single shared executor
+    n_jobs = _get_n_jobs(n_jobs)
+    executor = ProcessPoolExecutor(max_workers=n_jobs) if n_jobs > 1 else None
     df_list = []
-    for eval_data in evaluation_datasets:
-        try:
-            assert type(eval_data) is EvaluationDataset, "All datasets must be of type EvaluationDataset"
-            print("=== Start evaluation of {0} ===".format(eval_data.name))
-            X, labels_true, X_test, labels_true_test = _get_data_and_labels_from_evaluation_dataset(eval_data.data,
-                                                                                                    eval_data.data_loader_params,
-                                                                                                    eval_data.labels_true,
-                                                                                                    eval_data.train_test_split)
-            print("=== (Data shape: {0} / Ground truth shape: {1}) ===".format(X.shape,
-                                                                               labels_true if labels_true is None else labels_true.shape))
-            if eval_data.preprocess_methods is not None:
-                X = _preprocess_dataset(X, eval_data.preprocess_methods, eval_data.preprocess_params)
-                if X_test is not None:
-                    X_test = _preprocess_dataset(X_test, eval_data.preprocess_methods, eval_data.preprocess_params)
-            inner_save_path = None if not save_intermediate_results else "{0}_{1}.{2}".format(save_path.split(".")[0],
-                                                                                              eval_data.name,
-                                                                                              save_path.split(".")[1])
-            inner_save_labels_path = None if save_labels_path is None else "{0}_{1}.{2}".format(
-                save_labels_path.split(".")[0], eval_data.name, save_labels_path.split(".")[1])
-            df = evaluate_dataset(X, evaluation_algorithms, evaluation_metrics=evaluation_metrics,
-                                  labels_true=labels_true,
-                                  n_repetitions=n_repetitions, X_test=X_test, labels_true_test=labels_true_test,
-                                  aggregation_functions=aggregation_functions,
-                                  add_runtime=add_runtime, add_n_clusters=add_n_clusters, save_path=inner_save_path,
-                                  save_labels_path=inner_save_labels_path,
-                                  ignore_algorithms=eval_data.ignore_algorithms, dataset_name=eval_data.name,
-                                  random_state=random_state)
-            df_list.append(df)
-        except Exception as e:
-            print("Dataset {0} raised an exception and will be skipped".format(eval_data.name))
-            print(e)
+    pending_evaluations = []
+    try:
+        for eval_data in evaluation_datasets:
+            try:
+                assert type(eval_data) is EvaluationDataset, "All datasets must be of type EvaluationDataset"
+                print("=== Start evaluation of {0} ===".format(eval_data.name))
+                X, labels_true, X_test, labels_true_test = _get_data_and_labels_from_evaluation_dataset(
+                    eval_data.data, eval_data.data_loader_params, eval_data.labels_true, eval_data.train_test_split)
+                print("=== (Data shape: {0} / Ground truth shape: {1}) ===".format(X.shape,
+                                                                                   labels_true if labels_true is None else labels_true.shape))
+                if eval_data.preprocess_methods is not None:
+                    X = _preprocess_dataset(X, eval_data.preprocess_methods, eval_data.preprocess_params)
+                    if X_test is not None:
+                        X_test = _preprocess_dataset(X_test, eval_data.preprocess_methods, eval_data.preprocess_params)
+                inner_save_path = None if not save_intermediate_results else "{0}_{1}.{2}".format(
+                    save_path.split(".")[0], eval_data.name, save_path.split(".")[1])
+                inner_save_labels_path = None if save_labels_path is None else "{0}_{1}.{2}".format(
+                    save_labels_path.split(".")[0], eval_data.name, save_labels_path.split(".")[1])
+                inner_checkpoint_dir = None if checkpoint_dir is None else os.path.join(checkpoint_dir, eval_data.name)
+                inner_save_profiling_path = None if save_profiling_path is None else "{0}_{1}.{2}".format(
+                    save_profiling_path.split(".")[0], eval_data.name, save_profiling_path.split(".")[1])
+                df, units, preprocessing_profilers = _prepare_evaluation(X, evaluation_algorithms, evaluation_metrics,
+                                                                         labels_true, n_repetitions, X_test,
+                                                                         labels_true_test, aggregation_functions,
+                                                                         add_runtime, add_n_clusters,
+                                                                         inner_save_labels_path,
+                                                                         eval_data.ignore_algorithms, eval_data.name,
+                                                                         inner_checkpoint_dir, cache_dir,
+                                                                         add_profiling, inner_save_profiling_path,
+                                                                         random_state)
+                results, traces, futures = _submit_evaluation_units(units, executor, inner_checkpoint_dir)
+                if executor is None:
+                    # All units have already been executed, so the data set can be finished directly
+                    df_list.append(_finish_evaluation(df, units, results, traces, preprocessing_profilers,
+                                                      n_repetitions, aggregation_functions, add_profiling,
+                                                      inner_save_path, inner_save_profiling_path, eval_data.name))
+                else:
+                    pending_evaluations.append((eval_data.name, df, units, results, traces, futures,
+                                                preprocessing_profilers, inner_checkpoint_dir, inner_save_path,
+                                                inner_save_profiling_path))
+            except Exception as e:
+                print("Dataset {0} raised an exception and will be skipped".format(eval_data.name))
+                print(e)
+        # Wait for the units of all data sets (in the order of the data sets)
+        for (dataset_name, df, units, results, traces, futures, preprocessing_profilers, inner_checkpoint_dir,
+             inner_save_path, inner_save_profiling_path) in pending_evaluations:
+            try:
+                _collect_evaluation_units(units, results, traces, futures, inner_checkpoint_dir)
+                df_list.append(_finish_evaluation(df, units, results, traces, preprocessing_profilers, n_repetitions,
+                                                  aggregation_functions, add_profiling, inner_save_path,
+                                                  inner_save_profiling_path, dataset_name))
+            except Exception as e:
+                print("Dataset {0} raised an exception and will be skipped".format(dataset_name))
+                print(e)
+    finally:
+        if executor is not None:
+            executor.shutdown()
     all_dfs = pd.concat(df_list, keys=data_names)
     if save_path is not None:
         # Check if directory exists
@@ -815,6 +1802,9 @@ class EvaluationAlgorithm():
         List of dictionaries containing the parameters for the preprocessing methods.
         Needs one entry for each method in preprocess_methods.
         If only a single preprocessing method is given (instead of a list) a single dictionary is expected (default: {})
+    n_threads : int
+        Maximum number of threads used by the native thread pools (BLAS, OpenMP) within a single execution of the algorithm.
+        Useful to avoid oversubscription if multiple executions run in parallel (see n_jobs in evaluate_dataset). If None, no limit is set (default: None)
 
 
     Examples
@@ -829,7 +1819,7 @@ class EvaluationAlgorithm():
 
     def __init__(self, name: str, algorithm: ClusterMixin, params: dict = None, deterministic: bool = False,
                  iteration_specific_params: dict = None, preprocess_methods: list = None,
-                 preprocess_params: dict = None):
+                 preprocess_params: dict = None, n_threads: int = None):
         assert type(name) is str, "name must be a string"
         assert "." not in name, "name must not contain a dot"
         self.name = name
@@ -847,3 +1837,5 @@ class EvaluationAlgorithm():
         assert preprocess_params is None or type(preprocess_params) is dict or type(
             preprocess_methods) is list, "preprocess_params must be a dict or a list of dicts"
         self.preprocess_params = {} if preprocess_params is None else preprocess_params
+        assert n_threads is None or (type(n_threads) is int and n_threads > 0), "n_threads must be None or a positive int"
+        self.n_threads = n_threads
@@ -1,7 +1,10 @@
-from clustpy.utils import dip_test, dip_pval, dip_boot_samples, plot_dip, dip_gradient, dip_pval_gradient
-from clustpy.utils.diptest import _dip_c_impl, _dip_python_impl, _dip_pval_function, _dip_pval_table, \
-    _get_dip_table_values
+from clustpy.utils import dip_test, dip_test_batch, dip_executor_map, IncrementalDip, dip_pval, dip_boot_samples, \
+    dip_boot_samples_cached, plot_dip, dip_gradient, dip_pval_gradient
+from clustpy.utils.diptest import _dip_c_impl, _dip_python_impl, _dip_numba_impl, _dip_kernel, _dip_numba_kernel, \
+    _dip_pval_function, _dip_pval_table, _get_dip_table_values, _DIP_BOOT_CACHE, DIP_BOOT_CACHE_DEFAULT_SEED, backend
 import numpy as np
+import os
+import pytest
 from unittest.mock import patch
 
 
@@ -91,6 +94,42 @@ def test_diptest_python_impl_matches_c_impl_with_random_data():
     assert np.array_equal(mj_py, mj_c)
 
 
+def test_diptest_compiled_kernel_matches_c_impl(capsys):
+    X = np.sort(np.random.rand(100))
+    dip_c, modal_interval_c, modal_triangle_c, gcm_c, lcm_c, mn_c, mj_c = _dip_c_impl(X, debug=False)
+    # Check the uncompiled kernel
+    dip_k, low_k, high_k, mt1_k, mt2_k, mt3_k, gcm_k, lcm_k, mn_k, mj_k = _dip_kernel(X)
+    assert dip_k == dip_c
+    assert (low_k, high_k) == modal_interval_c
+    assert (mt1_k, mt2_k, mt3_k) == modal_triangle_c
+    assert np.array_equal(gcm_k, gcm_c)
+    assert np.array_equal(lcm_k, lcm_c)
+    assert np.array_equal(mn_k, mn_c)
+    assert np.array_equal(mj_k, mj_c)
+    # Debug mode should print additional information but not change the result
+    dip_debug, modal_interval_debug, modal_triangle_debug, _, _, _, _ = _dip_python_impl(X, debug=True)
+    assert "LOOP-BEGIN" in capsys.readouterr().out
+    assert dip_debug == dip_c
+    assert modal_interval_debug == modal_interval_c
+    assert modal_triangle_debug == modal_triangle_c
+    # Check the compiled kernel (only if Numba is used)
+    if _dip_numba_kernel is not None:
+        dip_nb, modal_interval_nb, modal_triangle_nb, gcm_nb, lcm_nb, mn_nb, mj_nb = _dip_numba_impl(X, debug=False)
+        assert dip_nb == dip_c
+        assert modal_interval_nb == modal_interval_c
+        assert modal_triangle_nb == modal_triangle_c
+        assert np.array_equal(gcm_nb, gcm_c)
+        assert np.array_equal(lcm_nb, lcm_c)
+        assert np.array_equal(mn_nb, mn_c)
+        assert np.array_equal(mj_nb, mj_c)
+
+
+def test_backend():
+    assert backend() in ["c", "numba", "python"]
+    with patch("clustpy.utils.diptest._C_DIP_AVAILABLE", False):
+        assert backend() == ("numba" if _dip_numba_kernel is not None else "python")
+
+
 def test_dip_pval():
     random_state = np.random.RandomState(1)
     # Multimodal Example
@@ -173,6 +212,53 @@ def test_dip_boot_samples():
     dips = dip_boot_samples(50, n_boots, random_state)
     assert dips.shape[0] == n_boots
     assert np.all(dips >= 0) and np.all(dips <= 0.25)
+    # Parallel execution returns the same result
+    dips_parallel = dip_boot_samples(50, n_boots, 1, n_jobs=2)
+    assert np.array_equal(dips_parallel, dip_boot_samples(50, n_boots, 1))
+
+
+def test_dip_boot_samples_cached(tmp_path):
+    _DIP_BOOT_CACHE.clear()
+    n_boots = 100
+    dips = dip_boot_samples_cached(50, n_boots, 1, cache_dir=str(tmp_path))
+    assert np.array_equal(dips, np.sort(dip_boot_samples(50, n_boots, 1)))
+    assert (50, n_boots, 1) in _DIP_BOOT_CACHE
+    assert (tmp_path / "dip_boot_50_100_1.npy").is_file()
+    # No temporary files should remain
+    assert os.listdir(tmp_path) == ["dip_boot_50_100_1.npy"]
+    # Cached array can not be modified
+    with pytest.raises(ValueError):
+        dips[0] = 1
+    # Load from disk
+    _DIP_BOOT_CACHE.clear()
+    assert np.array_equal(dip_boot_samples_cached(50, n_boots, 1, cache_dir=str(tmp_path)), dips)
+    # Interpolation
+    dips_60 = dip_boot_samples_cached(60, n_boots, 1, cache_dir=str(tmp_path))
+    dips_55 = dip_boot_samples_cached(55, n_boots, 1, cache_dir=str(tmp_path), interpolation_tolerance=0.1)
+    assert (55, n_boots, 1, 0.1) in _DIP_BOOT_CACHE and (55, n_boots, 1) not in _DIP_BOOT_CACHE
+    assert np.allclose(dips_55, (np.sqrt(50) * dips + 0.5 * (np.sqrt(60) * dips_60 - np.sqrt(50) * dips)) / np.sqrt(55))
+    with pytest.raises(ValueError):
+        dips_55[0] = 1
+    # Interpolated entries are reused, but not returned if interpolation is disabled
+    assert dip_boot_samples_cached(55, n_boots, 1, cache_dir=str(tmp_path), interpolation_tolerance=0.1) is dips_55
+    assert np.array_equal(dip_boot_samples_cached(55, n_boots, 1), np.sort(dip_boot_samples(55, n_boots, 1)))
+    assert (55, n_boots, 1) in _DIP_BOOT_CACHE
+    # p-value
+    pval = dip_pval(dips[50], 50, "cached_bootstrap", n_boots, 1)
+    assert pval == np.mean(dips[50] <= dips)
+    # A RandomState always uses the default seed, so the cached entry is reused
+    _DIP_BOOT_CACHE.clear()
+    random_state = np.random.RandomState(2)
+    for _ in range(3):
+        dip_pval(dips[50], 50, "cached_bootstrap", n_boots, random_state)
+    assert list(_DIP_BOOT_CACHE.keys()) == [(50, n_boots, DIP_BOOT_CACHE_DEFAULT_SEED)]
+    assert random_state.randint(1000) == np.random.RandomState(2).randint(1000)
+    # Interpolation via dip_pval
+    pval_55 = dip_pval(dips_55[50], 55, "cached_bootstrap", n_boots, 1, cache_dir=str(tmp_path),
+                       interpolation_tolerance=0.1)
+    assert pval_55 == np.mean(dips_55[50] <= dips_55)
+    assert (55, n_boots, 1, 0.1) in _DIP_BOOT_CACHE and (55, n_boots, 1) not in _DIP_BOOT_CACHE
+    _DIP_BOOT_CACHE.clear()
 
 
 @patch("matplotlib.pyplot.show")  # Used to test plots (show will not be called)
@@ -190,3 +276,73 @@ def test_dip_table_values():
     assert N.shape == (21,)
     assert SIG.shape == (26,)
     assert CV.shape == (21, 26)
+
+
+def test_dip_test_batch():
+    random_state = np.random.RandomState(1)
+    X = np.c_[random_state.rand(50), np.r_[random_state.rand(25), random_state.rand(25) + 5], np.ones(50)]
+    # Columns
+    dips = dip_test_batch(X, axis=0)
+    assert dips.shape == (3,)
+    assert np.array_equal(dips, [dip_test(X[:, i]) for i in range(X.shape[1])])
+    # Rows
+    dips = dip_test_batch(X.T, axis=1)
+    assert np.array_equal(dips, [dip_test(X[:, i]) for i in range(X.shape[1])])
+    # Modal intervals and triangles
+    dips, modal_intervals, modal_triangles = dip_test_batch(X, axis=0, just_dip=False)
+    assert modal_intervals.shape == (3, 2)
+    assert modal_triangles.shape == (3, 3)
+    for i in range(X.shape[1]):
+        dip, modal_interval, modal_triangle = dip_test(np.sort(X[:, i]), just_dip=False, is_data_sorted=True)
+        assert dips[i] == dip
+        assert tuple(modal_intervals[i]) == modal_interval
+        assert tuple(modal_triangles[i]) == modal_triangle
+    # Python implementation
+    dips_py, modal_intervals_py, modal_triangles_py = dip_test_batch(X, axis=0, just_dip=False, use_c=False)
+    assert np.array_equal(dips_py, dips)
+    assert np.array_equal(modal_intervals_py, modal_intervals)
+    assert np.array_equal(modal_triangles_py, modal_triangles)
+    # Multiple threads
+    dips_parallel, modal_intervals_parallel, modal_triangles_parallel = dip_test_batch(X, axis=0, just_dip=False,
+                                                                                       n_jobs=2)
+    assert np.array_equal(dips_parallel, dips)
+    assert np.array_equal(modal_intervals_parallel, modal_intervals)
+    assert np.array_equal(modal_triangles_parallel, modal_triangles)
+
+
+def test_IncrementalDip():
+    random_state = np.random.RandomState(1)
+    X = np.sort(np.r_[random_state.rand(100), random_state.rand(100) + 3, np.round(random_state.rand(50) * 10)])
+    incremental_dip = IncrementalDip(X)
+    assert incremental_dip.mn_.shape == X.shape
+    assert incremental_dip.mj_.shape == X.shape
+    for start, end in [(0, X.shape[0]), (10, 150), (120, 250), (100, 103), (40, 60), (10, 150)]:
+        # Sub-range
+        dip, modal_interval, modal_triangle = incremental_dip.dip_test(start, end, just_dip=False)
+        dip_2, modal_interval_2, modal_triangle_2 = dip_test(X[start:end], just_dip=False, is_data_sorted=True)
+        assert dip == dip_2
+        assert modal_interval == modal_interval_2
+        assert modal_triangle == modal_triangle_2
+        assert incremental_dip.dip_test(start, end) == dip_2
+        # Mirrored sub-range
+        X_range = X[start:end]
+        X_left_mirrored = np.append(X_range[0] - np.flip(X_range[1:] - X_range[0]), X_range)
+        X_right_mirrored = np.append(X_range, X_range[-1] + np.flip(X_range[-1] - X_range[:-1]))
+        for side, X_mirrored in [("left", X_left_mirrored), ("right", X_right_mirrored)]:
+            dip, modal_interval, modal_triangle = incremental_dip.dip_test_mirrored(start, end, side)
+            dip_2, modal_interval_2, modal_triangle_2 = dip_test(X_mirrored, just_dip=False, is_data_sorted=True)
+            assert dip == dip_2
+            assert modal_interval == modal_interval_2
+            assert modal_triangle == modal_triangle_2
+    # Without C implementation
+    incremental_dip = IncrementalDip(X, use_c=False)
+    assert incremental_dip.mn_ is None
+    assert incremental_dip.dip_test(10, 150) == dip_test(X[10:150], is_data_sorted=True)
+
+
+def test_dip_executor_map():
+    X_list = [np.random.rand(20 + i) for i in range(10)]
+    dips = dip_executor_map(dip_test, X_list)
+    assert dips == [dip_test(X) for X in X_list]
+    dips_parallel = dip_executor_map(dip_test, X_list, n_jobs=3)
+    assert dips_parallel == dips
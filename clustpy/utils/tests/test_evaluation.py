@@ -1,7 +1,9 @@
 import torch
+import clustpy.utils.evaluation
 from clustpy.utils import evaluate_multiple_datasets, evaluate_dataset, EvaluationAlgorithm, EvaluationDataset, \
     EvaluationMetric, evaluation_df_to_latex_table
-from clustpy.utils.evaluation import _preprocess_dataset, _get_n_clusters_from_algo
+from clustpy.utils.evaluation import _preprocess_dataset, _get_n_clusters_from_algo, _reset_peak_rss, _get_peak_rss, \
+    _get_hashable_representation
 import numpy as np
 from clustpy.deep.neural_networks import FeedforwardAutoencoder
 from clustpy.data import create_subspace_data
@@ -85,6 +87,197 @@ def test_evaluate_dataset():
     assert df.shape == (n_repetitions + len(aggregations), len(algorithms) * (len(metrics) + 2))
 
 
+def test_evaluate_dataset_parallel_and_with_checkpoints(tmp_path):
+    from sklearn.cluster import KMeans, DBSCAN
+    from sklearn.metrics import normalized_mutual_info_score as nmi, silhouette_score as silhouette
+    X, L = create_subspace_data(200, subspace_features=(2, 3), random_state=1)
+    n_repetitions = 3
+    algorithms = [
+        EvaluationAlgorithm(name="KMeans", algorithm=KMeans, params={"n_clusters": None, "n_init": 1}, n_threads=1),
+        EvaluationAlgorithm(name="KMeans_with_preprocess", algorithm=KMeans, params={"n_clusters": 2, "n_init": 1},
+                            preprocess_methods=[_add_value], preprocess_params=[{"value": 1}]),
+        EvaluationAlgorithm(name="DBSCAN", algorithm=DBSCAN, params={"eps": 0.5, "min_samples": 2}, deterministic=True)]
+    metrics = [EvaluationMetric(name="nmi", metric=nmi, params={"average_method": "geometric"}, use_gt=True),
+               EvaluationMetric(name="silhouette", metric=silhouette, use_gt=False)]
+    df = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L,
+                          n_repetitions=n_repetitions, add_runtime=False, add_n_clusters=True, random_state=1)
+    # Parallel execution must produce the same results
+    df_parallel = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L,
+                                   n_repetitions=n_repetitions, add_runtime=False, add_n_clusters=True, n_jobs=2,
+                                   random_state=1)
+    assert df.equals(df_parallel)
+    # Check checkpoints
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    df_checkpoint = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics,
+                                     labels_true=L, n_repetitions=n_repetitions, add_runtime=False,
+                                     add_n_clusters=True, checkpoint_dir=checkpoint_dir, random_state=1)
+    assert df.equals(df_checkpoint)
+    # Deterministic algorithms are only executed once
+    assert len(os.listdir(checkpoint_dir)) == 2 * n_repetitions + 1
+    # Resume evaluation -> only the missing unit is executed again
+    checkpoint_file = [f for f in os.listdir(checkpoint_dir) if f.startswith("KMeans_1_")][0]
+    os.remove(os.path.join(checkpoint_dir, checkpoint_file))
+    df_resumed = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics,
+                                  labels_true=L, n_repetitions=n_repetitions, add_runtime=False,
+                                  add_n_clusters=True, checkpoint_dir=checkpoint_dir, random_state=1)
+    assert df.equals(df_resumed)
+    assert os.path.isfile(os.path.join(checkpoint_dir, checkpoint_file))
+    # Changed settings must not load existing checkpoints
+    df_changed = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics[:1],
+                                  labels_true=L, n_repetitions=n_repetitions, add_runtime=False,
+                                  add_n_clusters=True, checkpoint_dir=checkpoint_dir, random_state=2)
+    assert len(os.listdir(checkpoint_dir)) == 2 * (2 * n_repetitions + 1)
+    assert not df.equals(df_changed)
+
+
+def test_evaluate_dataset_with_cache(tmp_path):
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import normalized_mutual_info_score as nmi, adjusted_rand_score as ari
+    from unittest.mock import patch
+    X, L = create_subspace_data(200, subspace_features=(2, 3), random_state=1)
+    cache_dir = str(tmp_path / "cache")
+    algorithms = [EvaluationAlgorithm(name="KMeans", algorithm=KMeans, params={"n_clusters": 3, "n_init": 1}),
+                  EvaluationAlgorithm(name="KMeans_with_preprocess", algorithm=KMeans,
+                                      params={"n_clusters": 3, "n_init": 1}, preprocess_methods=[_add_value],
+                                      preprocess_params=[{"value": 2}])]
+    metrics = [EvaluationMetric(name="nmi", metric=nmi)]
+    df = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L,
+                          n_repetitions=2, add_n_clusters=True, cache_dir=cache_dir, random_state=1)
+    assert len(os.listdir(cache_dir)) == 4
+    # Add a new metric and a new algorithm -> only the new algorithm should be executed
+    algorithms.append(EvaluationAlgorithm(name="KMeans4", algorithm=KMeans, params={"n_clusters": 4, "n_init": 1}))
+    metrics.append(EvaluationMetric(name="ari", metric=ari))
+    with patch("clustpy.utils.evaluation._fit_evaluation_algorithm",
+               wraps=clustpy.utils.evaluation._fit_evaluation_algorithm) as fit_mock:
+        df_cached = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics,
+                                     labels_true=L, n_repetitions=2, add_n_clusters=True, cache_dir=cache_dir,
+                                     random_state=1)
+        assert fit_mock.call_count == 2
+    assert len(os.listdir(cache_dir)) == 6
+    for algo in ["KMeans", "KMeans_with_preprocess"]:
+        for metric in ["nmi", "runtime", "n_clusters"]:
+            assert np.array_equal(df[algo, metric].values, df_cached[algo, metric].values)
+    assert df_cached["KMeans4", "n_clusters"][0] == 4
+    # Different preprocessing parameters lead to new cache entries
+    algorithms[1].preprocess_params = [{"value": 3}]
+    evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L,
+                     n_repetitions=2, cache_dir=cache_dir, random_state=1)
+    assert len(os.listdir(cache_dir)) == 8
+
+
+class _FirstPointsInit():
+    def __call__(self, X, n_clusters, random_state):
+        return X[:n_clusters]
+
+
+def _get_scaling_function(factor):
+    return lambda x: x * factor
+
+
+def test_get_hashable_representation():
+    # Different lambdas, closures and default arguments lead to different representations
+    assert _get_hashable_representation(lambda x: x + 1) != _get_hashable_representation(lambda x: x + 2)
+    assert _get_hashable_representation(_get_scaling_function(2)) != _get_hashable_representation(
+        _get_scaling_function(3))
+    assert _get_hashable_representation(_get_scaling_function(2)) == _get_hashable_representation(
+        _get_scaling_function(2))
+    assert _get_hashable_representation({"a": [1, 2.5, None], "b": np.arange(3)}) == _get_hashable_representation(
+        {"b": np.arange(3), "a": [1, 2.5, None]})
+    # Torch modules with the same architecture but different weights
+    torch.manual_seed(1)
+    module_1 = torch.nn.Linear(3, 2)
+    module_2 = torch.nn.Linear(3, 2)
+    assert _get_hashable_representation(module_1) != _get_hashable_representation(module_2)
+    module_2.load_state_dict(module_1.state_dict())
+    assert _get_hashable_representation(module_1) == _get_hashable_representation(module_2)
+    # Objects without a content-based representation can not be hashed
+    assert _get_hashable_representation(object()) is None
+    assert _get_hashable_representation({"a": [object()]}) is None
+    assert _get_hashable_representation(np.array([object()])) is None
+
+
+def test_evaluate_dataset_with_cache_and_functions_as_parameters(tmp_path):
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import adjusted_rand_score as ari
+    from unittest.mock import patch
+    X, L = create_subspace_data(100, subspace_features=(2, 3), random_state=1)
+    cache_dir = str(tmp_path / "cache")
+    metrics = [EvaluationMetric(name="ari", metric=ari)]
+    for factor in [1, 2]:
+        algorithms = [EvaluationAlgorithm(name="KMeans", algorithm=KMeans, params={"n_clusters": 3, "n_init": 1},
+                                          preprocess_methods=[_get_scaling_function(factor)],
+                                          preprocess_params=[{}]),
+                      EvaluationAlgorithm(name="KMeans_init", algorithm=KMeans,
+                                          params={"n_clusters": 3, "n_init": 1,
+                                                  "init": lambda X, n_clusters, random_state: X[:n_clusters] * factor})]
+        with patch("clustpy.utils.evaluation._fit_evaluation_algorithm",
+                   wraps=clustpy.utils.evaluation._fit_evaluation_algorithm) as fit_mock:
+            evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L,
+                             n_repetitions=1, cache_dir=cache_dir, random_state=1)
+            # Different closures must not reuse the cached results
+            assert fit_mock.call_count == 2
+    assert len(os.listdir(cache_dir)) == 4
+    # Parameters without reliable representation are not cached
+    algorithms = [EvaluationAlgorithm(name="KMeans", algorithm=KMeans,
+                                      params={"n_clusters": 3, "n_init": 1, "init": _FirstPointsInit()})]
+    df = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L,
+                          n_repetitions=1, cache_dir=cache_dir, random_state=1)
+    assert df["KMeans", "ari"][0] > 0
+    assert len(os.listdir(cache_dir)) == 4
+
+
+def test_evaluate_dataset_with_profiling(tmp_path):
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import normalized_mutual_info_score as nmi, silhouette_score as silhouette
+    import json
+    X = np.array([[0, 0], [1, 1], [2, 2], [5, 5], [6, 6], [7, 7], [8, 8]])
+    L = np.array([0] * 4 + [1] * 3)
+    n_repetitions = 2
+    algorithms = [EvaluationAlgorithm(name="KMeans", algorithm=KMeans, params={"n_clusters": 2}),
+                  EvaluationAlgorithm(name="KMeans_with_preprocess", algorithm=KMeans, params={"n_clusters": 2},
+                                      preprocess_methods=[_add_value], preprocess_params=[{"value": 1}])]
+    metrics = [EvaluationMetric(name="nmi", metric=nmi), EvaluationMetric(name="silhouette", metric=silhouette,
+                                                                          use_gt=False)]
+    profiling_path = str(tmp_path / "profiling.json")
+    df = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L,
+                          n_repetitions=n_repetitions, add_runtime=True, add_profiling=True,
+                          save_profiling_path=profiling_path, dataset_name="X", random_state=1)
+    # 2 metrics + runtime + 4 phases with 3 measurements each + peak_rss
+    assert df.shape == (n_repetitions + 2, len(algorithms) * (2 + 1 + 4 * 3 + 1))
+    for algo in ["KMeans", "KMeans_with_preprocess"]:
+        for phase in ["preprocessing", "fit", "nmi", "silhouette"]:
+            assert np.all(df[algo, phase + "_wall_time"].values >= 0)
+            assert np.all(df[algo, phase + "_cpu_time"].values >= 0)
+        assert np.all(df[algo, "fit_peak_memory"].values[:n_repetitions] > 0)
+        assert np.all(df[algo, "peak_rss"].values[:n_repetitions] > 0)
+    with open(profiling_path, "r") as f:
+        trace = json.load(f)
+    assert trace["dataset"] == "X"
+    assert len(trace["units"]) == len(algorithms) * n_repetitions
+    assert set(trace["units"][0]["phases"].keys()) == {"preprocessing", "fit", "nmi", "silhouette"}
+    assert set(trace["units"][0]["phases"]["fit"].keys()) == {"wall_time", "cpu_time", "peak_memory"} or set(
+        trace["units"][0]["phases"]["fit"].keys()) == {"wall_time", "cpu_time", "peak_memory", "peak_torch_memory"}
+    # Cached results do not contain a peak resident set size
+    cache_dir = str(tmp_path / "cache")
+    for _ in range(2):
+        df = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L,
+                              n_repetitions=n_repetitions, add_profiling=True, cache_dir=cache_dir, random_state=1)
+    assert np.all(np.isnan(df["KMeans", "peak_rss"].values[:n_repetitions]))
+
+
+def test_peak_rss():
+    peak_rss_start = _reset_peak_rss()
+    X = np.ones(10 ** 7)
+    peak_rss_large = _get_peak_rss(peak_rss_start)
+    del X
+    if peak_rss_start is None:
+        # The peak could be reset, i.e., the measurement does only cover the following allocations
+        assert peak_rss_large >= 8 * 10 ** 7
+        assert _get_peak_rss(_reset_peak_rss()) < peak_rss_large
+    else:
+        assert peak_rss_large >= 0 or np.isnan(peak_rss_large)
+
+
 @pytest.mark.usefixtures("cleanup_autoencoders")
 def test_evaluate_dataset_with_neural_networks_as_iteration_parameters():
     from sklearn.cluster import KMeans
@@ -171,6 +364,36 @@ def test_evaluate_multiple_datasets():
     assert df.shape == (len(datasets) * (n_repetitions + len(aggregations)), len(algorithms) * (len(metrics) * 2 + 2))
 
 
+def test_evaluate_multiple_datasets_parallel_and_with_checkpoints(tmp_path):
+    from sklearn.cluster import KMeans, DBSCAN
+    from sklearn.metrics import normalized_mutual_info_score as nmi
+    X, L = create_subspace_data(100, subspace_features=(2, 3), random_state=1)
+    X2, L2 = create_subspace_data(100, subspace_features=(2, 3), random_state=2)
+    algorithms = [EvaluationAlgorithm(name="KMeans", algorithm=KMeans, params={"n_clusters": None, "n_init": 1}),
+                  EvaluationAlgorithm(name="DBSCAN", algorithm=DBSCAN, params={"eps": 0.5, "min_samples": 2},
+                                      deterministic=True)]
+    metrics = [EvaluationMetric(name="nmi", metric=nmi)]
+    datasets = [EvaluationDataset(name="X", data=X, labels_true=L),
+                EvaluationDataset(name="X2", data=X2, labels_true=L2)]
+    df = evaluate_multiple_datasets(evaluation_datasets=datasets, evaluation_algorithms=algorithms,
+                                    evaluation_metrics=metrics, n_repetitions=2, add_runtime=False,
+                                    add_n_clusters=True, random_state=1)
+    # Parallel execution with a shared executor must produce the same results
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    df_parallel = evaluate_multiple_datasets(evaluation_datasets=datasets, evaluation_algorithms=algorithms,
+                                             evaluation_metrics=metrics, n_repetitions=2, add_runtime=False,
+                                             add_n_clusters=True, n_jobs=2, checkpoint_dir=checkpoint_dir,
+                                             random_state=1)
+    assert df.equals(df_parallel)
+    assert len(os.listdir(os.path.join(checkpoint_dir, "X"))) == 3
+    assert len(os.listdir(os.path.join(checkpoint_dir, "X2"))) == 3
+    # Resume evaluation
+    df_resumed = evaluate_multiple_datasets(evaluation_datasets=datasets, evaluation_algorithms=algorithms,
+                                            evaluation_metrics=metrics, n_repetitions=2, add_runtime=False,
+                                            add_n_clusters=True, checkpoint_dir=checkpoint_dir, random_state=1)
+    assert df.equals(df_resumed)
+
+
 @pytest.fixture
 def cleanup_latex_table():
     yield
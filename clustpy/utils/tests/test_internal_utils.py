@@ -0,0 +1,11 @@
+from clustpy.utils._utils import _get_n_jobs
+import os
+
+
+def test_get_n_jobs():
+    assert _get_n_jobs(None) == 1
+    assert _get_n_jobs(1) == 1
+    assert _get_n_jobs(3) == 3
+    assert _get_n_jobs(0) == 1
+    assert _get_n_jobs(-1) == os.cpu_count()
+    assert _get_n_jobs(-os.cpu_count() - 5) == 1
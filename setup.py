@@ -34,7 +34,7 @@ setup(
                       'pandas',
                       'tqdm'],
     extras_require={
-        'full': ['torchvision', 'Pillow', 'nltk', 'xlrd', 'opencv-python', 'requests']
+        'full': ['torchvision', 'Pillow', 'nltk', 'xlrd', 'opencv-python', 'requests', 'numba']
     },
     ext_modules=[dip_extension]
 )